@@ -5,11 +5,16 @@ Provides webhook endpoint for HOC to trigger campaign package creation
 and automatic upload back to cloud.
 """
 
-from fastapi import FastAPI, HTTPException, Header, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import logging
 import asyncio
+import hashlib
+import json
+import time
+import traceback
 from datetime import datetime
 from typing import Optional
 import sys
@@ -21,7 +26,25 @@ sys.path.insert(0, str(Path(__file__).parent))
 from src.config import get_settings
 from src.campaign.package_builder import CampaignPackageBuilder
 from src.storage.campaign_storage import CampaignStorage
+from src.storage.hoc_uploader import HOCUploader
+from src.storage.call_store import get_call_store
+from src.storage.job_leases import LeaseLost, LeaseTimeout, default_worker_id, get_job_lease_store
+from src.storage.package_store import content_digest
+from src.storage.write_behind import get_package_writer, stop_package_writers
+from src.elevenlabs.completion_tracker import (
+    CompletionTracker, ElevenLabsStatusSource, verify_webhook_signature
+)
 from src.questions.builder import build_question_catalog
+from src.questions.structured_output import get_structured_output_stats
+from src.questions.llm_adapter import get_streaming_stats
+from src.questions.provider_health import get_provider_health
+from src.questions.latency_budget import get_latency_budgets
+from src.questions.classification_cache import get_classification_cache
+from src.aggregator.kb_store import KnowledgeStore, get_kb_registry
+from src.utils.diagnostics import get_diagnostics
+from src.utils.loop_monitor import LoopLagMonitor
+from src.utils.admission import AdmissionRejected, client_key, get_admission_controller
+from src.utils import json_codec
 
 # Logging Setup
 logging.basicConfig(
@@ -30,8 +53,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Prozessweiter HOC Uploader + Outbox-Worker (siehe startup/shutdown)
+_hoc_uploader: Optional[HOCUploader] = None
+_outbox_task: Optional[asyncio.Task] = None
+_loop_monitor: Optional[LoopLagMonitor] = None
+_completion_tracker: Optional[CompletionTracker] = None
+_status_source: Optional[ElevenLabsStatusSource] = None
+
+# Kennung dieses Worker-Prozesses für Job Leases (mehrere uvicorn Worker/Nodes)
+_worker_id = default_worker_id()
+
+
+
+class FastJSONResponse(JSONResponse):
+    """Rendert Responses mit dem schnellen JSON Codec (orjson, falls installiert)"""
+    
+    def render(self, content) -> bytes:
+        return json_codec.dumps(content)
+
+
 # FastAPI App
 app = FastAPI(
+    default_response_class=FastJSONResponse,
     title="VoiceKI Campaign Setup API",
     version="1.0.0",
     description="Webhook API für Campaign Package Setup via HOC"
@@ -138,6 +181,17 @@ async def log_requests(request, call_next):
     return response
 
 
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Überlast: sofort 503 mit Retry-After statt Timeout"""
+    logger.warning(f"Admission rejected ({exc.reason}): {request.url.path} - retry in {exc.retry_after}s")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server ausgelastet - bitte später erneut versuchen", "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
 # Helper Functions
 def verify_webhook_auth(authorization: Optional[str] = None) -> bool:
     """
@@ -192,19 +246,16 @@ def trim_question(question) -> dict:
         'priority', 'help_text', 'gate_config'  # NEU: gate_config für ElevenLabs
     }
     
-    # #region agent log
-    import json, time
     try:
         q_dict = question.model_dump()
-        success = True
-        error_msg = None
     except Exception as e:
         # Fallback: Falls model_dump() fehlschlägt, versuche dict()
         q_dict = dict(question)
-        success = False
-        error_msg = str(e)
-    with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:195','message':'trim_question model_dump','data':{'success':success,'error':error_msg,'q_id':getattr(question,'id','unknown'),'has_metadata':hasattr(question,'metadata'),'has_gate_config':hasattr(question,'gate_config')},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'A,B'})+'\n')
-    # #endregion
+        get_diagnostics().event(
+            'trim_question', 'model_dump fehlgeschlagen',
+            {'error': str(e), 'q_id': getattr(question, 'id', 'unknown')},
+            force=True
+        )
     
     # Filtere nur erlaubte Felder (metadata wird automatisch ausgeschlossen)
     return {
@@ -231,59 +282,201 @@ async def run_campaign_setup(
     
     Returns:
         Campaign Package Dict
+    
+    Raises:
+        LeaseTimeout: Build läuft in einem anderen Worker und wurde nicht rechtzeitig fertig
+        LeaseLost: Lease ging während des Builds an einen anderen Worker
     """
     settings = get_settings()
-    storage = CampaignStorage()
+    storage = await asyncio.to_thread(CampaignStorage)
     
     # Existierendes Package nutzen wenn vorhanden
-    if storage.package_exists(campaign_id) and not force:
+    if not force and await asyncio.to_thread(storage.package_exists, campaign_id):
         logger.info(f"Using existing package for campaign {campaign_id}")
-        return storage.load_package(campaign_id)
+        return await asyncio.to_thread(storage.load_package, campaign_id)
     
-    # Neues Package erstellen mit übergebenen Daten
-    builder = CampaignPackageBuilder(
-        prompts_dir=settings.get_prompts_dir_path()
-    )
+    # Genau ein Build pro Kampagne über alle Worker: andere Worker warten
+    # auf den laufenden Build und nutzen dessen Package
+    built: dict = {}
     
-    # build_package_from_data ist neu - nimmt Daten direkt
-    package = await builder.build_package_from_data(
-        campaign_id=campaign_id,
-        company_data=company_data,
-        protocol_data=protocol_data
+    async def build() -> dict:
+        # Neues Package erstellen mit übergebenen Daten
+        builder = CampaignPackageBuilder(
+            prompts_dir=settings.get_prompts_dir_path()
+        )
+        
+        # build_package_from_data ist neu - nimmt Daten direkt
+        package = await builder.build_package_from_data(
+            campaign_id=campaign_id,
+            company_data=company_data,
+            protocol_data=protocol_data
+        )
+        
+        # Write-Behind: Antwort sobald das Package im Speicher übernommen ist,
+        # Kompression + fsync laufen im Hintergrund
+        if settings.package_write_behind:
+            storage.enqueue_package(campaign_id, package)
+        else:
+            await asyncio.to_thread(storage.save_package, campaign_id, package)
+        built[campaign_id] = package
+        return {
+            "campaign_id": campaign_id,
+            "created_at": package.get("created_at"),
+            "hash": content_digest(package)
+        }
+    
+    def package_stored(result: Optional[dict]) -> bool:
+        # Der bauende Worker speichert per Write-Behind: "done" heißt erst
+        # dann verwendbar, wenn das Package mit diesem Hash vorliegt
+        digest = (result or {}).get("hash")
+        return not digest or storage.has_version(campaign_id, digest)
+    
+    fingerprint = hashlib.sha256(
+        json.dumps([company_data, protocol_data], sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    result, _ = await get_job_lease_store().run_once(
+        f"campaign_setup:{campaign_id}",
+        build,
+        fingerprint=fingerprint,
+        force=force,
+        wait_timeout=settings.campaign_setup_wait_seconds,
+        verify_done=package_stored
     )
     
-    storage.save_package(campaign_id, package)
+    if campaign_id in built:
+        return built[campaign_id]
+    logger.info(f"Campaign {campaign_id} wurde von einem anderen Worker gebaut")
+    return await asyncio.to_thread(storage.load_package, campaign_id)
+
+
+def get_hoc_uploader() -> HOCUploader:
+    """
+    Gibt den prozessweiten HOC Uploader zurück (gepoolter HTTP-Client).
     
-    return package
+    Returns:
+        HOCUploader Singleton
+    """
+    global _hoc_uploader
+    if _hoc_uploader is None:
+        settings = get_settings()
+        _hoc_uploader = HOCUploader(
+            hoc_api_url=settings.hoc_api_url,
+            hoc_api_key=settings.api_key,
+            outbox_dir=settings.hoc_outbox_dir,
+            max_attempts=settings.hoc_upload_max_attempts,
+            backoff_base=settings.hoc_upload_backoff_seconds,
+            timeout_seconds=settings.hoc_upload_timeout_seconds
+        )
+    return _hoc_uploader
 
 
 async def upload_to_hoc(package: dict) -> str:
     """
-    Uploaded Campaign Package zu HOC Cloud (async wrapper).
+    Uploaded Campaign Package zu HOC Cloud.
+    
+    Schlägt der Upload nach allen Retries fehl, wird das Package in die
+    Outbox gelegt und im Hintergrund erneut hochgeladen - der Webhook
+    schlägt deshalb nicht fehl.
     
     Args:
         package: Campaign Package
     
     Returns:
-        Download URL
+        Download URL (bzw. lokale URL solange der Upload aussteht)
     """
     settings = get_settings()
+    local_url = f"local://campaign_packages/{package['campaign_id']}.json"
     
     # Prüfe ob Upload aktiviert
     if not settings.hoc_upload_enabled:
         logger.warning("HOC Upload deaktiviert - Package nur lokal gespeichert")
-        return f"local://campaign_packages/{package['campaign_id']}.json"
+        return local_url
     
-    storage = CampaignStorage()
+    download_url = await get_hoc_uploader().upload_or_enqueue(package)
+    return download_url or local_url
+
+
+def _store_completed_transcript(result: dict) -> None:
+    """Completion Callback: Transkript an den gespeicherten Call hängen"""
+    if result.get("transcript"):
+        get_call_store().attach_transcript(result["conversation_id"], result["transcript"])
+
+
+async def _is_outbox_leader() -> bool:
+    """Nur ein Worker leert die geteilte Outbox (Leader-Lease, bei Absturz übernimmt ein anderer)"""
+    return await asyncio.to_thread(get_job_lease_store().hold, "hoc_outbox", _worker_id)
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Startet Diagnostics-Writer, Loop Lag Monitor, Completion Tracker und Outbox-Worker für ausstehende HOC Uploads"""
+    global _outbox_task, _loop_monitor, _completion_tracker, _status_source
+    settings = get_settings()
+    
+    get_diagnostics().start()
     
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(
-        None,
-        storage.upload_to_hoc,
-        package,
-        settings.hoc_api_url,
-        settings.api_key
+    if settings.loop_monitor_enabled:
+        _loop_monitor = LoopLagMonitor(
+            interval_seconds=settings.loop_monitor_interval_seconds,
+            threshold_seconds=settings.loop_monitor_threshold_seconds,
+            on_stall=lambda stall: get_diagnostics().event(
+                'event_loop', 'Event Loop blockiert', stall, force=True
+            )
+        )
+        _loop_monitor.start()
+    
+    _status_source = ElevenLabsStatusSource(settings.elevenlabs_api_key)
+    _completion_tracker = CompletionTracker(
+        fetch_status=_status_source.status,
+        fetch_transcript=_status_source.transcript,
+        batch_size=settings.completion_poll_batch_size,
+        min_interval=settings.completion_poll_min_seconds,
+        max_interval=settings.completion_poll_max_seconds,
+        timeout=settings.completion_timeout_seconds
     )
+    _completion_tracker.add_callback(_store_completed_transcript)
+    _completion_tracker.start()
+    
+    if settings.hoc_upload_enabled:
+        _outbox_task = asyncio.create_task(
+            get_hoc_uploader().run_outbox_worker(
+                settings.hoc_outbox_interval_seconds,
+                is_leader=_is_outbox_leader
+            )
+        )
+        logger.info("HOC Outbox-Worker gestartet")
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stoppt Hintergrund-Worker und schließt den HTTP-Client"""
+    global _outbox_task, _loop_monitor, _completion_tracker, _status_source
+    if _loop_monitor is not None:
+        await _loop_monitor.stop()
+        _loop_monitor = None
+    
+    if _completion_tracker is not None:
+        await _completion_tracker.stop()
+        _completion_tracker = None
+    if _status_source is not None:
+        await _status_source.aclose()
+        _status_source = None
+    
+    if _outbox_task is not None:
+        _outbox_task.cancel()
+        try:
+            await _outbox_task
+        except asyncio.CancelledError:
+            pass
+        _outbox_task = None
+    
+    if _hoc_uploader is not None:
+        await _hoc_uploader.aclose()
+    
+    # Ausstehende Packages vor dem Beenden auf die Platte bringen
+    await asyncio.to_thread(stop_package_writers)
+    
+    get_diagnostics().stop()
 
 
 # Endpoints
@@ -302,10 +495,50 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health Check Endpoint für Render.com"""
+    classification_cache = get_classification_cache()
+    # SQLite-Abfrage bzw. Writer-Locks: nicht im Event Loop
+    job_leases, package_writer = await asyncio.gather(
+        asyncio.to_thread(lambda: get_job_lease_store().stats()),
+        asyncio.to_thread(lambda: get_package_writer().stats())
+    )
     return {
         "status": "healthy",
         "version": "1.0.0",
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": datetime.utcnow().isoformat(),
+        "event_loop": _loop_monitor.stats() if _loop_monitor else None,
+        "structured_output": get_structured_output_stats(),
+        "llm_streaming": get_streaming_stats(),
+        "llm_providers": get_provider_health().snapshot(),
+        "llm_timeouts": get_latency_budgets().snapshot(),
+        "classification_cache": classification_cache.stats() if classification_cache else None,
+        "completion_tracker": _completion_tracker.stats() if _completion_tracker else None,
+        "job_leases": job_leases,
+        "admission": get_admission_controller().stats(),
+        "package_writer": package_writer
+    }
+
+
+@app.get("/diagnostics")
+async def diagnostics_events(
+    limit: int = 100,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Letzte Diagnose-Events aus dem Ring Buffer.
+    
+    Args:
+        limit: Max. Anzahl Events
+        authorization: Bearer Token
+    
+    Returns:
+        Zähler und Events (neueste zuletzt)
+    """
+    verify_webhook_auth(authorization)
+    
+    diagnostics = get_diagnostics()
+    return {
+        "stats": diagnostics.stats(),
+        "events": diagnostics.recent(limit)
     }
 
 
@@ -328,7 +561,8 @@ async def setup_campaign_webhook(
         Setup Response mit Package-Info
     
     Raises:
-        HTTPException: Bei Fehlern (401, 404, 400, 500)
+        HTTPException: Bei Fehlern (401, 404, 400, 409, 500)
+        AdmissionRejected: Bei Überlast (503 mit Retry-After)
     """
     
     # 1. Auth prüfen
@@ -336,50 +570,58 @@ async def setup_campaign_webhook(
     
     logger.info(f"Setup triggered for campaign {request.campaign_id} (force={request.force_rebuild})")
     
-    try:
-        # 2. Setup ausführen mit übergebenen Daten
-        package = await run_campaign_setup(
-            campaign_id=request.campaign_id,
-            company_data=request.company.model_dump(),
-            protocol_data=request.conversation_protocol.model_dump(),
-            force=request.force_rebuild
-        )
-        
-        logger.info(f"Package created for campaign {request.campaign_id}")
-        
-        # 3. Zu HOC uploaden
-        download_url = await upload_to_hoc(package)
-        
-        logger.info(f"Package uploaded: {download_url}")
-        
-        # 4. Response
-        return SetupCampaignResponse(
-            status="success",
-            package_id=package['campaign_id'],
-            created_at=package['created_at'],
-            download_url=download_url,
-            question_count=len(package['questions'].get('questions', [])),
-            company_name=package['company_name']
-        )
+    # Admission Control: begrenzte Queue, Fair Queuing pro Token (503 bei Überlast)
+    async with get_admission_controller().slot(client_key(authorization)):
+        try:
+            # 2. Setup ausführen mit übergebenen Daten
+            package = await run_campaign_setup(
+                campaign_id=request.campaign_id,
+                company_data=request.company.model_dump(),
+                protocol_data=request.conversation_protocol.model_dump(),
+                force=request.force_rebuild
+            )
+            
+            logger.info(f"Package created for campaign {request.campaign_id}")
+            
+            # 3. Zu HOC uploaden
+            download_url = await upload_to_hoc(package)
+            
+            logger.info(f"Package uploaded: {download_url}")
+            
+            # 4. Response
+            return SetupCampaignResponse(
+                status="success",
+                package_id=package['campaign_id'],
+                created_at=package['created_at'],
+                download_url=download_url,
+                question_count=len(package['questions'].get('questions', [])),
+                company_name=package['company_name']
+            )
         
-    except FileNotFoundError as e:
-        logger.error(f"File not found: {e}")
-        raise HTTPException(
-            status_code=404,
-            detail=str(e)
-        )
-    except ValueError as e:
-        logger.error(f"Validation error: {e}")
-        raise HTTPException(
-            status_code=400,
-            detail=str(e)
-        )
-    except Exception as e:
-        logger.error(f"Setup failed: {e}", exc_info=True)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
-        )
+        except (LeaseTimeout, LeaseLost) as e:
+            logger.error(f"Campaign build owned by another worker: {e}")
+            raise HTTPException(
+                status_code=409,
+                detail=str(e)
+            )
+        except FileNotFoundError as e:
+            logger.error(f"File not found: {e}")
+            raise HTTPException(
+                status_code=404,
+                detail=str(e)
+            )
+        except ValueError as e:
+            logger.error(f"Validation error: {e}")
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+        except Exception as e:
+            logger.error(f"Setup failed: {e}", exc_info=True)
+            raise HTTPException(
+                status_code=500,
+                detail=f"Internal server error: {str(e)}"
+            )
 
 
 @app.get("/campaigns/{campaign_id}/package")
@@ -412,15 +654,15 @@ async def get_campaign_package(
     logger.info(f"Package retrieval requested for campaign {campaign_id}")
     
     try:
-        storage = CampaignStorage()
+        storage = await asyncio.to_thread(CampaignStorage)
         
-        if not storage.package_exists(campaign_id):
+        if not await asyncio.to_thread(storage.package_exists, campaign_id):
             raise HTTPException(
                 status_code=404,
                 detail=f"Campaign Package {campaign_id} nicht gefunden. Bitte zuerst Setup durchführen."
             )
         
-        package = storage.load_package(campaign_id)
+        package = await asyncio.to_thread(storage.load_package, campaign_id)
         
         logger.info(f"Package {campaign_id} successfully retrieved")
         return package
@@ -435,6 +677,197 @@ async def get_campaign_package(
         )
 
 
+def get_campaign_kb_store(campaign_id: str) -> KnowledgeStore:
+    """
+    Indexierter Knowledge Store einer Kampagne für den On-Demand-Lookup.
+    
+    Bevorzugt den Store aus dem Call-Pfad (Phase-Abschnitte), sonst wird er
+    aus dem gespeicherten Campaign Package gebaut (einmal pro Package-Inhalt).
+    
+    Raises:
+        HTTPException: 404 wenn weder Store noch Package existiert
+    """
+    registry = get_kb_registry()
+    store = registry.get(campaign_id)
+    if store is not None:
+        return store
+    
+    storage = CampaignStorage()
+    if not storage.package_exists(campaign_id):
+        raise HTTPException(
+            status_code=404,
+            detail=f"Campaign Package {campaign_id} nicht gefunden. Bitte zuerst Setup durchführen."
+        )
+    # Nur die benötigten Abschnitte laden (SQLite Backend liest den Rest nicht)
+    package = storage.load_sections(campaign_id, "knowledge_base", "questions")
+    sources = {
+        "knowledge_base": package.get("knowledge_base") or {},
+        "questions": package.get("questions") or {}
+    }
+    return registry.get_or_build(f"package:{campaign_id}", sources, KnowledgeStore.from_package)
+
+
+@app.get("/campaigns/{campaign_id}/kb/search")
+async def search_campaign_kb(
+    campaign_id: str,
+    q: str,
+    k: int = 5,
+    phase: Optional[str] = None,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    BM25-Suche in den Knowledge-Base-Abschnitten einer Kampagne.
+    
+    Nutzen: Agent lädt Abschnitte nach, die nicht im Conversation Payload sind
+    (siehe kb_payload_max_chars).
+    
+    Args:
+        campaign_id: Campaign ID
+        q: Suchanfrage (z.B. "Gehalt Nachtschicht")
+        k: Max. Anzahl Treffer
+        phase: Optional nur Abschnitte dieser Phase
+        authorization: Bearer Token
+    
+    Returns:
+        Treffer mit ID, Titel, Text, Größe und Score
+    """
+    verify_webhook_auth(authorization)
+    
+    store = await asyncio.to_thread(get_campaign_kb_store, campaign_id)
+    return {
+        "campaign_id": campaign_id,
+        "query": q,
+        "results": store.search(q, k=max(1, min(k, 20)), phase=phase)
+    }
+
+
+@app.get("/campaigns/{campaign_id}/kb/sections/{section_id}")
+async def get_campaign_kb_section(
+    campaign_id: str,
+    section_id: str,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Einzelner Knowledge-Base-Abschnitt (ID aus dem Payload-Verzeichnis).
+    
+    Raises:
+        HTTPException: 404 wenn der Abschnitt nicht existiert
+    """
+    verify_webhook_auth(authorization)
+    
+    store = await asyncio.to_thread(get_campaign_kb_store, campaign_id)
+    section = store.section(section_id)
+    if section is None:
+        raise HTTPException(status_code=404, detail=f"KB-Abschnitt {section_id} nicht gefunden")
+    return section
+
+
+@app.get("/calls")
+async def list_calls(
+    applicant_id: Optional[str] = None,
+    campaign_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+    offset: int = 0,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Listet gespeicherte Calls aus dem Call Store (neueste zuerst).
+    
+    Args:
+        applicant_id: Optional nur Calls dieses Bewerbers
+        campaign_id: Optional nur Calls dieser Kampagne
+        since/until: Optional Zeitraum (ISO 8601)
+        limit/offset: Pagination (limit max. 1000)
+        authorization: Bearer Token
+    
+    Returns:
+        Calls ohne Knowledge-Base-Text (nur Hash und Größe)
+    """
+    verify_webhook_auth(authorization)
+    
+    calls = await asyncio.to_thread(
+        get_call_store().list_calls,
+        applicant_id=applicant_id,
+        campaign_id=campaign_id,
+        since=since,
+        until=until,
+        limit=max(1, min(limit, 1000)),
+        offset=max(0, offset)
+    )
+    return {"count": len(calls), "calls": calls}
+
+
+@app.post("/webhook/elevenlabs/conversation-ended")
+async def elevenlabs_conversation_ended(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    elevenlabs_signature: Optional[str] = Header(None)
+):
+    """
+    Empfängt Post-Call Events von ElevenLabs.
+    
+    Beendet das Warten auf die Conversation sofort (statt Polling) und
+    speichert das mitgelieferte Transkript.
+    
+    Args:
+        request: Roher Request (Body für die HMAC-Prüfung)
+        authorization: Bearer Token (wenn kein ElevenLabs Secret gesetzt)
+        elevenlabs_signature: ElevenLabs-Signature Header ("t=...,v0=...")
+    
+    Raises:
+        HTTPException: 401 (Signatur ungültig), 422 (keine conversation_id)
+    """
+    settings = get_settings()
+    body = await request.body()
+    
+    if settings.elevenlabs_webhook_secret:
+        if not verify_webhook_signature(body, elevenlabs_signature, settings.elevenlabs_webhook_secret):
+            raise HTTPException(status_code=401, detail="Invalid ElevenLabs signature")
+    else:
+        verify_webhook_auth(authorization)
+    
+    try:
+        event = json.loads(body or b"{}")
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid JSON body")
+    
+    # Post-Call Webhooks liefern {"type": ..., "data": {...}}
+    data = event.get("data", event) if isinstance(event, dict) else {}
+    conversation_id = data.get("conversation_id")
+    if not conversation_id:
+        raise HTTPException(status_code=422, detail="conversation_id missing")
+    
+    if _completion_tracker is None:
+        raise HTTPException(status_code=503, detail="Completion tracker not running")
+    
+    result = await _completion_tracker.notify(conversation_id, {
+        "status": data.get("status", "done"),
+        "transcript": data.get("transcript")
+    })
+    logger.info(f"Conversation beendet (Webhook): {conversation_id}")
+    return {"conversation_id": conversation_id, "status": result["status"]}
+
+
+@app.post("/conversations/{conversation_id}/track")
+async def track_conversation(
+    conversation_id: str,
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Registriert eine laufende Conversation für das Fallback-Polling.
+    
+    Kommt kein Webhook, fragt der Tracker den Status mit wachsendem
+    Intervall ab und speichert das Transkript beim Abschluss.
+    """
+    verify_webhook_auth(authorization)
+    if _completion_tracker is None:
+        raise HTTPException(status_code=503, detail="Completion tracker not running")
+    _completion_tracker.track(conversation_id)
+    return {"conversation_id": conversation_id, "tracking": True}
+
+
 @app.get("/campaigns", response_model=CampaignListResponse)
 async def list_campaigns(
     authorization: str = Header(None)
@@ -462,25 +895,18 @@ async def list_campaigns(
     logger.info("Campaign list requested")
     
     try:
-        storage = CampaignStorage()
-        campaigns = storage.list_campaigns()
+        storage = await asyncio.to_thread(CampaignStorage)
+        campaigns = await asyncio.to_thread(storage.list_campaigns)
         
         # Konvertiere zu Response-Format
         campaign_items = []
         for campaign in campaigns:
-            # Lade Package für question_count
-            try:
-                pkg = storage.load_package(campaign['campaign_id'])
-                question_count = len(pkg.get('questions', {}).get('questions', []))
-            except Exception:
-                question_count = 0
-            
             campaign_items.append(CampaignListItem(
                 campaign_id=campaign['campaign_id'],
                 company_name=campaign['company_name'],
                 campaign_name=campaign['campaign_name'],
                 created_at=campaign['created_at'],
-                question_count=question_count
+                question_count=campaign['question_count']
             ))
         
         logger.info(f"Returning {len(campaign_items)} campaigns")
@@ -517,123 +943,126 @@ async def process_protocol_webhook(
     
     Raises:
         HTTPException: Bei Fehlern (401, 500)
+        AdmissionRejected: Bei Überlast (503 mit Retry-After)
     """
     
-    # #region agent log
-    import json, time
-    with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:521','message':'Webhook Entry BEFORE auth','data':{'protocol_id':request.id,'protocol_name':request.name,'has_auth':authorization is not None},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'A'})+'\n')
-    # #endregion
+    diagnostics = get_diagnostics()
+    diagnostics.event('process_protocol_webhook', 'Webhook Entry', {
+        'protocol_id': request.id,
+        'protocol_name': request.name,
+        'has_auth': authorization is not None
+    })
     
     # 1. Auth prüfen
     verify_webhook_auth(authorization)
     
-    # #region agent log
-    with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:524','message':'Auth passed','data':{'protocol_id':request.id},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'A'})+'\n')
-    # #endregion
-    
     logger.info(f"Protocol processing triggered for: {request.name} (ID: {request.id})")
     
-    try:
-        # 2. Questions generieren mit OpenAI
-        logger.info("Generating questions with OpenAI...")
-        
-        # #region agent log
-        with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:542','message':'Before build_question_catalog','data':{'protocol_id':request.id},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'B,C'})+'\n')
-        # #endregion
-        
-        build_context = {
-            "policy_level": "standard"  # Standard policies
-        }
-        
-        questions_catalog = await build_question_catalog(
-            request.model_dump(),
-            build_context
-        )
-        
-        # #region agent log
-        with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:554','message':'After build_question_catalog','data':{'question_count':len(questions_catalog.questions),'has_kb':hasattr(questions_catalog,'knowledge_base')},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'B,C'})+'\n')
-        # #endregion
-        
-        logger.info(f"Generated {len(questions_catalog.questions)} questions")
-        
-        # 3. Trim questions to essential fields
-        trimmed_questions = [
-            trim_question(q) 
-            for q in questions_catalog.questions
-        ]
-        
-        logger.info("Questions trimmed and ready")
-        
-        # 4. Optional: Export questions.json with knowledge_base (for Agent/VoiceKI)
-        # This is saved to file AND included in webhook response
+    # Admission Control: bei Überlast 503 statt Fallback-Response (HOC kann erneut senden)
+    async with get_admission_controller().slot(client_key(authorization)):
         try:
-            import json
-            from pathlib import Path
+            # 2. Questions generieren mit OpenAI
+            logger.info("Generating questions with OpenAI...")
             
-            # Build questions.json structure
-            questions_json = {
-                "_meta": questions_catalog.meta.model_dump(),
-                "questions": trimmed_questions
+            build_context = {
+                "policy_level": "standard"  # Standard policies
             }
             
-            # Add knowledge_base if exists (from V2)
-            if hasattr(questions_catalog, 'knowledge_base') and questions_catalog.knowledge_base:
-                questions_json['knowledge_base'] = questions_catalog.knowledge_base
-                logger.info(f"Knowledge base attached with {len(questions_catalog.knowledge_base)} categories")
+            build_started = time.perf_counter()
+            questions_catalog = await build_question_catalog(
+                request.model_dump(),
+                build_context
+            )
             
-            # Save to file for Agent/VoiceKI
-            output_dir = Path("output")
-            output_dir.mkdir(exist_ok=True)
-            output_path = output_dir / f"questions_{request.id}.json"
+            diagnostics.event('process_protocol_webhook', 'build_question_catalog fertig', {
+                'protocol_id': request.id,
+                'question_count': len(questions_catalog.questions),
+                'has_kb': bool(getattr(questions_catalog, 'knowledge_base', None)),
+                'duration_ms': round((time.perf_counter() - build_started) * 1000, 1)
+            })
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(questions_json, f, ensure_ascii=False, indent=2)
+            logger.info(f"Generated {len(questions_catalog.questions)} questions")
             
-            logger.info(f"Questions.json saved to: {output_path}")
-        except Exception as e:
-            logger.warning(f"Failed to save questions.json: {e}")
-            # Non-critical, continue
-        
-        # 5. Webhook Response mit knowledge_base
-        knowledge_base = getattr(questions_catalog, 'knowledge_base', None)
-        
-        response_obj = ProcessProtocolResponse(
-            protocol_id=request.id,
-            protocol_name=request.name,
-            processed_at=datetime.utcnow().isoformat() + "Z",
-            question_count=len(trimmed_questions),
-            questions=trimmed_questions,
-            knowledge_base=knowledge_base
-        )
-        
-        # #region agent log
-        response_dict = response_obj.model_dump()
-        with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:599','message':'Webhook Response Built','data':{'has_questions_key':'questions' in response_dict,'question_count':len(response_dict.get('questions',[])),'response_keys':list(response_dict.keys())},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'D'})+'\n')
-        # #endregion
-        
-        return response_obj
-        
-    except Exception as e:
-        # #region agent log
-        import traceback
-        error_tb = traceback.format_exc()
-        with open(r'c:\Users\David Jekal\Desktop\Projekte\KI-Sellcrtuiting_VoiceKI\.cursor\debug.log', 'a') as f: f.write(json.dumps({'location':'api_server.py:614','message':'Exception caught','data':{'error_type':type(e).__name__,'error_msg':str(e),'traceback':error_tb[:500]},'timestamp':int(time.time()*1000),'sessionId':'debug-session','hypothesisId':'B,C,D'})+'\n')
-        # #endregion
-        logger.error(f"Protocol processing failed: {e}", exc_info=True)
+            # 3. Trim questions to essential fields
+            trimmed_questions = [
+                trim_question(q) 
+                for q in questions_catalog.questions
+            ]
+            
+            logger.info("Questions trimmed and ready")
+            
+            # 4. Optional: Export questions.json with knowledge_base (for Agent/VoiceKI)
+            # This is saved to file AND included in webhook response
+            try:
+                settings = get_settings()
+                
+                # Build questions.json structure
+                questions_json = {
+                    "_meta": questions_catalog.meta.model_dump(),
+                    "questions": trimmed_questions
+                }
+                
+                # Add knowledge_base if exists (from V2)
+                if hasattr(questions_catalog, 'knowledge_base') and questions_catalog.knowledge_base:
+                    questions_json['knowledge_base'] = questions_catalog.knowledge_base
+                    logger.info(f"Knowledge base attached with {len(questions_catalog.knowledge_base)} categories")
+                
+                # Save to file for Agent/VoiceKI
+                output_dir = Path("output")
+                output_dir.mkdir(exist_ok=True)
+                output_path = output_dir / f"questions_{request.id}.json"
+                
+                await asyncio.to_thread(
+                    json_codec.dump_file, output_path, questions_json, settings.json_pretty_output
+                )
+                
+                logger.info(f"Questions.json saved to: {output_path}")
+            except Exception as e:
+                logger.warning(f"Failed to save questions.json: {e}")
+                # Non-critical, continue
+            
+            # 5. Webhook Response mit knowledge_base
+            knowledge_base = getattr(questions_catalog, 'knowledge_base', None)
+            
+            response_obj = ProcessProtocolResponse(
+                protocol_id=request.id,
+                protocol_name=request.name,
+                processed_at=datetime.utcnow().isoformat() + "Z",
+                question_count=len(trimmed_questions),
+                questions=trimmed_questions,
+                knowledge_base=knowledge_base
+            )
+            
+            diagnostics.event('process_protocol_webhook', 'Webhook Response Built', {
+                'protocol_id': request.id,
+                'question_count': response_obj.question_count,
+                'has_kb': knowledge_base is not None
+            })
+            
+            return response_obj
         
-        # Robuster Fallback: Gib eine valide Response mit leeren questions zurück
-        # anstatt HTTPException zu werfen, damit HOC nicht crasht
-        return ProcessProtocolResponse(
-            protocol_id=request.id,
-            protocol_name=request.name,
-            processed_at=datetime.utcnow().isoformat() + "Z",
-            question_count=0,
-            questions=[],
-            knowledge_base={
-                "error": str(e),
-                "error_type": type(e).__name__
-            }
-        )
+        except Exception as e:
+            diagnostics.event('process_protocol_webhook', 'Exception caught', {
+                'protocol_id': request.id,
+                'error_type': type(e).__name__,
+                'error_msg': str(e),
+                'traceback': traceback.format_exc()[-2000:]
+            }, force=True)
+            logger.error(f"Protocol processing failed: {e}", exc_info=True)
+            
+            # Robuster Fallback: Gib eine valide Response mit leeren questions zurück
+            # anstatt HTTPException zu werfen, damit HOC nicht crasht
+            return ProcessProtocolResponse(
+                protocol_id=request.id,
+                protocol_name=request.name,
+                processed_at=datetime.utcnow().isoformat() + "Z",
+                question_count=0,
+                questions=[],
+                knowledge_base={
+                    "error": str(e),
+                    "error_type": type(e).__name__
+                }
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,117 @@
+"""Benchmark: JSON Encode/Decode von Campaign Packages (stdlib json vs. json_codec)"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils import json_codec
+
+# Typische Package-Größen: Anzahl Fragen
+SIZES = {"klein": 20, "mittel": 100, "groß": 400}
+
+
+def synthetic_package(question_count: int) -> dict:
+    """Package mit realistischer Struktur (Fragen, Gates, Knowledge Base, Umlaute)"""
+    questions = [
+        {
+            "id": f"q_{i}",
+            "question": f"Haben Sie Erfahrung im Bereich Intensivpflege, Station {i}? Wie viele Jahre?",
+            "type": "boolean" if i % 3 else "choice",
+            "options": ["Ja", "Nein", "Teilweise"] if i % 3 == 0 else None,
+            "priority": i % 5,
+            "group": ["standardqualifikationen", "rahmenbedingungen", "präferenzen"][i % 3],
+            "help_text": "Bitte kurz begründen - z.B. Weiterbildung, Fachkrankenpflege o.ä.",
+            "conditions": [{"when": f"q_{i - 1}", "equals": "Ja"}] if i else [],
+            "metadata": {"source": "protocol", "page": i // 10, "confidence": 0.93}
+        }
+        for i in range(question_count)
+    ]
+    return {
+        "company_name": "Klinikum Süd GmbH",
+        "campaign_id": "bench",
+        "campaign_name": "Pflegefachkraft (m/w/d)",
+        "created_at": "2025-06-02T10:00:00Z",
+        "company_info": {"size": "1200", "benefits": "Jobrad, betriebliche Altersvorsorge, 30 Tage Urlaub"},
+        "questions": {"_meta": {"version": 2}, "questions": questions},
+        "gate_questions": questions[: question_count // 4],
+        "preference_questions": questions[question_count // 4: question_count // 2],
+        "knowledge_base": {
+            f"kategorie_{k}": [f"Antwort {k}.{n}: Schichtdienst, Zuschläge, Einarbeitung über 6 Wochen." for n in range(20)]
+            for k in range(max(3, question_count // 20))
+        }
+    }
+
+
+def _best_of(func, repeat: int) -> float:
+    """Schnellste von repeat Messungen in Millisekunden (robust gegen Ausreißer)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run_benchmark(sizes: dict = SIZES, repeat: int = 20) -> list:
+    """
+    Misst Encode/Decode pro Package-Größe.
+
+    Returns:
+        Liste von Ergebnis-Dicts (Größe, Bytes, Zeiten in ms)
+    """
+    results = []
+    for label, count in sizes.items():
+        package = synthetic_package(count)
+        legacy = json.dumps(package, indent=2, ensure_ascii=False).encode("utf-8")
+        compact = json_codec.dumps(package)
+
+        results.append({
+            "size": label,
+            "questions": count,
+            "bytes_legacy": len(legacy),
+            "bytes_compact": len(compact),
+            "encode_legacy_ms": _best_of(
+                lambda: json.dumps(package, indent=2, ensure_ascii=False).encode("utf-8"), repeat
+            ),
+            "encode_codec_ms": _best_of(lambda: json_codec.dumps(package), repeat),
+            "decode_legacy_ms": _best_of(lambda: json.loads(legacy.decode("utf-8")), repeat),
+            "decode_codec_ms": _best_of(lambda: json_codec.loads(compact), repeat),
+        })
+    return results
+
+
+def format_results(results: list) -> str:
+    lines = [
+        f"Backend: {json_codec.backend()} (Referenz: stdlib json, indent=2)",
+        f"{'Größe':<8}{'Fragen':>7}{'KB alt':>9}{'KB neu':>9}"
+        f"{'enc alt':>10}{'enc neu':>10}{'dec alt':>10}{'dec neu':>10}{'Faktor':>8}"
+    ]
+    for r in results:
+        old = r["encode_legacy_ms"] + r["decode_legacy_ms"]
+        new = r["encode_codec_ms"] + r["decode_codec_ms"]
+        lines.append(
+            f"{r['size']:<8}{r['questions']:>7}{r['bytes_legacy'] / 1024:>9.1f}{r['bytes_compact'] / 1024:>9.1f}"
+            f"{r['encode_legacy_ms']:>8.2f}ms{r['encode_codec_ms']:>8.2f}ms"
+            f"{r['decode_legacy_ms']:>8.2f}ms{r['decode_codec_ms']:>8.2f}ms{old / new if new else 0:>7.1f}x"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON Encode/Decode Benchmark für Campaign Packages")
+    parser.add_argument("--repeat", type=int, default=20, help="Messungen pro Wert (bester Wert zählt)")
+    parser.add_argument("--json", action="store_true", help="Ergebnisse als JSON ausgeben")
+    args = parser.parse_args()
+
+    results = run_benchmark(repeat=args.repeat)
+    if args.json:
+        print(json.dumps({"backend": json_codec.backend(), "results": results}, indent=2, ensure_ascii=False))
+    else:
+        print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,15 @@
-import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.campaign_storage import CampaignStorage
 
 print("="*70)
 print("PRÜFUNG: Unternehmensprofil (Onboarding) Integration")
 print("="*70)
 
 # Campaign 258
-with open('campaign_packages/258.json', encoding='utf-8') as f:
-    c258 = json.load(f)
+c258 = CampaignStorage().load_package('258')
 
 phase2 = c258['kb_templates']['phase_2']
 phase1 = c258['kb_templates']['phase_1']
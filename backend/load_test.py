@@ -0,0 +1,80 @@
+"""Lasttest des Call-Pfads gegen einen lokalen ElevenLabs/HOC Stand-in Server"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.loadtest.standin_server import ENDPOINTS, LatencyModel, StandinConfig, StandinServer, parse_profile
+from src.loadtest.load_driver import format_report, run_load_test
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Lasttest: Stand-in Server starten und Bewerber-Calls Ende-zu-Ende durchlaufen"
+    )
+    parser.add_argument("--applicants", type=int, default=100, help="Anzahl synthetischer Bewerber")
+    parser.add_argument("--campaigns", type=int, default=3, help="Anzahl Kampagnen")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[8],
+        help="Gleichzeitige Calls; mehrere Werte = ein Lauf pro Stufe"
+    )
+    parser.add_argument("--per-campaign", type=int, help="Max. gleichzeitige Calls pro Kampagne")
+    parser.add_argument(
+        "--profile", action="append", default=[], metavar="ENDPOINT=SPEC",
+        help=f"Endpoint-Profil, z.B. start='latency=lognormal:0.2,0.5;errors=0.02;rate=50' "
+             f"(Endpoints: {', '.join(ENDPOINTS)})"
+    )
+    parser.add_argument("--call-duration", default="uniform:0.5,2", help="Dauer bis Status 'done'")
+    parser.add_argument("--seed", type=int, help="Seed für reproduzierbare Latenzen/Fehler")
+    parser.add_argument("--prompts-dir", help="Prompt-Verzeichnis mit Masterprompt.md (default: Stub im Arbeitsverzeichnis)")
+    parser.add_argument("--no-wait", action="store_true", help="Conversations nicht bis 'done' verfolgen")
+    parser.add_argument("--no-upload", action="store_true", help="Keine Package Uploads")
+    parser.add_argument("--json", action="store_true", help="Report als JSON ausgeben")
+    parser.add_argument("--verbose", action="store_true", help="Ausgabe des Orchestrators anzeigen")
+    args = parser.parse_args()
+
+    profiles = {}
+    for entry in args.profile:
+        endpoint, _, spec = entry.partition("=")
+        if endpoint not in ENDPOINTS:
+            parser.error(f"Unbekannter Endpoint '{endpoint}' (erlaubt: {', '.join(ENDPOINTS)})")
+        profiles[endpoint] = parse_profile(spec)
+
+    reports = []
+    for concurrency in args.concurrency:
+        # Frischer Server pro Stufe: Rate Limits und Zähler starten bei Null
+        config = StandinConfig(
+            profiles=profiles,
+            call_duration=LatencyModel.parse(args.call_duration),
+            applicants=args.applicants,
+            campaigns=args.campaigns,
+            seed=args.seed
+        )
+        with StandinServer(config) as server, tempfile.TemporaryDirectory(prefix="voiceki_load_") as work_dir:
+            report = run_load_test(
+                server.base_url,
+                work_dir=work_dir,
+                concurrency=concurrency,
+                max_per_campaign=args.per_campaign,
+                prompts_dir=args.prompts_dir,
+                wait_for_completion=not args.no_wait,
+                upload_packages=not args.no_upload,
+                quiet=not args.verbose
+            )
+            report["standin"] = server.stats()
+        reports.append(report)
+
+        if not args.json:
+            print("=" * 70)
+            print(format_report(report))
+            print(f"Stand-in Requests: {json.dumps(report['standin']['requests'])}")
+
+    if args.json:
+        print(json.dumps(reports, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -100,7 +100,10 @@ def main():
                 api_url=settings.api_url,
                 api_key=settings.api_key,
                 status=settings.api_status,
-                filter_test_applicants=settings.filter_test_applicants
+                filter_test_applicants=settings.filter_test_applicants,
+                cache_ttl_seconds=settings.api_cache_ttl_seconds,
+                timeout_seconds=settings.api_timeout_seconds,
+                page_size=settings.api_page_size
             )
         else:
             print("ℹ️  Verwende File Data Source")
@@ -124,7 +127,7 @@ def main():
         # Initialisiere Orchestrator
         orchestrator = CallOrchestrator(
             data_source=data_source,
-            elevenlabs_client=elevenlabs_client,
+            conversation_client=elevenlabs_client,
             settings=settings
         )
         
@@ -0,0 +1,115 @@
+"""
+Package Migration - importiert vorhandene Campaign Packages ins SQLite Backend
+
+Quellen im Storage-Verzeichnis:
+- Legacy-Dateien {campaign_id}.json (eingerückt oder kompakt)
+- Blob-Dateien + Pointer (package_backend=files), optional mit Historie
+
+Die Migration ist idempotent: unveränderte Packages erzeugen keine neue
+Version. Danach PACKAGE_BACKEND=sqlite setzen.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.campaign_storage import CampaignStorage, open_package_backend
+from src.storage.package_store import content_digest
+
+
+def migrate_packages(
+    source_dir: str = "campaign_packages",
+    target_dir: Optional[str] = None,
+    history: bool = True,
+    remove_legacy: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Importiert alle Packages aus source_dir in das SQLite Backend.
+
+    Args:
+        source_dir: Storage-Verzeichnis mit Legacy-JSON und/oder Blob-Dateien
+        target_dir: Verzeichnis für packages.sqlite3 (default: source_dir)
+        history: Auch frühere Versionen aus den Blob-Pointern übernehmen
+        remove_legacy: Legacy-JSON nach erfolgreichem Import löschen
+        dry_run: Nur auflisten, nichts schreiben
+
+    Returns:
+        Statistik (migrated, unchanged, versions, failed)
+    """
+    source = CampaignStorage(source_dir, fsync=False, backend="files")
+    target = None if dry_run else open_package_backend("sqlite", target_dir or source_dir, fsync=True)
+    stats: Dict[str, Any] = {"migrated": 0, "unchanged": 0, "versions": 0, "failed": {}}
+
+    for campaign_id in source.list_packages():
+        try:
+            entries = source.backend.history(campaign_id)
+            if entries and not history:
+                entries = entries[-1:]
+            if entries:
+                packages = [source.backend.get(campaign_id, entry["hash"]) for entry in entries]
+            else:
+                packages = [source.load_package(campaign_id)]
+
+            expected = content_digest(packages[-1])
+            if dry_run:
+                print(f"   {campaign_id}: {len(packages)} Version(en), {expected[:12]}")
+                stats["versions"] += len(packages)
+                continue
+
+            current = target.current(campaign_id)
+            if current is not None and current["hash"] == expected:
+                stats["unchanged"] += 1
+                continue
+
+            for package in packages:
+                target.put(campaign_id, package)
+            if content_digest(target.get(campaign_id)) != expected:
+                raise ValueError("Inhalt nach Import weicht ab")
+
+            stats["migrated"] += 1
+            stats["versions"] += len(packages)
+            print(f"   ✅ {campaign_id}: {len(packages)} Version(en)")
+
+            legacy_path = Path(source_dir) / f"{campaign_id}.json"
+            if remove_legacy and legacy_path.exists():
+                legacy_path.unlink()
+        except Exception as e:
+            stats["failed"][campaign_id] = str(e)
+            print(f"   ❌ {campaign_id}: {e}")
+
+    return stats
+
+
+def main():
+    """CLI Entry Point"""
+    parser = argparse.ArgumentParser(
+        description="Importiert Campaign Packages (JSON/Blob-Dateien) ins SQLite Backend"
+    )
+    parser.add_argument("--source", default="campaign_packages", help="Storage-Verzeichnis (default: campaign_packages)")
+    parser.add_argument("--target", default=None, help="Verzeichnis für packages.sqlite3 (default: --source)")
+    parser.add_argument("--no-history", action="store_true", help="Nur die aktuelle Version übernehmen")
+    parser.add_argument("--remove-legacy", action="store_true", help="Legacy {id}.json nach Import löschen")
+    parser.add_argument("--dry-run", action="store_true", help="Nur auflisten, nichts schreiben")
+    args = parser.parse_args()
+
+    print(f"\n📦 Migration: {args.source} → {args.target or args.source}/packages.sqlite3")
+    stats = migrate_packages(
+        args.source,
+        args.target,
+        history=not args.no_history,
+        remove_legacy=args.remove_legacy,
+        dry_run=args.dry_run
+    )
+    print(f"\nImportiert: {stats['migrated']}, unverändert: {stats['unchanged']}, "
+          f"Versionen: {stats['versions']}, Fehler: {len(stats['failed'])}")
+    if not args.dry_run and not stats["failed"]:
+        print("💡 Jetzt PACKAGE_BACKEND=sqlite setzen")
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,49 @@
 """Batch-Verarbeitung aller Bewerber mit Status 'Neu intern'"""
 
+import argparse
 import sys
 from pathlib import Path
+from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.config import get_settings
 from src.data_sources.api_loader import APIDataSource
 from src.telephony.webrtc_client import WebRTCConversation
+from src.telephony.mock_client import MockConversationClient
 from src.orchestrator.call_orchestrator import CallOrchestrator
+from src.orchestrator.batch_runner import BatchCallRunner
+from src.orchestrator.call_queue import CallQueueWorker, PRIORITY_FRESH, PRIORITY_RETRY, get_call_queue
 
 
-def process_all_applicants():
+def process_all_applicants(
+    max_workers: Optional[int] = None,
+    max_per_campaign: Optional[int] = None,
+    resume: bool = True,
+    use_queue: bool = False
+):
     """
     Verarbeitet alle Bewerber mit Status 'Neu intern'.
     
-    Startet für jeden Bewerber einen Call mit den zugehörigen
-    Unternehmens- und Kampagnendaten.
+    Startet die Calls parallel über einen begrenzten Worker-Pool
+    (global + pro Kampagne) mit den zugehörigen Unternehmens- und
+    Kampagnendaten. Bereits erfolgreich verarbeitete Bewerber werden
+    über die Checkpoint-Datei übersprungen.
+    
+    Args:
+        max_workers: Globales Limit gleichzeitiger Calls (default: aus Settings)
+        max_per_campaign: Limit pro Kampagne (default: aus Settings)
+        resume: Checkpoint nutzen und fortschreiben
+        use_queue: Über die persistente Call Queue (Anrufzeiten, Quoten,
+                   Retries, mehrere Worker-Prozesse) statt direkt anrufen
+    
+    Returns:
+        Summary-Dict des BatchCallRunner
     """
     
     settings = get_settings()
+    max_workers = max_workers or settings.batch_max_workers
+    max_per_campaign = max_per_campaign or settings.batch_max_per_campaign
+    checkpoint_path = Path(settings.batch_checkpoint_path) if resume else None
     
     print("="*70)
     print("BATCH-VERARBEITUNG: Alle Bewerber mit Status 'Neu intern'")
@@ -45,14 +70,21 @@ def process_all_applicants():
             api_url=settings.api_url,
             api_key=settings.api_key,
             status=settings.api_status,
-            filter_test_applicants=settings.filter_test_applicants
+            filter_test_applicants=settings.filter_test_applicants,
+            cache_ttl_seconds=settings.api_cache_ttl_seconds,
+            timeout_seconds=settings.api_timeout_seconds,
+            page_size=settings.api_page_size
         )
         
         # Conversation Client
-        conversation_client = WebRTCConversation(
-            api_key=settings.elevenlabs_api_key,
-            base_url="https://api.eu.residency.elevenlabs.io"
-        )
+        if settings.dry_run:
+            print("ℹ️  Verwende Mock-Client (kein echter API Call)")
+            conversation_client = MockConversationClient()
+        else:
+            conversation_client = WebRTCConversation(
+                api_key=settings.elevenlabs_api_key,
+                base_url="https://api.eu.residency.elevenlabs.io"
+            )
         
         # Orchestrator
         orchestrator = CallOrchestrator(
@@ -72,58 +104,54 @@ def process_all_applicants():
         print(f"\n✅ {len(applicants)} Bewerber gefunden\n")
         print("="*70)
         
-        # Statistik
-        successful = 0
-        failed = 0
-        errors = []
+        if use_queue:
+            return _process_via_queue(orchestrator, applicants, settings, max_workers, max_per_campaign)
+        
+        runner = BatchCallRunner(
+            start_call=lambda applicant_id, campaign_id: orchestrator.start_call(
+                applicant_id=applicant_id,
+                campaign_id=campaign_id
+            ),
+            max_workers=max_workers,
+            max_per_campaign=max_per_campaign,
+            checkpoint_path=checkpoint_path
+        )
+        
+        print(f"⚙️  Worker: {max_workers} global, {max_per_campaign} pro Kampagne")
+        if checkpoint_path:
+            print(f"💾 Checkpoint: {checkpoint_path}")
+        print("="*70)
         
-        # Verarbeite jeden Bewerber
-        for i, applicant in enumerate(applicants, 1):
-            name = f"{applicant['first_name']} {applicant['last_name']}"
-            phone = applicant['telephone']
-            campaign_id = str(applicant['campaign_id'])
-            
-            print(f"\n[{i}/{len(applicants)}] Verarbeite: {name}")
-            print(f"             Telefon: {phone}")
-            print(f"             Campaign ID: {campaign_id}")
-            
-            try:
-                result = orchestrator.start_call(
-                    applicant_id=phone,
-                    campaign_id=campaign_id
-                )
-                
-                print(f"   ✅ Call gestartet: {result['conversation_id']}")
-                successful += 1
-                
-            except Exception as e:
-                print(f"   ❌ Fehler: {e}")
-                failed += 1
-                errors.append({
-                    "applicant": name,
-                    "phone": phone,
-                    "error": str(e)
-                })
+        summary = runner.run(applicants)
         
         # Zusammenfassung
         print("\n" + "="*70)
         print("ZUSAMMENFASSUNG")
         print("="*70)
-        print(f"✅ Erfolgreich: {successful}")
-        print(f"❌ Fehlgeschlagen: {failed}")
+        print(f"✅ Erfolgreich: {summary['successful']}")
+        print(f"❌ Fehlgeschlagen: {summary['failed']}")
+        print(f"⏭️  Übersprungen (Checkpoint): {summary['skipped']}")
         print(f"📊 Gesamt: {len(applicants)}")
+        print(f"⏱️  Dauer: {summary['elapsed_seconds']:.1f}s "
+              f"({summary['throughput_per_minute']:.1f} Calls/min)")
+        latency = summary['latency_seconds']
+        print(f"📈 Latenz: p50={latency['p50']:.2f}s, p90={latency['p90']:.2f}s, "
+              f"p99={latency['p99']:.2f}s, max={latency['max']:.2f}s")
         
-        if errors:
+        if summary['errors']:
             print("\n❌ FEHLER-DETAILS:")
-            for err in errors:
+            for err in summary['errors']:
                 print(f"\n  Bewerber: {err['applicant']}")
                 print(f"  Telefon: {err['phone']}")
+                print(f"  Campaign ID: {err['campaign_id']}")
                 print(f"  Fehler: {err['error']}")
         
         print("\n" + "="*70)
         print("✅ Batch-Verarbeitung abgeschlossen!")
         print("="*70)
         
+        return summary
+        
     except Exception as e:
         print(f"\n❌ KRITISCHER FEHLER: {e}")
         import traceback
@@ -131,6 +159,83 @@ def process_all_applicants():
         sys.exit(1)
 
 
+def _process_via_queue(orchestrator, applicants, settings, max_workers: int, max_per_campaign: int):
+    """Reiht die Bewerber in die Call Queue ein und arbeitet fällige Jobs ab"""
+    queue = get_call_queue()
+    # --workers/--per-campaign gelten auch für die Queue-Quoten (sonst aus Settings)
+    queue.max_in_flight = max_workers
+    queue.max_in_flight_per_campaign = max_per_campaign
+    not_reached = settings.api_status == "not_reached"
+    added = queue.enqueue_applicants(
+        applicants,
+        priority=PRIORITY_RETRY if not_reached else PRIORITY_FRESH,
+        requeue=not_reached
+    )
+    print(f"📥 Call Queue: {added} neu eingeplant ({settings.call_queue_path})")
+    print(f"🕘 Anrufzeiten: {settings.call_queue_windows or 'immer'} ({settings.call_queue_timezone})")
+    print(f"⚙️  Worker: {max_workers} global, {max_per_campaign} pro Kampagne")
+    
+    worker = CallQueueWorker(
+        queue,
+        start_call=lambda applicant_id, campaign_id: orchestrator.start_call(
+            applicant_id=applicant_id,
+            campaign_id=campaign_id
+        ),
+        max_workers=max_workers
+    )
+    summary = worker.run(until_idle=True)
+    
+    print("\n" + "="*70)
+    print("ZUSAMMENFASSUNG (Call Queue)")
+    print("="*70)
+    print(f"✅ Erfolgreich: {summary['successful']}")
+    print(f"📵 Nicht erreicht: {summary['not_reached']}")
+    print(f"🔁 Erneut eingeplant: {summary['retried']}")
+    print(f"❌ Endgültig fehlgeschlagen: {summary['failed']}")
+    print(f"📊 Queue: {queue.stats()['jobs']}")
+    print(f"⏱️  Dauer: {summary['elapsed_seconds']:.1f}s "
+          f"({summary['throughput_per_minute']:.1f} Calls/min)")
+    return summary
+
+
 if __name__ == "__main__":
-    process_all_applicants()
+    parser = argparse.ArgumentParser(
+        description="Batch-Verarbeitung aller Bewerber mit Status 'Neu intern'"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Max. gleichzeitige Calls (überschreibt BATCH_MAX_WORKERS)"
+    )
+    parser.add_argument(
+        "--per-campaign",
+        type=int,
+        help="Max. gleichzeitige Calls pro Kampagne (überschreibt BATCH_MAX_PER_CAMPAIGN)"
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Checkpoint ignorieren und alle Bewerber erneut verarbeiten"
+    )
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Über die persistente Call Queue anrufen (Anrufzeiten, Quoten, Retries)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Mock-Modus: Kein echter ElevenLabs Call"
+    )
+    args = parser.parse_args()
+    
+    if args.dry_run:
+        get_settings().dry_run = True
+    
+    process_all_applicants(
+        max_workers=args.workers,
+        max_per_campaign=args.per_campaign,
+        resume=not args.no_resume,
+        use_queue=args.queue
+    )
 
@@ -121,7 +121,9 @@ async def setup_campaign_async(
         # Speichern
         print("\nSpeichere Package lokal...")
         storage.save_package(campaign_id, package)
-        print(f"   Gespeichert: campaign_packages/{campaign_id}.json")
+        info = storage.get_package_info(campaign_id)
+        print(f"   Gespeichert: {info['storage']['path']} "
+              f"({info['storage']['stored_bytes']} Bytes, {info['storage']['codec']})")
         
         print("\n" + "="*70)
         print("CAMPAIGN SETUP ERFOLGREICH!")
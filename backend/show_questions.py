@@ -1,7 +1,10 @@
-import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
 
-with open('campaign_packages/258.json', encoding='utf-8') as f:
-    data = json.load(f)
+from src.storage.campaign_storage import CampaignStorage
+
+data = CampaignStorage().load_package('258')
 
 questions = data['questions']['questions']
 
@@ -0,0 +1,368 @@
+"""Knowledge Store - Indexierte Knowledge-Base-Abschnitte pro Kampagne (BM25)"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from ..config import get_settings
+from ..utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Banner-Zeilen der Phase-KBs (=== Titel ===)
+_BANNER = re.compile(r"^={20,}\s*$")
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Häufige deutsche Füllwörter ohne Aussagekraft für die Suche
+_STOPWORDS = frozenset(
+    "der die das und oder ein eine einer eines einem einen ist sind war für mit von zu im in "
+    "am an auf aus bei nach wie was wer wo sie ihr ihre ihnen es er wir ich du den dem des "
+    "nicht auch noch nur als so dass ob wenn dann bitte".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Kleingeschriebene Wort-Tokens ohne Stopwörter"""
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def split_phase_sections(phase: str, text: str) -> List[Dict[str, Any]]:
+    """
+    Zerlegt eine Phase-KB an ihren Banner-Überschriften in Abschnitte.
+
+    Ein Banner ist eine Titelzeile zwischen zwei ===-Zeilen. Text vor dem
+    ersten Banner bildet einen eigenen Abschnitt.
+
+    Returns:
+        [{'title': ..., 'text': ...}, ...] in Dokument-Reihenfolge
+    """
+    lines = text.splitlines()
+    sections: List[Dict[str, Any]] = []
+    title = phase.upper()
+    current: List[str] = []
+
+    i = 0
+    while i < len(lines):
+        if (
+            i + 2 < len(lines)
+            and _BANNER.match(lines[i])
+            and lines[i + 1].strip()
+            and _BANNER.match(lines[i + 2])
+        ):
+            if "\n".join(current).strip():
+                sections.append({"title": title, "text": "\n".join(current).strip("\n")})
+            title = lines[i + 1].strip()
+            current = lines[i:i + 3]
+            i += 3
+            continue
+        current.append(lines[i])
+        i += 1
+
+    if "\n".join(current).strip():
+        sections.append({"title": title, "text": "\n".join(current).strip("\n")})
+    return sections
+
+
+def knowledge_base_sections(knowledge_base: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Wandelt die flache Knowledge-Base aus build_knowledge_base() in Abschnitte.
+
+    Jede nicht-leere Kategorie wird ein Abschnitt (Listen als Aufzählung,
+    Dicts als "Schlüssel: Wert"-Zeilen).
+    """
+    sections = []
+    for category, value in knowledge_base.items():
+        if not value:
+            continue
+        title = category.replace("_", " ").upper()
+        if isinstance(value, list):
+            body = "\n".join(
+                f"- {item.get('text', json.dumps(item, ensure_ascii=False)) if isinstance(item, dict) else item}"
+                for item in value
+            )
+        elif isinstance(value, dict):
+            body = "\n".join(f"{key}: {entry}" for key, entry in value.items() if entry not in (None, "", [], {}))
+        else:
+            body = str(value)
+        if body.strip():
+            sections.append({"title": title, "text": f"{title}:\n{body}"})
+    return sections
+
+
+class KnowledgeStore:
+    """
+    Abschnitte einer Kampagnen-Knowledge-Base mit invertiertem Index.
+
+    Jeder Abschnitt hat eine stabile ID ("phase_3:2"), seine Phase, den
+    Titel und die vorberechnete Größe in Zeichen. Darüber liefert der Store
+    Phase-Payloads innerhalb eines Zeichenbudgets und eine BM25-Suche für
+    den On-Demand-Abruf.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            k1: BM25 Termfrequenz-Sättigung
+            b: BM25 Längennormalisierung
+        """
+        self.k1 = k1
+        self.b = b
+        self._sections: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+        self._position: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+
+    @classmethod
+    def from_phase_texts(cls, phase_texts: Dict[str, str]) -> "KnowledgeStore":
+        """Baut einen Store aus {"phase_2": text, ...}"""
+        store = cls()
+        for phase, text in phase_texts.items():
+            store.add_sections(phase, split_phase_sections(phase, text))
+        return store
+
+    @classmethod
+    def from_package(cls, package: Dict[str, Any]) -> "KnowledgeStore":
+        """
+        Baut einen Store aus einem gespeicherten Campaign Package.
+
+        Abschnitte: Kategorien der Knowledge-Base ("knowledge_base") und
+        die Fragen gruppiert nach Kategorie ("questions").
+        """
+        store = cls()
+        store.add_sections("knowledge_base", knowledge_base_sections(package.get("knowledge_base") or {}))
+
+        by_category: Dict[str, List[str]] = {}
+        for question in (package.get("questions") or {}).get("questions", []):
+            category = question.get("category") or question.get("group") or "sonstige"
+            line = question.get("question", "")
+            if question.get("help_text"):
+                line += f" ({question['help_text']})"
+            by_category.setdefault(str(category), []).append(f"- {line}")
+        store.add_sections("questions", [
+            {"title": category.upper(), "text": f"{category.upper()}:\n" + "\n".join(lines)}
+            for category, lines in by_category.items()
+        ])
+        return store
+
+    def add_sections(self, phase: str, sections: Iterable[Dict[str, Any]]) -> List[str]:
+        """
+        Indexiert Abschnitte einer Phase.
+
+        Returns:
+            IDs der neuen Abschnitte
+        """
+        ids = []
+        offset = sum(1 for sid in self._order if self._sections[sid]["phase"] == phase)
+        for index, section in enumerate(sections, offset + 1):
+            section_id = f"{phase}:{index}"
+            text = section["text"]
+            tokens = tokenize(f"{section['title']}\n{text}")
+            self._sections[section_id] = {
+                "id": section_id,
+                "phase": phase,
+                "title": section["title"],
+                "text": text,
+                "chars": len(text)
+            }
+            self._position[section_id] = len(self._order)
+            self._order.append(section_id)
+            self._lengths[section_id] = len(tokens)
+            for term, count in Counter(tokens).items():
+                self._postings.setdefault(term, {})[section_id] = count
+            ids.append(section_id)
+        return ids
+
+    def section(self, section_id: str) -> Optional[Dict[str, Any]]:
+        return self._sections.get(section_id)
+
+    def sections(self, phase: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Abschnitte (einer Phase) in Dokument-Reihenfolge"""
+        return [
+            self._sections[sid] for sid in self._order
+            if phase is None or self._sections[sid]["phase"] == phase
+        ]
+
+    def search(self, query: str, k: int = 5, phase: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        BM25-Suche über alle (oder die Abschnitte einer Phase).
+
+        Returns:
+            Abschnitte mit zusätzlichem "score", bester Treffer zuerst
+        """
+        if not self._order:
+            return []
+        total = len(self._order)
+        avg_length = sum(self._lengths.values()) / total or 1.0
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for section_id, tf in postings.items():
+                if phase is not None and self._sections[section_id]["phase"] != phase:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[section_id] / avg_length)
+                scores[section_id] = scores.get(section_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda kv: (-kv[1], self._position[kv[0]]))[:k]
+        return [{**self._sections[sid], "score": round(score, 4)} for sid, score in ranked]
+
+    def phase_payload(self, phase: str, max_chars: int = 0) -> str:
+        """
+        Text einer Phase für den Conversation Payload.
+
+        Der erste Abschnitt (Phase-Prompt) ist immer enthalten, weitere
+        Abschnitte folgen in Dokument-Reihenfolge, solange sie ins Budget
+        passen. Ausgelassene Abschnitte erscheinen als Verzeichnis mit ID
+        und Größe, damit der Agent sie per Lookup nachladen kann.
+
+        Args:
+            phase: z.B. "phase_3"
+            max_chars: Zeichenbudget (0 = alle Abschnitte)
+        """
+        sections = self.sections(phase)
+        if not sections:
+            return ""
+
+        included, omitted = [sections[0]], []
+        used = sections[0]["chars"]
+        for section in sections[1:]:
+            if max_chars <= 0 or used + section["chars"] <= max_chars:
+                included.append(section)
+                used += section["chars"]
+            else:
+                omitted.append(section)
+
+        payload = "\n\n".join(section["text"] for section in included)
+        if omitted:
+            payload += "\n\nWEITERE ABSCHNITTE (bei Bedarf per Wissens-Lookup abrufen):\n"
+            payload += "\n".join(f"- [{s['id']}] {s['title']} ({s['chars']} Zeichen)" for s in omitted)
+        return payload
+
+    def stats(self) -> Dict[str, Any]:
+        by_phase: Dict[str, Dict[str, int]] = {}
+        for section in self.sections():
+            entry = by_phase.setdefault(section["phase"], {"sections": 0, "chars": 0})
+            entry["sections"] += 1
+            entry["chars"] += section["chars"]
+        return {"sections": len(self._order), "terms": len(self._postings), "phases": by_phase}
+
+
+def content_hash(sources: Dict[str, Any]) -> str:
+    """Hash über die Quelltexte eines Stores (Änderung → Neuaufbau)"""
+    canonical = json.dumps(sources, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+class KnowledgeStoreRegistry:
+    """
+    Hält einen Store pro Kampagne; baut nur bei geänderten Quellen neu.
+
+    Mit storage_dir werden die Phase-Texte persistierter Stores als
+    {campaign_id}.json abgelegt. So löst der api_server (Lookup-API) die
+    Abschnitts-IDs auf, die der Call-Prozess in den Payload geschrieben hat.
+    """
+
+    def __init__(self, max_campaigns: int = 128, storage_dir: Optional[str] = None):
+        """
+        Args:
+            max_campaigns: Max. Anzahl Stores im Speicher
+            storage_dir: Verzeichnis für persistierte Phase-Texte (None = nur In-Memory)
+        """
+        self.max_campaigns = max_campaigns
+        self.storage_dir = Path(storage_dir) if storage_dir else None
+        self._stores: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(
+        self,
+        campaign_id: str,
+        sources: Dict[str, Any],
+        build: Callable[[Dict[str, Any]], KnowledgeStore],
+        persist: bool = False
+    ) -> KnowledgeStore:
+        """
+        Args:
+            campaign_id: Campaign ID
+            sources: Quelldaten des Stores (bestimmen den Content-Hash)
+            build: Baut den Store aus den Quelldaten
+            persist: Quellen für andere Prozesse speichern (nur Phase-Texte,
+                     get() baut daraus mit KnowledgeStore.from_phase_texts)
+        """
+        digest = content_hash(sources)
+        with self._lock:
+            entry = self._stores.get(str(campaign_id))
+            if entry and entry["hash"] == digest:
+                return entry["store"]
+
+        store = build(sources)
+        mtime = self._persist(campaign_id, digest, sources) if persist else None
+        self._remember(campaign_id, {"hash": digest, "store": store, "mtime": mtime})
+        return store
+
+    def get(self, campaign_id: str) -> Optional[KnowledgeStore]:
+        """Store aus dem Speicher bzw. aus den persistierten Phase-Texten (neuester Stand)"""
+        path = self._path(campaign_id)
+        with self._lock:
+            entry = self._stores.get(str(campaign_id))
+        if path is None or not path.exists():
+            return entry["store"] if entry else None
+
+        mtime = path.stat().st_mtime_ns
+        if entry and (entry["mtime"] is None or entry["mtime"] == mtime):
+            return entry["store"]
+        try:
+            payload = json_codec.load_file(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"KB Store {campaign_id} unlesbar: {e}")
+            return entry["store"] if entry else None
+        if entry and entry["hash"] == payload.get("hash"):
+            entry["mtime"] = mtime
+            return entry["store"]
+
+        store = KnowledgeStore.from_phase_texts(payload.get("sources") or {})
+        self._remember(campaign_id, {"hash": payload.get("hash"), "store": store, "mtime": mtime})
+        return store
+
+    def _path(self, campaign_id: str) -> Optional[Path]:
+        return self.storage_dir / f"{campaign_id}.json" if self.storage_dir else None
+
+    def _persist(self, campaign_id: str, digest: str, sources: Dict[str, Any]) -> Optional[int]:
+        path = self._path(campaign_id)
+        if path is None:
+            return None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            json_codec.dump_file(path, {"campaign_id": str(campaign_id), "hash": digest, "sources": sources})
+            return path.stat().st_mtime_ns
+        except OSError as e:
+            logger.warning(f"KB Store {campaign_id} konnte nicht gespeichert werden: {e}")
+            return None
+
+    def _remember(self, campaign_id: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._stores.pop(str(campaign_id), None)
+            self._stores[str(campaign_id)] = entry
+            while len(self._stores) > self.max_campaigns:
+                self._stores.pop(next(iter(self._stores)))
+
+
+# Singleton-Instanz
+_kb_registry: Optional[KnowledgeStoreRegistry] = None
+
+
+def get_kb_registry() -> KnowledgeStoreRegistry:
+    """Gibt die prozessweite Store-Registry zurück (persistiert in kb_store_dir)"""
+    global _kb_registry
+    if _kb_registry is None:
+        _kb_registry = KnowledgeStoreRegistry(storage_dir=get_settings().kb_store_dir or None)
+    return _kb_registry
@@ -1,5 +1,6 @@
 """Campaign Package Builder - Orchestriert Template-Erstellung und Package-Zusammenstellung"""
 
+import hashlib
 import json
 from datetime import datetime
 from pathlib import Path
@@ -10,6 +11,93 @@ from .template_builder import TemplateBuilder, filter_gate_questions, filter_pre
 from ..questions.builder import build_question_catalog
 
 
+def protocol_fingerprint(protocol: Dict[str, Any]) -> str:
+    """
+    Stabiler Hash eines Protokolls (Änderungen erzwingen einen Neuaufbau).
+
+    Gehasht werden nur die Felder, die der Webhook (ConversationProtocol)
+    und die HOC API gemeinsam liefern - Seiten: id/name/position, Prompts:
+    id/question/position. Zeitstempel, is_template, checked usw. aus der
+    API ändern den Hash nicht.
+    """
+    def field(value: Any) -> str:
+        return "" if value is None else str(value)
+
+    projection = {
+        "id": field(protocol.get("id")),
+        "name": field(protocol.get("name")),
+        "pages": [
+            {
+                "id": field(page.get("id")),
+                "name": field(page.get("name")),
+                "position": field(page.get("position")),
+                "prompts": [
+                    {
+                        "id": field(prompt.get("id")),
+                        "question": field(prompt.get("question")),
+                        "position": field(prompt.get("position"))
+                    }
+                    for prompt in page.get("prompts") or []
+                ]
+            }
+            for page in protocol.get("pages") or []
+        ]
+    }
+    canonical = json.dumps(projection, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def trim_questions_for_export(questions_catalog) -> Dict[str, Any]:
+    """
+    Exportiert nur die benötigten Felder aus Questions Catalog.
+
+    Behaltene Felder pro Frage:
+    - id, question, preamble, group, context
+    - category, category_order, type, options
+    - priority, help_text, gate_config
+
+    Entfernte Felder pro Frage:
+    - conversation_flow, required, input_hint, conditions
+    - source, slot_config, conversation_hints
+
+    Entfernte Meta-Informationen:
+    - meta.schema_version, meta.generated_at, meta.generator
+    - meta.policies_applied
+
+    Args:
+        questions_catalog: QuestionCatalog Pydantic Model
+
+    Returns:
+        Dict mit nur {"questions": [...]} - keine Meta-Infos
+    """
+
+    # Felder, die exportiert werden sollen
+    EXPORT_FIELDS = {
+        'id', 'question', 'preamble', 'group', 'context',
+        'category', 'category_order', 'type', 'options',
+        'priority', 'help_text', 'gate_config'
+    }
+
+    # Trimme Questions
+    trimmed_questions = []
+    for q in questions_catalog.questions:
+        q_dict = q.model_dump()
+
+        # Behalte nur Export-Felder
+        trimmed = {
+            key: value 
+            for key, value in q_dict.items() 
+            if key in EXPORT_FIELDS
+        }
+
+        trimmed_questions.append(trimmed)
+
+    # Keine Meta-Infos - nur die Questions
+    return {
+        "questions": trimmed_questions
+    }
+
+
 class CampaignPackageBuilder:
     """
     Erstellt Campaign Packages aus Cloud-API-Daten.
@@ -108,6 +196,7 @@ class CampaignPackageBuilder:
             "campaign_id": campaign_id,
             "campaign_name": protocol.get('name', ''),
             "created_at": datetime.utcnow().isoformat() + "Z",
+            "protocol_hash": protocol_fingerprint(protocol),
             
             # Company Metadata
             "company_info": {
@@ -207,6 +296,7 @@ class CampaignPackageBuilder:
             "campaign_id": campaign_id,
             "campaign_name": protocol_data.get('name', ''),
             "created_at": datetime.utcnow().isoformat() + "Z",
+            "protocol_hash": protocol_fingerprint(protocol_data),
             
             # Company Metadata
             "company_info": {
@@ -294,51 +384,5 @@ class CampaignPackageBuilder:
             raise ValueError("questions.json fehlt 'questions' Array")
     
     def _trim_questions_for_export(self, questions_catalog) -> Dict[str, Any]:
-        """
-        Exportiert nur die benötigten Felder aus Questions Catalog.
-        
-        Behaltene Felder pro Frage:
-        - id, question, preamble, group, context
-        - category, category_order, type, options
-        - priority, help_text, gate_config
-        
-        Entfernte Felder pro Frage:
-        - conversation_flow, required, input_hint, conditions
-        - source, slot_config, conversation_hints
-        
-        Entfernte Meta-Informationen:
-        - meta.schema_version, meta.generated_at, meta.generator
-        - meta.policies_applied
-        
-        Args:
-            questions_catalog: QuestionCatalog Pydantic Model
-        
-        Returns:
-            Dict mit nur {"questions": [...]} - keine Meta-Infos
-        """
-        
-        # Felder, die exportiert werden sollen
-        EXPORT_FIELDS = {
-            'id', 'question', 'preamble', 'group', 'context',
-            'category', 'category_order', 'type', 'options',
-            'priority', 'help_text', 'gate_config'
-        }
-        
-        # Trimme Questions
-        trimmed_questions = []
-        for q in questions_catalog.questions:
-            q_dict = q.model_dump()
-            
-            # Behalte nur Export-Felder
-            trimmed = {
-                key: value 
-                for key, value in q_dict.items() 
-                if key in EXPORT_FIELDS
-            }
-            
-            trimmed_questions.append(trimmed)
-        
-        # Keine Meta-Infos - nur die Questions
-        return {
-            "questions": trimmed_questions
-        }
+        """Siehe trim_questions_for_export()"""
+        return trim_questions_for_export(questions_catalog)
@@ -46,7 +46,51 @@ class Settings(BaseSettings):
     )
     llm_timeout_seconds: int = Field(
         default=120,
-        description="Timeout für LLM API Calls in Sekunden"
+        description="Timeout für LLM API Calls in Sekunden (Startwert für adaptive Timeouts)"
+    )
+    llm_timeout_percentile: float = Field(
+        default=95.0,
+        description="Perzentil der beobachteten Latenz pro Stage/Provider/Model für adaptive Timeouts"
+    )
+    llm_timeout_headroom: float = Field(
+        default=1.5,
+        description="Faktor auf das Latenz-Perzentil"
+    )
+    llm_timeout_floor_seconds: float = Field(
+        default=15.0,
+        description="Minimales adaptives Timeout in Sekunden"
+    )
+    llm_timeout_ceiling_seconds: float = Field(
+        default=180.0,
+        description="Maximales adaptives Timeout in Sekunden"
+    )
+    llm_max_repair_attempts: int = Field(
+        default=1,
+        description="Max. Reparaturversuche bei schema-ungültiger LLM-Ausgabe"
+    )
+    llm_streaming_enabled: bool = Field(
+        default=False,
+        description="LLM-Antworten streamen und inkrementell parsen (Time-to-first-Result)"
+    )
+    llm_breaker_error_rate: float = Field(
+        default=0.5,
+        description="Fehlerquote ab der der Circuit Breaker eines Providers öffnet"
+    )
+    llm_breaker_window: int = Field(
+        default=20,
+        description="Anzahl letzter Calls für die Fehlerquote des Circuit Breakers"
+    )
+    llm_breaker_cooldown_seconds: float = Field(
+        default=30.0,
+        description="Sperrzeit eines Providers bis zum nächsten Probe-Call"
+    )
+    llm_latency_route_factor: float = Field(
+        default=2.0,
+        description="Primary wird nachrangig, wenn seine Latenz-EWMA um diesen Faktor höher ist (0 = aus)"
+    )
+    llm_max_concurrent_calls: int = Field(
+        default=8,
+        description="Max. gleichzeitige LLM Calls pro Prozess (globales Limit)"
     )
     
     # Question Generation Pipeline Settings
@@ -54,6 +98,22 @@ class Settings(BaseSettings):
         default=False,
         description="Nutze Unified 3-Prompt Pipeline (konsolidierte Fragen)"
     )
+    extract_chunk_token_budget: int = Field(
+        default=8000,
+        description="Große Protokolle seitenweise in Chunks bis zu diesem Token-Budget parallel extrahieren (0 = aus)"
+    )
+    classification_cache_enabled: bool = Field(
+        default=True,
+        description="Intent-Klassifizierung wiederkehrender Items cachen (nur neue Items ans LLM)"
+    )
+    classification_cache_path: str = Field(
+        default="Output_ordner/cache/classification_cache.json",
+        description="Persistente Datei des Klassifizierungs-Caches (leer = nur In-Memory)"
+    )
+    classification_cache_max_entries: int = Field(
+        default=5000,
+        description="Max. Anzahl gecachter Item-Klassifizierungen (älteste fallen heraus)"
+    )
 
     # ElevenLabs Configuration
     elevenlabs_api_key: str = Field(
@@ -64,6 +124,26 @@ class Settings(BaseSettings):
         default="",
         description="ElevenLabs Agent ID für Conversational AI"
     )
+    elevenlabs_webhook_secret: str = Field(
+        default="",
+        description="HMAC Secret der ElevenLabs Post-Call Webhooks (leer = Bearer Auth wie andere Webhooks)"
+    )
+    completion_poll_min_seconds: float = Field(
+        default=5.0,
+        description="Erstes Poll-Intervall des Completion Trackers pro Conversation"
+    )
+    completion_poll_max_seconds: float = Field(
+        default=60.0,
+        description="Max. Poll-Intervall (Backoff-Obergrenze) des Completion Trackers"
+    )
+    completion_poll_batch_size: int = Field(
+        default=20,
+        description="Max. parallele Status-Abfragen pro Poll-Runde"
+    )
+    completion_timeout_seconds: float = Field(
+        default=3600.0,
+        description="Max. Wartezeit auf das Ende einer Conversation"
+    )
 
     # Data Source Configuration
     data_source_type: Literal["file", "api"] = Field(
@@ -96,7 +176,105 @@ class Settings(BaseSettings):
         default=True,
         description="Filtert Bewerber mit 'Test' im Namen"
     )
-    
+    api_cache_ttl_seconds: float = Field(
+        default=300.0,
+        description="TTL des API-Caches; danach Refresh per ETag/If-Modified-Since"
+    )
+    api_timeout_seconds: float = Field(
+        default=30.0,
+        description="Timeout für API Requests in Sekunden"
+    )
+    api_page_size: int = Field(
+        default=0,
+        description="Seitengröße für paginiertes Laden (0 = ein gestreamter Request)"
+    )
+
+    # Batch Processing Configuration
+    batch_max_workers: int = Field(
+        default=8,
+        description="Max. gleichzeitige Calls in der Batch-Verarbeitung"
+    )
+    batch_max_per_campaign: int = Field(
+        default=4,
+        description="Max. gleichzeitige Calls pro Kampagne"
+    )
+    batch_checkpoint_path: str = Field(
+        default="Output_ordner/batch_checkpoint.json",
+        description="Checkpoint-Datei für wiederaufnehmbare Batch-Läufe"
+    )
+
+    # Call Queue (persistente Anruf-Warteschlange)
+    call_queue_path: str = Field(
+        default="Output_ordner/call_queue.sqlite3",
+        description="SQLite-Datei der Call Queue (von allen Workern geteilt)"
+    )
+    call_queue_windows: str = Field(
+        default="Mon-Fri 09:00-19:00; Sat 10:00-14:00",
+        description="Erlaubte Anrufzeiten, z.B. 'Mo-Fr 09:00-19:00; Sa 10:00-14:00' (leer = immer)"
+    )
+    call_queue_timezone: str = Field(
+        default="Europe/Berlin",
+        description="Zeitzone der Anrufzeiten"
+    )
+    call_queue_max_per_minute: int = Field(
+        default=0,
+        description="Max. neue Calls pro Minute über alle Worker (0 = unbegrenzt)"
+    )
+    call_queue_max_per_minute_per_campaign: int = Field(
+        default=0,
+        description="Max. neue Calls pro Minute und Kampagne (0 = unbegrenzt)"
+    )
+    call_queue_lease_seconds: float = Field(
+        default=300.0,
+        description="Lease-Dauer eines beanspruchten Jobs; danach übernimmt ein anderer Worker"
+    )
+    call_queue_retry_delays_minutes: str = Field(
+        default="60,240,1440",
+        description="Wartezeiten vor erneuten Versuchen in Minuten (kommagetrennt)"
+    )
+    call_queue_max_attempts: int = Field(
+        default=4,
+        description="Max. Anrufversuche pro Bewerber"
+    )
+
+    # Campaign Package Storage
+    package_backend: str = Field(
+        default="files",
+        description="Package Backend: 'files' (Blob-Dateien) oder 'sqlite' (packages.sqlite3, Import mit migrate_packages.py)"
+    )
+    package_fsync: bool = Field(
+        default=True,
+        description="Package-Writes per fsync absichern (übersteht Absturz/Stromausfall)"
+    )
+    package_write_behind: bool = Field(
+        default=True,
+        description="Packages im Webhook im Hintergrund speichern (Antwort ohne auf die Platte zu warten)"
+    )
+
+    # Job Leases (Koordination über mehrere Worker/Nodes)
+    job_lease_path: str = Field(
+        default="Output_ordner/job_leases.sqlite3",
+        description="SQLite-Datei für Job Leases (von allen Workern/Nodes geteilt)"
+    )
+    job_lease_seconds: float = Field(
+        default=60.0,
+        description="Lease-Dauer ohne Heartbeat; danach übernimmt ein anderer Worker"
+    )
+    campaign_setup_wait_seconds: float = Field(
+        default=600.0,
+        description="Max. Wartezeit auf einen Campaign Build, der in einem anderen Worker läuft"
+    )
+
+    # Call Result Store
+    call_store_path: str = Field(
+        default="Output_ordner/calls.sqlite3",
+        description="SQLite-Datei für Call-Ergebnisse (KB einmal pro Inhalt gespeichert)"
+    )
+    call_store_batch_size: int = Field(
+        default=200,
+        description="Max. Call-Records pro Commit (Group Commit)"
+    )
+
     # Webhook Configuration
     webhook_secret: str = Field(
         default="",
@@ -113,6 +291,26 @@ class Settings(BaseSettings):
         default=False,
         description="Aktiviert Upload zu HOC Cloud"
     )
+    hoc_upload_max_attempts: int = Field(
+        default=4,
+        description="Max. Upload-Versuche pro Request (Retry bei 5xx/Timeout)"
+    )
+    hoc_upload_backoff_seconds: float = Field(
+        default=1.0,
+        description="Basis-Wartezeit für exponentielles Backoff mit Jitter"
+    )
+    hoc_upload_timeout_seconds: float = Field(
+        default=30.0,
+        description="Timeout pro Upload-Request in Sekunden"
+    )
+    hoc_outbox_dir: str = Field(
+        default="campaign_packages/_outbox",
+        description="Verzeichnis für fehlgeschlagene Uploads (Retry im Hintergrund)"
+    )
+    hoc_outbox_interval_seconds: float = Field(
+        default=60.0,
+        description="Intervall des Outbox-Workers in Sekunden"
+    )
 
     # Questions.json Configuration
     questions_json_path: str = Field(
@@ -127,7 +325,17 @@ class Settings(BaseSettings):
     )
     generate_questions: bool = Field(
         default=False,
-        description="Automatisch questions.json generieren via TypeScript Tool"
+        description="Fragenkatalog pro Kampagne in-process generieren, wenn kein Campaign Package existiert"
+    )
+
+    # Knowledge Base Payload
+    kb_payload_max_chars: int = Field(
+        default=0,
+        description="Zeichenbudget pro Kampagnen-Phase im Conversation Payload; weitere Abschnitte nur per Lookup (0 = vollständig)"
+    )
+    kb_store_dir: str = Field(
+        default="campaign_packages/_kb_stores",
+        description="Phase-Abschnitte pro Kampagne für die KB-Lookup-API (geteilt zwischen Call-Prozess und api_server, leer = nur In-Memory)"
     )
 
     # Prompts Configuration
@@ -136,6 +344,62 @@ class Settings(BaseSettings):
         description="Verzeichnis mit Phase-Prompts"
     )
 
+    # Diagnostics Configuration
+    diagnostics_enabled: bool = Field(
+        default=True,
+        description="Strukturierte Diagnose-Events erfassen (Ring Buffer + JSONL)"
+    )
+    diagnostics_sample_rate: float = Field(
+        default=1.0,
+        description="Anteil erfasster Diagnose-Events (0.0 - 1.0, Fehler immer)"
+    )
+    diagnostics_log_path: str = Field(
+        default="Output_ordner/logs/diagnostics.jsonl",
+        description="JSONL-Datei für Diagnose-Events (leer = nur Ring Buffer)"
+    )
+    diagnostics_buffer_size: int = Field(
+        default=1000,
+        description="Anzahl Diagnose-Events im In-Memory Ring Buffer"
+    )
+
+    # JSON Serialisierung
+    json_pretty_output: bool = Field(
+        default=False,
+        description="JSON-Dateien (Packages, questions.json) eingerückt statt kompakt schreiben"
+    )
+
+    # Admission Control (teure Webhooks: Setup Campaign, Process Protocol)
+    admission_max_concurrent: int = Field(
+        default=4,
+        description="Max. gleichzeitig laufende Webhook-Pipelines pro Worker"
+    )
+    admission_max_queue: int = Field(
+        default=32,
+        description="Max. wartende Webhook-Requests; darüber 503 mit Retry-After"
+    )
+    admission_max_queue_per_client: int = Field(
+        default=16,
+        description="Max. wartende Requests pro Client (Authorization Token)"
+    )
+    admission_max_wait_seconds: float = Field(
+        default=30.0,
+        description="Max. Wartezeit in der Queue, danach 503 mit Retry-After"
+    )
+
+    # Event Loop Monitoring
+    loop_monitor_enabled: bool = Field(
+        default=True,
+        description="Event Loop Lag Monitor im API Server aktivieren"
+    )
+    loop_monitor_interval_seconds: float = Field(
+        default=0.1,
+        description="Heartbeat-Intervall des Loop Lag Monitors"
+    )
+    loop_monitor_threshold_seconds: float = Field(
+        default=0.25,
+        description="Lag ab dem der Event Loop als blockiert gemeldet wird"
+    )
+
     # Operational Settings
     dry_run: bool = Field(
         default=False,
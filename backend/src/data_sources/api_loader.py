@@ -1,8 +1,45 @@
 """API Data Source - Lädt Daten von der Cloud-API und transformiert sie ins erwartete Format"""
 
+import codecs
+import threading
+import time
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from .base import DataSource
+from ..utils.json_stream import IncrementalJSONParser
+
+# Chunk-Größe für gestreamte API-Antworten
+_CHUNK_SIZE = 64 * 1024
+
+
+class _Download:
+    """Zustand eines laufenden API-Downloads (geteilt zwischen Threads)"""
+    
+    def __init__(self):
+        self.applicants: List[Dict[str, Any]] = []
+        self.filtered_count = 0
+        self.not_modified = False
+        # Validatoren der Antwort - erst nach vollständigem Parsen gesetzt
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.condition = threading.Condition()
+    
+    def add_applicant(self, applicant: Dict[str, Any]) -> None:
+        with self.condition:
+            self.applicants.append(applicant)
+            self.condition.notify_all()
+    
+    def finish(self) -> None:
+        with self.condition:
+            self.done = True
+            self.condition.notify_all()
+    
+    def wait(self) -> None:
+        with self.condition:
+            while not self.done:
+                self.condition.wait()
 
 
 class APIDataSource(DataSource):
@@ -16,7 +53,11 @@ class APIDataSource(DataSource):
         api_url: str, 
         api_key: Optional[str] = None,
         status: str = "new",
-        filter_test_applicants: bool = True
+        filter_test_applicants: bool = True,
+        cache_ttl_seconds: Optional[float] = None,
+        timeout_seconds: float = 30.0,
+        page_size: int = 0,
+        refresh_retry_seconds: float = 30.0
     ):
         """
         Args:
@@ -24,11 +65,22 @@ class APIDataSource(DataSource):
             api_key: Optional API Key für Authentifizierung
             status: Bewerber-Status ("new" oder "not_reached")
             filter_test_applicants: Filtert Bewerber mit "Test" im Namen
+            cache_ttl_seconds: Nach Ablauf wird der Cache per Conditional Request
+                               (ETag / If-Modified-Since) erneuert. None = nie
+            timeout_seconds: Connect-/Read-Timeout pro Request
+            page_size: > 0 lädt seitenweise (?page=N&per_page=page_size),
+                       0 lädt alles in einem gestreamten Request
+            refresh_retry_seconds: Nach einem fehlgeschlagenen Download erst
+                                   nach dieser Wartezeit erneut versuchen
         """
         self.api_url = api_url.rstrip('/')
         self.api_key = api_key
         self.status = status
         self.filter_test_applicants = filter_test_applicants
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.page_size = page_size
+        self.refresh_retry_seconds = refresh_retry_seconds
         self.session = requests.Session()
         
         if api_key:
@@ -37,40 +89,277 @@ class APIDataSource(DataSource):
         
         # Cache für API-Daten
         self._api_data = None
+        self._loaded_at = 0.0
+        self._retry_at = 0.0
+        self._last_error: Optional[Exception] = None
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._load_lock = threading.Lock()
+        self._download: Optional[_Download] = None
+        
+        # Hash-Indizes (werden nach dem Laden einmalig aufgebaut)
+        # Applicant-Indizes speichern (Listenposition, Bewerber) des ersten Treffers
+        self._applicants_by_phone: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._applicants_by_full_name: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._applicants_by_first_name: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._campaigns_by_id: Dict[Any, Dict[str, Any]] = {}
+        self._companies_by_id: Dict[Any, Dict[str, Any]] = {}
     
     def _load_api_data(self) -> Dict[str, Any]:
-        """Lädt alle Daten von der API (einmalig pro Session, dann gecacht)"""
+        """
+        Lädt alle Daten von der API (gecacht, nach TTL per Conditional Request erneuert).
+        
+        Sind bereits Daten geladen, kommen sie sofort zurück, auch wenn sie
+        abgelaufen sind; die Erneuerung läuft dann im Hintergrund. Nach einem
+        fehlgeschlagenen Download wird erst nach refresh_retry_seconds erneut
+        geladen.
+        """
+        if self._api_data is not None and not self._is_stale():
+            return self._api_data
+        
+        if self._api_data is None and self._last_error is not None and time.monotonic() < self._retry_at:
+            raise self._last_error
+        
+        download = self._ensure_download()
+        if self._api_data is not None:
+            return self._api_data
+        
+        download.wait()
         if self._api_data is None:
-            try:
-                # API Endpoint: /applicants/{status}
-                endpoint = f"{self.api_url}/applicants/{self.status}"
-                print(f"Lade Daten von: {endpoint}")
+            raise download.error or Exception("API-Daten nicht verfügbar")
+        return self._api_data
+    
+    def iter_pending_applicants(self) -> Iterator[Dict[str, Any]]:
+        """
+        Liefert Bewerber, sobald sie aus dem laufenden Download geparst sind.
+        
+        Der Download läuft in einem Hintergrund-Thread; Lookups anderer
+        Threads (z.B. get_company_profile) warten auf dessen Abschluss.
+        Sind die Daten bereits gecacht und frisch, kommt direkt der Cache.
+        
+        Yields:
+            Bewerber-Dicts (ohne Test-Bewerber, falls Filter aktiv)
+        
+        Raises:
+            Exception: Wenn der Download fehlschlägt
+        """
+        if self._api_data is not None and not self._is_stale():
+            yield from list(self._api_data.get('applicants', []))
+            return
+        
+        download = self._ensure_download()
+        index = 0
+        
+        while True:
+            with download.condition:
+                while index >= len(download.applicants) and not download.done:
+                    download.condition.wait()
+                batch = download.applicants[index:]
+                finished = download.done
+            
+            index += len(batch)
+            yield from batch
+            
+            if finished and index >= len(download.applicants):
+                break
+        
+        if download.error is not None:
+            raise download.error
+        if download.not_modified:
+            yield from list(self._api_data.get('applicants', []))
+    
+    def _is_stale(self) -> bool:
+        """True wenn der Cache älter als die TTL ist (nicht während des Retry-Backoffs)"""
+        if self.cache_ttl_seconds is None:
+            return False
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        return now - self._loaded_at >= self.cache_ttl_seconds
+    
+    def _ensure_download(self) -> "_Download":
+        """Startet einen Download-Thread oder gibt den laufenden zurück"""
+        with self._load_lock:
+            if self._download is not None and not self._download.done:
+                return self._download
+            
+            download = _Download()
+            self._download = download
+            threading.Thread(
+                target=self._run_download,
+                args=(download,),
+                name="api-data-download",
+                daemon=True
+            ).start()
+            return download
+    
+    def _run_download(self, download: "_Download") -> None:
+        """Download-Thread: streamt die API-Antwort und veröffentlicht den Cache"""
+        try:
+            api_data = self._stream_api_data(download)
+            
+            if api_data is not None:
+                applicants = api_data['applicants']
+                if download.filtered_count > 0:
+                    print(f"WARNUNG: {download.filtered_count} Test-Bewerber herausgefiltert")
+                print(f"API-Daten geladen: {len(applicants)} Bewerber (Status: {self.status})")
                 
-                response = self.session.get(endpoint)
+                self._build_indexes(api_data)
+                self._api_data = api_data
+                # Validatoren nur zusammen mit den Daten übernehmen: sonst
+                # bestätigt ein 304 künftig den veralteten Cache
+                self._etag = download.etag
+                self._last_modified = download.last_modified
+            
+            self._loaded_at = time.monotonic()
+            self._retry_at = 0.0
+            self._last_error = None
+            
+        except requests.exceptions.RequestException as e:
+            download.error = Exception(f"Fehler beim Laden der API-Daten: {e}")
+        except ValueError as e:
+            download.error = Exception(f"Ungültige API-Antwort: {e}")
+        finally:
+            if download.error is not None:
+                # Backoff: bis dahin gecachte Daten nutzen bzw. Fehler direkt melden
+                self._last_error = download.error
+                self._retry_at = time.monotonic() + self.refresh_retry_seconds
+                if self._api_data is not None:
+                    print(f"WARNUNG: API-Refresh fehlgeschlagen, nutze gecachte Daten: {download.error}")
+            download.finish()
+    
+    def _stream_api_data(self, download: "_Download") -> Optional[Dict[str, Any]]:
+        """
+        Lädt /applicants/{status} gestreamt (optional seitenweise).
+        
+        Bewerber werden während des Parsens an den Download weitergereicht,
+        der Rohtext wird nie vollständig im Speicher gehalten.
+        
+        Returns:
+            API-Daten oder None wenn der Server 304 (Not Modified) meldet
+        """
+        # API Endpoint: /applicants/{status}
+        endpoint = f"{self.api_url}/applicants/{self.status}"
+        print(f"Lade Daten von: {endpoint}")
+        
+        api_data: Dict[str, Any] = {'applicants': download.applicants, 'campaigns': [], 'companies': []}
+        seen_ids = {'campaigns': set(), 'companies': set()}
+        seen_applicants = set()
+        page = 1
+        
+        while True:
+            headers = {}
+            params = None
+            if self.page_size > 0:
+                params = {'page': page, 'per_page': self.page_size}
+            elif self._api_data is not None:
+                # Conditional Request nur für ungeteilte Antworten
+                if self._etag:
+                    headers['If-None-Match'] = self._etag
+                if self._last_modified:
+                    headers['If-Modified-Since'] = self._last_modified
+            
+            response = self.session.get(
+                endpoint,
+                headers=headers,
+                params=params,
+                stream=True,
+                timeout=self.timeout_seconds
+            )
+            
+            try:
+                if response.status_code == 304:
+                    download.not_modified = True
+                    return None
                 response.raise_for_status()
-                self._api_data = response.json()
                 
-                # Filtere Test-Bewerber
-                applicants = self._api_data.get('applicants', [])
-                original_count = len(applicants)
+                page_applicants = 0
+                new_applicants = 0
+                parser = IncrementalJSONParser()
+                decoder = codecs.getincrementaldecoder('utf-8')()
                 
-                if self.filter_test_applicants:
-                    applicants = [
-                        a for a in applicants 
-                        if not self._is_test_applicant(a)
-                    ]
-                    self._api_data['applicants'] = applicants
-                    filtered_count = original_count - len(applicants)
-                    
-                    if filtered_count > 0:
-                        print(f"WARNUNG: {filtered_count} Test-Bewerber herausgefiltert")
+                for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                    for kind, key, value in parser.feed(decoder.decode(chunk)):
+                        if kind == 'item' and key == 'applicants':
+                            page_applicants += 1
+                            if self.page_size > 0:
+                                # Wiederholte Bewerber (Seite doppelt geliefert) überspringen
+                                applicant_key = self._applicant_key(value)
+                                if applicant_key in seen_applicants:
+                                    continue
+                                seen_applicants.add(applicant_key)
+                            new_applicants += 1
+                            if self.filter_test_applicants and self._is_test_applicant(value):
+                                download.filtered_count += 1
+                            else:
+                                download.add_applicant(value)
+                        elif kind == 'item' and key in seen_ids:
+                            # Seitenweise Antworten wiederholen Kampagnen/Unternehmen
+                            if value.get('id') not in seen_ids[key]:
+                                seen_ids[key].add(value.get('id'))
+                                api_data[key].append(value)
+                        elif kind == 'value' and key not in api_data:
+                            api_data[key] = value
                 
-                print(f"API-Daten geladen: {len(applicants)} Bewerber (Status: {self.status})")
+                parser.feed(decoder.decode(b'', final=True))
+                parser.close()
                 
-            except requests.exceptions.RequestException as e:
-                raise Exception(f"Fehler beim Laden der API-Daten: {e}")
+                if self.page_size <= 0:
+                    download.etag = response.headers.get('ETag')
+                    download.last_modified = response.headers.get('Last-Modified')
+            finally:
+                response.close()
+            
+            # Ende: letzte (kurze) Seite, oder der Server ignoriert die
+            # Seitenparameter und liefert nur bekannte Bewerber
+            if self.page_size <= 0 or page_applicants < self.page_size or new_applicants == 0:
+                return api_data
+            page += 1
+    
+    @staticmethod
+    def _applicant_key(applicant: Dict[str, Any]) -> Any:
+        """Eindeutiger Schlüssel eines Bewerbers (ID, sonst Telefon + Name)"""
+        if applicant.get('id') is not None:
+            return ('id', applicant['id'])
+        return (applicant.get('telephone'), applicant.get('first_name'), applicant.get('last_name'))
+    
+    def _build_indexes(self, api_data: Dict[str, Any]) -> None:
+        """
+        Baut Hash-Indizes über Bewerber, Kampagnen und Unternehmen.
         
-        return self._api_data
+        Einmalig nach dem Laden - danach sind alle Lookups O(1) statt
+        eines Listen-Scans pro Aufruf. Bei Duplikaten gewinnt (wie beim
+        linearen Scan) der erste Eintrag.
+        
+        Args:
+            api_data: Geladene (und gefilterte) API-Antwort
+        """
+        by_phone: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        by_full_name: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        by_first_name: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        
+        for position, applicant in enumerate(api_data.get('applicants', [])):
+            first_name = applicant.get('first_name', '')
+            full_name = f"{first_name} {applicant.get('last_name', '')}"
+            entry = (position, applicant)
+            
+            by_phone.setdefault(applicant.get('telephone', ''), entry)
+            by_full_name.setdefault(full_name.lower(), entry)
+            by_first_name.setdefault(first_name.lower(), entry)
+        
+        campaigns_by_id: Dict[Any, Dict[str, Any]] = {}
+        for campaign in api_data.get('campaigns', []):
+            campaigns_by_id.setdefault(campaign.get('id'), campaign)
+        
+        companies_by_id: Dict[Any, Dict[str, Any]] = {}
+        for company in api_data.get('companies', []):
+            companies_by_id.setdefault(company.get('id'), company)
+        
+        self._applicants_by_phone = by_phone
+        self._applicants_by_full_name = by_full_name
+        self._applicants_by_first_name = by_first_name
+        self._campaigns_by_id = campaigns_by_id
+        self._companies_by_id = companies_by_id
     
     def _is_test_applicant(self, applicant: Dict[str, Any]) -> bool:
         """
@@ -99,17 +388,21 @@ class APIDataSource(DataSource):
         Returns:
             Bewerber-Dict aus API
         """
-        data = self._load_api_data()
-        
-        for applicant in data.get('applicants', []):
-            # Match über verschiedene Kriterien
-            phone = applicant.get('telephone', '')
-            name = f"{applicant.get('first_name', '')} {applicant.get('last_name', '')}"
-            
-            if (phone == applicant_id or 
-                name.lower() == applicant_id.lower() or
-                applicant.get('first_name', '').lower() == applicant_id.lower()):
-                return applicant
+        self._load_api_data()
+        
+        # Match über verschiedene Kriterien - frühester Listeneintrag gewinnt
+        key = applicant_id.lower()
+        matches = [
+            entry for entry in (
+                self._applicants_by_phone.get(applicant_id),
+                self._applicants_by_full_name.get(key),
+                self._applicants_by_first_name.get(key)
+            )
+            if entry is not None
+        ]
+        
+        if matches:
+            return min(matches, key=lambda entry: entry[0])[1]
         
         raise ValueError(f"Bewerber '{applicant_id}' nicht in API gefunden")
     
@@ -123,23 +416,21 @@ class APIDataSource(DataSource):
         Returns:
             Campaign-Dict aus API
         """
-        data = self._load_api_data()
-        campaigns = data.get('campaigns', [])
+        self._load_api_data()
         
-        # Suche Campaign mit passender ID
-        for campaign in campaigns:
-            if campaign.get('id') == campaign_id:
-                return campaign
+        campaign = self._campaigns_by_id.get(campaign_id)
+        if campaign is not None:
+            return campaign
         
-        raise ValueError(f"Campaign {campaign_id} nicht gefunden. Verfügbare Campaigns: {len(campaigns)}")
+        raise ValueError(f"Campaign {campaign_id} nicht gefunden. Verfügbare Campaigns: {len(self._campaigns_by_id)}")
     
     def _find_company_by_id(self, company_id: int) -> Dict[str, Any]:
         """Findet Unternehmen anhand company_id"""
-        data = self._load_api_data()
+        self._load_api_data()
         
-        for company in data.get('companies', []):
-            if company.get('id') == company_id:
-                return company
+        company = self._companies_by_id.get(company_id)
+        if company is not None:
+            return company
         
         raise ValueError(f"Company {company_id} nicht gefunden")
     
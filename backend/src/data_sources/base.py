@@ -1,5 +1,6 @@
 """Abstract Base Class für Data Sources"""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 
@@ -8,6 +9,9 @@ class DataSource(ABC):
     """
     Abstract interface für verschiedene Datenquellen.
     Ermöglicht einfachen Austausch zwischen FileLoader, API Client, etc.
+    
+    Die *_async Varianten laufen per Default im Thread-Pool, damit der
+    Event Loop nicht blockiert; native async Quellen überschreiben sie.
     """
 
     @abstractmethod
@@ -62,3 +66,18 @@ class DataSource(ABC):
         """
         pass
 
+    async def get_applicant_profile_async(self, applicant_id: str) -> Dict[str, Any]:
+        """Async Variante von get_applicant_profile"""
+        return await asyncio.to_thread(self.get_applicant_profile, applicant_id)
+
+    async def get_applicant_address_async(self, applicant_id: str) -> Dict[str, Any]:
+        """Async Variante von get_applicant_address"""
+        return await asyncio.to_thread(self.get_applicant_address, applicant_id)
+
+    async def get_company_profile_async(self, company_id: str) -> Dict[str, Any]:
+        """Async Variante von get_company_profile"""
+        return await asyncio.to_thread(self.get_company_profile, company_id)
+
+    async def get_conversation_protocol_async(self, campaign_id: str) -> Dict[str, Any]:
+        """Async Variante von get_conversation_protocol"""
+        return await asyncio.to_thread(self.get_conversation_protocol, campaign_id)
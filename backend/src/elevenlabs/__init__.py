@@ -1,6 +1,6 @@
 """ElevenLabs Integration Layer"""
 
 from .voice_client import ElevenLabsVoiceClient
+from .completion_tracker import CompletionTracker, ElevenLabsStatusSource
 
-__all__ = ["ElevenLabsVoiceClient"]
-
+__all__ = ["ElevenLabsVoiceClient", "CompletionTracker", "ElevenLabsStatusSource"]
@@ -0,0 +1,273 @@
+"""Completion Tracker - Wartet asynchron auf das Ende vieler Conversations"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = frozenset({"completed", "ended", "done", "failed"})
+
+StatusFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+TranscriptFetcher = Callable[[str], Awaitable[Optional[str]]]
+CompletionCallback = Callable[[Dict[str, Any]], Any]
+
+
+def format_transcript(turns: Any) -> Optional[str]:
+    """Wandelt ElevenLabs-Transkript-Turns in Text ("role: message" pro Zeile)"""
+    if turns is None or isinstance(turns, str):
+        return turns
+    lines = [
+        f"{turn.get('role', '?')}: {turn.get('message') or ''}"
+        for turn in turns if isinstance(turn, dict)
+    ]
+    return "\n".join(lines)
+
+
+def verify_webhook_signature(body: bytes, header: Optional[str], secret: str, tolerance_seconds: int = 1800) -> bool:
+    """
+    Prüft den ElevenLabs-Signature Header ("t=<timestamp>,v0=<hmac_sha256>").
+
+    Signiert ist "<timestamp>.<body>" mit dem Webhook Secret.
+    """
+    if not header:
+        return False
+    parts = dict(part.split("=", 1) for part in header.split(",") if "=" in part)
+    timestamp, signature = parts.get("t"), parts.get("v0")
+    if not timestamp or not signature or not timestamp.isdigit():
+        return False
+    if abs(time.time() - int(timestamp)) > tolerance_seconds:
+        return False
+    expected = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class ElevenLabsStatusSource:
+    """Async Status- und Transkript-Abfragen gegen die ElevenLabs API (gepoolter Client)"""
+
+    def __init__(self, api_key: str, base_url: str = "https://api.elevenlabs.io/v1", timeout: float = 10.0):
+        self.base_url = base_url
+        self._client = httpx.AsyncClient(headers={"xi-api-key": api_key}, timeout=timeout)
+
+    async def status(self, conversation_id: str) -> Dict[str, Any]:
+        response = await self._client.get(f"{self.base_url}/convai/conversations/{conversation_id}")
+        response.raise_for_status()
+        return response.json()
+
+    async def transcript(self, conversation_id: str) -> Optional[str]:
+        response = await self._client.get(f"{self.base_url}/convai/conversations/{conversation_id}/transcript")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return format_transcript(response.json().get("transcript"))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class _Tracked:
+    __slots__ = ("conversation_id", "future", "started", "next_poll", "interval", "polls")
+
+    def __init__(self, conversation_id: str, future: asyncio.Future, now: float, interval: float):
+        self.conversation_id = conversation_id
+        self.future = future
+        self.started = now
+        self.next_poll = now + interval
+        self.interval = interval
+        self.polls = 0
+
+
+class CompletionTracker:
+    """
+    Verfolgt offene Conversations auf einem Event Loop statt einem Thread pro Call.
+
+    - Webhook (notify) beendet eine Conversation sofort
+    - Fallback: ein Poller fragt fällige Conversations batchweise parallel ab;
+      das Intervall pro Conversation wächst mit jedem Poll (Backoff)
+    - Jede Conversation hat ein Future; zusätzlich laufen globale Callbacks
+      (z.B. Transkript speichern), auch für nicht getrackte Webhook-Events
+    """
+
+    def __init__(
+        self,
+        fetch_status: StatusFetcher,
+        fetch_transcript: Optional[TranscriptFetcher] = None,
+        batch_size: int = 20,
+        min_interval: float = 5.0,
+        max_interval: float = 60.0,
+        backoff: float = 1.5,
+        timeout: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            fetch_status: Async Status-Abfrage einer Conversation
+            fetch_transcript: Async Transkript-Abfrage (None = kein Transkript)
+            batch_size: Max. parallele Status-Abfragen pro Poll-Runde
+            min_interval: Erstes Poll-Intervall in Sekunden
+            max_interval: Obergrenze des Poll-Intervalls
+            backoff: Faktor auf das Intervall nach jedem ergebnislosen Poll
+            timeout: Max. Wartezeit pro Conversation
+            clock: Zeitquelle (für Tests)
+        """
+        self.fetch_status = fetch_status
+        self.fetch_transcript = fetch_transcript
+        self.batch_size = batch_size
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.timeout = timeout
+        self._clock = clock
+
+        self._tracked: Dict[str, _Tracked] = {}
+        self._callbacks: List[CompletionCallback] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"tracked": 0, "completed_webhook": 0, "completed_poll": 0, "timeouts": 0, "polls": 0}
+
+    def add_callback(self, callback: CompletionCallback) -> None:
+        """Callback für jede abgeschlossene Conversation (sync oder async)"""
+        self._callbacks.append(callback)
+
+    def track(self, conversation_id: str) -> asyncio.Future:
+        """
+        Beginnt das Tracking einer Conversation.
+
+        Returns:
+            Future mit {"conversation_id", "status", "transcript", "source"}
+        """
+        existing = self._tracked.get(conversation_id)
+        if existing is not None:
+            return existing.future
+
+        future = asyncio.get_running_loop().create_future()
+        # Timeout wird auch geloggt - nicht abgeholte Exceptions sind kein Fehler
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._tracked[conversation_id] = _Tracked(conversation_id, future, self._clock(), self.min_interval)
+        self._stats["tracked"] += 1
+        self._wake()
+        return future
+
+    async def notify(self, conversation_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Verarbeitet ein Conversation-Ended Event (Webhook).
+
+        Args:
+            payload: Event-Daten (status, optional transcript)
+        """
+        self._stats["completed_webhook"] += 1
+        transcript = format_transcript(payload.get("transcript"))
+        return await self._complete(conversation_id, payload, "webhook", transcript)
+
+    def start(self) -> None:
+        """Startet den Poller im laufenden Event Loop"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="completion-tracker")
+
+    async def stop(self) -> None:
+        """Stoppt den Poller; offene Futures werden abgebrochen"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for tracked in list(self._tracked.values()):
+            tracked.future.cancel()
+        self._tracked.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._tracked)}
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = self._clock()
+            self._expire(now)
+            due = sorted(
+                (t for t in self._tracked.values() if t.next_poll <= now),
+                key=lambda t: t.next_poll
+            )[:self.batch_size]
+
+            if due:
+                await asyncio.gather(*(self._poll(t) for t in due))
+                continue
+
+            next_due = min((t.next_poll for t in self._tracked.values()), default=None)
+            wait = self.max_interval if next_due is None else max(0.0, next_due - now)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _expire(self, now: float) -> None:
+        for tracked in list(self._tracked.values()):
+            if now - tracked.started >= self.timeout:
+                self._tracked.pop(tracked.conversation_id, None)
+                self._stats["timeouts"] += 1
+                logger.warning(f"Conversation {tracked.conversation_id}: Timeout nach {tracked.polls} Polls")
+                if not tracked.future.done():
+                    tracked.future.set_exception(TimeoutError(
+                        f"Conversation {tracked.conversation_id} did not complete within {self.timeout:.0f}s"
+                    ))
+
+    async def _poll(self, tracked: _Tracked) -> None:
+        tracked.polls += 1
+        self._stats["polls"] += 1
+        try:
+            status = await self.fetch_status(tracked.conversation_id)
+        except Exception as e:
+            logger.warning(f"Status-Abfrage {tracked.conversation_id} fehlgeschlagen: {e}")
+            status = {}
+
+        if status.get("status") in TERMINAL_STATUSES:
+            self._stats["completed_poll"] += 1
+            await self._complete(tracked.conversation_id, status, "poll")
+            return
+
+        tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+        tracked.next_poll = self._clock() + tracked.interval
+
+    async def _complete(
+        self,
+        conversation_id: str,
+        status: Dict[str, Any],
+        source: str,
+        transcript: Optional[str] = None
+    ) -> Dict[str, Any]:
+        tracked = self._tracked.pop(conversation_id, None)
+
+        if transcript is None and self.fetch_transcript is not None:
+            try:
+                transcript = await self.fetch_transcript(conversation_id)
+            except Exception as e:
+                logger.warning(f"Transkript {conversation_id} nicht abrufbar: {e}")
+
+        result = {
+            "conversation_id": conversation_id,
+            "status": status.get("status", "completed"),
+            "transcript": transcript,
+            "source": source
+        }
+        if tracked is not None and not tracked.future.done():
+            tracked.future.set_result(result)
+
+        for callback in self._callbacks:
+            try:
+                outcome = callback(result)
+                if asyncio.iscoroutine(outcome):
+                    await outcome
+            except Exception as e:
+                logger.error(f"Completion Callback für {conversation_id} fehlgeschlagen: {e}")
+        return result
@@ -1,11 +1,20 @@
 """ElevenLabs Voice Client - API Integration für Conversational AI"""
 
+import asyncio
 import requests
 import time
+import weakref
 from typing import Dict, Any, Optional
+
+import httpx
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# Wie die Retry-Strategie der requests Session
+RETRY_STATUS = (429, 500, 502, 503, 504)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 1.0
+
 
 class ElevenLabsVoiceClient:
     """
@@ -24,6 +33,10 @@ class ElevenLabsVoiceClient:
         self.api_key = api_key
         self.base_url = base_url
         self.session = self._create_session()
+        # Ein httpx Client pro Event Loop (Clients sind an ihren Loop gebunden)
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
 
     def _create_session(self) -> requests.Session:
         """Erstellt Session mit Retry-Logik"""
@@ -71,18 +84,7 @@ class ElevenLabsVoiceClient:
             "Content-Type": "application/json"
         }
         
-        payload = {
-            "agent_id": agent_id,
-            "override_agent_config": {
-                "prompt": {
-                    "knowledge_base": knowledge_base
-                }
-            }
-        }
-        
-        # Optional: System Prompt überschreiben
-        if system_prompt:
-            payload["override_agent_config"]["prompt"]["system"] = system_prompt
+        payload = self._conversation_payload(agent_id, knowledge_base, system_prompt)
         
         try:
             response = self.session.post(
@@ -105,6 +107,86 @@ class ElevenLabsVoiceClient:
         except requests.exceptions.RequestException as e:
             raise Exception(f"ElevenLabs API Error: {str(e)}")
 
+    async def start_conversation_async(
+        self,
+        agent_id: str,
+        knowledge_base: str,
+        system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Startet eine Conversation ohne Thread (gepoolter httpx Client).
+        
+        Wiederholt wie die Session bei 429/5xx und Verbindungsfehlern,
+        Retry-After wird beachtet.
+        
+        Raises:
+            Exception: Bei API-Fehlern (wie start_conversation)
+        """
+        endpoint = f"{self.base_url}/conversational-ai/conversations"
+        payload = self._conversation_payload(agent_id, knowledge_base, system_prompt)
+        client = self._get_async_client()
+        
+        for attempt in range(RETRY_TOTAL + 1):
+            retry_after = None
+            try:
+                response = await client.post(endpoint, json=payload, timeout=30)
+                if response.status_code not in RETRY_STATUS or attempt == RETRY_TOTAL:
+                    response.raise_for_status()
+                    data = response.json()
+                    return {
+                        "conversation_id": data.get("conversation_id"),
+                        "status": "started",
+                        "agent_id": agent_id,
+                        "timestamp": time.time()
+                    }
+                retry_after = response.headers.get("Retry-After")
+            except httpx.TransportError as e:
+                if attempt == RETRY_TOTAL:
+                    raise Exception(f"ElevenLabs API Error: {str(e)}")
+            except httpx.HTTPStatusError as e:
+                raise Exception(f"ElevenLabs API Error: {str(e)}")
+            
+            delay = RETRY_BACKOFF * (2 ** attempt)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+        
+        raise Exception("ElevenLabs API Error: retries exhausted")
+
+    def _conversation_payload(
+        self,
+        agent_id: str,
+        knowledge_base: str,
+        system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        payload = {
+            "agent_id": agent_id,
+            "override_agent_config": {
+                "prompt": {
+                    "knowledge_base": knowledge_base
+                }
+            }
+        }
+        if system_prompt:
+            payload["override_agent_config"]["prompt"]["system"] = system_prompt
+        return payload
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = self._async_clients[loop] = httpx.AsyncClient(
+                headers={"xi-api-key": self.api_key},
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+        return client
+
+    async def aclose(self) -> None:
+        """Schließt den async Client des laufenden Event Loops"""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
     def get_conversation_status(self, conversation_id: str) -> Dict[str, Any]:
         """
         Holt Status einer laufenden Conversation.
@@ -174,6 +256,9 @@ class ElevenLabsVoiceClient:
         """
         Wartet auf Completion einer Conversation (blocking).
         
+        Für viele parallele Calls den CompletionTracker verwenden
+        (Webhook + gebündeltes Polling auf einem Event Loop).
+        
         Args:
             conversation_id: ID der Conversation
             timeout: Max. Wartezeit in Sekunden
@@ -236,6 +321,18 @@ class MockElevenLabsClient(ElevenLabsVoiceClient):
             "timestamp": time.time()
         }
 
+    async def start_conversation_async(
+        self, 
+        agent_id: str, 
+        knowledge_base: str,
+        system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Simuliert Conversation-Start (kein IO)"""
+        return self.start_conversation(agent_id, knowledge_base, system_prompt)
+
+    async def aclose(self) -> None:
+        pass
+
     def get_conversation_status(self, conversation_id: str) -> Dict[str, Any]:
         """Simuliert Status-Abfrage"""
         if conversation_id not in self.conversations:
@@ -0,0 +1,9 @@
+"""Load Testing - Lokaler Stand-in für ElevenLabs/HOC und Load Driver"""
+
+from .standin_server import EndpointProfile, LatencyModel, StandinConfig, StandinServer, create_standin_app
+from .load_driver import format_report, run_load_test
+
+__all__ = [
+    "EndpointProfile", "LatencyModel", "StandinConfig", "StandinServer",
+    "create_standin_app", "format_report", "run_load_test"
+]
@@ -0,0 +1,250 @@
+"""Load Driver - Treibt den Call-Pfad Ende-zu-Ende gegen den Stand-in Server
+
+Verdrahtet APIDataSource, ElevenLabsVoiceClient, CallOrchestrator und
+BatchCallRunner wie process_all_applicants(), nur gegen die Stand-in URL.
+Danach werden alle Conversations über den CompletionTracker abgewartet
+und pro Kampagne ein Package per HOCUploader hochgeladen.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import Settings, get_settings
+from ..data_sources.api_loader import APIDataSource
+from ..elevenlabs.completion_tracker import CompletionTracker, ElevenLabsStatusSource
+from ..elevenlabs.voice_client import ElevenLabsVoiceClient
+from ..orchestrator.batch_runner import BatchCallRunner, percentile
+from ..orchestrator.call_orchestrator import CallOrchestrator
+from ..orchestrator.question_cache import CampaignQuestionCache
+from ..storage.call_store import CallResultStore
+from ..storage.hoc_uploader import HOCUploader
+
+# Kleiner Fragenkatalog - Lasttests sollen keine LLM-Pipeline auslösen
+LOADTEST_QUESTIONS = {"questions": [
+    {"id": "q1", "question": "Haben Sie ein Examen als Pflegefachkraft?",
+     "category": "standardqualifikationen", "type": "boolean", "priority": 1},
+    {"id": "q2", "question": "Haben Sie Erfahrung im Nachtdienst?",
+     "category": "zusaetzliche_informationen", "type": "boolean", "priority": 2},
+]}
+
+# Stub für Masterprompt.md - das Repo liefert nur Masterprompt.txt aus
+LOADTEST_MASTER_PROMPT = "Du bist ein Recruiting-Assistent. (Lasttest)"
+
+
+def _latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0
+    }
+
+
+async def _await_completions(
+    base_url: str,
+    conversation_ids: List[str],
+    poll_interval: float,
+    timeout: float
+) -> Dict[str, Any]:
+    """Wartet alle Conversations über den CompletionTracker ab (Polling-Pfad)"""
+    source = ElevenLabsStatusSource(api_key="loadtest", base_url=f"{base_url}/v1")
+    tracker = CompletionTracker(
+        fetch_status=source.status,
+        fetch_transcript=source.transcript,
+        batch_size=50,
+        min_interval=poll_interval,
+        max_interval=poll_interval * 4,
+        timeout=timeout
+    )
+    tracker.start()
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(
+            *(tracker.track(cid) for cid in conversation_ids), return_exceptions=True
+        )
+    finally:
+        await tracker.stop()
+        await source.aclose()
+
+    elapsed = time.perf_counter() - started
+    completed = [r for r in results if isinstance(r, dict)]
+    return {
+        "completed": len(completed),
+        "with_transcript": sum(1 for r in completed if r.get("transcript")),
+        "failed": len(results) - len(completed),
+        "elapsed_seconds": elapsed,
+        "tracker": tracker.stats()
+    }
+
+
+async def _upload_packages(base_url: str, campaign_ids: List[str], outbox_dir: Path) -> Dict[str, Any]:
+    """Lädt pro Kampagne ein Package hoch (Retry/Outbox wie im API Server)"""
+    uploader = HOCUploader(
+        hoc_api_url=f"{base_url}/api/v1",
+        hoc_api_key="loadtest",
+        outbox_dir=str(outbox_dir),
+        max_attempts=3,
+        backoff_base=0.05
+    )
+    latencies: List[float] = []
+
+    async def upload(campaign_id: str) -> Optional[str]:
+        start = time.perf_counter()
+        url = await uploader.upload_or_enqueue({
+            "campaign_id": campaign_id,
+            "questions": LOADTEST_QUESTIONS,
+            "knowledge_base": {}
+        })
+        latencies.append(time.perf_counter() - start)
+        return url
+
+    try:
+        urls = await asyncio.gather(*(upload(cid) for cid in campaign_ids))
+    finally:
+        await uploader.aclose()
+    return {
+        "uploaded": sum(1 for url in urls if url),
+        "queued_in_outbox": sum(1 for url in urls if not url),
+        "latency_seconds": _latency_summary(latencies)
+    }
+
+
+def run_load_test(
+    base_url: str,
+    work_dir: str,
+    concurrency: int = 8,
+    max_per_campaign: Optional[int] = None,
+    prompts_dir: Optional[str] = None,
+    wait_for_completion: bool = True,
+    upload_packages: bool = True,
+    poll_interval: float = 0.2,
+    completion_timeout: float = 300.0,
+    settings: Optional[Settings] = None,
+    quiet: bool = True
+) -> Dict[str, Any]:
+    """
+    Führt einen Lasttest gegen einen laufenden Stand-in Server aus.
+
+    Args:
+        base_url: URL des Stand-ins (z.B. StandinServer.base_url)
+        work_dir: Verzeichnis für Call Store, Fragenkatalog und Outbox
+        concurrency: Gleichzeitige Calls (BatchCallRunner max_workers)
+        max_per_campaign: Limit pro Kampagne (default: concurrency)
+        prompts_dir: Prompt-Verzeichnis mit Masterprompt.md (default: Stub in work_dir)
+        wait_for_completion: Conversations bis "done" verfolgen
+        upload_packages: Pro Kampagne ein Package hochladen
+        poll_interval: Erstes Poll-Intervall des Completion Trackers
+        completion_timeout: Max. Wartezeit pro Conversation
+        settings: Basis-Settings (default: get_settings())
+        quiet: Konsolenausgabe des Orchestrators unterdrücken
+
+    Returns:
+        Report mit Batch-Summary, Completion- und Upload-Durchsatz
+    """
+    work = Path(work_dir)
+    work.mkdir(parents=True, exist_ok=True)
+    questions_path = work / "questions.json"
+    questions_path.write_text(json.dumps(LOADTEST_QUESTIONS, ensure_ascii=False), encoding="utf-8")
+    if prompts_dir is None:
+        stub_dir = work / "prompts"
+        stub_dir.mkdir(exist_ok=True)
+        (stub_dir / "Masterprompt.md").write_text(LOADTEST_MASTER_PROMPT, encoding="utf-8")
+        prompts_dir = str(stub_dir)
+
+    base = settings or get_settings()
+    run_settings = base.model_copy(update={
+        "prompts_dir": prompts_dir,
+        "questions_json_path": str(questions_path),
+        "generate_questions": False,
+        "elevenlabs_agent_id": base.elevenlabs_agent_id or "loadtest-agent"
+    })
+
+    data_source = APIDataSource(
+        api_url=f"{base_url}/api/v1",
+        api_key="loadtest",
+        filter_test_applicants=False,
+        timeout_seconds=30.0
+    )
+    call_store = CallResultStore(str(work / "calls.sqlite3"))
+    orchestrator = CallOrchestrator(
+        data_source=data_source,
+        conversation_client=ElevenLabsVoiceClient(api_key="loadtest", base_url=f"{base_url}/v1"),
+        settings=run_settings,
+        question_cache=CampaignQuestionCache(storage=None),
+        call_store=call_store
+    )
+    runner = BatchCallRunner(
+        start_call=lambda applicant_id, campaign_id: orchestrator.start_call(
+            applicant_id=applicant_id,
+            campaign_id=campaign_id
+        ),
+        max_workers=concurrency,
+        max_per_campaign=max_per_campaign or concurrency
+    )
+
+    output = io.StringIO() if quiet else None
+    with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+        applicants = data_source.list_pending_applicants()
+        summary = runner.run(applicants)
+
+    call_store.flush()
+    conversation_ids = [call["conversation_id"] for call in call_store.list_calls(limit=max(1, len(applicants)))]
+    campaign_ids = sorted({str(a["campaign_id"]) for a in applicants})
+
+    calls = {key: value for key, value in summary.items() if key != "errors"}
+    # Durchsatz nur aus erfolgreichen Calls (schnell fehlschlagende Calls würden ihn aufblähen)
+    elapsed = summary["elapsed_seconds"]
+    calls["throughput_per_minute"] = summary["successful"] / elapsed * 60 if elapsed > 0 else 0.0
+
+    report: Dict[str, Any] = {
+        "concurrency": concurrency,
+        "applicants": len(applicants),
+        "calls": calls,
+        "errors": summary["errors"][:10],
+        "completion": None,
+        "uploads": None
+    }
+    if wait_for_completion and conversation_ids:
+        completion = asyncio.run(_await_completions(base_url, conversation_ids, poll_interval, completion_timeout))
+        elapsed = completion["elapsed_seconds"]
+        completion["throughput_per_minute"] = completion["completed"] / elapsed * 60 if elapsed > 0 else 0.0
+        report["completion"] = completion
+    if upload_packages and campaign_ids:
+        report["uploads"] = asyncio.run(_upload_packages(base_url, campaign_ids, work / "outbox"))
+
+    call_store.close()
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Lesbare Zusammenfassung eines Lasttest-Reports"""
+    calls = report["calls"]
+    latency = calls["latency_seconds"]
+    lines = [
+        f"Calls: {calls['successful']}/{calls['total']} erfolgreich, {calls['failed']} fehlgeschlagen "
+        f"(Concurrency {report['concurrency']})",
+        f"Durchsatz: {calls['throughput_per_minute']:.1f} Calls/min in {calls['elapsed_seconds']:.1f}s",
+        f"Latenz: p50={latency['p50']:.3f}s p90={latency['p90']:.3f}s "
+        f"p99={latency['p99']:.3f}s max={latency['max']:.3f}s",
+    ]
+    completion = report.get("completion")
+    if completion:
+        lines.append(
+            f"Completion: {completion['completed']} abgeschlossen ({completion['with_transcript']} mit Transkript), "
+            f"{completion['failed']} ohne Abschluss, {completion['throughput_per_minute']:.1f}/min, "
+            f"{completion['tracker']['polls']} Status-Polls"
+        )
+    uploads = report.get("uploads")
+    if uploads:
+        lines.append(
+            f"Uploads: {uploads['uploaded']} hochgeladen, {uploads['queued_in_outbox']} in Outbox, "
+            f"p90={uploads['latency_seconds']['p90']:.3f}s"
+        )
+    for error in report.get("errors", []):
+        lines.append(f"  Fehler ({error['campaign_id']}): {error['error']}")
+    return "\n".join(lines)
@@ -0,0 +1,390 @@
+"""Stand-in Server - Lokale Nachbildung von ElevenLabs- und HOC-Endpoints für Lasttests
+
+Emuliert die Endpoints, die der Call-Pfad nutzt:
+- GET  /api/v1/applicants/{status}               (HOC Bewerber-API, APIDataSource)
+- POST /api/v1/campaigns/{id}/package            (HOC Package Upload, HOCUploader)
+- POST /v1/conversational-ai/conversations       (Conversation Start, ElevenLabsVoiceClient)
+- GET  /v1/convai/conversations/{id}             (Status)
+- GET  /v1/convai/conversations/{id}/transcript  (Transkript)
+- GET  /_standin/stats                           (Request-Zähler des Stand-ins)
+
+Pro Endpoint-Gruppe sind Latenzverteilung, Fehlerquote und Rate Limit
+(429 + Retry-After) konfigurierbar.
+"""
+
+import asyncio
+import gzip
+import json
+import math
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Endpoint-Gruppen mit eigenem Profil
+ENDPOINTS = ("applicants", "start", "status", "transcript", "upload")
+
+
+class LatencyModel:
+    """
+    Latenzverteilung in Sekunden.
+
+    Spezifikation als String:
+    - "fixed:0.05"
+    - "uniform:0.02,0.2"         (min, max)
+    - "normal:0.1,0.02"          (Mittelwert, Standardabweichung, >= 0)
+    - "lognormal:0.1,0.5"        (Median, Sigma - langer Tail wie echte APIs)
+    """
+
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unbekannte Latenzverteilung '{kind}' (erlaubt: {', '.join(self.KINDS)})")
+        expected = 1 if kind == "fixed" else 2
+        if len(params) != expected:
+            raise ValueError(f"Latenzverteilung '{kind}' erwartet {expected} Parameter")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, raw = spec.partition(":")
+        params = [float(p) for p in raw.split(",") if p.strip()] if raw else [0.0]
+        return cls(kind.strip(), *params)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(*self.params))
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+@dataclass
+class EndpointProfile:
+    """Verhalten einer Endpoint-Gruppe"""
+    latency: LatencyModel = field(default_factory=lambda: LatencyModel("fixed", 0.0))
+    error_rate: float = 0.0
+    error_status: int = 500
+    rate_limit_per_second: float = 0.0  # 0 = kein Rate Limit
+
+
+@dataclass
+class StandinConfig:
+    """
+    Konfiguration des Stand-in Servers.
+
+    Attributes:
+        profiles: EndpointProfile pro Endpoint-Gruppe (siehe ENDPOINTS)
+        call_duration: Dauer einer Conversation bis Status "done"
+        applicants: Anzahl synthetischer Bewerber
+        campaigns: Anzahl Kampagnen (Bewerber werden reihum verteilt)
+        seed: Seed für Latenzen und Fehlerinjektion (reproduzierbare Läufe)
+    """
+    profiles: Dict[str, EndpointProfile] = field(default_factory=dict)
+    call_duration: LatencyModel = field(default_factory=lambda: LatencyModel("fixed", 0.5))
+    applicants: int = 50
+    campaigns: int = 3
+    seed: Optional[int] = None
+
+    def profile(self, endpoint: str) -> EndpointProfile:
+        return self.profiles.get(endpoint) or EndpointProfile()
+
+
+class _TokenBucket:
+    """Rate Limit: rate Requests/s, Burst bis max(1, rate)"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def acquire(self) -> float:
+        """0.0 wenn erlaubt, sonst Sekunden bis zum nächsten freien Token"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+def synthetic_api_data(applicants: int, campaigns: int) -> Dict[str, Any]:
+    """
+    Synthetische Antwort der HOC Bewerber-API (Format wie /applicants/{status}).
+
+    Jede Kampagne hat ein eigenes Unternehmen mit Onboarding-Angaben und ein
+    kleines Gesprächsprotokoll.
+    """
+    campaign_list, company_list = [], []
+    for c in range(1, campaigns + 1):
+        company_list.append({
+            "id": 1000 + c,
+            "name": f"Lasttest Klinik {c}",
+            "onboarding": {"pages": [{"prompts": [
+                {"question": "Wie viele Mitarbeitende hat das Unternehmen?", "answer": str(100 * c)},
+                {"question": "Wie lautet die Adresse?", "answer": f"Teststraße {c}, 10115 Berlin"},
+                {"question": "Was unterscheidet Sie von anderen Arbeitgebern?", "answer": "Jobrad, 30 Tage Urlaub"},
+            ]}]}
+        })
+        campaign_list.append({
+            "id": c,
+            "company_id": 1000 + c,
+            "name": f"Pflegefachkraft Station {c}",
+            "transcript": {
+                "id": 500 + c,
+                "name": f"Pflegefachkraft Station {c}",
+                "pages": [{
+                    "id": 1,
+                    "name": "Der Bewerber erfüllt folgende Kriterien:",
+                    "prompts": [
+                        {"id": 1, "question": "Zwingend: Examen als Pflegefachkraft", "position": 1},
+                        {"id": 2, "question": "Wünschenswert: Erfahrung im Nachtdienst", "position": 2},
+                    ]
+                }]
+            }
+        })
+
+    applicant_list = [
+        {
+            "id": i,
+            "first_name": f"Bewerber{i}",
+            "last_name": "Last",
+            "telephone": f"+4915100{i:05d}",
+            "email": f"bewerber{i}@example.com",
+            "campaign_id": 1 + (i - 1) % campaigns
+        }
+        for i in range(1, applicants + 1)
+    ]
+    return {"applicants": applicant_list, "campaigns": campaign_list, "companies": company_list}
+
+
+def create_standin_app(config: Optional[StandinConfig] = None) -> FastAPI:
+    """
+    Baut die FastAPI-App des Stand-ins.
+
+    Zustand (Conversations, Uploads, Zähler) lebt in app.state.standin.
+    """
+    config = config or StandinConfig()
+    rng = random.Random(config.seed)
+    buckets = {
+        name: _TokenBucket(config.profile(name).rate_limit_per_second)
+        for name in ENDPOINTS if config.profile(name).rate_limit_per_second > 0
+    }
+    api_data = synthetic_api_data(config.applicants, config.campaigns)
+    state: Dict[str, Any] = {
+        "conversations": {},
+        "uploads": {},
+        "requests": {name: {} for name in ENDPOINTS},
+        "started_at": time.time()
+    }
+
+    app = FastAPI(title="VoiceKI Stand-in (ElevenLabs/HOC)")
+    app.state.standin = state
+
+    def count(endpoint: str, status: int) -> None:
+        counters = state["requests"][endpoint]
+        counters[str(status)] = counters.get(str(status), 0) + 1
+
+    async def gate(endpoint: str) -> Optional[JSONResponse]:
+        """Latenz, Rate Limit und Fehlerinjektion; None = normale Antwort"""
+        profile = config.profile(endpoint)
+        await asyncio.sleep(profile.latency.sample(rng))
+
+        bucket = buckets.get(endpoint)
+        if bucket is not None:
+            wait = bucket.acquire()
+            if wait > 0:
+                count(endpoint, 429)
+                return JSONResponse(
+                    {"detail": "rate limit exceeded"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))}
+                )
+
+        if profile.error_rate > 0 and rng.random() < profile.error_rate:
+            count(endpoint, profile.error_status)
+            return JSONResponse({"detail": "injected error"}, status_code=profile.error_status)
+        return None
+
+    def conversation_status(conversation: Dict[str, Any]) -> str:
+        return "done" if time.monotonic() >= conversation["ends_at"] else "processing"
+
+    @app.get("/api/v1/applicants/{status}")
+    async def applicants(status: str):
+        failure = await gate("applicants")
+        if failure:
+            return failure
+        count("applicants", 200)
+        return api_data
+
+    @app.post("/api/v1/campaigns/{campaign_id}/package")
+    async def upload_package(campaign_id: str, request: Request):
+        failure = await gate("upload")
+        if failure:
+            return failure
+        body = await request.body()
+        if request.headers.get("content-encoding") == "gzip":
+            body = gzip.decompress(body)
+        json.loads(body)
+        state["uploads"][campaign_id] = len(body)
+        count("upload", 200)
+        return {"download_url": f"{request.base_url}api/v1/campaigns/{campaign_id}/package"}
+
+    @app.post("/v1/conversational-ai/conversations")
+    async def start_conversation(request: Request):
+        failure = await gate("start")
+        if failure:
+            return failure
+        payload = await request.json()
+        conversation_id = f"standin_{uuid.uuid4().hex[:12]}"
+        prompt = (payload.get("override_agent_config") or {}).get("prompt") or {}
+        state["conversations"][conversation_id] = {
+            "agent_id": payload.get("agent_id"),
+            "kb_size": len(prompt.get("knowledge_base") or ""),
+            "ends_at": time.monotonic() + config.call_duration.sample(rng)
+        }
+        count("start", 200)
+        return {"conversation_id": conversation_id}
+
+    @app.get("/v1/convai/conversations/{conversation_id}")
+    async def get_status(conversation_id: str):
+        failure = await gate("status")
+        if failure:
+            return failure
+        conversation = state["conversations"].get(conversation_id)
+        if conversation is None:
+            count("status", 404)
+            return JSONResponse({"detail": "conversation not found"}, status_code=404)
+        count("status", 200)
+        return {"conversation_id": conversation_id, "status": conversation_status(conversation)}
+
+    @app.get("/v1/convai/conversations/{conversation_id}/transcript")
+    async def get_transcript(conversation_id: str):
+        failure = await gate("transcript")
+        if failure:
+            return failure
+        conversation = state["conversations"].get(conversation_id)
+        if conversation is None or conversation_status(conversation) != "done":
+            count("transcript", 404)
+            return JSONResponse({"detail": "transcript not available"}, status_code=404)
+        count("transcript", 200)
+        return {"transcript": [
+            {"role": "agent", "message": "Guten Tag, hier ist die Recruiting-Assistenz."},
+            {"role": "user", "message": "Hallo, ja gerne."},
+        ]}
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return {
+            "requests": state["requests"],
+            "conversations": len(state["conversations"]),
+            "uploads": len(state["uploads"]),
+            "uptime_seconds": round(time.time() - state["started_at"], 3)
+        }
+
+    return app
+
+
+class StandinServer:
+    """
+    Startet den Stand-in in einem Hintergrund-Thread (uvicorn).
+
+    Beispiel:
+        with StandinServer(StandinConfig(applicants=200)) as server:
+            run_load_test(server.base_url, concurrency=16)
+    """
+
+    def __init__(self, config: Optional[StandinConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            config: Stand-in Konfiguration
+            host: Bind-Adresse
+            port: Port (0 = freier Port)
+        """
+        self.app = create_standin_app(config)
+        self.host = host
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self.port = self._socket.getsockname()[1]
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, log_level="warning", access_log=False, backlog=2048
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "StandinServer":
+        self._thread = threading.Thread(
+            target=self._server.run, kwargs={"sockets": [self._socket]},
+            name="standin-server", daemon=True
+        )
+        self._thread.start()
+        deadline = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Stand-in Server konnte nicht gestartet werden")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self._socket.close()
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.app.state.standin
+        return {
+            "requests": {name: dict(counts) for name, counts in state["requests"].items()},
+            "conversations": len(state["conversations"]),
+            "uploads": len(state["uploads"])
+        }
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def parse_profile(spec: str) -> EndpointProfile:
+    """
+    Parst ein Endpoint-Profil aus der Kommandozeile.
+
+    Format: "latency=lognormal:0.1,0.5;errors=0.02;error_status=503;rate=50"
+    """
+    profile = EndpointProfile()
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        key, _, value = part.partition("=")
+        if key == "latency":
+            profile.latency = LatencyModel.parse(value)
+        elif key == "errors":
+            profile.error_rate = float(value)
+        elif key == "error_status":
+            profile.error_status = int(value)
+        elif key == "rate":
+            profile.rate_limit_per_second = float(value)
+        else:
+            raise ValueError(f"Unbekannter Profil-Schlüssel '{key}'")
+    return profile
@@ -1,6 +1,6 @@
 """Orchestrator Layer - Koordiniert den gesamten Voice-Call-Ablauf"""
 
 from .call_orchestrator import CallOrchestrator
+from .batch_runner import BatchCallRunner
 
-__all__ = ["CallOrchestrator"]
-
+__all__ = ["CallOrchestrator", "BatchCallRunner"]
@@ -0,0 +1,239 @@
+"""Batch Runner - Startet Calls für viele Bewerber parallel mit begrenztem Worker-Pool"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable
+
+from ..utils.logger import setup_logger
+
+
+def applicant_key(applicant: Dict[str, Any]) -> str:
+    """
+    Stabiler Schlüssel eines Bewerbers für das Checkpointing.
+
+    Nutzt die API-ID falls vorhanden, sonst Telefonnummer + Campaign ID.
+    """
+    if applicant.get('id') is not None:
+        return f"id:{applicant['id']}"
+    return f"{applicant.get('telephone', '')}:{applicant.get('campaign_id', '')}"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    Nearest-Rank Perzentil einer Werteliste.
+
+    Args:
+        values: Messwerte (unsortiert)
+        pct: Perzentil zwischen 0 und 100
+
+    Returns:
+        Perzentilwert oder 0.0 bei leerer Liste
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class BatchCheckpoint:
+    """
+    Persistiert, welche Bewerber bereits verarbeitet wurden.
+
+    Die Datei wird nach jedem abgeschlossenen Call atomar ersetzt
+    (Temp-Datei + os.replace), damit ein Abbruch den Stand nicht beschädigt.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Pfad zur Checkpoint-Datei (JSON)
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f).get('processed', {})
+
+    def is_done(self, key: str) -> bool:
+        """True wenn der Bewerber bereits erfolgreich angerufen wurde"""
+        return self._entries.get(key, {}).get('status') == 'success'
+
+    def record(self, key: str, entry: Dict[str, Any]) -> None:
+        """Speichert Ergebnis eines Bewerbers und schreibt Checkpoint"""
+        with self._lock:
+            self._entries[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"processed": self._entries}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class BatchCallRunner:
+    """
+    Startet Calls für eine Bewerberliste über einen begrenzten Thread-Pool.
+
+    - Globales Limit: max_workers gleichzeitige Calls
+    - Pro Kampagne: max_per_campaign gleichzeitige Calls
+    - Optionales Checkpointing für Wiederaufnahme nach Abbruch
+    - Zusammenfassung mit Durchsatz und Latenz-Perzentilen
+    """
+
+    def __init__(
+        self,
+        start_call: Callable[[str, str], Dict[str, Any]],
+        max_workers: int = 8,
+        max_per_campaign: int = 4,
+        checkpoint_path: Optional[Path] = None
+    ):
+        """
+        Args:
+            start_call: Funktion (applicant_id, campaign_id) -> Ergebnis-Dict,
+                        typischerweise CallOrchestrator.start_call
+            max_workers: Globales Limit gleichzeitiger Calls
+            max_per_campaign: Limit gleichzeitiger Calls pro Kampagne
+            checkpoint_path: Optional Pfad zur Checkpoint-Datei
+        """
+        if max_workers < 1 or max_per_campaign < 1:
+            raise ValueError("max_workers und max_per_campaign müssen >= 1 sein")
+
+        self.start_call = start_call
+        self.max_workers = max_workers
+        self.max_per_campaign = max_per_campaign
+        self.checkpoint = BatchCheckpoint(checkpoint_path) if checkpoint_path else None
+        self.logger = setup_logger("batch_runner")
+
+    def run(self, applicants: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Verarbeitet alle Bewerber und gibt eine Zusammenfassung zurück.
+
+        Args:
+            applicants: Bewerber-Dicts aus der API (telephone, campaign_id, ...)
+
+        Returns:
+            Summary-Dict (successful, failed, skipped, errors, throughput, latency)
+        """
+        # Eine Warteschlange pro Kampagne - verteilt Slots fair (Round Robin)
+        queues: Dict[str, deque] = {}
+        skipped = 0
+        for applicant in applicants:
+            if self.checkpoint and self.checkpoint.is_done(applicant_key(applicant)):
+                skipped += 1
+            else:
+                queues.setdefault(str(applicant['campaign_id']), deque()).append(applicant)
+
+        total = sum(len(q) for q in queues.values())
+        if skipped:
+            print(f"⏭️  {skipped} Bewerber bereits verarbeitet (Checkpoint) - übersprungen")
+
+        latencies: List[float] = []
+        errors: List[Dict[str, Any]] = []
+        successful = 0
+        completed = 0
+        in_flight_per_campaign: Dict[str, int] = {}
+        started_at = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {}
+
+            while queues or futures:
+                # Freie Slots füllen, ohne Kampagnen-Limit zu überschreiten
+                progressed = True
+                while progressed and len(futures) < self.max_workers:
+                    progressed = False
+                    for campaign_id in list(queues):
+                        if len(futures) >= self.max_workers:
+                            break
+                        if in_flight_per_campaign.get(campaign_id, 0) >= self.max_per_campaign:
+                            continue
+                        applicant = queues[campaign_id].popleft()
+                        if not queues[campaign_id]:
+                            del queues[campaign_id]
+                        in_flight_per_campaign[campaign_id] = in_flight_per_campaign.get(campaign_id, 0) + 1
+                        futures[executor.submit(self._call_one, applicant)] = applicant
+                        progressed = True
+
+                if not futures:
+                    break
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    applicant = futures.pop(future)
+                    campaign_id = str(applicant['campaign_id'])
+                    in_flight_per_campaign[campaign_id] -= 1
+
+                    outcome = future.result()
+                    latencies.append(outcome['duration'])
+                    completed += 1
+                    name = f"{applicant.get('first_name', '')} {applicant.get('last_name', '')}".strip()
+
+                    if outcome['status'] == 'success':
+                        successful += 1
+                        print(f"[{completed}/{total}] ✅ {name} (Campaign {campaign_id}): "
+                              f"{outcome['conversation_id']} ({outcome['duration']:.1f}s)")
+                    else:
+                        errors.append({
+                            "applicant": name,
+                            "phone": applicant.get('telephone', ''),
+                            "campaign_id": campaign_id,
+                            "error": outcome['error']
+                        })
+                        print(f"[{completed}/{total}] ❌ {name} (Campaign {campaign_id}): {outcome['error']}")
+
+                    if self.checkpoint:
+                        self.checkpoint.record(applicant_key(applicant), {
+                            "status": outcome['status'],
+                            "conversation_id": outcome.get('conversation_id'),
+                            "error": outcome.get('error'),
+                            "finished_at": datetime.now().isoformat()
+                        })
+
+        elapsed = time.perf_counter() - started_at
+        summary = {
+            "total": total,
+            "successful": successful,
+            "failed": len(errors),
+            "skipped": skipped,
+            "errors": errors,
+            "elapsed_seconds": elapsed,
+            "throughput_per_minute": (completed / elapsed * 60) if elapsed > 0 else 0.0,
+            "latency_seconds": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies) if latencies else 0.0
+            }
+        }
+        self.logger.info(
+            f"Batch finished - {successful}/{total} successful, "
+            f"{summary['throughput_per_minute']:.1f} calls/min"
+        )
+        return summary
+
+    def _call_one(self, applicant: Dict[str, Any]) -> Dict[str, Any]:
+        """Startet einen einzelnen Call und misst die Dauer"""
+        start = time.perf_counter()
+        try:
+            result = self.start_call(applicant['telephone'], str(applicant['campaign_id']))
+            return {
+                "status": "success",
+                "conversation_id": result.get('conversation_id'),
+                "duration": time.perf_counter() - start
+            }
+        except Exception as e:
+            self.logger.error(f"Call failed for {applicant.get('telephone')}: {e}")
+            return {
+                "status": "failed",
+                "error": str(e),
+                "duration": time.perf_counter() - start
+            }
@@ -1,18 +1,33 @@
 """Call Orchestrator - Steuert den kompletten Voice-Recruiting-Ablauf"""
 
-import json
-import subprocess
-from pathlib import Path
+import asyncio
+import contextvars
+import threading
 from typing import Dict, Any, Optional
-from datetime import datetime
 
 from ..data_sources.base import DataSource
 from ..aggregator.unified_aggregator import UnifiedAggregator
 from ..aggregator.knowledge_base_builder import KnowledgeBaseBuilder
+from ..aggregator.kb_store import KnowledgeStore, get_kb_registry
 from ..elevenlabs.voice_client import ElevenLabsVoiceClient
 from ..telephony.base import ConversationTransport
 from ..config import Settings
+from ..storage.call_store import CallResultStore, get_call_store
 from ..utils.logger import setup_logger
+from ..utils import json_codec
+from .question_cache import CampaignQuestionCache, get_question_cache
+
+
+# Phasen ohne Bewerberdaten - einmal pro Kampagne indexiert
+CAMPAIGN_KB_PHASES = ("phase_2", "phase_3")
+
+# Gesetzt, wenn start_call() im Main-Thread läuft (CLI) - Sync-Transports
+# werden dann direkt aufgerufen, damit sie Signal Handler registrieren können
+_cli_main_thread = contextvars.ContextVar("cli_main_thread", default=False)
+
+
+def _read_json(path) -> Dict[str, Any]:
+    return json_codec.load_file(path)
 
 
 def safe_print(text: str):
@@ -30,7 +45,7 @@ class CallOrchestrator:
     """
     Orchestriert den kompletten Ablauf eines Voice-Recruiting-Calls:
     1. Daten laden
-    2. Questions.json generieren (optional)
+    2. Fragenkatalog der Kampagne laden (Cache/Package/In-Process)
     3. Daten aggregieren
     4. ElevenLabs Call starten
     """
@@ -39,7 +54,9 @@ class CallOrchestrator:
         self,
         data_source: DataSource,
         conversation_client: ConversationTransport,
-        settings: Settings
+        settings: Settings,
+        question_cache: Optional[CampaignQuestionCache] = None,
+        call_store: Optional[CallResultStore] = None
     ):
         """
         Initialisiert Orchestrator.
@@ -48,10 +65,14 @@ class CallOrchestrator:
             data_source: DataSource für Bewerber-/Firmendaten
             conversation_client: Transport Layer (WebRTC/Twilio/etc.)
             settings: Konfiguration
+            question_cache: Fragenkatalog-Cache pro Kampagne (Default: prozessweit)
+            call_store: Speicher für Call-Ergebnisse (Default: prozessweit)
         """
         self.data_source = data_source
         self.conversation_client = conversation_client
         self.settings = settings
+        self.question_cache = question_cache or get_question_cache()
+        self.call_store = call_store or get_call_store()
         
         self.aggregator = UnifiedAggregator(
             prompts_dir=settings.get_prompts_dir_path()
@@ -68,7 +89,48 @@ class CallOrchestrator:
         phase: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Startet einen kompletten Voice-Recruiting-Call.
+        Startet einen kompletten Voice-Recruiting-Call (synchron).
+        
+        Wrapper um start_call_async für CLI und Worker-Threads - läuft in
+        einem eigenen Event Loop und darf daher nicht aus einem laufenden
+        Loop aufgerufen werden (dort start_call_async verwenden).
+        
+        Args:
+            applicant_id: ID des Bewerbers
+            campaign_id: ID der Kampagne
+            phase: Optional: Nur bestimmte Phase starten (1-4)
+            
+        Returns:
+            Dict mit Ergebnis (conversation_id, status, etc.)
+        """
+        return asyncio.run(self._start_call_in_own_loop(applicant_id, campaign_id, phase))
+
+    async def _start_call_in_own_loop(
+        self,
+        applicant_id: str,
+        campaign_id: str,
+        phase: Optional[int]
+    ) -> Dict[str, Any]:
+        _cli_main_thread.set(threading.current_thread() is threading.main_thread())
+        try:
+            return await self.start_call_async(applicant_id, campaign_id, phase)
+        finally:
+            # Loop-gebundene HTTP Clients des Transports schließen
+            aclose = getattr(self.conversation_client, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def start_call_async(
+        self,
+        applicant_id: str,
+        campaign_id: str,
+        phase: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Startet einen kompletten Voice-Recruiting-Call im Event Loop.
+        
+        Die vier Datenabfragen laufen parallel (asyncio.gather), Datei-IO
+        und synchrone Transports im Thread-Pool.
         
         Args:
             applicant_id: ID des Bewerbers
@@ -91,10 +153,12 @@ class CallOrchestrator:
 
             # Step 1: Daten laden
             safe_print("📂 Schritt 1: Lade Daten...")
-            applicant = self.data_source.get_applicant_profile(applicant_id)
-            address = self.data_source.get_applicant_address(applicant_id)
-            company = self.data_source.get_company_profile(campaign_id)
-            protocol = self.data_source.get_conversation_protocol(campaign_id)
+            applicant, address, company, protocol = await asyncio.gather(
+                self.data_source.get_applicant_profile_async(applicant_id),
+                self.data_source.get_applicant_address_async(applicant_id),
+                self.data_source.get_company_profile_async(campaign_id),
+                self.data_source.get_conversation_protocol_async(campaign_id)
+            )
             
             print(f"   ✓ Bewerber: {applicant.get('first_name')} {applicant.get('last_name')}")
             print(f"   ✓ Adresse: {address.get('city', 'N/A')}")
@@ -102,7 +166,7 @@ class CallOrchestrator:
             print(f"   ✓ Protokoll: {len(protocol.get('pages', []))} Seiten")
 
             # Step 2: Questions.json generieren (optional)
-            questions_json = self._load_or_generate_questions(protocol)
+            questions_json = await self._load_or_generate_questions(protocol, campaign_id)
             
             # Step 3: Daten aggregieren
             safe_print("\n🔄 Schritt 3: Aggregiere Daten...")
@@ -115,17 +179,17 @@ class CallOrchestrator:
             knowledge_bases = self._build_knowledge_bases(phase_data)
             
             # Step 4.5: Master Prompt laden
-            master_prompt = self._load_master_prompt()
+            master_prompt = await asyncio.to_thread(self._load_master_prompt)
             
             # Step 5: ElevenLabs Call starten
             safe_print("\n📞 Schritt 5: Starte ElevenLabs Call...")
             
             if phase:
                 # Nur bestimmte Phase
-                result = self._start_single_phase(phase, knowledge_bases, master_prompt)
+                result = await self._start_single_phase(phase, knowledge_bases, master_prompt, campaign_id)
             else:
                 # Alle Phasen sequenziell
-                result = self._start_multi_phase_call(knowledge_bases, master_prompt, applicant_id)
+                result = await self._start_multi_phase_call(knowledge_bases, master_prompt, applicant_id, campaign_id)
             
             self.logger.info(f"Call started successfully - Conversation ID: {result.get('conversation_id')}")
             
@@ -152,54 +216,36 @@ class CallOrchestrator:
         safe_print(f"   ✓ Master Prompt geladen: {len(content)} Zeichen")
         return content
 
-    def _load_or_generate_questions(self, protocol: Dict[str, Any]) -> Dict[str, Any]:
-        """Lädt questions.json oder generiert es via TypeScript Tool"""
-        print("\n📋 Schritt 2: Lade/Generiere questions.json...")
+    async def _load_or_generate_questions(self, protocol: Dict[str, Any], campaign_id: str) -> Dict[str, Any]:
+        """
+        Lädt questions.json der Kampagne über den Campaign Question Cache.
         
-        questions_path = self.settings.get_questions_json_path()
+        Quelle: gecachter Katalog → gespeichertes Campaign Package →
+        In-Process Pipeline (nur bei generate_questions). Ohne Treffer
+        greift die globale questions_json_path als Fallback.
+        """
+        print("\n📋 Schritt 2: Lade/Generiere questions.json...")
         
-        # Prüfe ob generieren gewünscht
         if self.settings.generate_questions:
-            print("   🔨 Generiere questions.json via TypeScript Tool...")
-            self._run_typescript_tool()
+            print("   🔨 Fragenkatalog aus Cache oder In-Process Pipeline...")
         
-        # Lade questions.json
+        questions_json = await self.question_cache.get_async(
+            campaign_id, protocol, build=self.settings.generate_questions
+        )
+        if questions_json is not None:
+            safe_print(f"   ✓ Fragenkatalog für Kampagne {campaign_id}: {len(questions_json.get('questions', []))} Fragen")
+            return questions_json
+        
+        # Fallback: globale questions.json (Entwicklung ohne Package)
+        questions_path = self.settings.get_questions_json_path()
         if questions_path.exists():
-            with open(questions_path, 'r', encoding='utf-8') as f:
-                questions_json = json.load(f)
+            questions_json = await asyncio.to_thread(_read_json, questions_path)
             safe_print(f"   ✓ questions.json geladen: {len(questions_json.get('questions', []))} Fragen")
             return questions_json
         else:
             safe_print("   ⚠️  Warnung: questions.json nicht gefunden - verwende Fallback")
             return {"_meta": {}, "questions": []}
 
-    def _run_typescript_tool(self):
-        """Führt TypeScript Question Builder Tool aus"""
-        tool_path = self.settings.get_typescript_tool_path()
-        
-        if not tool_path.exists():
-            raise FileNotFoundError(f"TypeScript Tool nicht gefunden: {tool_path}")
-        
-        try:
-            # Wechsle ins Tool-Verzeichnis und führe npm start aus
-            result = subprocess.run(
-                ["npm", "start"],
-                cwd=tool_path,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
-            
-            if result.returncode != 0:
-                print(f"   ⚠️  Tool-Ausführung fehlgeschlagen:\n{result.stderr}")
-            else:
-                print("   ✓ TypeScript Tool erfolgreich ausgeführt")
-                
-        except subprocess.TimeoutExpired:
-            print("   ⚠️  Tool-Timeout (>60s)")
-        except Exception as e:
-            print(f"   ⚠️  Fehler beim Ausführen des Tools: {e}")
-
     def _aggregate_all_phases(
         self,
         applicant: Dict[str, Any],
@@ -253,21 +299,18 @@ class CallOrchestrator:
             "phase_4": kb_4
         }
 
-    def _start_single_phase(
+    async def _start_single_phase(
         self, 
         phase: int, 
         knowledge_bases: Dict[str, str],
-        system_prompt: str
+        system_prompt: str,
+        campaign_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Startet einen einzelnen Phase-Call"""
         
-        kb = knowledge_bases[f"phase_{phase}"]
+        kb = self._phase_payloads(knowledge_bases, campaign_id)[f"phase_{phase}"]
         
-        result = self.conversation_client.start_conversation(
-            agent_id=self.settings.elevenlabs_agent_id,
-            knowledge_base=kb,
-            system_prompt=system_prompt
-        )
+        result = await self._start_conversation(kb, system_prompt)
         
         print(f"   ✓ Phase {phase} gestartet: {result['conversation_id']}")
         
@@ -277,32 +320,92 @@ class CallOrchestrator:
             "status": result["status"]
         }
 
-    def _start_multi_phase_call(
+    async def _start_conversation(self, knowledge_base: str, system_prompt: str) -> Dict[str, Any]:
+        """Startet die Conversation über den Transport (async falls unterstützt)"""
+        client = self.conversation_client
+        kwargs = {
+            "agent_id": self.settings.elevenlabs_agent_id,
+            "knowledge_base": knowledge_base,
+            "system_prompt": system_prompt
+        }
+        start_async = getattr(client, "start_conversation_async", None)
+        native_async = (
+            start_async is not None
+            and getattr(type(client), "start_conversation_async", None)
+            is not ConversationTransport.start_conversation_async
+        )
+        if native_async:
+            return await start_async(**kwargs)
+        # CLI-Aufruf: Sync-Transport direkt im Main-Thread starten, sonst
+        # registriert er seinen SIGINT-Cleanup nicht (WebRTC). Sonst im
+        # Thread-Pool, damit der Start den Loop nicht blockiert.
+        if _cli_main_thread.get():
+            return client.start_conversation(**kwargs)
+        return await asyncio.to_thread(client.start_conversation, **kwargs)
+
+    def _campaign_kb_store(
+        self,
+        knowledge_bases: Dict[str, str],
+        campaign_id: str
+    ) -> KnowledgeStore:
+        """
+        Indexierter Store der kampagnenweiten Phasen (2: Unternehmen, 3: Fragen).
+        
+        Wird pro Kampagne nur bei geändertem Inhalt neu aufgebaut; Phase 1 und 4
+        enthalten Bewerberdaten und bleiben außerhalb des geteilten Stores.
+        """
+        sources = {key: knowledge_bases[key] for key in CAMPAIGN_KB_PHASES}
+        # Persistiert: der api_server löst die Payload-IDs (phase_3:2) daraus auf
+        return get_kb_registry().get_or_build(
+            campaign_id, sources, KnowledgeStore.from_phase_texts, persist=True
+        )
+
+    def _phase_payloads(
+        self,
+        knowledge_bases: Dict[str, str],
+        campaign_id: Optional[str]
+    ) -> Dict[str, str]:
+        """
+        KB-Text pro Phase für den Conversation Payload.
+        
+        Mit kb_payload_max_chars tragen die Kampagnen-Phasen nur die Abschnitte
+        innerhalb des Budgets plus ein Verzeichnis der übrigen (Lookup-API).
+        """
+        budget = self.settings.kb_payload_max_chars
+        if budget <= 0 or campaign_id is None:
+            return dict(knowledge_bases)
+        
+        store = self._campaign_kb_store(knowledge_bases, campaign_id)
+        payloads = dict(knowledge_bases)
+        for key in CAMPAIGN_KB_PHASES:
+            payloads[key] = store.phase_payload(key, budget)
+            print(f"   ✓ {key} Payload: {len(payloads[key])}/{len(knowledge_bases[key])} Zeichen")
+        return payloads
+
+    async def _start_multi_phase_call(
         self, 
         knowledge_bases: Dict[str, str],
         system_prompt: str,
-        applicant_id: str
+        applicant_id: str,
+        campaign_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Startet alle Phasen sequenziell"""
         
         # Für MVP: Kombiniere alle Knowledge Bases
         # In Produktion: Separate Calls mit Phase-Transition
+        payloads = self._phase_payloads(knowledge_bases, campaign_id)
         
         combined_kb = "\n\n".join([
             "=" * 80,
             "MASTER KNOWLEDGE BASE - ALLE PHASEN",
             "=" * 80,
-            knowledge_bases["phase_1"],
-            knowledge_bases["phase_2"],
-            knowledge_bases["phase_3"],
-            knowledge_bases["phase_4"]
+            payloads["phase_1"],
+            payloads["phase_2"],
+            payloads["phase_3"],
+            payloads["phase_4"]
         ])
         
-        result = self.conversation_client.start_conversation(
-            agent_id=self.settings.elevenlabs_agent_id,
-            knowledge_base=combined_kb,
-            system_prompt=system_prompt
-        )
+        result = await self._start_conversation(combined_kb, system_prompt)
         
         print(f"   ✓ Multi-Phase Call gestartet: {result['conversation_id']}")
         
@@ -310,7 +413,8 @@ class CallOrchestrator:
         self._save_call_results(
             conversation_id=result['conversation_id'],
             applicant_id=applicant_id,
-            knowledge_base=combined_kb
+            knowledge_base=combined_kb,
+            campaign_id=campaign_id
         )
         
         return {
@@ -325,32 +429,22 @@ class CallOrchestrator:
         conversation_id: str,
         applicant_id: str,
         knowledge_base: str,
-        transcript: Optional[str] = None
+        transcript: Optional[str] = None,
+        campaign_id: Optional[str] = None
     ):
-        """Speichert Call-Ergebnisse in Output_ordner/calls/"""
-        output_dir = Path("Output_ordner/calls")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Metadata
-        metadata = {
-            "conversation_id": conversation_id,
-            "applicant_id": applicant_id,
-            "timestamp": datetime.now().isoformat(),
-            "kb_size": len(knowledge_base),
-            "has_transcript": transcript is not None
-        }
-        
-        with open(output_dir / f"{conversation_id}_metadata.json", "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
-        # Knowledge Base
-        with open(output_dir / f"{conversation_id}_kb.txt", "w", encoding="utf-8") as f:
-            f.write(knowledge_base)
+        """
+        Speichert Call-Ergebnisse im Call Store (SQLite).
         
-        # Transkript (falls vorhanden)
-        if transcript:
-            with open(output_dir / f"{conversation_id}_transcript.txt", "w", encoding="utf-8") as f:
-                f.write(transcript)
+        Die Knowledge Base wird nur einmal pro Inhalt abgelegt und per Hash
+        referenziert; der Schreibvorgang läuft gebündelt im Hintergrund.
+        """
+        digest = self.call_store.record(
+            conversation_id=conversation_id,
+            applicant_id=applicant_id,
+            campaign_id=campaign_id,
+            knowledge_base=knowledge_base,
+            transcript=transcript,
+            metadata={"has_transcript": transcript is not None}
+        )
         
-        safe_print(f"   ✓ Ergebnisse gespeichert: {conversation_id}_*")
-
+        safe_print(f"   ✓ Ergebnisse gespeichert: {conversation_id} (KB {digest[:12]})")
@@ -0,0 +1,579 @@
+"""Call Queue - Persistente Warteschlange für ausgehende Calls (SQLite)
+
+Mehrere Worker-Prozesse können dieselbe Queue abarbeiten: Jobs werden per
+Lease beansprucht (claim), per Heartbeat verlängert und nach Ablauf der
+Lease wieder freigegeben. Ein Job ist damit nie bei zwei Workern aktiv.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from ..storage.job_leases import _ImmediateTransaction, default_worker_id
+from ..utils.logger import setup_logger
+from .batch_runner import applicant_key
+
+# Frische Bewerber vor erneuten Versuchen
+PRIORITY_FRESH = 100
+PRIORITY_RETRY = 50
+
+# Call-Ergebnisse, bei denen der Bewerber nicht erreicht wurde (Retry später)
+NOT_REACHED_STATUSES = frozenset({"not_reached", "no_answer", "busy", "voicemail"})
+
+_WEEKDAYS = {
+    "mon": 0, "mo": 0, "tue": 1, "di": 1, "wed": 2, "mi": 2, "thu": 3, "do": 3,
+    "fri": 4, "fr": 4, "sat": 5, "sa": 5, "sun": 6, "so": 6
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS call_jobs (
+    job_id TEXT PRIMARY KEY,
+    applicant_id TEXT NOT NULL,
+    campaign_id TEXT NOT NULL,
+    payload TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_call_jobs_due ON call_jobs(status, not_before, priority);
+CREATE INDEX IF NOT EXISTS idx_call_jobs_campaign ON call_jobs(campaign_id, status);
+CREATE TABLE IF NOT EXISTS call_dials (
+    campaign_id TEXT NOT NULL,
+    dialed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_call_dials_time ON call_dials(dialed_at);
+"""
+
+
+def applicant_priority(applicant: Dict[str, Any]) -> int:
+    """Priorität eines API-Bewerbers: 'not_reached' nach frischen Bewerbern"""
+    return PRIORITY_RETRY if applicant.get("status") == "not_reached" else PRIORITY_FRESH
+
+
+class CallingWindows:
+    """
+    Erlaubte Anrufzeiten, z.B. "Mon-Fri 09:00-19:00; Sat 10:00-14:00".
+
+    Wochentage englisch oder deutsch abgekürzt (Mo-Fr), Zeiten in der
+    konfigurierten Zeitzone. Leere Spezifikation = immer erlaubt.
+    """
+
+    def __init__(self, spec: str = "", timezone: str = "Europe/Berlin"):
+        self.spec = spec
+        self.tz = ZoneInfo(timezone)
+        self.windows: List[Tuple[int, int, int]] = []  # (Wochentag, Start-Minute, End-Minute)
+
+        for part in filter(None, (p.strip() for p in spec.split(";"))):
+            days, _, hours = part.rpartition(" ")
+            start, _, end = hours.partition("-")
+            start_min, end_min = self._minutes(start), self._minutes(end)
+            if end_min <= start_min:
+                raise ValueError(f"Ungültiges Anruffenster '{part}' (Ende vor Start)")
+            for day in self._days(days):
+                self.windows.append((day, start_min, end_min))
+
+    @staticmethod
+    def _minutes(value: str) -> int:
+        hour, _, minute = value.strip().partition(":")
+        return int(hour) * 60 + int(minute or 0)
+
+    @staticmethod
+    def _days(spec: str) -> List[int]:
+        days: List[int] = []
+        for token in filter(None, (t.strip().lower() for t in spec.split(","))):
+            first, _, last = token.partition("-")
+            if first not in _WEEKDAYS or (last and last not in _WEEKDAYS):
+                raise ValueError(f"Unbekannter Wochentag in '{spec}'")
+            start = _WEEKDAYS[first]
+            end = _WEEKDAYS[last] if last else start
+            days.extend((start + i) % 7 for i in range(((end - start) % 7) + 1))
+        return days
+
+    def is_open(self, timestamp: float) -> bool:
+        if not self.windows:
+            return True
+        local = datetime.fromtimestamp(timestamp, self.tz)
+        minute = local.hour * 60 + local.minute
+        return any(day == local.weekday() and start <= minute < end for day, start, end in self.windows)
+
+    def next_open(self, timestamp: float) -> float:
+        """Zeitpunkt (Epoch), ab dem wieder angerufen werden darf"""
+        if self.is_open(timestamp):
+            return timestamp
+        local = datetime.fromtimestamp(timestamp, self.tz)
+        midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        candidates = []
+        for offset in range(8):
+            day = midnight + timedelta(days=offset)
+            for weekday, start, _ in self.windows:
+                if weekday == day.weekday():
+                    opens = day + timedelta(minutes=start)
+                    if opens > local:
+                        candidates.append(opens.timestamp())
+        return min(candidates)
+
+
+class CallQueue:
+    """
+    SQLite-Warteschlange für ausgehende Calls.
+
+    - Priorität (höher zuerst), bei Gleichstand FIFO
+    - Anruffenster: außerhalb werden keine Jobs vergeben
+    - Quoten: gleichzeitige Calls global/pro Kampagne und Calls pro Minute
+    - Fehlgeschlagene und nicht erreichte Bewerber kommen mit Verzögerung
+      zurück in die Queue, bis max_attempts erreicht ist
+    - Lease pro beanspruchtem Job; abgelaufene Leases (abgestürzter Worker)
+      werden beim nächsten claim() wieder vergeben, solange max_attempts
+      nicht erreicht ist
+    """
+
+    def __init__(
+        self,
+        path: str,
+        windows: Optional[CallingWindows] = None,
+        max_in_flight: int = 8,
+        max_in_flight_per_campaign: int = 4,
+        max_per_minute: int = 0,
+        max_per_minute_per_campaign: int = 0,
+        lease_seconds: float = 300.0,
+        retry_delays: Iterable[float] = (3600.0, 4 * 3600.0, 24 * 3600.0),
+        max_attempts: int = 4
+    ):
+        """
+        Args:
+            path: SQLite-Datei (von allen Workern geteilt)
+            windows: Erlaubte Anrufzeiten (None = immer)
+            max_in_flight: Max. gleichzeitige Calls über alle Worker
+            max_in_flight_per_campaign: Max. gleichzeitige Calls pro Kampagne
+            max_per_minute: Max. neue Calls pro Minute (0 = unbegrenzt)
+            max_per_minute_per_campaign: Max. neue Calls pro Minute und Kampagne (0 = unbegrenzt)
+            lease_seconds: Gültigkeit einer Lease ohne Heartbeat
+            retry_delays: Wartezeit vor Versuch 2, 3, ... in Sekunden (letzter Wert wiederholt sich)
+            max_attempts: Versuche pro Job inkl. erstem
+        """
+        self.path = Path(path)
+        self.windows = windows or CallingWindows()
+        self.max_in_flight = max_in_flight
+        self.max_in_flight_per_campaign = max_in_flight_per_campaign
+        self.max_per_minute = max_per_minute
+        self.max_per_minute_per_campaign = max_per_minute_per_campaign
+        self.lease_seconds = lease_seconds
+        self.retry_delays = list(retry_delays) or [0.0]
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread, Transaktionen explizit (BEGIN IMMEDIATE)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn())
+
+    def retry_delay(self, attempts: int) -> float:
+        return self.retry_delays[min(max(attempts, 1), len(self.retry_delays)) - 1]
+
+    def enqueue(
+        self,
+        applicant_id: str,
+        campaign_id: str,
+        priority: int = PRIORITY_FRESH,
+        payload: Optional[Dict[str, Any]] = None,
+        job_id: Optional[str] = None,
+        not_before: Optional[float] = None,
+        requeue: bool = False,
+        reset_attempts: bool = False,
+        now: Optional[float] = None
+    ) -> bool:
+        """
+        Fügt einen Job hinzu (idempotent pro job_id).
+
+        Args:
+            job_id: Stabiler Schlüssel (default: applicant_id:campaign_id)
+            not_before: Frühester Anrufzeitpunkt (Epoch)
+            requeue: Abgeschlossene/fehlgeschlagene Jobs erneut einplanen
+                     (nach der Retry-Verzögerung ab dem letzten Versuch).
+                     Die Versuche zählen weiter; ab max_attempts wird nicht
+                     mehr eingeplant
+            reset_attempts: Beim requeue wieder bei 0 Versuchen beginnen
+
+        Returns:
+            True wenn der Job neu eingeplant wurde
+        """
+        now = time.time() if now is None else now
+        job_id = job_id or f"{applicant_id}:{campaign_id}"
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status, attempts, updated_at FROM call_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute(
+                    "INSERT INTO call_jobs (job_id, applicant_id, campaign_id, payload, priority, status, "
+                    "not_before, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?)",
+                    (job_id, str(applicant_id), str(campaign_id), json.dumps(payload or {}, ensure_ascii=False),
+                     priority, not_before or 0.0, now, now)
+                )
+                return True
+            if requeue and row["status"] in ("done", "failed"):
+                if not reset_attempts and row["attempts"] >= self.max_attempts:
+                    return False
+                due = max(now, row["updated_at"] + self.retry_delay(row["attempts"]), not_before or 0.0)
+                conn.execute(
+                    "UPDATE call_jobs SET status = 'pending', priority = ?, not_before = ?, "
+                    "attempts = CASE WHEN ? THEN 0 ELSE attempts END, updated_at = ? WHERE job_id = ?",
+                    (priority, due, int(reset_attempts), now, job_id)
+                )
+                return True
+            return False
+
+    def enqueue_applicants(
+        self,
+        applicants: Iterable[Dict[str, Any]],
+        priority: Optional[int] = None,
+        requeue: bool = False
+    ) -> int:
+        """
+        Reiht API-Bewerber ein.
+
+        Args:
+            priority: Feste Priorität (default: nach Bewerber-Status)
+            requeue: Siehe enqueue() - z.B. für die 'not_reached' Liste
+
+        Returns:
+            Anzahl neu eingeplanter Jobs
+        """
+        added = 0
+        for applicant in applicants:
+            added += self.enqueue(
+                applicant_id=applicant.get("telephone", ""),
+                campaign_id=str(applicant["campaign_id"]),
+                priority=applicant_priority(applicant) if priority is None else priority,
+                payload=applicant,
+                job_id=applicant_key(applicant),
+                requeue=requeue
+            )
+        return added
+
+    def claim(self, worker_id: str, limit: int = 1, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Beansprucht bis zu limit fällige Jobs unter Einhaltung aller Quoten.
+
+        Returns:
+            Jobs (job_id, applicant_id, campaign_id, payload, attempts, ...)
+        """
+        now = time.time() if now is None else now
+        if limit <= 0 or not self.windows.is_open(now):
+            return []
+
+        with self._transaction() as conn:
+            # Abgestürzte Worker: abgelaufene Leases zurück in die Queue - der
+            # abgebrochene Versuch zählt, nach max_attempts ist der Job 'failed'
+            conn.execute(
+                "UPDATE call_jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "last_error = 'lease_expired', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ?",
+                (self.max_attempts, now, now)
+            )
+            conn.execute("DELETE FROM call_dials WHERE dialed_at < ?", (now - 60,))
+
+            in_flight = dict(conn.execute(
+                "SELECT campaign_id, COUNT(*) FROM call_jobs WHERE status = 'leased' GROUP BY campaign_id"
+            ).fetchall())
+            dialed = dict(conn.execute(
+                "SELECT campaign_id, COUNT(*) FROM call_dials WHERE dialed_at >= ? GROUP BY campaign_id",
+                (now - 60,)
+            ).fetchall())
+
+            free = min(limit, self.max_in_flight - sum(in_flight.values()))
+            if self.max_per_minute > 0:
+                free = min(free, self.max_per_minute - sum(dialed.values()))
+            if free <= 0:
+                return []
+
+            claimed = []
+            candidates = conn.execute(
+                "SELECT * FROM call_jobs WHERE status = 'pending' AND not_before <= ? "
+                "ORDER BY priority DESC, not_before, enqueued_at LIMIT ?",
+                (now, max(free * 20, 100))
+            )
+            for row in candidates.fetchall():
+                campaign_id = row["campaign_id"]
+                if in_flight.get(campaign_id, 0) >= self.max_in_flight_per_campaign:
+                    continue
+                if 0 < self.max_per_minute_per_campaign <= dialed.get(campaign_id, 0):
+                    continue
+
+                conn.execute(
+                    "UPDATE call_jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE job_id = ?",
+                    (worker_id, now + self.lease_seconds, now, row["job_id"])
+                )
+                conn.execute("INSERT INTO call_dials (campaign_id, dialed_at) VALUES (?, ?)", (campaign_id, now))
+                in_flight[campaign_id] = in_flight.get(campaign_id, 0) + 1
+                dialed[campaign_id] = dialed.get(campaign_id, 0) + 1
+
+                job = self._row_to_job(row)
+                job["attempts"] += 1
+                claimed.append(job)
+                if len(claimed) >= free:
+                    break
+            return claimed
+
+    def heartbeat(self, job_id: str, worker_id: str, now: Optional[float] = None) -> bool:
+        """Verlängert die Lease; False wenn der Job nicht mehr diesem Worker gehört"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE call_jobs SET lease_expires = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_seconds, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result: Optional[Dict[str, Any]] = None) -> bool:
+        """Markiert einen Job als erledigt (nur durch den Lease-Inhaber)"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE call_jobs SET status = 'done', result = ?, last_error = NULL, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result or {}, ensure_ascii=False, default=str), time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry: bool = True, now: Optional[float] = None) -> str:
+        """
+        Meldet einen fehlgeschlagenen Versuch.
+
+        Returns:
+            Neuer Status: 'pending' (Retry eingeplant), 'failed' oder 'lost' (Lease verloren)
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM call_jobs WHERE job_id = ? AND status = 'leased' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return "lost"
+            return self._reschedule(conn, job_id, row["attempts"], error, retry, now)
+
+    def mark_not_reached(self, job_id: str, now: Optional[float] = None) -> str:
+        """
+        Bewerber wurde im abgeschlossenen Call nicht erreicht: später erneut anrufen.
+
+        Returns:
+            'pending' (Retry eingeplant) oder 'failed' (max_attempts erreicht)
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM call_jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                raise KeyError(job_id)
+            return self._reschedule(conn, job_id, row["attempts"], "not_reached", True, now, PRIORITY_RETRY)
+
+    def _reschedule(
+        self,
+        conn: sqlite3.Connection,
+        job_id: str,
+        attempts: int,
+        error: str,
+        retry: bool,
+        now: float,
+        priority: Optional[int] = None
+    ) -> str:
+        status = "pending" if retry and attempts < self.max_attempts else "failed"
+        conn.execute(
+            "UPDATE call_jobs SET status = ?, not_before = ?, last_error = ?, priority = COALESCE(?, priority), "
+            "lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE job_id = ?",
+            (status, now + self.retry_delay(attempts), error, priority, now, job_id)
+        )
+        return status
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM call_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def next_due(self, now: Optional[float] = None) -> Optional[float]:
+        """Frühester Zeitpunkt, zu dem ein offener Job vergeben werden kann (None = keine offenen Jobs)"""
+        now = time.time() if now is None else now
+        row = self._conn().execute(
+            "SELECT MIN(not_before) FROM call_jobs WHERE status IN ('pending', 'leased')"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return self.windows.next_open(max(now, row[0]))
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn()
+        by_status = dict(conn.execute("SELECT status, COUNT(*) FROM call_jobs GROUP BY status").fetchall())
+        in_flight = dict(conn.execute(
+            "SELECT campaign_id, COUNT(*) FROM call_jobs WHERE status = 'leased' GROUP BY campaign_id"
+        ).fetchall())
+        return {"jobs": by_status, "in_flight_per_campaign": in_flight}
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"] or "{}")
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+
+class CallQueueWorker:
+    """
+    Arbeitet die Call Queue mit einem lokalen Thread-Pool ab.
+
+    Mehrere Worker (auch in anderen Prozessen) teilen sich dieselbe Queue;
+    Quoten gelten über alle Worker, da sie beim claim() in der DB geprüft werden.
+    """
+
+    def __init__(
+        self,
+        queue: CallQueue,
+        start_call: Callable[[str, str], Dict[str, Any]],
+        worker_id: Optional[str] = None,
+        max_workers: int = 4,
+        poll_interval: float = 5.0,
+        is_not_reached: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        """
+        Args:
+            queue: Call Queue
+            start_call: Funktion (applicant_id, campaign_id) -> Ergebnis-Dict
+            worker_id: Eindeutige Worker-Kennung (default: host:pid:zufall)
+            max_workers: Gleichzeitige Calls dieses Workers
+            poll_interval: Wartezeit, wenn keine Jobs vergeben werden
+            is_not_reached: Erkennt nicht erreichte Bewerber am Ergebnis
+                            (default: status in NOT_REACHED_STATUSES)
+        """
+        self.queue = queue
+        self.start_call = start_call
+        self.worker_id = worker_id or default_worker_id()
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.is_not_reached = is_not_reached or (
+            lambda result: (result or {}).get("status") in NOT_REACHED_STATUSES
+        )
+        self.logger = setup_logger("call_queue")
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, until_idle: bool = True) -> Dict[str, Any]:
+        """
+        Verarbeitet Jobs bis stop() oder - mit until_idle - bis keine Jobs mehr
+        sofort fällig sind.
+
+        Returns:
+            Summary (successful, failed, retried, elapsed_seconds, throughput_per_minute)
+        """
+        summary = {"successful": 0, "failed": 0, "retried": 0, "lost": 0, "not_reached": 0}
+        started = time.perf_counter()
+        heartbeat_every = self.queue.lease_seconds / 3
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: Dict[Any, Dict[str, Any]] = {}
+            last_heartbeat = time.monotonic()
+
+            while not self._stop.is_set():
+                for job in self.queue.claim(self.worker_id, self.max_workers - len(futures)):
+                    futures[executor.submit(self.start_call, job["applicant_id"], job["campaign_id"])] = job
+
+                if not futures:
+                    due = self.queue.next_due()
+                    if until_idle and (due is None or due > time.time()):
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+
+                done, _ = wait(futures, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = futures.pop(future)
+                    self._finish(job, future, summary)
+
+                if time.monotonic() - last_heartbeat >= heartbeat_every:
+                    for job in futures.values():
+                        self.queue.heartbeat(job["job_id"], self.worker_id)
+                    last_heartbeat = time.monotonic()
+
+            for future in list(futures):
+                self._finish(futures.pop(future), future, summary)
+
+        elapsed = time.perf_counter() - started
+        processed = summary["successful"] + summary["failed"] + summary["retried"]
+        summary["elapsed_seconds"] = elapsed
+        summary["throughput_per_minute"] = processed / elapsed * 60 if elapsed > 0 else 0.0
+        return summary
+
+    def _finish(self, job: Dict[str, Any], future, summary: Dict[str, Any]) -> None:
+        try:
+            result = future.result()
+        except Exception as e:
+            status = self.queue.fail(job["job_id"], self.worker_id, str(e))
+            key = {"pending": "retried", "failed": "failed"}.get(status, "lost")
+            summary[key] += 1
+            self.logger.error(f"Call {job['job_id']} fehlgeschlagen (Versuch {job['attempts']}): {e} -> {status}")
+            return
+
+        if self.queue.complete(job["job_id"], self.worker_id, result):
+            if self.is_not_reached(result):
+                # Zählt als Versuch: nach max_attempts wird nicht mehr angerufen
+                status = self.queue.mark_not_reached(job["job_id"])
+                summary["not_reached"] += 1
+                summary["retried" if status == "pending" else "failed"] += 1
+                self.logger.info(f"Call {job['job_id']}: nicht erreicht (Versuch {job['attempts']}) -> {status}")
+            else:
+                summary["successful"] += 1
+        else:
+            # Lease abgelaufen und neu vergeben - Ergebnis trotzdem geloggt
+            summary["lost"] += 1
+            self.logger.warning(f"Call {job['job_id']}: Lease verloren, Ergebnis nicht übernommen")
+
+
+# Singleton-Instanz
+_call_queue: Optional[CallQueue] = None
+_call_queue_lock = threading.Lock()
+
+
+def get_call_queue() -> CallQueue:
+    """Gibt die prozessweite Call Queue zurück (konfiguriert über Settings)"""
+    global _call_queue
+    with _call_queue_lock:
+        if _call_queue is None:
+            settings = get_settings()
+            _call_queue = CallQueue(
+                settings.call_queue_path,
+                windows=CallingWindows(settings.call_queue_windows, settings.call_queue_timezone),
+                max_in_flight=settings.batch_max_workers,
+                max_in_flight_per_campaign=settings.batch_max_per_campaign,
+                max_per_minute=settings.call_queue_max_per_minute,
+                max_per_minute_per_campaign=settings.call_queue_max_per_minute_per_campaign,
+                lease_seconds=settings.call_queue_lease_seconds,
+                retry_delays=[
+                    float(minutes) * 60
+                    for minutes in settings.call_queue_retry_delays_minutes.split(",") if minutes.strip()
+                ],
+                max_attempts=settings.call_queue_max_attempts
+            )
+        return _call_queue
@@ -0,0 +1,220 @@
+"""Question Cache - Fragenkatalog pro Kampagne für den Call-Pfad"""
+
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..campaign.package_builder import protocol_fingerprint, trim_questions_for_export
+from ..questions.builder import build_question_catalog
+from ..storage.campaign_storage import CampaignStorage
+from ..utils.logger import setup_logger
+
+CatalogBuilder = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+
+
+class CampaignQuestionCache:
+    """
+    Liefert questions.json pro Kampagne ohne Node-Prozess im Call-Pfad.
+
+    Reihenfolge pro (Kampagne, Protokoll-Hash):
+    1. In-Memory Cache
+    2. Gespeichertes Campaign Package (CampaignStorage), sofern es aus
+       demselben Protokoll gebaut wurde (protocol_hash)
+    3. In-Process build_question_catalog (nur wenn build=True)
+
+    Gleichzeitige Anfragen für dieselbe Kampagne warten auf einen einzigen
+    Build (geteiltes Future pro Schlüssel, auch über Threads und Event
+    Loops hinweg), statt ihn mehrfach zu starten.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[CampaignStorage] = None,
+        builder: CatalogBuilder = build_question_catalog,
+        max_campaigns: int = 64,
+        build_context: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            storage: CampaignStorage für gespeicherte Packages (None = keine)
+            builder: Async Builder für den Fragenkatalog
+            max_campaigns: Max. Anzahl gecachter Kampagnen (LRU)
+            build_context: Context für den Builder (Default: policy_level standard)
+        """
+        self.storage = storage
+        self.builder = builder
+        self.max_campaigns = max_campaigns
+        self.build_context = build_context or {"policy_level": "standard"}
+        self.logger = setup_logger("question_cache")
+
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "package_loads": 0, "stale_packages": 0, "builds": 0}
+
+    def get(self, campaign_id: str, protocol: Dict[str, Any], build: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Synchroner Zugriff (Worker-Threads, CLI).
+
+        Returns:
+            questions.json Dict oder None wenn nichts vorhanden und build=False
+        """
+        key = (str(campaign_id), protocol_fingerprint(protocol))
+        while True:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+            future, owner = self._claim(key)
+            if not owner:
+                # None: der Halter hatte build=False bzw. brach ab → selbst versuchen
+                questions = future.result()
+                if questions is not None or not build:
+                    self._count_shared(questions)
+                    return questions
+                continue
+
+            with self._resolving(key, future) as resolve:
+                questions = self._load_package(campaign_id, key[1])
+                if questions is None and build:
+                    questions = asyncio.run(self._build(campaign_id, protocol))
+                return resolve(questions)
+
+    async def get_async(self, campaign_id: str, protocol: Dict[str, Any], build: bool = True) -> Optional[Dict[str, Any]]:
+        """Wie get(), aber im laufenden Event Loop (Build ohne asyncio.run)"""
+        key = (str(campaign_id), protocol_fingerprint(protocol))
+        while True:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+
+            future, owner = self._claim(key)
+            if not owner:
+                # Wartet ohne Pool-Thread; shield, damit ein abgebrochener
+                # Aufrufer das geteilte Future nicht für alle abbricht
+                questions = await asyncio.shield(asyncio.wrap_future(future))
+                if questions is not None or not build:
+                    self._count_shared(questions)
+                    return questions
+                continue
+
+            with self._resolving(key, future) as resolve:
+                questions = await asyncio.to_thread(self._load_package, campaign_id, key[1])
+                if questions is None and build:
+                    questions = await self._build(campaign_id, protocol)
+                return resolve(questions)
+
+    def invalidate(self, campaign_id: Optional[str] = None) -> None:
+        """Verwirft den Cache einer Kampagne (oder komplett)"""
+        with self._lock:
+            for key in list(self._entries):
+                if campaign_id is None or key[0] == str(campaign_id):
+                    del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"campaigns": len(self._entries), **self._stats}
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            questions = self._entries.get(key)
+            if questions is not None:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+            return questions
+
+    def _store(self, key: Tuple[str, str], questions: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = questions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_campaigns:
+                self._entries.popitem(last=False)
+
+    def _count_shared(self, questions: Optional[Dict[str, Any]]) -> None:
+        if questions is not None:
+            with self._lock:
+                self._stats["hits"] += 1
+
+    def _claim(self, key: Tuple[str, str]) -> Tuple[Future, bool]:
+        """Laufendes Future für key, oder ein neues (owner=True) - dann muss der Aufrufer es auflösen"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    @contextmanager
+    def _resolving(self, key: Tuple[str, str], future: Future):
+        """
+        Löst das Future des Halters auf: Ergebnis über resolve(), Fehler
+        werden an die Wartenden weitergereicht, Abbruch liefert None.
+        """
+        def resolve(questions: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            if questions is not None:
+                self._store(key, questions)
+            self._finish(key, future, result=questions)
+            return questions
+
+        try:
+            yield resolve
+        except Exception as e:
+            self._finish(key, future, error=e)
+            raise
+        finally:
+            self._finish(key, future, result=None)
+
+    def _finish(self, key: Tuple[str, str], future: Future, result=None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _load_package(self, campaign_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        if self.storage is None or not self.storage.package_exists(campaign_id):
+            return None
+        sections = self.storage.load_sections(campaign_id, "questions", "protocol_hash")
+        questions = sections.get("questions")
+        if not questions or "questions" not in questions:
+            return None
+        # Ältere Packages ohne protocol_hash gelten weiter; sonst nur bei
+        # gleichem Protokoll, ein geändertes erzwingt den Neuaufbau
+        stored_hash = sections.get("protocol_hash")
+        if stored_hash and stored_hash != fingerprint:
+            with self._lock:
+                self._stats["stale_packages"] += 1
+            self.logger.info(f"Campaign Package {campaign_id} stammt von einem anderen Protokoll - baue neu")
+            return None
+        with self._lock:
+            self._stats["package_loads"] += 1
+        self.logger.info(f"Fragenkatalog aus Campaign Package {campaign_id} geladen")
+        return questions
+
+    async def _build(self, campaign_id: str, protocol: Dict[str, Any]) -> Dict[str, Any]:
+        self.logger.info(f"Generiere Fragenkatalog für Kampagne {campaign_id} (in-process)")
+        catalog = await self.builder(protocol, dict(self.build_context))
+        with self._lock:
+            self._stats["builds"] += 1
+        return trim_questions_for_export(catalog)
+
+
+# Singleton-Instanz
+_question_cache: Optional[CampaignQuestionCache] = None
+_question_cache_lock = threading.Lock()
+
+
+def get_question_cache() -> CampaignQuestionCache:
+    """Gibt den prozessweiten Question Cache zurück (mit lokalem CampaignStorage)"""
+    global _question_cache
+    with _question_cache_lock:
+        if _question_cache is None:
+            _question_cache = CampaignQuestionCache(storage=CampaignStorage())
+        return _question_cache
@@ -20,6 +20,7 @@ from .pipeline.validate import validate_and_finalize
 from .categorizer import categorize_question
 from .types import QuestionCatalog, CatalogMeta
 from .schemas import validate_question_catalog
+from .latency_budget import collect_stage_trace
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -51,6 +52,19 @@ async def build_question_catalog(
     Raises:
         Exception: If any pipeline stage fails
     """
+    with collect_stage_trace() as trace:
+        catalog = await _build_question_catalog(conversation_protocol, context)
+    
+    # LLM-Versuche mit Timeout-Budget und Dauer pro Stage
+    catalog.meta.stage_trace = trace or None
+    return catalog
+
+
+async def _build_question_catalog(
+    conversation_protocol: Dict[str, Any],
+    context: Dict[str, Any] = None
+) -> QuestionCatalog:
+    """Pipeline-Implementierung von build_question_catalog()"""
     if context is None:
         context = {}
     
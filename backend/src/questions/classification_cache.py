@@ -0,0 +1,164 @@
+"""
+Classification Cache - Intent-Klassifizierung pro Item wiederverwenden
+
+Viele Protokolle bestehen größtenteils aus Template-Prompts und
+wiederkehrenden Kriterien ("zwingend: Deutschkenntnisse B2",
+Standard-Einwilligungen). Statt diese bei jeder Kampagne erneut
+klassifizieren zu lassen, wird das Ergebnis pro normalisiertem Item-Text
+(inkl. Seitenname, den das LLM ebenfalls sieht) persistent gespeichert.
+
+Der Cache ist an einen Hash des Classification Prompts gebunden: ändert sich
+der Prompt, werden alle Einträge verworfen.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import get_settings
+from ..utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Nur diese Felder sind unabhängig vom konkreten Protokoll
+_CACHED_FIELDS = ("intent", "confidence", "reason")
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Kurzer Hash des Classification Prompts (Cache-Version)"""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_item_text(text: str) -> str:
+    """Unicode-Normalisierung, Kleinschreibung, zusammengefasste Leerzeichen"""
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+class ClassificationCache:
+    """Normalisierter Item-Text → Intent-Klassifizierung (LRU, JSON-Datei)"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 5000):
+        """
+        Args:
+            path: JSON-Datei für Persistenz (None/leer = nur In-Memory)
+            max_entries: Max. Anzahl Einträge, älteste fallen heraus
+        """
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._version: Optional[str] = None
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def item_key(item: Dict[str, Any]) -> str:
+        """Cache-Schlüssel eines Items aus _collect_protocol_items()"""
+        return f"{normalize_item_text(item.get('page_name', ''))}\x1f{normalize_item_text(item.get('text', ''))}"
+
+    def get(self, version: str, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Gecachte Klassifizierung für ein Item (oder None)"""
+        key = self.item_key(item)
+        with self._lock:
+            self._ensure_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return dict(entry)
+
+    def put(self, version: str, item: Dict[str, Any], classification: Dict[str, Any]) -> None:
+        """Speichert die Klassifizierung eines Items"""
+        entry = {field: classification[field] for field in _CACHED_FIELDS if field in classification}
+        if not entry.get("intent"):
+            return
+        entry["intent"] = str(entry["intent"]).upper()
+
+        key = self.item_key(item)
+        with self._lock:
+            self._ensure_version(version)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def save(self) -> None:
+        """Schreibt den Cache atomar auf die Platte (falls geändert)"""
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = {"prompt_version": self._version, "entries": dict(self._entries)}
+            self._dirty = False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            json_codec.dump_file(self.path, payload)
+        except OSError as e:
+            logger.warning(f"Classification Cache konnte nicht gespeichert werden: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self._hits,
+                "misses": self._misses,
+                "prompt_version": self._version
+            }
+
+    def _ensure_version(self, version: str) -> None:
+        """Lädt die Datei beim ersten Zugriff; verwirft Einträge bei Prompt-Änderung"""
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+        if self._version != version:
+            if self._entries:
+                logger.info(
+                    f"Classification Prompt geändert ({self._version} → {version}) - "
+                    f"{len(self._entries)} Cache-Einträge verworfen"
+                )
+                self._dirty = True
+            self._entries.clear()
+            self._version = version
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            payload = json_codec.load_file(self.path)
+            self._version = payload.get("prompt_version")
+            self._entries = OrderedDict(payload.get("entries", {}))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Classification Cache unlesbar, starte leer: {e}")
+            self._version = None
+            self._entries = OrderedDict()
+
+
+# Singleton-Instanz
+_classification_cache: Optional[ClassificationCache] = None
+
+
+def get_classification_cache() -> Optional[ClassificationCache]:
+    """Gibt den prozessweiten Classification Cache zurück (None wenn deaktiviert)"""
+    global _classification_cache
+    settings = get_settings()
+    if not settings.classification_cache_enabled:
+        return None
+    if _classification_cache is None:
+        _classification_cache = ClassificationCache(
+            path=settings.classification_cache_path or None,
+            max_entries=settings.classification_cache_max_entries
+        )
+    return _classification_cache
@@ -0,0 +1,147 @@
+"""
+Latency Budget - Adaptive Timeouts pro (Stage, Provider, Model)
+
+Statt eines statischen llm_timeout_seconds für alle Calls wird pro
+Kombination aus Stage, Provider und Model ein rollierendes Fenster der
+beobachteten Latenzen geführt. Das Timeout-Budget ist ein konfigurierbares
+Perzentil davon (mal Headroom), begrenzt durch Floor und Ceiling.
+
+Timeouts fließen mit dem abgelaufenen Budget als Messwert ein (die echte
+Latenz war mindestens so hoch) - so wächst das Budget wieder, wenn ein
+Provider dauerhaft langsamer wird.
+
+Zusätzlich sammelt collect_stage_trace() alle LLM-Versuche eines Builds
+(Stage, Provider, Budget, Dauer, Ergebnis) für die Catalog-Metadaten.
+"""
+
+import contextvars
+import math
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import get_settings
+
+_current_trace: contextvars.ContextVar[Optional[List[Dict[str, Any]]]] = contextvars.ContextVar(
+    "llm_stage_trace", default=None
+)
+
+
+@contextmanager
+def collect_stage_trace() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Sammelt alle LLM-Versuche im aktuellen Kontext (inkl. gestarteter Tasks).
+
+    Yields:
+        Liste, die während des Blocks befüllt wird
+    """
+    trace: List[Dict[str, Any]] = []
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def record_stage_trace(entry: Dict[str, Any]) -> None:
+    """Hängt einen Eintrag an den aktiven Stage Trace an (falls vorhanden)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.append(entry)
+
+
+class LatencyBudgets:
+    """Rollierende Latenz-Fenster und daraus abgeleitete Timeouts"""
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        headroom: float = 1.5,
+        floor_seconds: float = 15.0,
+        ceiling_seconds: float = 180.0,
+        default_seconds: float = 120.0,
+        min_samples: int = 10,
+        window_size: int = 200
+    ):
+        """
+        Args:
+            percentile: Perzentil der beobachteten Latenzen (0-100)
+            headroom: Faktor auf das Perzentil
+            floor_seconds: Untergrenze des Budgets
+            ceiling_seconds: Obergrenze des Budgets
+            default_seconds: Budget solange zu wenige Messwerte vorliegen
+            min_samples: Mindestanzahl Messwerte für ein adaptives Budget
+            window_size: Anzahl gemerkter Messwerte pro Schlüssel
+        """
+        self.percentile = percentile
+        self.headroom = headroom
+        self.floor_seconds = floor_seconds
+        self.ceiling_seconds = ceiling_seconds
+        self.default_seconds = default_seconds
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self._samples: Dict[Tuple[str, str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def timeout_for(self, stage: str, provider: str, model: str) -> Tuple[float, str]:
+        """
+        Liefert das Timeout-Budget für einen Call.
+
+        Returns:
+            (Sekunden, Quelle) mit Quelle "observed" oder "default"
+        """
+        with self._lock:
+            samples = list(self._samples.get((stage, provider, model), ()))
+
+        if len(samples) < self.min_samples:
+            return self.default_seconds, "default"
+
+        samples.sort()
+        rank = max(1, math.ceil(self.percentile / 100 * len(samples)))
+        budget = samples[rank - 1] * self.headroom
+        return min(self.ceiling_seconds, max(self.floor_seconds, budget)), "observed"
+
+    def record(self, stage: str, provider: str, model: str, seconds: float) -> None:
+        """Speichert eine Latenz (bei Timeout: das abgelaufene Budget)"""
+        key = (stage, provider, model)
+        with self._lock:
+            window = self._samples.get(key)
+            if window is None:
+                window = self._samples[key] = deque(maxlen=self.window_size)
+            window.append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Budgets pro Schlüssel (für /health)"""
+        with self._lock:
+            keys = list(self._samples)
+        result = {}
+        for stage, provider, model in keys:
+            budget, source = self.timeout_for(stage, provider, model)
+            with self._lock:
+                count = len(self._samples[(stage, provider, model)])
+            result[f"{stage}/{provider}/{model}"] = {
+                "timeout_seconds": round(budget, 1),
+                "source": source,
+                "samples": count
+            }
+        return result
+
+
+# Singleton-Instanz
+_latency_budgets: Optional[LatencyBudgets] = None
+
+
+def get_latency_budgets() -> LatencyBudgets:
+    """Gibt die prozessweite LatencyBudgets-Instanz zurück (Konfiguration aus Settings)"""
+    global _latency_budgets
+    if _latency_budgets is None:
+        settings = get_settings()
+        _latency_budgets = LatencyBudgets(
+            percentile=settings.llm_timeout_percentile,
+            headroom=settings.llm_timeout_headroom,
+            floor_seconds=settings.llm_timeout_floor_seconds,
+            ceiling_seconds=settings.llm_timeout_ceiling_seconds,
+            default_seconds=settings.llm_timeout_seconds
+        )
+    return _latency_budgets
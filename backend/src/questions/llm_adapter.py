@@ -6,34 +6,164 @@ from Claude to OpenAI if Claude fails or times out.
 """
 
 import asyncio
+import json
 import logging
+import threading
 import time
-from typing import Dict, Any, List, Optional
+import weakref
+from typing import Dict, Any, List, Optional, Callable, Tuple
 
+import anthropic
+import httpx
+import openai
 from anthropic import AsyncAnthropic
 from openai import AsyncOpenAI
 
+from .latency_budget import get_latency_budgets, record_stage_trace
+from .provider_health import get_provider_health
 from ..config import get_settings
+from ..utils.json_stream import IncrementalJSONParser
 
 logger = logging.getLogger(__name__)
 
+# Callback für fertige JSON-Abschnitte im Streaming-Modus:
+# ("item", key, value) für Array-Elemente, ("value", key, value) für Top-Level-Keys
+JsonEventCallback = Callable[[Tuple[str, str, Any]], None]
+
+_stream_stats = {"streams": 0, "with_results": 0, "first_result_total": 0.0, "duration_total": 0.0}
+_stream_stats_lock = threading.Lock()
+
+_call_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Fehler, die auf einen gestörten Provider hindeuten (zählen für den Circuit Breaker)
+_TRANSPORT_ERRORS = (
+    anthropic.APIConnectionError,   # inkl. APITimeoutError
+    openai.APIConnectionError,
+    httpx.TransportError,
+    ConnectionError
+)
+
+
+def _is_provider_failure(error: Exception) -> bool:
+    """
+    True für Transportfehler und HTTP 5xx/429.
+
+    4xx (ungültiger Request, Auth, zu großer Prompt) liegen am Request
+    selbst - sie dürfen einen gesunden Provider nicht sperren.
+    """
+    if isinstance(error, _TRANSPORT_ERRORS):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class _StreamCollector:
+    """
+    Sammelt Text-Deltas eines Streams und parst sie inkrementell.
+
+    Fertige Abschnitte gehen sofort an on_event; der Zeitpunkt des ersten
+    Abschnitts ist die Time-to-first-Result.
+    """
+
+    def __init__(self, on_event: Optional[JsonEventCallback], started: float):
+        self.on_event = on_event
+        self.started = started
+        self.first_result_seconds: Optional[float] = None
+        self.events = 0
+        self._parts: List[str] = []
+        self._parser: Optional[IncrementalJSONParser] = IncrementalJSONParser(skip_prefix=True)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, text: Optional[str]) -> None:
+        if not text:
+            return
+        self._parts.append(text)
+        if self._parser is None:
+            return
+        try:
+            events = self._parser.feed(text)
+        except ValueError as e:
+            # Kein Top-Level-Objekt - Streaming-Events abschalten, Text trotzdem sammeln
+            logger.debug(f"Inkrementelles Parsen abgebrochen: {e}")
+            self._parser = None
+            return
+        for event in events:
+            if self.first_result_seconds is None:
+                self.first_result_seconds = time.time() - self.started
+            self.events += 1
+            if self.on_event is not None:
+                self.on_event(event)
+
+
+def _get_call_limiter() -> asyncio.Semaphore:
+    """
+    Semaphore für das globale Limit paralleler LLM Calls (pro Event Loop).
+
+    Begrenzt z.B. das Chunked Extract, das viele Calls gleichzeitig startet.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = _call_limiters.get(loop)
+    if limiter is None:
+        limiter = _call_limiters[loop] = asyncio.Semaphore(max(1, get_settings().llm_max_concurrent_calls))
+    return limiter
+
+
+def _record_stream(first_result_seconds: Optional[float], duration: float) -> None:
+    with _stream_stats_lock:
+        _stream_stats["streams"] += 1
+        _stream_stats["duration_total"] += duration
+        if first_result_seconds is not None:
+            _stream_stats["with_results"] += 1
+            _stream_stats["first_result_total"] += first_result_seconds
+
+
+def get_streaming_stats() -> Dict[str, Any]:
+    """Time-to-first-Result und Gesamtdauer gestreamter Calls (für /health)"""
+    with _stream_stats_lock:
+        streams = _stream_stats["streams"]
+        with_results = _stream_stats["with_results"]
+        return {
+            "streams": streams,
+            "avg_first_result_seconds": round(_stream_stats["first_result_total"] / with_results, 2) if with_results else None,
+            "avg_duration_seconds": round(_stream_stats["duration_total"] / streams, 2) if streams else None
+        }
+
 
 async def call_llm_async(
     messages: List[Dict[str, str]],
     temperature: float = 0.7,
     response_format: Optional[Dict[str, str]] = None,
     timeout: Optional[int] = None,
-    force_provider: Optional[str] = None
+    force_provider: Optional[str] = None,
+    json_schema: Optional[Dict[str, Any]] = None,
+    stream: bool = False,
+    on_event: Optional[JsonEventCallback] = None,
+    stage: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Unified LLM Call mit Claude (Primary) + OpenAI (Fallback).
     
+    Die Reihenfolge kommt aus den Circuit Breakern (provider_health):
+    gesperrte Provider werden übersprungen, ein deutlich langsamerer
+    Primary wird nach hinten sortiert. force_provider umgeht das Routing.
+    
     Args:
         messages: List of messages with role and content
         temperature: Temperature parameter (0-2)
         response_format: Response format for JSON mode (OpenAI only)
-        timeout: Optional timeout override (default: from config)
+        timeout: Optional timeout override (default: adaptives Budget der Stage,
+                 sonst llm_timeout_seconds)
         force_provider: Force specific provider ("claude" or "openai") for A/B testing
+        json_schema: Optional {"name": ..., "schema": ...} - erzwingt strukturierte
+                     Ausgabe (Claude: Tool-Use, OpenAI: response_format json_schema)
+        stream: Antwort streamen und inkrementell parsen
+        on_event: Callback für fertige Top-Level-Keys/Array-Elemente (aktiviert stream).
+                  Läuft synchron im Stream - längere Arbeit per asyncio.create_task starten.
+                  Events sind vorläufig, bis das Gesamtergebnis validiert ist.
+        stage: Stage-Name für adaptive Timeouts (latency_budget) und Stage Trace
         
     Returns:
         Unified response dict:
@@ -41,7 +171,9 @@ async def call_llm_async(
             "choices": [{"message": {"content": "...", "role": "assistant"}}],
             "usage": {"total_tokens": 123, "input_tokens": 50, "output_tokens": 73},
             "_provider": "claude" | "openai",
-            "_duration": 8.5
+            "_duration": 8.5,
+            "_timeout_seconds": 45.0,  # verwendetes Timeout-Budget
+            "_first_result_seconds": 1.2  # nur im Streaming-Modus
         }
         
     Raises:
@@ -49,7 +181,7 @@ async def call_llm_async(
         TimeoutError: If timeout exceeded for all providers
     """
     settings = get_settings()
-    timeout_seconds = timeout or settings.llm_timeout_seconds
+    budgets = get_latency_budgets()
     start_time = time.time()
     
     # Determine provider order
@@ -70,41 +202,109 @@ async def call_llm_async(
             "Bitte ANTHROPIC_API_KEY oder OPENAI_API_KEY in .env setzen"
         )
     
+    health = get_provider_health()
+    if not force_provider:
+        routed = health.route(providers)
+        if not routed:
+            raise Exception(
+                f"Alle LLM Provider per Circuit Breaker gesperrt: {', '.join(providers)}"
+            )
+        providers = routed
+    
     last_error = None
+    stream = stream or on_event is not None
     
     for provider in providers:
+        breaker = health.breaker(provider)
+        if not force_provider and not health.acquire(provider):
+            # Parallel laufende Probe hat den half_open-Slot belegt
+            last_error = f"{provider} circuit open"
+            continue
+        
+        model = settings.anthropic_model if provider == "claude" else settings.openai_model
+        if timeout:
+            timeout_seconds, budget_source = timeout, "explicit"
+        elif stage:
+            timeout_seconds, budget_source = budgets.timeout_for(stage, provider, model)
+        else:
+            timeout_seconds, budget_source = settings.llm_timeout_seconds, "static"
+        
+        trace_entry = {
+            "stage": stage,
+            "provider": provider,
+            "model": model,
+            "timeout_seconds": round(timeout_seconds, 1),
+            "budget_source": budget_source
+        }
+        
+        collector = _StreamCollector(on_event, time.time()) if stream else None
+        attempt_start = time.time()
         try:
-            logger.info(f"LLM Call: {provider.upper()} (timeout: {timeout_seconds}s)")
-            
-            if provider == "claude":
-                result = await asyncio.wait_for(
-                    _call_claude(messages, temperature, settings),
-                    timeout=timeout_seconds
-                )
-            else:  # openai
-                result = await asyncio.wait_for(
-                    _call_openai(messages, temperature, response_format, settings),
-                    timeout=timeout_seconds
-                )
+            # Globales Limit paralleler LLM Calls; Wartezeit zählt nicht zum Budget
+            async with _get_call_limiter():
+                attempt_start = time.time()
+                logger.info(f"LLM Call: {provider.upper()} (timeout: {timeout_seconds:.0f}s {budget_source}{', stream' if stream else ''})")
+                
+                if provider == "claude":
+                    result = await asyncio.wait_for(
+                        _call_claude(messages, temperature, settings, json_schema, collector),
+                        timeout=timeout_seconds
+                    )
+                else:  # openai
+                    result = await asyncio.wait_for(
+                        _call_openai(messages, temperature, response_format, settings, json_schema, collector),
+                        timeout=timeout_seconds
+                    )
             
+            attempt_duration = time.time() - attempt_start
+            breaker.record_success(attempt_duration)
+            if stage:
+                budgets.record(stage, provider, model, attempt_duration)
+            record_stage_trace({**trace_entry, "duration_seconds": round(attempt_duration, 2), "outcome": "ok"})
             duration = time.time() - start_time
             tokens = result.get("usage", {}).get("total_tokens", 0)
             
             logger.info(f"LLM Success: {provider.upper()}, {duration:.1f}s, {tokens} tokens")
             result["_provider"] = provider
             result["_duration"] = duration
+            result["_timeout_seconds"] = timeout_seconds
+            
+            if collector is not None:
+                result["_first_result_seconds"] = collector.first_result_seconds
+                _record_stream(collector.first_result_seconds, duration)
+                if collector.first_result_seconds is not None:
+                    logger.info(f"  ⏱️  Erstes Ergebnis nach {collector.first_result_seconds:.1f}s ({collector.events} Abschnitte)")
             
             return result
             
         except asyncio.TimeoutError:
-            last_error = f"{provider} timeout after {timeout_seconds}s"
+            breaker.record_failure(time.time() - attempt_start)
+            if stage:
+                # Zensierter Messwert: die Latenz war mindestens das Budget
+                budgets.record(stage, provider, model, timeout_seconds)
+            record_stage_trace({**trace_entry, "duration_seconds": round(time.time() - attempt_start, 2), "outcome": "timeout"})
+            last_error = f"{provider} timeout after {timeout_seconds:.0f}s"
             logger.warning(f"LLM Timeout: {last_error}")
-            continue
-            
+        
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        
         except Exception as e:
+            if _is_provider_failure(e):
+                breaker.record_failure()
+                outcome = "error"
+            else:
+                # Provider hat geantwortet: nur den Probe-Slot freigeben
+                breaker.release_probe()
+                outcome = "rejected"
+            record_stage_trace({**trace_entry, "duration_seconds": round(time.time() - attempt_start, 2), "outcome": outcome})
             last_error = f"{provider} error: {str(e)}"
             logger.warning(f"LLM Error: {last_error}")
-            continue
+        
+        # Wurden bereits Abschnitte ausgeliefert, würde ein Fallback sie doppeln
+        if collector is not None and collector.events:
+            raise Exception(f"LLM Stream abgebrochen nach {collector.events} Abschnitten: {last_error}")
     
     # All providers failed
     raise Exception(f"Alle LLM Provider fehlgeschlagen. Letzter Fehler: {last_error}")
@@ -113,14 +313,18 @@ async def call_llm_async(
 async def _call_claude(
     messages: List[Dict[str, str]],
     temperature: float,
-    settings
+    settings,
+    json_schema: Optional[Dict[str, Any]] = None,
+    collector: Optional[_StreamCollector] = None
 ) -> Dict[str, Any]:
     """
     Internal call to Claude API.
     
     Claude expects system message separately from user messages.
-    Note: Claude doesn't support response_format like OpenAI, so we need
-    to handle JSON extraction from the response.
+    Mit json_schema wird ein Tool mit dem Schema als input_schema erzwungen
+    (tool_choice) - die Tool-Argumente sind dann das JSON-Ergebnis.
+    Ohne Schema wird das JSON aus dem Antworttext extrahiert.
+    Mit collector wird gestreamt (input_json_delta bzw. text_delta).
     """
     client = AsyncAnthropic(api_key=settings.anthropic_api_key)
     
@@ -132,7 +336,7 @@ async def _call_claude(
         if msg["role"] == "system":
             # Add explicit JSON instruction to system message
             system_content = msg["content"]
-            if "json" not in system_content.lower():
+            if not json_schema and "json" not in system_content.lower():
                 system_content += "\n\nWICHTIG: Antworte NUR mit validem JSON. Keine Erklärungen, kein Markdown, nur das JSON-Objekt."
             system_msg = system_content
         else:
@@ -149,14 +353,33 @@ async def _call_claude(
     if system_msg:
         kwargs["system"] = system_msg
     
+    if json_schema:
+        kwargs["tools"] = [{
+            "name": json_schema["name"],
+            "description": "Gibt das Ergebnis als strukturiertes JSON-Objekt zurück.",
+            "input_schema": json_schema["schema"]
+        }]
+        kwargs["tool_choice"] = {"type": "tool", "name": json_schema["name"]}
+    
+    if collector is not None:
+        return await _stream_claude(client, kwargs, collector, bool(json_schema))
+    
     # Make API call
     response = await client.messages.create(**kwargs)
     
     # Extract content
-    raw_content = response.content[0].text
-    
-    # Try to extract JSON from response (Claude sometimes wraps in markdown)
-    content = _extract_json_from_response(raw_content)
+    tool_input = next(
+        (block.input for block in response.content if block.type == "tool_use"),
+        None
+    )
+    if tool_input is not None:
+        content = json.dumps(tool_input, ensure_ascii=False)
+    else:
+        raw_content = "".join(
+            block.text for block in response.content if block.type == "text"
+        )
+        # Try to extract JSON from response (Claude sometimes wraps in markdown)
+        content = _extract_json_from_response(raw_content)
     
     # Convert to unified format (OpenAI-compatible)
     return {
@@ -174,6 +397,46 @@ async def _call_claude(
     }
 
 
+async def _stream_claude(
+    client: AsyncAnthropic,
+    kwargs: Dict[str, Any],
+    collector: _StreamCollector,
+    tool_output: bool
+) -> Dict[str, Any]:
+    """Streamt einen Claude Call und füttert den Collector mit den Deltas"""
+    input_tokens = 0
+    output_tokens = 0
+    
+    stream = await client.messages.create(**kwargs, stream=True)
+    async for event in stream:
+        if event.type == "message_start":
+            input_tokens = event.message.usage.input_tokens
+        elif event.type == "content_block_delta":
+            delta = event.delta
+            if tool_output and delta.type == "input_json_delta":
+                collector.feed(delta.partial_json)
+            elif not tool_output and delta.type == "text_delta":
+                collector.feed(delta.text)
+        elif event.type == "message_delta":
+            output_tokens = event.usage.output_tokens
+    
+    content = collector.text if tool_output else _extract_json_from_response(collector.text)
+    
+    return {
+        "choices": [{
+            "message": {
+                "content": content,
+                "role": "assistant"
+            }
+        }],
+        "usage": {
+            "total_tokens": input_tokens + output_tokens,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens
+        }
+    }
+
+
 def _extract_json_from_response(text: str) -> str:
     """
     Extract JSON from Claude response, handling markdown code blocks.
@@ -226,10 +489,16 @@ async def _call_openai(
     messages: List[Dict[str, str]],
     temperature: float,
     response_format: Optional[Dict[str, str]],
-    settings
+    settings,
+    json_schema: Optional[Dict[str, Any]] = None,
+    collector: Optional[_StreamCollector] = None
 ) -> Dict[str, Any]:
     """
     Internal call to OpenAI API.
+    
+    Mit json_schema wird response_format auf das Schema festgelegt
+    (strict=False, da die Schemas additionalProperties erlauben).
+    Mit collector wird gestreamt (Content-Deltas, Usage im letzten Chunk).
     """
     client = AsyncOpenAI(api_key=settings.openai_api_key)
     
@@ -239,9 +508,21 @@ async def _call_openai(
         "messages": messages
     }
     
-    if response_format:
+    if json_schema:
+        kwargs["response_format"] = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": json_schema["name"],
+                "schema": json_schema["schema"],
+                "strict": False
+            }
+        }
+    elif response_format:
         kwargs["response_format"] = response_format
     
+    if collector is not None:
+        return await _stream_openai(client, kwargs, collector)
+    
     response = await client.chat.completions.create(**kwargs)
     result = response.model_dump()
     
@@ -252,6 +533,38 @@ async def _call_openai(
     return result
 
 
+async def _stream_openai(
+    client: AsyncOpenAI,
+    kwargs: Dict[str, Any],
+    collector: _StreamCollector
+) -> Dict[str, Any]:
+    """Streamt einen OpenAI Call und füttert den Collector mit den Deltas"""
+    usage = {"total_tokens": 0, "input_tokens": 0, "output_tokens": 0}
+    
+    stream = await client.chat.completions.create(
+        **kwargs, stream=True, stream_options={"include_usage": True}
+    )
+    async for chunk in stream:
+        if chunk.choices:
+            collector.feed(chunk.choices[0].delta.content)
+        if chunk.usage:
+            usage = {
+                "total_tokens": chunk.usage.total_tokens,
+                "input_tokens": chunk.usage.prompt_tokens,
+                "output_tokens": chunk.usage.completion_tokens
+            }
+    
+    return {
+        "choices": [{
+            "message": {
+                "content": collector.text,
+                "role": "assistant"
+            }
+        }],
+        "usage": usage
+    }
+
+
 # Legacy compatibility - can be used as drop-in replacement
 async def call_openai_async(
     model: str,
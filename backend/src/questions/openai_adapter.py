@@ -4,14 +4,50 @@ OpenAI API Adapter
 Port of TypeScript openai adapter for Python.
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
 import logging
-from openai import OpenAI
+import threading
+import weakref
+from openai import OpenAI, AsyncOpenAI
 
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Gepoolte Clients (Keep-Alive statt neuer Verbindung pro Call).
+# Async-Clients sind an ihren Event Loop gebunden - daher einer pro Loop.
+_sync_client: Optional[OpenAI] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_client_lock = threading.Lock()
+
+
+def _get_sync_client() -> OpenAI:
+    """Gibt den prozessweiten synchronen OpenAI Client zurück"""
+    global _sync_client
+    settings = get_settings()
+    with _client_lock:
+        if _sync_client is None or _sync_client.api_key != settings.openai_api_key:
+            _sync_client = OpenAI(
+                api_key=settings.openai_api_key,
+                timeout=settings.llm_timeout_seconds
+            )
+        return _sync_client
+
+
+def _get_async_client() -> AsyncOpenAI:
+    """Gibt den AsyncOpenAI Client des laufenden Event Loops zurück"""
+    settings = get_settings()
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.api_key != settings.openai_api_key:
+        client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            timeout=settings.llm_timeout_seconds
+        )
+        _async_clients[loop] = client
+    return client
+
 
 def call_openai(
     model: str,
@@ -40,7 +76,7 @@ def call_openai(
         raise ValueError("OPENAI_API_KEY not configured")
     
     try:
-        client = OpenAI(api_key=settings.openai_api_key)
+        client = _get_sync_client()
         
         logger.info(f"Calling OpenAI API: model={model}, temperature={temperature}, messages={len(messages)}")
         
@@ -69,7 +105,9 @@ async def call_openai_async(
     response_format: Dict[str, str]
 ) -> Dict[str, Any]:
     """
-    Async wrapper for OpenAI API call.
+    Non-blocking OpenAI API call via pooled AsyncOpenAI client.
+    
+    Der Event Loop bleibt während des LLM-Calls frei für andere Requests.
     
     Args:
         model: Model name (e.g. "gpt-4o")
@@ -83,7 +121,30 @@ async def call_openai_async(
     Raises:
         Exception: If API call fails
     """
-    # For now, just call synchronous version
-    # OpenAI Python SDK has async support, but keeping it simple
-    return call_openai(model, temperature, messages, response_format)
+    settings = get_settings()
+    
+    if not settings.openai_api_key:
+        raise ValueError("OPENAI_API_KEY not configured")
+    
+    try:
+        client = _get_async_client()
+        
+        logger.info(f"Calling OpenAI API (async): model={model}, temperature={temperature}, messages={len(messages)}")
+        
+        response = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+            response_format=response_format
+        )
+        
+        result = response.model_dump()
+        
+        logger.info(f"OpenAI API response received: {result['usage']['total_tokens']} tokens")
+        
+        return result
+        
+    except Exception as e:
+        logger.error(f"OpenAI API call failed: {e}")
+        raise Exception(f"OpenAI API error: {e}")
 
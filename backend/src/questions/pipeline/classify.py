@@ -5,12 +5,14 @@ Klassifiziert Protokoll-Items nach ihrem Intent, bevor sie verarbeitet werden.
 Dies verhindert, dass Informationen verloren gehen oder falsch kategorisiert werden.
 """
 
-import json
+import asyncio
 import logging
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from ..llm_adapter import call_llm_async
+from ..classification_cache import ClassificationCache, get_classification_cache, prompt_version
+from ..schemas import CLASSIFICATION_SCHEMA
+from ..structured_output import call_llm_structured, StructuredOutputError
 
 logger = logging.getLogger(__name__)
 
@@ -46,41 +48,65 @@ async def classify_protocol_items(protocol: Dict[str, Any]) -> Dict[str, List]:
     
     # 2. Lade Classification Prompt
     prompt_path = Path(__file__).parent.parent / "prompts" / "extract_classify.system.md"
-    with open(prompt_path, 'r', encoding='utf-8') as f:
-        system_prompt = f.read()
-    
-    # 3. Baue User Message mit allen Items
-    user_message = _build_classification_message(protocol, all_items)
-    
-    # 4. LLM Call
-    logger.info("  Calling LLM for classification...")
-    from ...config import get_settings
-    settings = get_settings()
-    
-    messages = [
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_message}
-    ]
-    
-    response = await call_llm_async(
-        messages=messages,
-        temperature=0.3,  # Niedrig für konsistente Klassifizierung
-        response_format={"type": "json_object"}
-    )
-    
-    # 5. Parse Response
-    try:
-        # Extract content from OpenAI response
-        content = response['choices'][0]['message']['content']
-        classification_result = json.loads(content)
-        logger.info("  ✓ Classification successful")
-    except (KeyError, json.JSONDecodeError) as e:
-        logger.error(f"  ✗ Failed to parse classification response: {e}")
-        logger.debug(f"  Response was: {str(response)[:500]}")
-        return _empty_classification()
+    system_prompt = await asyncio.to_thread(prompt_path.read_text, encoding='utf-8')
+    
+    # 3. Bekannte Items aus dem Cache, nur neue (dedupliziert) ans LLM
+    #    (erster Zugriff lädt die Cache-Datei → im Thread statt im Event Loop)
+    cache = get_classification_cache()
+    version = prompt_version(system_prompt)
+    classified_items, uncached = await asyncio.to_thread(_lookup_cached, cache, version, all_items)
+    
+    if cache:
+        logger.info(f"  Classification Cache: {len(classified_items)} hits, {len(uncached)} new items")
+    
+    if uncached:
+        llm_indices = [indices[0] for indices in uncached.values()]
+        llm_items = [all_items[index - 1] for index in llm_indices]
+        
+        # 4. Baue User Message nur mit den neuen Items
+        user_message = _build_classification_message(protocol, llm_items)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_message}
+        ]
+        
+        # 5. Schema-gebundene Antwort (mit Reparaturversuch bei ungültigem JSON)
+        logger.info(f"  Calling LLM for classification of {len(llm_items)} items...")
+        try:
+            classification_result = await call_llm_structured(
+                messages=messages,
+                schema=CLASSIFICATION_SCHEMA,
+                stage="classify",
+                temperature=0.3  # Niedrig für konsistente Klassifizierung
+            )
+            logger.info("  ✓ Classification successful")
+        except StructuredOutputError as e:
+            # Cache-Treffer bleiben gültig, nur die neuen Items fehlen
+            logger.error(
+                f"  ✗ Failed to parse classification response: {e} - "
+                f"{len(llm_items)} items left unclassified"
+            )
+            classification_result = {}
+        
+        # LLM-Keys (item_N relativ zur Teilliste) auf Protokoll-Indizes abbilden
+        for llm_key, classification in classification_result.get('classified_items', {}).items():
+            position = llm_key.replace('item_', '') if llm_key.startswith('item_') else ''
+            if not position.isdigit() or not 1 <= int(position) <= len(llm_items):
+                logger.warning(f"Could not find item for key: {llm_key}")
+                continue
+            item = llm_items[int(position) - 1]
+            for index in uncached[ClassificationCache.item_key(item)]:
+                classified_items[f"item_{index}"] = classification
+            if cache:
+                cache.put(version, item, classification)
+        
+        if cache:
+            await asyncio.to_thread(cache.save)
     
-    # 6. Segment nach Intent
-    segmented = _segment_by_intent(classification_result, all_items)
+    # 6. Segment nach Intent (Protokoll-Reihenfolge)
+    ordered = dict(sorted(classified_items.items(), key=lambda kv: int(kv[0].replace('item_', ''))))
+    segmented = _segment_by_intent({'classified_items': ordered}, all_items)
     
     # 7. Log Results
     logger.info(f"  Segmented items:")
@@ -96,6 +122,31 @@ async def classify_protocol_items(protocol: Dict[str, Any]) -> Dict[str, List]:
     return segmented
 
 
+def _lookup_cached(
+    cache: Optional[ClassificationCache],
+    version: str,
+    all_items: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Dict], Dict[str, List[int]]]:
+    """
+    Teilt die Items in Cache-Treffer und neue Items.
+    
+    Returns:
+        (classified_items: item_N -> Klassifizierung,
+         uncached: Cache-Key -> Item-Indizes (1-based))
+    """
+    classified_items: Dict[str, Dict] = {}
+    uncached: Dict[str, List[int]] = {}
+    
+    for index, item in enumerate(all_items, 1):
+        cached = cache.get(version, item) if cache else None
+        if cached:
+            classified_items[f"item_{index}"] = cached
+        else:
+            uncached.setdefault(ClassificationCache.item_key(item), []).append(index)
+    
+    return classified_items, uncached
+
+
 def _collect_protocol_items(protocol: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
     Sammelt alle Items aus dem Protokoll mit Metadaten.
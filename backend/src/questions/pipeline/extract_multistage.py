@@ -10,8 +10,8 @@ import logging
 from pathlib import Path
 from typing import Dict, Any, List
 
-from ..llm_adapter import call_llm_async
-from ..schemas import validate_extract_result
+from ..schemas import validate_extract_result, QUALIFICATIONS_SCHEMA, RAHMEN_SCHEMA, INFO_SCHEMA
+from ..structured_output import call_llm_structured
 from ..types import ExtractResult
 from ...config import get_settings
 
@@ -24,26 +24,23 @@ async def extract_qualifications(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "extract_qualifications.system.md"
     
     if not prompt_path.exists():
-        logger.warning(f"Qualifications prompt not found: {prompt_path}")
-        return {"must_have": [], "alternatives": [], "protocol_questions": []}
+        raise FileNotFoundError(f"Qualifications prompt not found: {prompt_path}")
     
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
     logger.info("🔍 Stage 1/3: Extracting qualifications...")
     
     try:
-        response = await call_llm_async(
+        data = await call_llm_structured(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": json.dumps({"protocol": protocol}, ensure_ascii=False)}
             ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
+            schema=QUALIFICATIONS_SCHEMA,
+            stage="extract_qualifications",
+            temperature=0.7
         )
         
-        content = response["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        
         # Log alle Kategorien
         preferred = data.get('preferred', [])
         alternatives = data.get('alternatives', [])
@@ -55,13 +52,7 @@ async def extract_qualifications(protocol: Dict[str, Any]) -> Dict[str, Any]:
         return data
     except Exception as e:
         logger.error(f"Qualifications extraction failed: {e}")
-        return {
-            "preferred": [],
-            "must_have": [], 
-            "alternatives": [], 
-            "optional": [],
-            "protocol_questions": []
-        }
+        raise
 
 
 async def extract_rahmen(protocol: Dict[str, Any]) -> Dict[str, Any]:
@@ -70,26 +61,23 @@ async def extract_rahmen(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "extract_rahmen.system.md"
     
     if not prompt_path.exists():
-        logger.warning(f"Rahmen prompt not found: {prompt_path}")
-        return {"arbeitszeit": None, "gehalt": None, "benefits": [], "protocol_questions": []}
+        raise FileNotFoundError(f"Rahmen prompt not found: {prompt_path}")
     
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
     logger.info("🔍 Stage 2/3: Extracting rahmenbedingungen...")
     
     try:
-        response = await call_llm_async(
+        data = await call_llm_structured(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": json.dumps({"protocol": protocol}, ensure_ascii=False)}
             ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
+            schema=RAHMEN_SCHEMA,
+            stage="extract_rahmen",
+            temperature=0.7
         )
         
-        content = response["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        
         # Debug: Log what we got
         logger.info(f"  ✓ Found arbeitszeit: {bool(data.get('arbeitszeit'))}, gehalt: {bool(data.get('gehalt'))}, benefits: {len(data.get('benefits', []))}")
         logger.debug(f"  📊 Raw rahmen data: {json.dumps(data, ensure_ascii=False)[:200]}...")
@@ -97,7 +85,7 @@ async def extract_rahmen(protocol: Dict[str, Any]) -> Dict[str, Any]:
         return data
     except Exception as e:
         logger.error(f"Rahmen extraction failed: {e}")
-        return {"arbeitszeit": None, "gehalt": None, "benefits": [], "protocol_questions": []}
+        raise
 
 
 async def extract_info(protocol: Dict[str, Any]) -> Dict[str, Any]:
@@ -106,31 +94,28 @@ async def extract_info(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "extract_info.system.md"
     
     if not prompt_path.exists():
-        logger.warning(f"Info prompt not found: {prompt_path}")
-        return {"sites": [], "all_departments": [], "priorities": [], "roles": [], "protocol_questions": []}
+        raise FileNotFoundError(f"Info prompt not found: {prompt_path}")
     
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
     logger.info("🔍 Stage 3/3: Extracting organizational info...")
     
     try:
-        response = await call_llm_async(
+        data = await call_llm_structured(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": json.dumps({"protocol": protocol}, ensure_ascii=False)}
             ],
-            temperature=0.7,
-            response_format={"type": "json_object"}
+            schema=INFO_SCHEMA,
+            stage="extract_info",
+            temperature=0.7
         )
         
-        content = response["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        
         logger.info(f"  ✓ Found {len(data.get('sites', []))} sites, {len(data.get('all_departments', []))} departments")
         return data
     except Exception as e:
         logger.error(f"Info extraction failed: {e}")
-        return {"sites": [], "all_departments": [], "priorities": [], "roles": [], "protocol_questions": []}
+        raise
 
 
 def merge_protocol_questions(qual_pqs: List, rahmen_pqs: List, info_pqs: List) -> List:
@@ -174,6 +159,166 @@ def merge_constraints(rahmen_data: Dict[str, Any]) -> Dict[str, Any]:
     return constraints
 
 
+_EXTRACTORS = (extract_qualifications, extract_rahmen, extract_info)
+_EXTRACTOR_STAGES = ("Qualifications", "Rahmen", "Info")
+
+
+def _raise_on_failure(results: List[Any], stages: List[str]) -> None:
+    """
+    Bricht die Extraktion ab, wenn ein Extractor (auch nach Reparatur) fehlschlug.
+    
+    Ein leeres Ergebnis würde einen Katalog ohne Muss-Kriterien/Standorte
+    erzeugen, der nicht von einem echten Protokoll zu unterscheiden ist.
+    """
+    failures = [(stage, result) for result, stage in zip(results, stages) if isinstance(result, BaseException)]
+    if not failures:
+        return
+    logger.error(f"Extract aborted: {len(failures)} failed extractor call(s) ({', '.join(stage for stage, _ in failures)})")
+    raise failures[0][1]
+
+
+def _estimate_tokens(value: Any) -> int:
+    """Grobe Token-Schätzung (~4 Zeichen pro Token)"""
+    return len(json.dumps(value, ensure_ascii=False)) // 4 + 1
+
+
+def chunk_protocol(protocol: Dict[str, Any], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Teilt ein Protokoll seitenweise in Chunks.
+    
+    Aufeinanderfolgende kleine Seiten werden bis zum Token-Budget gruppiert,
+    eine einzelne zu große Seite bildet einen eigenen Chunk. Jeder Chunk ist
+    ein vollständiges Protokoll-Dict (gleiche Metadaten, Teilmenge der Seiten).
+    
+    Returns:
+        [protocol] wenn Chunking aus ist oder das Protokoll ins Budget passt
+    """
+    pages = protocol.get("pages") or []
+    if token_budget <= 0 or len(pages) < 2 or _estimate_tokens(protocol) <= token_budget:
+        return [protocol]
+    
+    header = {key: value for key, value in protocol.items() if key != "pages"}
+    header_tokens = _estimate_tokens(header)
+    
+    groups: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = header_tokens
+    for page in pages:
+        page_tokens = _estimate_tokens(page)
+        if current and current_tokens + page_tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = [], header_tokens
+        current.append(page)
+        current_tokens += page_tokens
+    if current:
+        groups.append(current)
+    
+    return [{**header, "pages": group} for group in groups]
+
+
+def _dedupe_key(item: Any) -> str:
+    if isinstance(item, str):
+        return item.lower().strip()
+    if isinstance(item, dict):
+        for field in ("text", "label", "name"):
+            if isinstance(item.get(field), str):
+                return f"{field}:{item[field].lower().strip()}"
+    return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+
+def _merge_value(current: Any, value: Any) -> Any:
+    """Dicts Schlüssel für Schlüssel (rekursiv), sonst erster nicht-leerer Wert"""
+    if isinstance(current, dict) and isinstance(value, dict):
+        merged = dict(current)
+        for key, entry in value.items():
+            merged[key] = _merge_value(merged.get(key), entry)
+        return merged
+    if current in (None, "", {}, []):
+        return value
+    return current
+
+
+def merge_chunk_results(chunk_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Führt die Ergebnisse eines Extractors über alle Chunks deterministisch zusammen.
+    
+    - Listen: in Chunk-Reihenfolge aneinandergehängt, Duplikate entfernt
+      (protocol_questions bleiben vollständig, merge_protocol_questions dedupliziert)
+    - Dicts (gehalt, arbeitszeit, department_contacts, ...): Schlüssel für
+      Schlüssel vereinigt, je Schlüssel gewinnt der erste nicht-leere Wert
+    - Übrige Felder (region_context, ...): erster nicht-leerer Wert
+    
+    Standortabhängige Felder (site_count, Standort-Frage) kennt jeder Chunk
+    nur für seine Seiten - siehe derive_site_fields().
+    """
+    merged: Dict[str, Any] = {}
+    seen: Dict[str, set] = {}
+    
+    for result in chunk_results:
+        for key, value in result.items():
+            if isinstance(value, list):
+                target = merged.setdefault(key, [])
+                if key == "protocol_questions":
+                    target.extend(value)
+                    continue
+                keys = seen.setdefault(key, set())
+                for item in value:
+                    item_key = _dedupe_key(item)
+                    if item_key not in keys:
+                        keys.add(item_key)
+                        target.append(item)
+            else:
+                merged[key] = _merge_value(merged.get(key), value)
+    
+    return merged
+
+
+def derive_site_fields(info_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Leitet site_count und die Standort-Frage aus den zusammengeführten Standorten ab.
+    
+    Die Chunks sehen jeweils nur ihre Seiten: ihr site_count und ihre
+    Standort-Fragen (Boolean bei 1, Choice bei 2+ Standorten) widersprechen
+    sich. Sie werden durch eine Frage nach den Regeln aus extract_info ersetzt.
+    """
+    sites = info_data.get("sites") or []
+    labels = [site.get("label") for site in sites if isinstance(site, dict) and site.get("label")]
+    questions = info_data.get("protocol_questions") or []
+    site_questions = [pq for pq in questions if str(pq.get("category", "")).lower() == "standort"]
+    
+    result = {
+        **info_data,
+        "site_count": len(labels),
+        "protocol_questions": [pq for pq in questions if pq not in site_questions]
+    }
+    if not site_questions:
+        return result
+    
+    region = info_data.get("region_context")
+    question = dict(site_questions[0])
+    if len(labels) >= 2:
+        where = f" in {region}" if region else ""
+        question.update(
+            text=f"Wir haben {len(labels)} Standorte{where}. Haben Sie eine Präferenz?",
+            type="choice",
+            options=labels
+        )
+    elif len(labels) == 1:
+        where = f"in {region}, genauer in {labels[0]}" if region else f"in {labels[0]}"
+        question.update(text=f"Wir sind {where}. Passt das für Sie?", type="boolean", options=None)
+    elif info_data.get("standort_fallback_url"):
+        question.update(
+            text=f"Hier finden Sie unsere Standorte: {info_data['standort_fallback_url']}",
+            type="info",
+            options=None
+        )
+    else:
+        return result
+    
+    result["protocol_questions"].append(question)
+    return result
+
+
 async def extract_multi_stage(protocol: Dict[str, Any]) -> ExtractResult:
     """
     Multi-stage extraction with parallel prompts.
@@ -185,39 +330,38 @@ async def extract_multi_stage(protocol: Dict[str, Any]) -> ExtractResult:
     
     Stage 2: Merge results
     
+    Große Protokolle (extract_chunk_token_budget) werden seitenweise in Chunks
+    geteilt; alle Extractor × Chunk Calls laufen parallel unter dem globalen
+    LLM-Limit, die Ergebnisse werden per merge_chunk_results zusammengeführt.
+    
     Returns:
         ExtractResult with comprehensive data
     """
     logger.info("Starting Multi-Stage Extract Pipeline...")
     
-    # STAGE 1: Parallel extraction
-    results = await asyncio.gather(
-        extract_qualifications(protocol),
-        extract_rahmen(protocol),
-        extract_info(protocol),
-        return_exceptions=True
-    )
+    # STAGE 1: Parallel extraction (große Protokolle seitenweise in Chunks)
+    chunks = chunk_protocol(protocol, get_settings().extract_chunk_token_budget)
     
-    qual_data, rahmen_data, info_data = results
-    
-    # Handle exceptions
-    if isinstance(qual_data, Exception):
-        logger.error(f"Qualifications extraction failed: {qual_data}")
-        qual_data = {
-            "preferred": [],
-            "must_have": [], 
-            "alternatives": [], 
-            "optional": [],
-            "protocol_questions": []
-        }
-    
-    if isinstance(rahmen_data, Exception):
-        logger.error(f"Rahmen extraction failed: {rahmen_data}")
-        rahmen_data = {"arbeitszeit": None, "gehalt": None, "benefits": [], "protocol_questions": []}
-    
-    if isinstance(info_data, Exception):
-        logger.error(f"Info extraction failed: {info_data}")
-        info_data = {"sites": [], "all_departments": [], "priorities": [], "roles": [], "protocol_questions": []}
+    if len(chunks) > 1:
+        logger.info(f"📄 Chunked extract: {len(protocol.get('pages', []))} pages → {len(chunks)} chunks")
+        results = await asyncio.gather(
+            *(extractor(chunk) for chunk in chunks for extractor in _EXTRACTORS),
+            return_exceptions=True
+        )
+        _raise_on_failure(results, list(_EXTRACTOR_STAGES) * len(chunks))
+        # Ergebnisse je Extractor in Chunk-Reihenfolge zusammenführen
+        qual_data, rahmen_data, info_data = (
+            merge_chunk_results(results[position::len(_EXTRACTORS)])
+            for position in range(len(_EXTRACTORS))
+        )
+        info_data = derive_site_fields(info_data)
+    else:
+        results = await asyncio.gather(
+            *(extractor(protocol) for extractor in _EXTRACTORS),
+            return_exceptions=True
+        )
+        _raise_on_failure(results, list(_EXTRACTOR_STAGES))
+        qual_data, rahmen_data, info_data = results
     
     # STAGE 2: Merge results
     logger.info("📦 Merging results from all extractors...")
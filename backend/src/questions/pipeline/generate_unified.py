@@ -17,14 +17,70 @@ import asyncio
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
-from ..llm_adapter import call_llm_async
+from ..schemas import GENERATED_QUESTIONS_SCHEMA
+from ..structured_output import call_llm_structured
 from ..types import Question, QuestionType, QuestionGroup, QuestionCatalog, CatalogMeta
+from ...config import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+# Gültige QuestionGroup Werte
+_VALID_GROUPS = {
+    "Motivation", "Standort", "Einsatzbereich", "Qualifikation",
+    "Präferenzen", "Rahmen", "Werdegang", "Verfügbarkeit", "Kontakt"
+}
+
+
+def _question_key(q_dict: Dict[str, Any]) -> str:
+    return json.dumps(q_dict, ensure_ascii=False, sort_keys=True)
+
+
+def _to_question(q_dict: Dict[str, Any]) -> Optional[Question]:
+    """Validiert eine generierte Frage (None = ungültig, wird übersprungen)"""
+    try:
+        # Validiere und korrigiere group
+        group = q_dict.get('group')
+        if group and group not in _VALID_GROUPS:
+            logger.warning(f"  Invalid group '{group}', mapping to 'Qualifikation'")
+            q_dict = {**q_dict, 'group': "Qualifikation"}
+        
+        # Konvertiere zu Question
+        return Question(**q_dict)
+    except Exception as e:
+        logger.warning(f"  Skipping invalid question: {e}")
+        return None
+
+
+class _QuestionStream:
+    """
+    on_event-Consumer für call_llm_structured: wandelt jede fertig gestreamte
+    Frage sofort in ein Question-Objekt um, während das Modell noch schreibt.
+    
+    Ein Reparaturversuch streamt erneut; mit einer neuen Versuchsnummer werden
+    die Fragen des verworfenen Versuchs vergessen. merge_results() nutzt nur
+    Fragen, die auch im validierten Ergebnis stehen.
+    """
+    
+    def __init__(self):
+        self.attempt = 0
+        self.questions: Dict[str, Optional[Question]] = {}
+    
+    def callback(self) -> Optional["_QuestionStream"]:
+        """Consumer nur bei aktiviertem Streaming (on_event erzwingt sonst stream)"""
+        return self if get_settings().llm_streaming_enabled else None
+    
+    def __call__(self, attempt: int, event: Tuple[str, str, Any]) -> None:
+        if attempt != self.attempt:
+            self.attempt = attempt
+            self.questions = {}
+        kind, key, value = event
+        if kind == "item" and key == "questions" and isinstance(value, dict):
+            self.questions[_question_key(value)] = _to_question(value)
+
+
 async def generate_from_kriterien(protocol: Dict[str, Any]) -> Dict[str, Any]:
     """
     Generiert Fragen aus "Bewerber erfüllt folgende Kriterien" Seite.
@@ -46,18 +102,19 @@ async def generate_from_kriterien(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "generate_kriterien.system.md"
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
-    # LLM Call
-    response = await call_llm_async(
+    # LLM Call - Fragen werden schon während des Streams konvertiert
+    streamed = _QuestionStream()
+    result = await call_llm_structured(
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": json.dumps(kriterien_page, ensure_ascii=False)}
         ],
+        schema=GENERATED_QUESTIONS_SCHEMA,
+        stage="generate_kriterien",
         temperature=0.7,
-        response_format={"type": "json_object"}
+        on_event=streamed.callback()
     )
-    
-    content = response["choices"][0]["message"]["content"]
-    result = json.loads(content)
+    result["_streamed"] = streamed.questions
     
     logger.info(f"  ✓ {len(result.get('questions', []))} Fragen aus Kriterien generiert")
     return result
@@ -84,18 +141,19 @@ async def generate_from_rahmen(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "generate_rahmen.system.md"
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
-    # LLM Call
-    response = await call_llm_async(
+    # LLM Call - Fragen werden schon während des Streams konvertiert
+    streamed = _QuestionStream()
+    result = await call_llm_structured(
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": json.dumps(rahmen_page, ensure_ascii=False)}
         ],
+        schema=GENERATED_QUESTIONS_SCHEMA,
+        stage="generate_rahmen",
         temperature=0.7,
-        response_format={"type": "json_object"}
+        on_event=streamed.callback()
     )
-    
-    content = response["choices"][0]["message"]["content"]
-    result = json.loads(content)
+    result["_streamed"] = streamed.questions
     
     logger.info(f"  ✓ {len(result.get('questions', []))} Fragen aus Rahmen generiert")
     return result
@@ -122,18 +180,19 @@ async def generate_from_infos(protocol: Dict[str, Any]) -> Dict[str, Any]:
     prompt_path = Path(__file__).parent.parent / "prompts" / "generate_infos.system.md"
     system_prompt = prompt_path.read_text(encoding="utf-8")
     
-    # LLM Call
-    response = await call_llm_async(
+    # LLM Call - Fragen werden schon während des Streams konvertiert
+    streamed = _QuestionStream()
+    result = await call_llm_structured(
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": json.dumps(info_page, ensure_ascii=False)}
         ],
+        schema=GENERATED_QUESTIONS_SCHEMA,
+        stage="generate_infos",
         temperature=0.7,
-        response_format={"type": "json_object"}
+        on_event=streamed.callback()
     )
-    
-    content = response["choices"][0]["message"]["content"]
-    result = json.loads(content)
+    result["_streamed"] = streamed.questions
     
     logger.info(f"  ✓ {len(result.get('questions', []))} Fragen aus Infos generiert")
     return result
@@ -195,28 +254,17 @@ def merge_results(kriterien: Dict, rahmen: Dict, infos: Dict) -> tuple:
     
     all_questions.sort(key=sort_key)
     
-    # Gültige QuestionGroup Werte
-    valid_groups = {
-        "Motivation", "Standort", "Einsatzbereich", "Qualifikation",
-        "Präferenzen", "Rahmen", "Werdegang", "Verfügbarkeit", "Kontakt"
-    }
+    # Konvertiere zu Question-Objekten (gestreamte Fragen sind bereits konvertiert)
+    streamed: Dict[str, Optional[Question]] = {}
+    for source in (kriterien, rahmen, infos):
+        streamed.update(source.get('_streamed', {}))
     
-    # Konvertiere zu Question-Objekten
     question_objects = []
     for q_dict in all_questions:
-        try:
-            # Validiere und korrigiere group
-            group = q_dict.get('group')
-            if group and group not in valid_groups:
-                logger.warning(f"  Invalid group '{group}', mapping to 'Qualifikation'")
-                q_dict['group'] = "Qualifikation"
-            
-            # Konvertiere zu Question
-            question = Question(**q_dict)
+        key = _question_key(q_dict)
+        question = streamed.pop(key) if key in streamed else _to_question(q_dict)
+        if question is not None:
             question_objects.append(question)
-        except Exception as e:
-            logger.warning(f"  Skipping invalid question: {e}")
-            continue
     
     logger.info(f"  ✓ Merged: {len(question_objects)} finale Fragen")
     return question_objects, knowledge_base
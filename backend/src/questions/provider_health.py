@@ -0,0 +1,268 @@
+"""
+Provider Health - Circuit Breaker und Latenz-Routing pro LLM Provider
+
+Jeder Provider hat einen Circuit Breaker (closed → open → half_open → closed):
+- closed: Calls laufen normal, Fehlerquote und Latenz (EWMA) werden gemessen
+- open: Nach zu vielen Fehlern wird der Provider übersprungen (Cooldown)
+- half_open: Nach dem Cooldown darf ein einzelner Probe-Call durch;
+  Erfolg schließt den Breaker, Fehler öffnet ihn erneut
+
+So kostet ein Provider-Ausfall einen Timeout pro Cooldown statt einen pro Call.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Circuit Breaker mit Fehlerquote und Latenz-EWMA für einen Provider"""
+
+    def __init__(
+        self,
+        name: str,
+        error_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        consecutive_failures: int = 3,
+        cooldown_seconds: float = 30.0,
+        ewma_alpha: float = 0.3,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Provider-Name
+            error_rate_threshold: Fehlerquote im Fenster, ab der geöffnet wird
+            window_size: Anzahl betrachteter letzter Calls
+            min_calls: Mindestanzahl Calls im Fenster für die Quote
+            consecutive_failures: Öffnet zusätzlich nach so vielen Fehlern in Folge
+            cooldown_seconds: Wartezeit im Zustand open bis zum Probe-Call
+            ewma_alpha: Gewicht neuer Latenzwerte
+            clock: Zeitquelle (für Tests)
+        """
+        self.name = name
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.consecutive_failures = consecutive_failures
+        self.cooldown_seconds = cooldown_seconds
+        self.ewma_alpha = ewma_alpha
+        self._clock = clock
+
+        self.state = CLOSED
+        self.latency_ewma: Optional[float] = None
+        self._outcomes: deque = deque(maxlen=window_size)
+        self._failures_in_row = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Darf ein Call an diesen Provider gehen?
+
+        Im Zustand half_open wird genau ein Probe-Call zugelassen.
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if self._clock() - self._opened_at < self.cooldown_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"Circuit Breaker {self.name}: half_open (Probe erlaubt)")
+
+            if self.state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def is_available(self) -> bool:
+        """Wie allow_request(), aber ohne den Probe-Slot zu reservieren"""
+        with self._lock:
+            if self.state == OPEN:
+                return self._clock() - self._opened_at >= self.cooldown_seconds
+            if self.state == HALF_OPEN:
+                return not self._probe_in_flight
+            return True
+
+    def record_success(self, latency: float) -> None:
+        """Erfolgreicher Call mit gemessener Latenz"""
+        with self._lock:
+            self._update_latency(latency)
+            self._outcomes.append(True)
+            self._failures_in_row = 0
+            if self.state != CLOSED:
+                logger.info(f"Circuit Breaker {self.name}: closed (Probe erfolgreich)")
+                self.state = CLOSED
+                self._outcomes.clear()
+                self._outcomes.append(True)
+            self._probe_in_flight = False
+
+    def record_failure(self, latency: Optional[float] = None) -> None:
+        """Fehlgeschlagener Call (Fehler oder Timeout)"""
+        with self._lock:
+            if latency is not None:
+                self._update_latency(latency)
+            self._outcomes.append(False)
+            self._failures_in_row += 1
+            self._probe_in_flight = False
+
+            if self.state == HALF_OPEN or self._should_open():
+                self._open()
+
+    def release_probe(self) -> None:
+        """Gibt einen nicht genutzten Probe-Slot frei (Call wurde nie gesendet)"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    @property
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Zustand für /health"""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (self._clock() - self._opened_at))
+            return {
+                "state": self.state,
+                "error_rate": round(self.error_rate, 3),
+                "calls_in_window": len(self._outcomes),
+                "latency_ewma_seconds": round(self.latency_ewma, 2) if self.latency_ewma is not None else None,
+                "times_opened": self._times_opened,
+                "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None
+            }
+
+    def _should_open(self) -> bool:
+        if self.state != CLOSED:
+            return False
+        if self._failures_in_row >= self.consecutive_failures:
+            return True
+        return len(self._outcomes) >= self.min_calls and self.error_rate >= self.error_rate_threshold
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = self._clock()
+        self._times_opened += 1
+        logger.warning(
+            f"Circuit Breaker {self.name}: open für {self.cooldown_seconds:.0f}s "
+            f"(Fehlerquote {self.error_rate:.0%}, {self._failures_in_row} Fehler in Folge)"
+        )
+
+    def _update_latency(self, latency: float) -> None:
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = self.ewma_alpha * latency + (1 - self.ewma_alpha) * self.latency_ewma
+
+
+class ProviderHealth:
+    """Verwaltet die Breaker aller Provider und bestimmt die Aufrufreihenfolge"""
+
+    def __init__(
+        self,
+        latency_route_factor: float = 2.0,
+        reprobe_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        **breaker_kwargs: Any
+    ):
+        """
+        Args:
+            latency_route_factor: Der bevorzugte Provider wird nach hinten
+                sortiert, wenn seine Latenz-EWMA um diesen Faktor über der
+                eines anderen gesunden Providers liegt
+            reprobe_seconds: Ein zurückgestufter Provider bekommt nach dieser
+                Zeit wieder einen Call, damit seine EWMA aktuell bleibt
+            clock: Zeitquelle (für Tests)
+            **breaker_kwargs: Parameter für neue CircuitBreaker
+        """
+        self.latency_route_factor = latency_route_factor
+        self.reprobe_seconds = reprobe_seconds
+        self._clock = clock
+        self._breaker_kwargs = {"clock": clock, **breaker_kwargs}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._demoted_since: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(provider, **self._breaker_kwargs)
+            return self._breakers[provider]
+
+    def route(self, providers: List[str]) -> List[str]:
+        """
+        Sortiert die konfigurierte Provider-Reihenfolge nach Gesundheit.
+
+        Gesperrte Provider (open, oder half_open mit laufender Probe) fallen weg.
+        Die Probe wird erst beim tatsächlichen Call reserviert (acquire()).
+        """
+        available = [p for p in providers if self.breaker(p).is_available()]
+
+        if len(available) > 1 and self.latency_route_factor > 0:
+            primary = self.breaker(available[0]).latency_ewma
+            fastest = min(
+                (self.breaker(p).latency_ewma for p in available[1:]
+                 if self.breaker(p).latency_ewma is not None and self.breaker(p).state == CLOSED),
+                default=None
+            )
+            name = available[0]
+            if primary is not None and fastest is not None and primary > fastest * self.latency_route_factor:
+                now = self._clock()
+                with self._lock:
+                    since = self._demoted_since.setdefault(name, now)
+                    reprobe = now - since >= self.reprobe_seconds
+                    if reprobe:
+                        self._demoted_since[name] = now
+                if not reprobe:
+                    logger.info(
+                        f"LLM Routing: {name} langsam ({primary:.1f}s vs {fastest:.1f}s) - nach hinten"
+                    )
+                    available = available[1:] + available[:1]
+            else:
+                with self._lock:
+                    self._demoted_since.pop(name, None)
+
+        return available
+
+    def acquire(self, provider: str) -> bool:
+        """Reserviert den Call (bzw. den Probe-Slot) direkt vor dem Senden"""
+        return self.breaker(provider).allow_request()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+
+# Singleton-Instanz
+_provider_health: Optional[ProviderHealth] = None
+
+
+def get_provider_health() -> ProviderHealth:
+    """Gibt die prozessweite ProviderHealth-Instanz zurück (Konfiguration aus Settings)"""
+    global _provider_health
+    if _provider_health is None:
+        settings = get_settings()
+        _provider_health = ProviderHealth(
+            latency_route_factor=settings.llm_latency_route_factor,
+            reprobe_seconds=settings.llm_breaker_cooldown_seconds,
+            error_rate_threshold=settings.llm_breaker_error_rate,
+            window_size=settings.llm_breaker_window,
+            cooldown_seconds=settings.llm_breaker_cooldown_seconds
+        )
+    return _provider_health
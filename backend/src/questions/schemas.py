@@ -202,6 +202,110 @@ QUESTION_CATALOG_SCHEMA = {
 }
 
 
+# Stage-Schemas für strukturierte LLM-Ausgaben (Claude Tool-Use / OpenAI json_schema).
+# Bewusst tolerant (additionalProperties), aber mit festen Top-Level-Keys und Typen.
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_PROTOCOL_QUESTIONS = EXTRACT_RESULT_SCHEMA["properties"]["protocol_questions"]
+_TEXT_OR_OBJECT = {"type": ["object", "string", "null"]}
+
+QUALIFICATIONS_SCHEMA = {
+    "type": "object",
+    "required": ["preferred", "alternatives", "must_have", "optional", "protocol_questions"],
+    "properties": {
+        "preferred": _STRING_LIST,
+        "alternatives": _STRING_LIST,
+        "must_have": _STRING_LIST,
+        "optional": _STRING_LIST,
+        "protocol_questions": _PROTOCOL_QUESTIONS
+    },
+    "additionalProperties": True
+}
+
+RAHMEN_SCHEMA = {
+    "type": "object",
+    "required": ["arbeitszeit", "gehalt", "benefits", "protocol_questions"],
+    "properties": {
+        "arbeitszeit": _TEXT_OR_OBJECT,
+        "gehalt": _TEXT_OR_OBJECT,
+        "benefits": _STRING_LIST,
+        "protocol_questions": _PROTOCOL_QUESTIONS
+    },
+    "additionalProperties": True
+}
+
+INFO_SCHEMA = {
+    "type": "object",
+    "required": ["sites", "all_departments", "priorities", "roles", "protocol_questions"],
+    "properties": {
+        "sites": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["label"],
+                "properties": {
+                    "label": {"type": "string"},
+                    "address": {"type": ["string", "null"]},
+                    "stations": _STRING_LIST
+                },
+                "additionalProperties": True
+            }
+        },
+        "all_departments": _STRING_LIST,
+        "priorities": EXTRACT_RESULT_SCHEMA["properties"]["priorities"],
+        "roles": _STRING_LIST,
+        "culture_notes": _STRING_LIST,
+        "protocol_questions": _PROTOCOL_QUESTIONS
+    },
+    "additionalProperties": True
+}
+
+CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "required": ["classified_items"],
+    "properties": {
+        "classified_items": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["intent"],
+                "properties": {
+                    "intent": {"type": "string"},
+                    "original_text": {"type": "string"},
+                    "confidence": {"type": "string"},
+                    "reason": {"type": "string"}
+                },
+                "additionalProperties": True
+            }
+        }
+    },
+    "additionalProperties": True
+}
+
+GENERATED_QUESTIONS_SCHEMA = {
+    "type": "object",
+    "required": ["questions"],
+    "properties": {
+        "questions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "question"],
+                "properties": {
+                    "id": {"type": "string"},
+                    "question": {"type": "string"},
+                    "type": {"type": "string"},
+                    "priority": {"enum": [1, 2, 3]},
+                    "gate_config": {"type": "object"}
+                },
+                "additionalProperties": True
+            }
+        },
+        "info_pool": {"type": "object"}
+    },
+    "additionalProperties": True
+}
+
+
 def validate_extract_result(data: Dict[str, Any]) -> None:
     """
     Validate extract result against schema.
@@ -0,0 +1,175 @@
+"""
+Structured Output - Schema-validierte LLM-Ausgaben mit Repair-Loop
+
+Ruft call_llm_async mit einem JSON-Schema aus schemas.py auf (Claude Tool-Use,
+OpenAI json_schema), validiert das Ergebnis und schickt ungültige Antworten
+mit der Fehlermeldung zur Korrektur zurück - begrenzt auf wenige Versuche.
+Pro Stage werden Parse-Fehler, Reparaturen und verschwendete Tokens gezählt.
+"""
+
+import json
+import logging
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+
+from .llm_adapter import call_llm_async
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Max. Länge der fehlerhaften Antwort, die zur Reparatur zurückgeschickt wird
+_MAX_ECHO_CHARS = 12000
+
+
+# on_event(attempt, (kind, key, value)) - attempt zählt ab 0 je Reparaturversuch
+AttemptEventCallback = Callable[[int, Tuple[str, str, Any]], None]
+
+
+class StructuredOutputError(ValueError):
+    """LLM-Ausgabe blieb auch nach Reparaturversuchen ungültig"""
+
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+_validators: Dict[int, Draft7Validator] = {}
+
+
+def _count(stage: str, **increments: int) -> None:
+    with _stats_lock:
+        entry = _stats.setdefault(stage, {
+            "calls": 0,
+            "parse_failures": 0,
+            "repaired": 0,
+            "failed": 0,
+            "wasted_tokens": 0
+        })
+        for key, value in increments.items():
+            entry[key] += value
+
+
+def get_structured_output_stats() -> Dict[str, Dict[str, int]]:
+    """Parse-Metriken pro Stage (für /health)"""
+    with _stats_lock:
+        return {stage: dict(entry) for stage, entry in _stats.items()}
+
+
+def reset_structured_output_stats() -> None:
+    """Setzt alle Zähler zurück (Tests)"""
+    with _stats_lock:
+        _stats.clear()
+
+
+def validate_payload(content: str, schema: Dict[str, Any]) -> tuple:
+    """
+    Parst und validiert eine LLM-Antwort.
+
+    Returns:
+        (data, None) bei Erfolg, sonst (None, Fehlerbeschreibung)
+    """
+    try:
+        data = json.loads(content)
+    except (json.JSONDecodeError, TypeError) as e:
+        detail = f"{e.msg} (Position {e.pos})" if isinstance(e, json.JSONDecodeError) else str(e)
+        return None, f"Kein gültiges JSON: {detail}"
+
+    validator = _validators.get(id(schema))
+    if validator is None:
+        validator = _validators[id(schema)] = Draft7Validator(schema)
+
+    error = best_match(validator.iter_errors(data))
+    if error is not None:
+        path = "/".join(str(p) for p in error.absolute_path) or "<root>"
+        return None, f"Schema-Verletzung bei {path}: {error.message}"
+    return data, None
+
+
+async def call_llm_structured(
+    messages: List[Dict[str, str]],
+    schema: Dict[str, Any],
+    stage: str,
+    temperature: float = 0.7,
+    max_repairs: Optional[int] = None,
+    timeout: Optional[int] = None,
+    force_provider: Optional[str] = None,
+    stream: Optional[bool] = None,
+    on_event: Optional[AttemptEventCallback] = None
+) -> Dict[str, Any]:
+    """
+    LLM Call mit schema-gebundener Ausgabe und begrenzter Reparatur.
+
+    Args:
+        messages: Chat Messages (system + user)
+        schema: JSON-Schema aus schemas.py
+        stage: Stage-Name (Metrik-Key und Tool-Name, [a-zA-Z0-9_-])
+        temperature: Temperature
+        max_repairs: Max. Reparaturversuche (default: settings.llm_max_repair_attempts)
+        timeout: Optional Timeout pro Call
+        force_provider: Optional "claude" oder "openai"
+        stream: Antwort streamen (default: settings.llm_streaming_enabled)
+        on_event: Callback für fertige Abschnitte (siehe call_llm_async), erhält
+                  zusätzlich die Versuchsnummer. Ein Reparaturversuch streamt
+                  erneut - Events eines früheren Versuchs sind damit verworfen,
+                  gültig sind nur die des zurückgegebenen (letzten) Versuchs.
+
+    Returns:
+        Validiertes JSON-Objekt
+
+    Raises:
+        StructuredOutputError: Wenn die Antwort auch nach Reparatur ungültig ist
+    """
+    settings = get_settings()
+    if max_repairs is None:
+        max_repairs = settings.llm_max_repair_attempts
+    if stream is None:
+        stream = settings.llm_streaming_enabled
+
+    conversation = list(messages)
+    error = None
+
+    for attempt in range(max_repairs + 1):
+        response = await call_llm_async(
+            messages=conversation,
+            temperature=temperature,
+            timeout=timeout,
+            force_provider=force_provider,
+            json_schema={"name": stage, "schema": schema},
+            stream=stream,
+            on_event=partial(on_event, attempt) if on_event is not None else None,
+            stage=stage
+        )
+        _count(stage, calls=1)
+
+        content = response["choices"][0]["message"].get("content") or ""
+        data, error = validate_payload(content, schema)
+
+        if error is None:
+            if attempt > 0:
+                _count(stage, repaired=1)
+                logger.info(f"  ✓ {stage}: Ausgabe nach {attempt} Reparatur(en) gültig")
+            return data
+
+        tokens = response.get("usage", {}).get("total_tokens", 0)
+        _count(stage, parse_failures=1, wasted_tokens=tokens)
+        logger.warning(
+            f"  ⚠️  {stage}: ungültige LLM-Ausgabe (Versuch {attempt + 1}/{max_repairs + 1}): {error}"
+        )
+
+        conversation = list(messages) + [
+            {"role": "assistant", "content": content[:_MAX_ECHO_CHARS]},
+            {
+                "role": "user",
+                "content": (
+                    f"Deine Antwort entspricht nicht dem geforderten Schema: {error}\n"
+                    "Antworte erneut mit dem vollständigen, korrigierten JSON-Objekt."
+                )
+            }
+        ]
+
+    _count(stage, failed=1)
+    raise StructuredOutputError(
+        f"{stage}: LLM-Ausgabe nach {max_repairs + 1} Versuchen ungültig: {error}"
+    )
@@ -276,6 +276,7 @@ class CatalogMeta(BaseModel):
     generated_at: str = Field(default_factory=lambda: datetime.now().isoformat())
     generator: str = "voiceki-python-question-builder@1.0.0"
     policies_applied: Optional[List[str]] = None
+    stage_trace: Optional[List[Dict[str, Any]]] = None  # LLM-Versuche (Stage, Provider, Timeout-Budget, Dauer)
 
 
 class QuestionCatalog(BaseModel):
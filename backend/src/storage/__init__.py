@@ -1,6 +1,10 @@
 """Storage Layer - Campaign Package Management"""
 
 from .campaign_storage import CampaignStorage
+from .package_backend import PackageBackend
+from .hoc_uploader import HOCUploader
+from .call_store import CallResultStore, get_call_store
+from .job_leases import JobLeaseStore, get_job_lease_store
 
-__all__ = ['CampaignStorage']
-
+__all__ = ['CampaignStorage', 'PackageBackend', 'HOCUploader', 'CallResultStore', 'get_call_store',
+           'JobLeaseStore', 'get_job_lease_store']
@@ -0,0 +1,320 @@
+"""Call Result Store - Call-Ergebnisse in SQLite statt drei Dateien pro Call"""
+
+import atexit
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+from ..utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge_bases (
+    hash TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS calls (
+    conversation_id TEXT PRIMARY KEY,
+    applicant_id TEXT,
+    campaign_id TEXT,
+    created_at TEXT NOT NULL,
+    kb_hash TEXT REFERENCES knowledge_bases(hash),
+    kb_size INTEGER,
+    transcript TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_calls_applicant ON calls(applicant_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_campaign ON calls(campaign_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_calls_created ON calls(created_at);
+"""
+
+_STOP = object()
+
+
+def kb_hash(knowledge_base: str) -> str:
+    """Content-Hash einer Knowledge Base (Schlüssel für die Deduplizierung)"""
+    return hashlib.sha256(knowledge_base.encode("utf-8")).hexdigest()
+
+
+class CallResultStore:
+    """
+    Append-only Speicher für Call-Ergebnisse (SQLite, WAL).
+
+    - Knowledge Bases werden einmal pro Inhalt gespeichert (Content-Hash),
+      Calls referenzieren sie nur - für alle Bewerber einer Kampagne identisch
+    - Schreibzugriffe laufen über eine Queue in einen Writer-Thread, der
+      mehrere Records pro Transaktion committet (Group Commit)
+    - Abfragen nach Bewerber, Kampagne und Zeitraum über Indizes
+    """
+
+    def __init__(self, path: str, batch_size: int = 200, flush_interval: float = 0.05):
+        """
+        Args:
+            path: SQLite-Datei
+            batch_size: Max. Records pro Commit
+            flush_interval: Max. Wartezeit auf weitere Records vor dem Commit
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._local = threading.local()
+        self._stats = {"records": 0, "commits": 0, "kb_deduplicated": 0, "errors": 0, "failed_records": 0}
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="call-store-writer", daemon=True)
+        self._writer.start()
+
+    def record(
+        self,
+        conversation_id: str,
+        applicant_id: str,
+        knowledge_base: str,
+        campaign_id: Optional[str] = None,
+        transcript: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Speichert einen Call (asynchron, kehrt sofort zurück).
+
+        Returns:
+            Content-Hash der Knowledge Base
+        """
+        if self._closed:
+            raise RuntimeError("CallResultStore ist geschlossen")
+        digest = kb_hash(knowledge_base)
+        self._queue.put(("call", {
+            "conversation_id": conversation_id,
+            "applicant_id": str(applicant_id) if applicant_id is not None else None,
+            "campaign_id": str(campaign_id) if campaign_id is not None else None,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "kb_hash": digest,
+            "kb_size": len(knowledge_base),
+            "knowledge_base": knowledge_base,
+            "transcript": transcript,
+            "metadata": json_codec.dumps_str(metadata or {})
+        }))
+        return digest
+
+    def attach_transcript(self, conversation_id: str, transcript: str) -> None:
+        """Ergänzt das Transkript eines gespeicherten Calls (asynchron)"""
+        self._queue.put(("transcript", {"conversation_id": conversation_id, "transcript": transcript}))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wartet bis alle bisher übergebenen Records committet sind"""
+        done = threading.Event()
+        self._queue.put(("barrier", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Schreibt ausstehende Records und beendet den Writer-Thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def get_call(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        row = self._reader().execute(
+            "SELECT * FROM calls WHERE conversation_id = ?", (conversation_id,)
+        ).fetchone()
+        return self._row_to_call(row) if row else None
+
+    def list_calls(
+        self,
+        applicant_id: Optional[str] = None,
+        campaign_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Calls nach Bewerber/Kampagne/Zeitraum, neueste zuerst.
+
+        Args:
+            since/until: Zeitraum (inklusive since, exklusive until)
+        """
+        clauses, params = [], []
+        if applicant_id is not None:
+            clauses.append("applicant_id = ?")
+            params.append(str(applicant_id))
+        if campaign_id is not None:
+            clauses.append("campaign_id = ?")
+            params.append(str(campaign_id))
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(_iso(until))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            f"SELECT * FROM calls {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+        return [self._row_to_call(row) for row in rows]
+
+    def get_knowledge_base(self, digest: str) -> Optional[str]:
+        row = self._reader().execute("SELECT content FROM knowledge_bases WHERE hash = ?", (digest,)).fetchone()
+        return row["content"] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {**self._stats, "pending": self._queue.qsize()}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """Eine Lese-Verbindung pro Thread (WAL: Lesen parallel zum Writer)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @staticmethod
+    def _row_to_call(row: sqlite3.Row) -> Dict[str, Any]:
+        call = dict(row)
+        call["metadata"] = json_codec.loads(call["metadata"] or "{}")
+        call["has_transcript"] = call["transcript"] is not None
+        return call
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        conn.execute("PRAGMA synchronous=NORMAL")
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            barriers = []
+            records = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                elif item[0] == "barrier":
+                    barriers.append(item[1])
+                else:
+                    records.append(item)
+
+            if records:
+                self._commit(conn, records)
+            for barrier in barriers:
+                barrier.set()
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, records: List[Any]) -> None:
+        """
+        Schreibt einen Batch in einer Transaktion.
+        
+        Schlägt der Batch fehl, wird jeder Record einzeln committet - ein
+        fehlerhafter Record kostet so nicht die übrigen des Batches.
+        """
+        written = len(records)
+        try:
+            deduplicated = self._write(conn, records)
+            commits = 1
+        except sqlite3.Error as e:
+            logger.warning(
+                f"Call Store: Commit von {len(records)} Records fehlgeschlagen ({e}) - schreibe einzeln"
+            )
+            deduplicated = commits = 0
+            for record in records:
+                try:
+                    deduplicated += self._write(conn, [record])
+                    commits += 1
+                except sqlite3.Error as record_error:
+                    written -= 1
+                    logger.error(
+                        f"Call Store: Record {record[0]} ({record[1].get('conversation_id')}) "
+                        f"verworfen: {record_error}"
+                    )
+            with self._stats_lock:
+                self._stats["errors"] += 1
+                self._stats["failed_records"] += len(records) - written
+
+        with self._stats_lock:
+            self._stats["records"] += written
+            self._stats["commits"] += commits
+            self._stats["kb_deduplicated"] += deduplicated
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, records: List[Any]) -> int:
+        """Schreibt Records in einer Transaktion, liefert die Anzahl deduplizierter KBs"""
+        deduplicated = 0
+        with conn:
+            for kind, data in records:
+                if kind == "call":
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO knowledge_bases (hash, content, size, created_at) VALUES (?, ?, ?, ?)",
+                        (data["kb_hash"], data["knowledge_base"], data["kb_size"], data["created_at"])
+                    )
+                    deduplicated += cursor.rowcount == 0
+                    conn.execute(
+                        "INSERT OR REPLACE INTO calls (conversation_id, applicant_id, campaign_id, created_at, "
+                        "kb_hash, kb_size, transcript, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (data["conversation_id"], data["applicant_id"], data["campaign_id"], data["created_at"],
+                         data["kb_hash"], data["kb_size"], data["transcript"], data["metadata"])
+                    )
+                elif kind == "transcript":
+                    conn.execute(
+                        "UPDATE calls SET transcript = ? WHERE conversation_id = ?",
+                        (data["transcript"], data["conversation_id"])
+                    )
+        return deduplicated
+
+
+def _iso(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat()
+
+
+# Singleton-Instanz
+_call_store: Optional[CallResultStore] = None
+_call_store_lock = threading.Lock()
+
+
+def get_call_store() -> CallResultStore:
+    """Gibt den prozessweiten Call Store zurück (wird beim Beenden geflusht)"""
+    global _call_store
+    with _call_store_lock:
+        if _call_store is None:
+            settings = get_settings()
+            _call_store = CallResultStore(
+                settings.call_store_path,
+                batch_size=settings.call_store_batch_size
+            )
+            atexit.register(_call_store.close)
+        return _call_store
@@ -1,59 +1,140 @@
-"""Campaign Storage - Lokale JSON-Speicherung für Campaign Packages"""
+"""Campaign Storage - Lokale Speicherung für Campaign Packages"""
 
 import json
+import logging
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from ..utils import json_codec
+from .package_backend import PackageBackend
+from .package_store import PackageBlobStore, content_digest, package_summary
+from .sqlite_package_store import SQLITE_FILENAME, SQLitePackageStore
+from .write_behind import get_package_writer, pending_package
+
+logger = logging.getLogger(__name__)
+
+# Gepoolte Session für synchrone HOC Uploads (lazy, siehe _get_upload_session)
+_upload_session = None
+
+# Verfügbare Package Backends (Setting package_backend)
+PACKAGE_BACKENDS = ("files", "sqlite")
+
+
+def open_package_backend(
+    kind: str,
+    storage_dir: str,
+    history_limit: int = 20,
+    fsync: bool = False
+) -> PackageBackend:
+    """
+    Erstellt das Package Backend für ein Storage-Verzeichnis.
+    
+    Args:
+        kind: 'files' (Blob-Dateien + Pointer) oder 'sqlite' (packages.sqlite3)
+        storage_dir: Storage-Verzeichnis
+        history_limit: Max. gemerkte Versionen pro Kampagne
+        fsync: Writes dauerhaft auf die Platte bringen
+    
+    Raises:
+        ValueError: Unbekanntes Backend
+    """
+    if kind == "files":
+        return PackageBlobStore(storage_dir, history_limit=history_limit, fsync=fsync)
+    if kind == "sqlite":
+        return SQLitePackageStore(str(Path(storage_dir) / SQLITE_FILENAME), history_limit=history_limit, fsync=fsync)
+    raise ValueError(f"Unbekanntes Package Backend: {kind} (erlaubt: {', '.join(PACKAGE_BACKENDS)})")
+
 
 class CampaignStorage:
     """
-    Verwaltet lokale Speicherung von Campaign Packages als JSON-Dateien.
+    Verwaltet lokale Speicherung von Campaign Packages.
     
-    Packages werden in campaign_packages/ Ordner gespeichert.
+    Packages werden komprimiert und inhaltsadressiert in campaign_packages/
+    gespeichert, je nach Setting package_backend als Blob-Dateien
+    (PackageBlobStore) oder in einer SQLite-Datei (SQLitePackageStore):
+    pro Kampagne eine Versionshistorie, identische Packages nur einmal.
+    Alte Packages im Format {campaign_id}.json werden weiterhin gelesen
+    (Import ins SQLite Backend: migrate_packages.py).
     Später migrierbar auf Cloud-Storage (S3, Azure, etc.).
+    
+    Schreiben ist atomar (Temp-Datei + rename, optional fsync) und pro
+    Kampagne serialisiert. enqueue_package() speichert im Hintergrund;
+    load_package() sieht solche Packages schon vor dem Schreiben.
     """
     
-    def __init__(self, storage_dir: str = "campaign_packages"):
+    def __init__(
+        self,
+        storage_dir: str = "campaign_packages",
+        history_limit: int = 20,
+        fsync: Optional[bool] = None,
+        backend: Optional[str] = None
+    ):
         """
         Args:
             storage_dir: Verzeichnis für Campaign Packages
+            history_limit: Max. gemerkte Versionen pro Kampagne (für Rollback)
+            fsync: Writes mit fsync absichern (default: Setting package_fsync)
+            backend: 'files' oder 'sqlite' (default: Setting package_backend)
         """
+        if fsync is None or backend is None:
+            from ..config import get_settings
+            settings = get_settings()
+            fsync = settings.package_fsync if fsync is None else fsync
+            backend = settings.package_backend if backend is None else backend
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True, parents=True)
+        self.backend_kind = backend
+        self.backend = open_package_backend(backend, str(self.storage_dir), history_limit, fsync)
+    
+    def _legacy_path(self, campaign_id: str) -> Path:
+        return self.storage_dir / f"{campaign_id}.json"
     
     def save_package(self, campaign_id: str, package: Dict[str, Any]) -> Path:
         """
-        Speichert Campaign Package als JSON.
+        Speichert Campaign Package als neue Version (komprimiert, dedupliziert).
         
         Args:
             campaign_id: Campaign ID
             package: Package Dict
         
         Returns:
-            Pfad zur gespeicherten Datei
+            Speicherort (Blob-Datei bzw. SQLite-Datei)
         
         Raises:
             IOError: Bei Schreibfehler
         """
-        path = self.storage_dir / f"{campaign_id}.json"
-        
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(package, f, indent=2, ensure_ascii=False)
-            
-            print(f"Package gespeichert: {path}")
-            return path
-            
+            entry = self.backend.put(campaign_id, package)
         except Exception as e:
             raise IOError(f"Fehler beim Speichern von Package {campaign_id}: {e}")
+        
+        # Altes Einzeldatei-Format ist damit abgelöst
+        self._legacy_path(campaign_id).unlink(missing_ok=True)
+        
+        logger.info(
+            f"Package {campaign_id} gespeichert: {entry['hash'][:12]} "
+            f"({entry['raw_bytes']} → {entry['stored_bytes']} Bytes, {entry['codec']})"
+        )
+        return Path(self.backend.location(entry))
+    
+    def enqueue_package(self, campaign_id: str, package: Dict[str, Any]) -> None:
+        """
+        Übergibt ein Package an den Write-Behind-Writer (kehrt sofort zurück).
+        
+        Ab sofort liefert load_package() es in diesem Prozess aus; auf der
+        Platte liegt es, sobald der Hintergrund-Thread es geschrieben hat
+        (spätestens beim Shutdown).
+        """
+        get_package_writer(str(self.storage_dir), self.backend_kind).submit(campaign_id, package, storage=self)
     
-    def load_package(self, campaign_id: str) -> Dict[str, Any]:
+    def load_package(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
         """
-        Lädt Campaign Package aus JSON.
+        Lädt Campaign Package (dekomprimiert transparent).
         
         Args:
             campaign_id: Campaign ID
+            version: Optional Hash (oder Präfix) einer früheren Version
         
         Returns:
             Package Dict
@@ -62,23 +143,62 @@ class CampaignStorage:
             FileNotFoundError: Wenn Package nicht existiert
             json.JSONDecodeError: Bei ungültigem JSON
         """
-        path = self.storage_dir / f"{campaign_id}.json"
+        if version is None:
+            pending = pending_package(str(self.storage_dir), campaign_id, backend=self.backend_kind)
+            if pending is not None:
+                return pending
+        
+        if self.backend.current(campaign_id) is not None or version is not None:
+            return self.backend.get(campaign_id, version)
+        
+        path = self._legacy_path(campaign_id)
         
         if not path.exists():
             raise FileNotFoundError(
-                f"Campaign Package nicht gefunden: {path}\n"
+                f"Campaign Package nicht gefunden: {campaign_id} ({self.storage_dir})\n"
                 f"Bitte zuerst Setup durchführen: python setup_campaign.py --campaign-id {campaign_id}"
             )
         
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_codec.load_file(path)
         except json.JSONDecodeError as e:
             raise json.JSONDecodeError(
                 f"Ungültiges JSON in Package {campaign_id}: {e.msg}",
                 e.doc, e.pos
             )
     
+    def load_sections(self, campaign_id: str, *sections: str) -> Dict[str, Any]:
+        """
+        Lädt nur einzelne Abschnitte eines Packages (z.B. 'questions').
+        
+        Das SQLite Backend liest dabei nur die angefragten Abschnitte;
+        Blob-Dateien und Legacy-JSON werden vollständig geladen.
+        
+        Args:
+            campaign_id: Campaign ID
+            *sections: Top-Level-Felder des Packages
+        
+        Returns:
+            Dict nur mit den vorhandenen angefragten Abschnitten
+        
+        Raises:
+            FileNotFoundError: Wenn Package nicht existiert
+        """
+        pending = pending_package(str(self.storage_dir), campaign_id, clone=False, backend=self.backend_kind)
+        if pending is None and self.backend.current(campaign_id) is not None:
+            return self.backend.get_sections(campaign_id, sections)
+        
+        package = self.load_package(campaign_id)
+        return {section: package[section] for section in sections if section in package}
+    
+    def load_questions(self, campaign_id: str) -> Dict[str, Any]:
+        """Nur die Fragen eines Packages ({} wenn keine vorhanden)"""
+        return self.load_sections(campaign_id, "questions").get("questions") or {}
+    
+    def load_knowledge_base(self, campaign_id: str) -> Dict[str, Any]:
+        """Nur die Knowledge Base eines Packages ({} wenn keine vorhanden)"""
+        return self.load_sections(campaign_id, "knowledge_base").get("knowledge_base") or {}
+    
     def package_exists(self, campaign_id: str) -> bool:
         """
         Prüft ob Campaign Package existiert.
@@ -89,39 +209,77 @@ class CampaignStorage:
         Returns:
             True wenn Package existiert
         """
-        path = self.storage_dir / f"{campaign_id}.json"
-        return path.exists()
+        return (
+            pending_package(str(self.storage_dir), campaign_id, clone=False, backend=self.backend_kind) is not None
+            or self.backend.current(campaign_id) is not None
+            or self._legacy_path(campaign_id).exists()
+        )
+    
+    def has_version(self, campaign_id: str, digest: str) -> bool:
+        """
+        Prüft ob eine Version (Inhalts-Hash) gespeichert ist oder im
+        Write-Behind dieses Prozesses aussteht.
+        """
+        pending = pending_package(str(self.storage_dir), campaign_id, clone=False, backend=self.backend_kind)
+        if pending is not None and content_digest(pending) == digest:
+            return True
+        return any(entry["hash"] == digest for entry in self.backend.history(campaign_id))
+    
+    def list_packages(self) -> List[str]:
+        """
+        Listet die IDs aller gespeicherten Campaign Packages.
+        
+        Returns:
+            Sortierte Campaign IDs
+        """
+        legacy = {path.stem for path in self.storage_dir.glob("*.json")}
+        return sorted(legacy | set(self.backend.campaign_ids()))
     
-    def list_campaigns(self) -> List[Dict[str, Any]]:
+    def list_campaigns(self, company_name: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Listet alle gespeicherten Campaign Packages.
         
+        Neue Packages werden dafür nicht dekomprimiert (Infos aus dem
+        Backend-Index, eine Abfrage beim SQLite Backend).
+        
+        Args:
+            company_name: Nur Kampagnen dieses Unternehmens
+        
         Returns:
-            Liste mit Campaign-Infos (ID, Name, Datum)
+            Liste mit Campaign-Infos (ID, Name, Datum, Anzahl Fragen)
         """
         campaigns = []
+        current = dict(self.backend.list_current(company_name))
+        legacy = {path.stem for path in self.storage_dir.glob("*.json")} - set(self.backend.campaign_ids())
         
-        for json_file in self.storage_dir.glob("*.json"):
+        for campaign_id in sorted(set(current) | legacy):
             try:
-                campaign_id = json_file.stem
-                package = self.load_package(campaign_id)
+                if campaign_id in current:
+                    info = self._entry_info(campaign_id, current[campaign_id])
+                else:
+                    info = self.get_package_info(campaign_id)
+                if info is None:
+                    raise ValueError("Package unlesbar")
+                if company_name is not None and info.get('company_name') != company_name:
+                    continue
                 
                 campaigns.append({
                     "campaign_id": campaign_id,
-                    "company_name": package.get('company_name', 'Unknown'),
-                    "campaign_name": package.get('campaign_name', 'Unknown'),
-                    "created_at": package.get('created_at', 'Unknown'),
-                    "file_path": str(json_file)
+                    "company_name": info.get('company_name') or 'Unknown',
+                    "campaign_name": info.get('campaign_name') or 'Unknown',
+                    "created_at": info.get('created_at') or 'Unknown',
+                    "question_count": info.get('question_count', 0),
+                    "file_path": str(info['storage']['path'])
                 })
             except Exception as e:
-                print(f"⚠️  Fehler beim Laden von {json_file}: {e}")
+                print(f"⚠️  Fehler beim Laden von {campaign_id}: {e}")
                 continue
         
         return campaigns
     
     def delete_package(self, campaign_id: str) -> bool:
         """
-        Löscht Campaign Package.
+        Löscht Campaign Package (Inhalte entfernt collect_garbage()).
         
         Args:
             campaign_id: Campaign ID
@@ -129,19 +287,39 @@ class CampaignStorage:
         Returns:
             True wenn gelöscht, False wenn nicht existiert
         """
-        path = self.storage_dir / f"{campaign_id}.json"
-        
-        if not path.exists():
+        if not self.package_exists(campaign_id):
             return False
         
         try:
-            path.unlink()
-            print(f"🗑️  Package gelöscht: {path}")
+            self.backend.delete(campaign_id)
+            self._legacy_path(campaign_id).unlink(missing_ok=True)
+            print(f"🗑️  Package gelöscht: {campaign_id}")
             return True
         except Exception as e:
             print(f"❌ Fehler beim Löschen: {e}")
             return False
     
+    def package_history(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Gespeicherte Versionen einer Kampagne, älteste zuerst"""
+        return self.backend.history(campaign_id)
+    
+    def rollback_package(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Setzt eine Kampagne auf eine frühere Version zurück.
+        
+        Args:
+            campaign_id: Campaign ID
+            version: Ziel-Hash (oder Präfix); default = vorherige Version
+        
+        Returns:
+            Versions-Eintrag der nun aktuellen Version
+        """
+        return self.backend.rollback(campaign_id, version)
+    
+    def collect_garbage(self, min_age_seconds: float = 3600.0) -> int:
+        """Löscht nicht mehr referenzierte Package-Inhalte"""
+        return self.backend.collect_garbage(min_age_seconds)
+    
     def get_package_info(self, campaign_id: str) -> Optional[Dict[str, Any]]:
         """
         Holt Basis-Infos über Package ohne vollständiges Laden.
@@ -150,28 +328,85 @@ class CampaignStorage:
             campaign_id: Campaign ID
         
         Returns:
-            Dict mit Infos oder None
+            Dict mit Infos inkl. Speichergröße und Kompressionsrate, oder None
         """
-        if not self.package_exists(campaign_id):
+        entry = self.backend.current(campaign_id)
+        if entry is not None:
+            info = self._entry_info(campaign_id, entry)
+            info["storage"]["versions"] = len(self.backend.history(campaign_id))
+            return info
+        
+        path = self._legacy_path(campaign_id)
+        if not path.exists():
             return None
         
         try:
             package = self.load_package(campaign_id)
+            size = path.stat().st_size
             
             return {
                 "campaign_id": campaign_id,
-                "company_name": package.get('company_name', ''),
-                "campaign_name": package.get('campaign_name', ''),
                 "created_at": package.get('created_at', ''),
-                "question_count": len(package.get('questions', {}).get('questions', [])),
-                "template_sizes": {
-                    phase: len(template) 
-                    for phase, template in package.get('kb_templates', {}).items()
+                **package_summary(package),
+                "storage": {
+                    "format": "legacy_json",
+                    "codec": "none",
+                    "raw_bytes": size,
+                    "stored_bytes": size,
+                    "ratio": 1.0,
+                    "versions": 1,
+                    "path": str(path)
                 }
             }
         except Exception:
             return None
     
+    def _entry_info(self, campaign_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Infos aus einem Versions-Eintrag des Backends (ohne Package zu laden)"""
+        return {
+            "campaign_id": campaign_id,
+            "company_name": entry.get('company_name', ''),
+            "campaign_name": entry.get('campaign_name', ''),
+            "created_at": entry.get('created_at') or '',
+            "question_count": entry.get('question_count', 0),
+            "template_sizes": entry.get('template_sizes', {}),
+            "storage": {
+                "format": self.backend.format,
+                "hash": entry['hash'],
+                "codec": entry['codec'],
+                "raw_bytes": entry['raw_bytes'],
+                "stored_bytes": entry['stored_bytes'],
+                "ratio": round(entry['raw_bytes'] / entry['stored_bytes'], 2) if entry['stored_bytes'] else None,
+                "path": self.backend.location(entry)
+            }
+        }
+    
+    @staticmethod
+    def _get_upload_session():
+        """
+        Gepoolte requests-Session für synchrone Uploads (CLI-Skripte).
+        
+        Wiederholt bei 429/5xx mit exponentiellem Backoff.
+        Der Webhook-Server nutzt stattdessen den async HOCUploader.
+        """
+        global _upload_session
+        if _upload_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            retry_strategy = Retry(
+                total=3,
+                backoff_factor=1,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"]
+            )
+            adapter = HTTPAdapter(max_retries=retry_strategy)
+            _upload_session = requests.Session()
+            _upload_session.mount("https://", adapter)
+            _upload_session.mount("http://", adapter)
+        return _upload_session
+    
     def upload_to_hoc(
         self,
         package: Dict[str, Any],
@@ -193,6 +428,7 @@ class CampaignStorage:
             requests.HTTPError: Bei Upload-Fehler
         """
         import requests
+        from .hoc_uploader import encode_package
         
         campaign_id = package['campaign_id']
         endpoint = f"{hoc_api_url}/campaigns/{campaign_id}/package"
@@ -200,12 +436,13 @@ class CampaignStorage:
         print(f"📤 Upload Package zu HOC: {endpoint}")
         
         try:
-            response = requests.post(
+            response = self._get_upload_session().post(
                 endpoint,
-                json=package,
+                data=encode_package(package),
                 headers={
                     'Authorization': f'Bearer {hoc_api_key}',
-                    'Content-Type': 'application/json'
+                    'Content-Type': 'application/json',
+                    'Content-Encoding': 'gzip'
                 },
                 timeout=30
             )
@@ -0,0 +1,321 @@
+"""HOC Uploader - Asynchroner, gepoolter Package-Upload mit Retry und Outbox"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from ..utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Status-Codes, bei denen ein erneuter Versuch sinnvoll ist
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def encode_package(package: Dict[str, Any]) -> bytes:
+    """Serialisiert ein Package als gzip-komprimiertes JSON"""
+    return gzip.compress(json_codec.dumps(package), compresslevel=6)
+
+
+def backoff_delay(attempt: int, base: float, cap: float = 30.0) -> float:
+    """
+    Exponentielles Backoff mit Full Jitter.
+
+    Args:
+        attempt: Nummer des fehlgeschlagenen Versuchs (1-basiert)
+        base: Basis-Wartezeit in Sekunden
+        cap: Obergrenze in Sekunden
+
+    Returns:
+        Zufällige Wartezeit zwischen 0 und min(cap, base * 2^(attempt-1))
+    """
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class UploadOutbox:
+    """
+    Dauerhafte Warteschlange für fehlgeschlagene Uploads.
+
+    Pro Kampagne liegt höchstens ein Eintrag im Outbox-Verzeichnis
+    (neuere Packages ersetzen ältere): {campaign_id}.json.gz mit dem
+    fertigen Request-Body und {campaign_id}.meta.json mit dem Retry-Zustand.
+    """
+
+    def __init__(self, outbox_dir: str):
+        """
+        Args:
+            outbox_dir: Verzeichnis für ausstehende Uploads
+        """
+        self.outbox_dir = Path(outbox_dir)
+        self.outbox_dir.mkdir(parents=True, exist_ok=True)
+
+    def put(self, campaign_id: str, body: bytes, error: str) -> None:
+        """Legt einen Upload ab (überschreibt vorhandenen Eintrag der Kampagne)"""
+        self._write_atomic(self._body_path(campaign_id), body)
+        self.save_meta(campaign_id, {
+            "campaign_id": campaign_id,
+            "attempts": 0,
+            "next_attempt_at": time.time(),
+            "last_error": error,
+            "queued_at": time.time()
+        })
+
+    def save_meta(self, campaign_id: str, meta: Dict[str, Any]) -> None:
+        """Speichert den Retry-Zustand eines Eintrags"""
+        self._write_atomic(
+            self._meta_path(campaign_id),
+            json_codec.dumps(meta)
+        )
+
+    def due(self, now: Optional[float] = None) -> list:
+        """Gibt alle fälligen Einträge (Meta-Dicts) zurück"""
+        now = time.time() if now is None else now
+        entries = []
+        for meta_path in self.outbox_dir.glob("*.meta.json"):
+            try:
+                meta = json_codec.load_file(meta_path)
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Outbox-Eintrag unlesbar: {meta_path}: {e}")
+                continue
+            if meta.get('next_attempt_at', 0) <= now:
+                entries.append(meta)
+        return entries
+
+    def load_body(self, campaign_id: str) -> bytes:
+        """Lädt den komprimierten Request-Body"""
+        return self._body_path(campaign_id).read_bytes()
+
+    def remove(self, campaign_id: str, queued_at: Optional[float] = None) -> None:
+        """
+        Entfernt einen erfolgreich hochgeladenen Eintrag.
+
+        Args:
+            campaign_id: Campaign ID
+            queued_at: Nur entfernen, wenn der Eintrag nicht zwischenzeitlich
+                       durch ein neueres Package ersetzt wurde
+        """
+        if queued_at is not None:
+            try:
+                current = json_codec.load_file(self._meta_path(campaign_id))
+            except (OSError, json.JSONDecodeError):
+                return
+            if current.get('queued_at') != queued_at:
+                return
+        for path in (self._body_path(campaign_id), self._meta_path(campaign_id)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.outbox_dir.glob("*.meta.json"))
+
+    def _body_path(self, campaign_id: str) -> Path:
+        return self.outbox_dir / f"{campaign_id}.json.gz"
+
+    def _meta_path(self, campaign_id: str) -> Path:
+        return self.outbox_dir / f"{campaign_id}.meta.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+def _download_url(response: httpx.Response, endpoint: str) -> str:
+    """download_url aus der Antwort; leerer/Nicht-JSON-Body (z.B. 201/204) → endpoint"""
+    try:
+        payload = response.json()
+    except ValueError:
+        return endpoint
+    if isinstance(payload, dict) and payload.get('download_url'):
+        return payload['download_url']
+    return endpoint
+
+
+class HOCUploader:
+    """
+    Asynchroner Upload von Campaign Packages zu HOC.
+
+    - Ein persistenter httpx.AsyncClient (Connection Pooling, Keep-Alive)
+    - gzip-komprimierter Request-Body
+    - Retry mit exponentiellem Backoff + Jitter bei 5xx/429/Timeouts
+    - Fehlgeschlagene Uploads landen in der Outbox und werden im
+      Hintergrund erneut versucht (run_outbox_worker)
+    """
+
+    def __init__(
+        self,
+        hoc_api_url: str,
+        hoc_api_key: str,
+        outbox_dir: str = "campaign_packages/_outbox",
+        max_attempts: int = 4,
+        backoff_base: float = 1.0,
+        timeout_seconds: float = 30.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Args:
+            hoc_api_url: HOC API Base URL
+            hoc_api_key: HOC API Key
+            outbox_dir: Verzeichnis der Outbox
+            max_attempts: Versuche pro Upload (inkl. erstem Versuch)
+            backoff_base: Basis-Wartezeit für Backoff in Sekunden
+            timeout_seconds: Timeout pro Request
+            transport: Optional httpx Transport (für Tests)
+        """
+        self.hoc_api_url = hoc_api_url.rstrip('/')
+        self.hoc_api_key = hoc_api_key
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.timeout_seconds = timeout_seconds
+        self.outbox = UploadOutbox(outbox_dir)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Erstellt den gepoolten Client beim ersten Gebrauch"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers={
+                    'Authorization': f'Bearer {self.hoc_api_key}',
+                    'Content-Type': 'application/json',
+                    'Content-Encoding': 'gzip'
+                },
+                transport=self._transport
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Schließt den HTTP-Client (beim Server-Shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def upload(self, package: Dict[str, Any]) -> str:
+        """
+        Uploaded ein Package mit Retries.
+
+        Args:
+            package: Campaign Package
+
+        Returns:
+            Download URL
+
+        Raises:
+            IOError: Wenn alle Versuche fehlschlagen
+        """
+        body = await asyncio.to_thread(encode_package, package)
+        return await self._upload_body(str(package['campaign_id']), body)
+
+    async def upload_or_enqueue(self, package: Dict[str, Any]) -> Optional[str]:
+        """
+        Uploaded ein Package; bei endgültigem Fehlschlag landet es in der Outbox.
+
+        Returns:
+            Download URL oder None wenn der Upload in die Outbox verschoben wurde
+        """
+        campaign_id = str(package['campaign_id'])
+        body = await asyncio.to_thread(encode_package, package)
+
+        try:
+            return await self._upload_body(campaign_id, body)
+        except IOError as e:
+            await asyncio.to_thread(self.outbox.put, campaign_id, body, str(e))
+            logger.warning(f"HOC Upload für {campaign_id} in Outbox verschoben: {e}")
+            return None
+
+    async def _upload_body(self, campaign_id: str, body: bytes) -> str:
+        """Sendet einen fertigen Body, wiederholt bei transienten Fehlern"""
+        endpoint = f"{self.hoc_api_url}/campaigns/{campaign_id}/package"
+        client = self._get_client()
+        last_error = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                response = await client.post(endpoint, content=body)
+
+                if response.status_code in RETRYABLE_STATUS:
+                    last_error = f"HTTP {response.status_code}"
+                elif response.status_code >= 400:
+                    # Client-Fehler: Wiederholen bringt nichts
+                    raise IOError(f"HOC Upload HTTP-Fehler {response.status_code}: {response.text}")
+                else:
+                    download_url = _download_url(response, endpoint)
+                    logger.info(f"HOC Upload erfolgreich ({len(body)} Bytes gzip): {download_url}")
+                    return download_url
+
+            except httpx.TimeoutException:
+                last_error = f"Timeout (>{self.timeout_seconds}s)"
+            except httpx.TransportError as e:
+                last_error = f"Verbindungsfehler: {e}"
+
+            if attempt < self.max_attempts:
+                delay = backoff_delay(attempt, self.backoff_base)
+                logger.warning(
+                    f"HOC Upload {campaign_id} Versuch {attempt}/{self.max_attempts} "
+                    f"fehlgeschlagen ({last_error}) - neuer Versuch in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        raise IOError(f"HOC Upload fehlgeschlagen nach {self.max_attempts} Versuchen: {last_error}")
+
+    async def flush_outbox(self) -> int:
+        """
+        Versucht alle fälligen Outbox-Einträge erneut.
+
+        Returns:
+            Anzahl erfolgreich hochgeladener Einträge
+        """
+        uploaded = 0
+        for meta in await asyncio.to_thread(self.outbox.due):
+            campaign_id = meta['campaign_id']
+            try:
+                body = await asyncio.to_thread(self.outbox.load_body, campaign_id)
+                await self._upload_body(campaign_id, body)
+                await asyncio.to_thread(self.outbox.remove, campaign_id, meta.get('queued_at'))
+                uploaded += 1
+                logger.info(f"Outbox: Package {campaign_id} nachträglich hochgeladen")
+            except (IOError, OSError) as e:
+                meta['attempts'] = meta.get('attempts', 0) + 1
+                meta['last_error'] = str(e)
+                meta['next_attempt_at'] = time.time() + backoff_delay(
+                    meta['attempts'], self.backoff_base * 30, cap=3600
+                ) + self.backoff_base
+                await asyncio.to_thread(self.outbox.save_meta, campaign_id, meta)
+        return uploaded
+
+    async def run_outbox_worker(
+        self,
+        interval_seconds: float = 60.0,
+        is_leader: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> None:
+        """
+        Hintergrund-Loop: leert die Outbox periodisch (bis zur Cancellation).
+        
+        Args:
+            interval_seconds: Abstand der Durchläufe
+            is_leader: Optional - nur wenn True leert dieser Worker die Outbox
+                (verhindert doppelte Uploads bei mehreren Workern)
+        """
+        while True:
+            try:
+                if is_leader is None or await is_leader():
+                    await self.flush_outbox()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Outbox-Worker Fehler: {e}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
@@ -0,0 +1,335 @@
+"""Job Leases - Koordination von Jobs über mehrere Worker-Prozesse (SQLite)
+
+Mehrere uvicorn Worker oder Nodes teilen sich eine SQLite-Datei. Ein Job
+(z.B. der Build eines Campaign Packages) wird per Lease beansprucht, während
+der Ausführung per Heartbeat verlängert und als erledigt markiert. Stirbt
+der Worker, läuft die Lease ab und ein anderer Worker übernimmt.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Ergebnis von acquire()
+ACQUIRED = "acquired"
+RUNNING = "running"
+DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_leases (
+    name TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    owner TEXT,
+    expires REAL,
+    fingerprint TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at REAL,
+    finished_at REAL,
+    last_error TEXT,
+    result TEXT
+);
+"""
+
+
+def default_worker_id() -> str:
+    """Eindeutige Worker-Kennung: host:pid:zufall"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class _ImmediateTransaction:
+    """Schreib-Transaktion, die die DB sofort sperrt (serialisiert Lease-Vergabe über Prozesse)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class LeaseTimeout(TimeoutError):
+    """Job wurde innerhalb der Wartezeit von keinem Worker abgeschlossen"""
+
+
+class LeaseLost(RuntimeError):
+    """Lease ging während der Ausführung an einen anderen Worker - Job wurde abgebrochen"""
+
+
+class JobLeaseStore:
+    """
+    Leases für benannte Jobs in einer geteilten SQLite-Datei.
+
+    - acquire() vergibt einen Job an genau einen Worker; abgelaufene Leases
+      (abgestürzter Worker) werden übernommen
+    - Ein erledigter Job mit gleichem Fingerprint wird nicht erneut
+      ausgeführt (außer mit force)
+    - run_once() kapselt acquire/Heartbeat/complete bzw. das Warten auf den
+      Worker, der den Job gerade ausführt
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 60.0):
+        """
+        Args:
+            path: SQLite-Datei (von allen Workern geteilt)
+            lease_seconds: Gültigkeit einer Lease ohne Heartbeat
+        """
+        self.path = Path(path)
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread, Transaktionen explizit (BEGIN IMMEDIATE)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn())
+
+    def acquire(
+        self,
+        name: str,
+        owner: str,
+        fingerprint: str = "",
+        force: bool = False,
+        now: Optional[float] = None
+    ) -> str:
+        """
+        Versucht, den Job zu beanspruchen.
+
+        Args:
+            name: Job-Name (z.B. 'campaign_setup:123')
+            owner: Worker-Kennung
+            fingerprint: Inhalt des Jobs; erledigte Jobs mit gleichem Fingerprint werden wiederverwendet
+            force: Erledigten Job trotzdem neu ausführen
+            now: Zeitpunkt (für Tests)
+
+        Returns:
+            ACQUIRED (Job gehört diesem Worker), RUNNING (anderer Worker hält
+            eine gültige Lease) oder DONE (bereits erledigt)
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute("SELECT * FROM job_leases WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                if row["status"] == "running" and row["owner"] != owner and row["expires"] > now:
+                    return RUNNING
+                if row["status"] == "done" and row["fingerprint"] == fingerprint and not force:
+                    return DONE
+                if row["status"] == "running" and row["owner"] != owner:
+                    logger.warning(
+                        f"Lease {name} von {row['owner']} abgelaufen - übernommen von {owner}"
+                    )
+
+            conn.execute(
+                """
+                INSERT INTO job_leases (name, status, owner, expires, fingerprint, attempts, started_at)
+                VALUES (?, 'running', ?, ?, ?, 1, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    status = 'running', owner = excluded.owner, expires = excluded.expires,
+                    fingerprint = excluded.fingerprint, attempts = job_leases.attempts + 1,
+                    started_at = excluded.started_at, finished_at = NULL, last_error = NULL
+                """,
+                (name, owner, now + self.lease_seconds, fingerprint, now)
+            )
+        return ACQUIRED
+
+    def heartbeat(self, name: str, owner: str, now: Optional[float] = None) -> bool:
+        """Verlängert die Lease; False, wenn sie inzwischen einem anderen Worker gehört"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE job_leases SET expires = ? WHERE name = ? AND owner = ? AND status = 'running'",
+                (now + self.lease_seconds, name, owner)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, name: str, owner: str, result: Any = None, now: Optional[float] = None) -> bool:
+        """Markiert den Job als erledigt (nur durch den Lease-Inhaber)"""
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE job_leases SET status = 'done', owner = NULL, expires = NULL,
+                    finished_at = ?, result = ?
+                WHERE name = ? AND owner = ? AND status = 'running'
+                """,
+                (now, json.dumps(result, ensure_ascii=False, default=str), name, owner)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, name: str, owner: str, error: Optional[str] = None) -> bool:
+        """Gibt die Lease nach einem Fehler frei - der nächste Worker darf es erneut versuchen"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE job_leases SET status = 'failed', owner = NULL, expires = NULL,
+                    finished_at = ?, last_error = ?
+                WHERE name = ? AND owner = ? AND status = 'running'
+                """,
+                (time.time(), error, name, owner)
+            )
+        return cursor.rowcount == 1
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM job_leases WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Anzahl Jobs pro Status inkl. abgelaufener Leases (für /health)"""
+        now = time.time() if now is None else now
+        conn = self._conn()
+        jobs = dict(conn.execute("SELECT status, COUNT(*) FROM job_leases GROUP BY status").fetchall())
+        expired = conn.execute(
+            "SELECT COUNT(*) FROM job_leases WHERE status = 'running' AND expires <= ?", (now,)
+        ).fetchone()[0]
+        return {"jobs": jobs, "expired_leases": expired, "lease_seconds": self.lease_seconds}
+
+    async def run_once(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[Any]],
+        owner: Optional[str] = None,
+        fingerprint: str = "",
+        force: bool = False,
+        wait_timeout: float = 600.0,
+        poll_interval: float = 0.5,
+        verify_done: Optional[Callable[[Any], bool]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Führt den Job genau einmal über alle Worker aus.
+
+        Hält ein anderer Worker die Lease, wird auf dessen Ergebnis gewartet.
+        Ein force gilt nur für Builds, die vor diesem Aufruf gestartet wurden:
+        nach dem Warten auf einen laufenden Build wird dessen Ergebnis genutzt.
+
+        Mit verify_done wird ein erledigter Job nur übernommen, wenn sein
+        Ergebnis tatsächlich vorliegt (z.B. das Package gespeichert ist).
+        Fehlt es noch eine Lease-Dauer nach Abschluss, gilt der Job als
+        verloren (Worker abgestürzt, bevor er speichern konnte) und wird neu
+        ausgeführt. Geht die Lease während der Ausführung verloren, wird der
+        Job abgebrochen (LeaseLost).
+
+        Args:
+            name: Job-Name
+            job: Coroutine-Factory, liefert das (JSON-serialisierbare) Ergebnis
+            owner: Worker-Kennung (default: neue Kennung pro Aufruf)
+            fingerprint: Inhalt des Jobs
+            force: Erledigten Job neu ausführen
+            wait_timeout: Max. Wartezeit auf einen fremden Worker
+            poll_interval: Abstand der Statusabfragen beim Warten
+            verify_done: Prüft (im Thread-Pool) das Ergebnis eines erledigten Jobs
+
+        Returns:
+            (Ergebnis, True wenn dieser Aufruf den Job ausgeführt hat)
+
+        Raises:
+            LeaseTimeout: Fremder Worker wurde nicht rechtzeitig fertig
+            LeaseLost: Lease ging während der eigenen Ausführung verloren
+        """
+        owner = owner or default_worker_id()
+        deadline = time.monotonic() + wait_timeout
+
+        while True:
+            state = await asyncio.to_thread(self.acquire, name, owner, fingerprint, force)
+            if state == ACQUIRED:
+                return await self._run_with_heartbeat(name, owner, job), True
+            if state == DONE:
+                record = await asyncio.to_thread(self.get, name)
+                if verify_done is None or await asyncio.to_thread(verify_done, record["result"]):
+                    return record["result"], False
+                if time.time() - (record["finished_at"] or 0.0) >= self.lease_seconds:
+                    logger.warning(f"Job {name}: als erledigt markiert, Ergebnis fehlt - wird neu ausgeführt")
+                    force = True
+                    continue
+            else:
+                force = False
+
+            if time.monotonic() >= deadline:
+                raise LeaseTimeout(f"Job {name} nach {wait_timeout:.0f}s nicht abgeschlossen")
+            await asyncio.sleep(poll_interval)
+
+    async def _run_with_heartbeat(self, name: str, owner: str, job: Callable[[], Awaitable[Any]]) -> Any:
+        job_task = asyncio.ensure_future(job())
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat_loop(name, owner, job_task, lost))
+        try:
+            result = await job_task
+        except asyncio.CancelledError:
+            if lost.is_set():
+                raise LeaseLost(f"Job {name}: Lease verloren, Ausführung abgebrochen")
+            await asyncio.to_thread(self.release, name, owner, "abgebrochen")
+            raise
+        except BaseException as e:
+            await asyncio.to_thread(self.release, name, owner, f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            heartbeat.cancel()
+
+        if not await asyncio.to_thread(self.complete, name, owner, result):
+            logger.warning(f"Job {name}: Lease während der Ausführung verloren")
+        return result
+
+    async def _heartbeat_loop(self, name: str, owner: str, job_task: asyncio.Future, lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await asyncio.to_thread(self.heartbeat, name, owner):
+                # Ein anderer Worker führt den Job jetzt aus - nicht doppelt speichern
+                logger.warning(f"Job {name}: Heartbeat abgelehnt, Lease gehört nicht mehr {owner} - Abbruch")
+                lost.set()
+                job_task.cancel()
+                return
+
+    def hold(self, name: str, owner: str, now: Optional[float] = None) -> bool:
+        """
+        Leader-Lease für periodische Hintergrund-Jobs: beansprucht oder
+        verlängert die Lease. Nur der Inhaber führt den Job aus.
+        """
+        if self.heartbeat(name, owner, now=now):
+            return True
+        return self.acquire(name, owner, force=True, now=now) == ACQUIRED
+
+
+# Singleton-Instanz
+_job_lease_store: Optional[JobLeaseStore] = None
+_job_lease_store_lock = threading.Lock()
+
+
+def get_job_lease_store() -> JobLeaseStore:
+    """Gibt den prozessweiten Lease Store zurück (konfiguriert über Settings)"""
+    global _job_lease_store
+    with _job_lease_store_lock:
+        if _job_lease_store is None:
+            settings = get_settings()
+            _job_lease_store = JobLeaseStore(
+                settings.job_lease_path,
+                lease_seconds=settings.job_lease_seconds
+            )
+        return _job_lease_store
@@ -0,0 +1,117 @@
+"""Abstract Base Class für Package Backends
+
+CampaignStorage speichert über ein austauschbares Backend:
+
+- PackageBlobStore (package_store.py): Blob-Dateien + Pointer pro Kampagne
+- SQLitePackageStore (sqlite_package_store.py): eine SQLite-Datei (WAL),
+  indizierte Metadaten, Abschnitte einzeln komprimiert
+
+Beide liefern dieselben Versions-Einträge (hash, codec, Größen, Metadaten).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class PackageBackend(ABC):
+    """
+    Abstract interface für die Ablage von Campaign Packages mit Versionshistorie.
+
+    Die letzte Version der Historie ist die aktuelle. get_sections() und
+    list_current() haben einfache Default-Implementierungen; Backends mit
+    Index bzw. getrennt gespeicherten Abschnitten überschreiben sie.
+    """
+
+    # Kennung für get_package_info()["storage"]["format"]
+    format = "abstract"
+
+    @abstractmethod
+    def put(self, campaign_id: str, package: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Speichert ein Package als neue aktuelle Version (falls geändert).
+
+        Returns:
+            Versions-Eintrag
+        """
+        pass
+
+    @abstractmethod
+    def get(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lädt die aktuelle (oder eine bestimmte) Version.
+
+        Raises:
+            FileNotFoundError: Kampagne bzw. Version nicht vorhanden
+        """
+        pass
+
+    @abstractmethod
+    def current(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Versions-Eintrag der aktuellen Version (ohne das Package zu laden)"""
+        pass
+
+    @abstractmethod
+    def history(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Alle gemerkten Versionen, älteste zuerst"""
+        pass
+
+    @abstractmethod
+    def rollback(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Macht eine frühere Version wieder zur aktuellen.
+
+        Raises:
+            FileNotFoundError: Keine passende frühere Version
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, campaign_id: str) -> bool:
+        """Entfernt die Kampagne (True wenn vorhanden)"""
+        pass
+
+    @abstractmethod
+    def campaign_ids(self) -> List[str]:
+        """Sortierte IDs aller gespeicherten Kampagnen"""
+        pass
+
+    @abstractmethod
+    def collect_garbage(self, min_age_seconds: float = 3600.0) -> int:
+        """Löscht nicht mehr referenzierte Package-Inhalte, liefert die Anzahl"""
+        pass
+
+    @abstractmethod
+    def location(self, entry: Dict[str, Any]) -> str:
+        """Speicherort einer Version (Datei bzw. Datenbank) für Infos/Logs"""
+        pass
+
+    def get_sections(
+        self,
+        campaign_id: str,
+        sections: Iterable[str],
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Lädt nur einzelne Top-Level-Felder eines Packages (z.B. 'questions').
+
+        Fehlende Felder sind im Ergebnis nicht enthalten.
+        """
+        package = self.get(campaign_id, version)
+        return {section: package[section] for section in sections if section in package}
+
+    def list_current(self, company_name: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Aktuelle Versions-Einträge aller Kampagnen.
+
+        Args:
+            company_name: Nur Kampagnen dieses Unternehmens
+        """
+        entries = []
+        for campaign_id in self.campaign_ids():
+            entry = self.current(campaign_id)
+            if entry is None:
+                continue
+            if company_name is not None and entry.get("company_name") != company_name:
+                continue
+            entries.append((campaign_id, entry))
+        return entries
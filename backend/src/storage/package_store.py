@@ -0,0 +1,331 @@
+"""Package Store - komprimierte, inhaltsadressierte Ablage von Campaign Packages
+
+Layout unter dem Storage-Verzeichnis:
+
+    blobs/ab/abcdef...       komprimiertes JSON (zstd falls installiert, sonst gzip)
+    refs/<campaign_id>.json  Pointer: aktuelle Version + Historie für Rollback
+
+Der Blob-Name ist der SHA-256 des kompakten JSON ohne flüchtige Felder
+(created_at). Ein unveränderter Rebuild erzeugt denselben Hash und schreibt
+nichts; identische Packages verschiedener Kampagnen liegen nur einmal vor.
+"""
+
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils import json_codec
+from .package_backend import PackageBackend
+
+try:
+    import zstandard
+except ImportError:  # optionale Abhängigkeit
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Sperre
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Felder, die sich bei jedem Build ändern und nicht zum Inhalt zählen
+VOLATILE_FIELDS = ("created_at",)
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Prozessweite Sperren pro Pointer-Datei (ergänzt durch flock über Prozesse)
+_ref_locks: Dict[str, threading.Lock] = {}
+_ref_locks_guard = threading.Lock()
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = False) -> None:
+    """
+    Schreibt eine Datei atomar: Temp-Datei im selben Verzeichnis, dann rename.
+
+    Leser sehen immer entweder die alte oder die neue, nie eine halbe Datei.
+
+    Args:
+        path: Zieldatei
+        data: Inhalt
+        fsync: Daten und Verzeichniseintrag vor dem Rückgabe auf die Platte
+               zwingen (übersteht auch Stromausfall)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if fsync and os.name != "nt":
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def content_digest(package: Dict[str, Any]) -> str:
+    """Inhalts-Hash eines Packages (ohne flüchtige Felder) = Blob-Name"""
+    return hashlib.sha256(_content_bytes(package)).hexdigest()
+
+
+def _content_bytes(package: Dict[str, Any]) -> bytes:
+    return json_codec.dumps({k: v for k, v in package.items() if k not in VOLATILE_FIELDS})
+
+
+def compress(data: bytes) -> tuple:
+    """
+    Komprimiert mit zstd (falls installiert), sonst gzip.
+
+    Returns:
+        (codec, komprimierte Bytes)
+    """
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=10).compress(data)
+    return "gzip", gzip.compress(data, compresslevel=6)
+
+
+def decompress(data: bytes) -> bytes:
+    """Dekomprimiert anhand der Magic Bytes (zstd, gzip oder unkomprimiert)"""
+    if data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise IOError("Package ist zstd-komprimiert, aber 'zstandard' ist nicht installiert")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if data[:2] == _GZIP_MAGIC:
+        return gzip.decompress(data)
+    return data
+
+
+def package_summary(package: Dict[str, Any]) -> Dict[str, Any]:
+    """Felder für Listen/Infos, die ohne Dekomprimieren verfügbar sein sollen"""
+    return {
+        "company_name": package.get("company_name", ""),
+        "campaign_name": package.get("campaign_name", ""),
+        "question_count": len((package.get("questions") or {}).get("questions", [])),
+        "template_sizes": {
+            phase: len(template)
+            for phase, template in (package.get("kb_templates") or {}).items()
+        }
+    }
+
+
+class PackageBlobStore(PackageBackend):
+    """
+    Inhaltsadressierte Blobs + Pointer-Datei pro Kampagne.
+
+    Die letzte Version in der Historie des Pointers ist die aktuelle.
+    Blobs werden nie überschrieben; nicht mehr referenzierte Blobs entfernt
+    collect_garbage().
+    """
+
+    format = "blob"
+
+    def __init__(self, root: str, history_limit: int = 20, fsync: bool = False):
+        """
+        Args:
+            root: Storage-Verzeichnis (blobs/ und refs/ darunter)
+            history_limit: Max. gemerkte Versionen pro Kampagne
+            fsync: Jeden Schreibvorgang mit fsync absichern
+        """
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.ref_dir = self.root / "refs"
+        self.history_limit = history_limit
+        self.fsync = fsync
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.ref_dir.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest
+
+    def ref_path(self, campaign_id: str) -> Path:
+        return self.ref_dir / f"{campaign_id}.json"
+
+    @contextmanager
+    def locked(self, campaign_id: str) -> Iterator[None]:
+        """
+        Schreibsperre pro Kampagne: Threads dieses Prozesses und (wo flock
+        verfügbar ist) andere Prozesse ändern den Pointer nacheinander.
+        """
+        lock_path = self.ref_dir / f"{campaign_id}.lock"
+        key = str(lock_path.resolve())
+        with _ref_locks_guard:
+            lock = _ref_locks.setdefault(key, threading.Lock())
+        with lock:
+            if fcntl is None:
+                yield
+                return
+            with open(lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def put(self, campaign_id: str, package: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Speichert ein Package als neue aktuelle Version (falls geändert).
+
+        Returns:
+            Versions-Eintrag (hash, codec, Größen, Zusammenfassung)
+        """
+        raw = _content_bytes(package)
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self.locked(campaign_id):
+            ref = self.read_ref(campaign_id) or {"campaign_id": campaign_id, "versions": []}
+            versions = ref["versions"]
+            if versions and versions[-1]["hash"] == digest and self.blob_path(digest).exists():
+                return versions[-1]
+
+            # Blob vor dem Pointer schreiben: ein Pointer zeigt nie ins Leere
+            blob_path = self.blob_path(digest)
+            if blob_path.exists():
+                codec, stored_bytes = self._codec_of(blob_path), blob_path.stat().st_size
+            else:
+                codec, blob = compress(raw)
+                atomic_write(blob_path, blob, self.fsync)
+                stored_bytes = len(blob)
+
+            entry = {
+                "hash": digest,
+                "codec": codec,
+                "raw_bytes": len(raw),
+                "stored_bytes": stored_bytes,
+                "created_at": package.get("created_at"),
+                "saved_at": time.time(),
+                **package_summary(package)
+            }
+            versions.append(entry)
+            ref["versions"] = versions[-self.history_limit:]
+            atomic_write(self.ref_path(campaign_id), json_codec.dumps(ref), self.fsync)
+        return entry
+
+    def get(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lädt die aktuelle (oder eine bestimmte) Version.
+
+        Args:
+            campaign_id: Campaign ID
+            version: Hash (oder Präfix) einer Version aus der Historie
+
+        Raises:
+            FileNotFoundError: Kein Pointer bzw. Version nicht in der Historie
+        """
+        entry = self.current(campaign_id) if version is None else self._find(campaign_id, version)
+        if entry is None:
+            raise FileNotFoundError(f"Version {version or 'aktuell'} für Kampagne {campaign_id} nicht gefunden")
+        package = json_codec.loads(decompress(self.blob_path(entry["hash"]).read_bytes()))
+        for field in VOLATILE_FIELDS:
+            if entry.get(field) is not None:
+                package[field] = entry[field]
+        return package
+
+    def read_ref(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        path = self.ref_path(campaign_id)
+        if not path.exists():
+            return None
+        return json_codec.load_file(path)
+
+    def current(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        """Versions-Eintrag der aktuellen Version (ohne Blob zu lesen)"""
+        ref = self.read_ref(campaign_id)
+        return ref["versions"][-1] if ref and ref["versions"] else None
+
+    def history(self, campaign_id: str) -> List[Dict[str, Any]]:
+        """Alle gemerkten Versionen, älteste zuerst"""
+        ref = self.read_ref(campaign_id)
+        return list(ref["versions"]) if ref else []
+
+    def rollback(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Macht eine frühere Version wieder zur aktuellen (als neuer Historien-Eintrag).
+
+        Args:
+            campaign_id: Campaign ID
+            version: Ziel-Hash (oder Präfix); default = letzte abweichende Version
+
+        Raises:
+            FileNotFoundError: Keine passende frühere Version
+        """
+        with self.locked(campaign_id):
+            ref = self.read_ref(campaign_id)
+            versions = ref["versions"] if ref else []
+            if version is None:
+                current_hash = versions[-1]["hash"] if versions else None
+                target = next((v for v in reversed(versions) if v["hash"] != current_hash), None)
+            else:
+                target = self._find(campaign_id, version)
+            if target is None or not self.blob_path(target["hash"]).exists():
+                raise FileNotFoundError(f"Keine frühere Version für Kampagne {campaign_id} verfügbar")
+
+            entry = dict(target, saved_at=time.time(), rollback=True)
+            versions.append(entry)
+            ref["versions"] = versions[-self.history_limit:]
+            atomic_write(self.ref_path(campaign_id), json_codec.dumps(ref), self.fsync)
+        logger.info(f"Package {campaign_id} auf Version {target['hash'][:12]} zurückgesetzt")
+        return entry
+
+    def delete(self, campaign_id: str) -> bool:
+        """Entfernt den Pointer (Blobs räumt collect_garbage() auf)"""
+        with self.locked(campaign_id):
+            try:
+                self.ref_path(campaign_id).unlink()
+                return True
+            except FileNotFoundError:
+                return False
+
+    def campaign_ids(self) -> List[str]:
+        return sorted(path.stem for path in self.ref_dir.glob("*.json"))
+
+    def location(self, entry: Dict[str, Any]) -> str:
+        return str(self.blob_path(entry["hash"]))
+
+    def collect_garbage(self, min_age_seconds: float = 3600.0) -> int:
+        """
+        Löscht Blobs, die von keinem Pointer (inkl. Historie) referenziert werden.
+
+        Args:
+            min_age_seconds: Jüngere Blobs bleiben (Pointer evtl. noch nicht geschrieben)
+
+        Returns:
+            Anzahl gelöschter Blobs
+        """
+        referenced = {
+            version["hash"]
+            for campaign_id in self.campaign_ids()
+            for version in self.history(campaign_id)
+        }
+        cutoff = time.time() - min_age_seconds
+        removed = 0
+        for blob_path in self.blob_dir.glob("*/*"):
+            if blob_path.name in referenced or blob_path.suffix == ".tmp":
+                continue
+            if blob_path.stat().st_mtime <= cutoff:
+                blob_path.unlink()
+                removed += 1
+        return removed
+
+    def _find(self, campaign_id: str, version: str) -> Optional[Dict[str, Any]]:
+        return next((v for v in reversed(self.history(campaign_id)) if v["hash"].startswith(version)), None)
+
+    @staticmethod
+    def _codec_of(blob_path: Path) -> str:
+        with open(blob_path, "rb") as f:
+            magic = f.read(4)
+        return "zstd" if magic == _ZSTD_MAGIC else "gzip" if magic[:2] == _GZIP_MAGIC else "none"
@@ -0,0 +1,355 @@
+"""SQLite Package Store - Campaign Packages in einer SQLite-Datei (WAL)
+
+Gegenüber den Blob-Dateien:
+
+- Metadaten (Unternehmen, Kampagne, Datum, Anzahl Fragen) als indizierte
+  Spalten: Listen und Filter ohne ein einziges Package zu dekomprimieren
+- Jeder Top-Level-Abschnitt (questions, knowledge_base, ...) wird einzeln
+  komprimiert gespeichert; get_sections() liest nur die angefragten
+- Schreiben in einer Transaktion (BEGIN IMMEDIATE), sicher über mehrere
+  Worker-Prozesse
+
+Inhalte sind wie im Blob Store nach SHA-256 (ohne created_at) adressiert und
+werden zwischen Kampagnen und Versionen geteilt.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..utils import json_codec
+from .job_leases import _ImmediateTransaction
+from .package_backend import PackageBackend
+from .package_store import VOLATILE_FIELDS, _content_bytes, compress, decompress, package_summary
+
+logger = logging.getLogger(__name__)
+
+# Dateiname im Storage-Verzeichnis
+SQLITE_FILENAME = "packages.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS package_contents (
+    hash TEXT PRIMARY KEY,
+    codec TEXT NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    stored_bytes INTEGER NOT NULL,
+    stored_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS package_sections (
+    hash TEXT NOT NULL,
+    section TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (hash, section)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS package_versions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    campaign_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    created_at TEXT,
+    saved_at REAL NOT NULL,
+    company_name TEXT,
+    campaign_name TEXT,
+    question_count INTEGER NOT NULL DEFAULT 0,
+    template_sizes TEXT,
+    rollback INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_package_versions_campaign ON package_versions (campaign_id, id);
+CREATE INDEX IF NOT EXISTS idx_package_versions_hash ON package_versions (hash);
+CREATE TABLE IF NOT EXISTS campaigns (
+    campaign_id TEXT PRIMARY KEY,
+    version_id INTEGER NOT NULL,
+    company_name TEXT,
+    created_at TEXT,
+    saved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_campaigns_company ON campaigns (company_name);
+CREATE INDEX IF NOT EXISTS idx_campaigns_created ON campaigns (created_at);
+"""
+
+_ENTRY_COLUMNS = """
+    v.id, v.campaign_id, v.hash, v.created_at, v.saved_at, v.company_name, v.campaign_name,
+    v.question_count, v.template_sizes, v.rollback, c.codec, c.raw_bytes, c.stored_bytes
+"""
+
+
+class SQLitePackageStore(PackageBackend):
+    """
+    Campaign Packages mit Versionshistorie in einer SQLite-Datei.
+
+    campaigns zeigt auf die aktuelle Zeile in package_versions; die
+    Historie ist auf history_limit Versionen pro Kampagne begrenzt.
+    """
+
+    format = "sqlite"
+
+    def __init__(self, path: str, history_limit: int = 20, fsync: bool = False):
+        """
+        Args:
+            path: SQLite-Datei
+            history_limit: Max. gemerkte Versionen pro Kampagne
+            fsync: synchronous=FULL (jeder Commit auf der Platte) statt NORMAL
+        """
+        self.path = Path(path)
+        self.history_limit = history_limit
+        self.fsync = fsync
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread, Transaktionen explizit (BEGIN IMMEDIATE)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn())
+
+    def put(self, campaign_id: str, package: Dict[str, Any]) -> Dict[str, Any]:
+        raw = _content_bytes(package)
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._transaction() as conn:
+            current = self._current(conn, campaign_id)
+            if current is not None and current["hash"] == digest:
+                return current
+
+            if conn.execute("SELECT 1 FROM package_contents WHERE hash = ?", (digest,)).fetchone() is None:
+                codec, stored_bytes = self._insert_sections(conn, digest, package)
+                conn.execute(
+                    "INSERT INTO package_contents (hash, codec, raw_bytes, stored_bytes, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (digest, codec, len(raw), stored_bytes, time.time())
+                )
+
+            summary = package_summary(package)
+            version_id = self._insert_version(conn, campaign_id, {
+                "hash": digest,
+                "created_at": package.get("created_at"),
+                **summary
+            })
+            return self._entry(conn, version_id)
+
+    def get(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        entry = self._resolve(campaign_id, version)
+        rows = self._conn().execute(
+            "SELECT section, body FROM package_sections WHERE hash = ? ORDER BY position",
+            (entry["hash"],)
+        ).fetchall()
+        package = {row["section"]: json_codec.loads(decompress(row["body"])) for row in rows}
+        for field in VOLATILE_FIELDS:
+            if entry.get(field) is not None:
+                package[field] = entry[field]
+        return package
+
+    def get_sections(
+        self,
+        campaign_id: str,
+        sections: Iterable[str],
+        version: Optional[str] = None
+    ) -> Dict[str, Any]:
+        sections = list(sections)
+        entry = self._resolve(campaign_id, version)
+        placeholders = ",".join("?" * len(sections))
+        rows = self._conn().execute(
+            f"SELECT section, body FROM package_sections WHERE hash = ? AND section IN ({placeholders})",
+            (entry["hash"], *sections)
+        ).fetchall() if sections else []
+        result = {row["section"]: json_codec.loads(decompress(row["body"])) for row in rows}
+        for field in VOLATILE_FIELDS:
+            if field in sections and entry.get(field) is not None:
+                result[field] = entry[field]
+        return {section: result[section] for section in sections if section in result}
+
+    def current(self, campaign_id: str) -> Optional[Dict[str, Any]]:
+        return self._current(self._conn(), campaign_id)
+
+    def history(self, campaign_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM package_versions v JOIN package_contents c ON c.hash = v.hash "
+            "WHERE v.campaign_id = ? ORDER BY v.id",
+            (campaign_id,)
+        ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def rollback(self, campaign_id: str, version: Optional[str] = None) -> Dict[str, Any]:
+        with self._transaction() as conn:
+            current = self._current(conn, campaign_id)
+            if version is None:
+                row = conn.execute(
+                    "SELECT * FROM package_versions WHERE campaign_id = ? AND hash != ? ORDER BY id DESC LIMIT 1",
+                    (campaign_id, current["hash"] if current else "")
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM package_versions WHERE campaign_id = ? AND hash LIKE ? ORDER BY id DESC LIMIT 1",
+                    (campaign_id, f"{version}%")
+                ).fetchone()
+            if row is None:
+                raise FileNotFoundError(f"Keine frühere Version für Kampagne {campaign_id} verfügbar")
+
+            version_id = self._insert_version(conn, campaign_id, {
+                "hash": row["hash"],
+                "created_at": row["created_at"],
+                "company_name": row["company_name"],
+                "campaign_name": row["campaign_name"],
+                "question_count": row["question_count"],
+                "template_sizes": json_codec.loads(row["template_sizes"] or "{}")
+            }, rollback=True)
+            entry = self._entry(conn, version_id)
+        logger.info(f"Package {campaign_id} auf Version {entry['hash'][:12]} zurückgesetzt")
+        return entry
+
+    def delete(self, campaign_id: str) -> bool:
+        """Entfernt Kampagne und Historie (Inhalte räumt collect_garbage() auf)"""
+        with self._transaction() as conn:
+            deleted = conn.execute("DELETE FROM campaigns WHERE campaign_id = ?", (campaign_id,)).rowcount
+            conn.execute("DELETE FROM package_versions WHERE campaign_id = ?", (campaign_id,))
+        return deleted > 0
+
+    def campaign_ids(self) -> List[str]:
+        rows = self._conn().execute("SELECT campaign_id FROM campaigns ORDER BY campaign_id").fetchall()
+        return [row["campaign_id"] for row in rows]
+
+    def list_current(self, company_name: Optional[str] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        where, params = ("WHERE p.company_name = ?", (company_name,)) if company_name is not None else ("", ())
+        rows = self._conn().execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM campaigns p "
+            "JOIN package_versions v ON v.id = p.version_id JOIN package_contents c ON c.hash = v.hash "
+            f"{where} ORDER BY p.campaign_id",
+            params
+        ).fetchall()
+        return [(row["campaign_id"], self._row_to_entry(row)) for row in rows]
+
+    def collect_garbage(self, min_age_seconds: float = 3600.0) -> int:
+        cutoff = time.time() - min_age_seconds
+        with self._transaction() as conn:
+            orphans = [
+                row["hash"] for row in conn.execute(
+                    "SELECT hash FROM package_contents WHERE stored_at <= ? "
+                    "AND hash NOT IN (SELECT hash FROM package_versions)",
+                    (cutoff,)
+                ).fetchall()
+            ]
+            for digest in orphans:
+                conn.execute("DELETE FROM package_sections WHERE hash = ?", (digest,))
+                conn.execute("DELETE FROM package_contents WHERE hash = ?", (digest,))
+        return len(orphans)
+
+    def location(self, entry: Dict[str, Any]) -> str:
+        return str(self.path)
+
+    @staticmethod
+    def _insert_sections(conn: sqlite3.Connection, digest: str, package: Dict[str, Any]) -> Tuple[str, int]:
+        """Schreibt jeden Abschnitt einzeln komprimiert; liefert (codec, gespeicherte Bytes)"""
+        codec, stored_bytes = "none", 0
+        sections = [(k, v) for k, v in package.items() if k not in VOLATILE_FIELDS]
+        for position, (section, value) in enumerate(sections):
+            raw = json_codec.dumps(value)
+            section_codec, body = compress(raw)
+            # Kleine Abschnitte werden durch Kompression größer; JSON beginnt
+            # nie mit den Magic Bytes, decompress() erkennt Rohdaten
+            if len(body) >= len(raw):
+                body = raw
+            else:
+                codec = section_codec
+            conn.execute(
+                "INSERT INTO package_sections (hash, section, position, body) VALUES (?, ?, ?, ?)",
+                (digest, section, position, body)
+            )
+            stored_bytes += len(body)
+        return codec, stored_bytes
+
+    def _insert_version(
+        self,
+        conn: sqlite3.Connection,
+        campaign_id: str,
+        fields: Dict[str, Any],
+        rollback: bool = False
+    ) -> int:
+        """Neue aktuelle Version + Pointer; kürzt die Historie auf history_limit"""
+        now = time.time()
+        version_id = conn.execute(
+            "INSERT INTO package_versions (campaign_id, hash, created_at, saved_at, company_name, "
+            "campaign_name, question_count, template_sizes, rollback) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                campaign_id, fields["hash"], fields.get("created_at"), now,
+                fields.get("company_name", ""), fields.get("campaign_name", ""),
+                fields.get("question_count", 0), json_codec.dumps_str(fields.get("template_sizes", {})),
+                int(rollback)
+            )
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO campaigns (campaign_id, version_id, company_name, created_at, saved_at) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(campaign_id) DO UPDATE SET version_id = excluded.version_id, "
+            "company_name = excluded.company_name, created_at = excluded.created_at, saved_at = excluded.saved_at",
+            (campaign_id, version_id, fields.get("company_name", ""), fields.get("created_at"), now)
+        )
+        conn.execute(
+            "DELETE FROM package_versions WHERE campaign_id = ? AND id NOT IN "
+            "(SELECT id FROM package_versions WHERE campaign_id = ? ORDER BY id DESC LIMIT ?)",
+            (campaign_id, campaign_id, self.history_limit)
+        )
+        return version_id
+
+    def _resolve(self, campaign_id: str, version: Optional[str]) -> Dict[str, Any]:
+        if version is None:
+            entry = self.current(campaign_id)
+        else:
+            row = self._conn().execute(
+                f"SELECT {_ENTRY_COLUMNS} FROM package_versions v JOIN package_contents c ON c.hash = v.hash "
+                "WHERE v.campaign_id = ? AND v.hash LIKE ? ORDER BY v.id DESC LIMIT 1",
+                (campaign_id, f"{version}%")
+            ).fetchone()
+            entry = self._row_to_entry(row) if row else None
+        if entry is None:
+            raise FileNotFoundError(f"Version {version or 'aktuell'} für Kampagne {campaign_id} nicht gefunden")
+        return entry
+
+    def _current(self, conn: sqlite3.Connection, campaign_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM campaigns p "
+            "JOIN package_versions v ON v.id = p.version_id JOIN package_contents c ON c.hash = v.hash "
+            "WHERE p.campaign_id = ?",
+            (campaign_id,)
+        ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def _entry(self, conn: sqlite3.Connection, version_id: int) -> Dict[str, Any]:
+        row = conn.execute(
+            f"SELECT {_ENTRY_COLUMNS} FROM package_versions v JOIN package_contents c ON c.hash = v.hash "
+            "WHERE v.id = ?",
+            (version_id,)
+        ).fetchone()
+        return self._row_to_entry(row)
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> Dict[str, Any]:
+        """Versions-Eintrag im selben Format wie PackageBlobStore"""
+        entry = {
+            "hash": row["hash"],
+            "codec": row["codec"],
+            "raw_bytes": row["raw_bytes"],
+            "stored_bytes": row["stored_bytes"],
+            "created_at": row["created_at"],
+            "saved_at": row["saved_at"],
+            "company_name": row["company_name"] or "",
+            "campaign_name": row["campaign_name"] or "",
+            "question_count": row["question_count"],
+            "template_sizes": json_codec.loads(row["template_sizes"] or "{}")
+        }
+        if row["rollback"]:
+            entry["rollback"] = True
+        return entry
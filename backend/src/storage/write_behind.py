@@ -0,0 +1,235 @@
+"""Write-Behind für Campaign Packages
+
+Der Webhook soll nicht auf Kompression + fsync warten: Packages werden hier
+im Speicher übernommen (ab dann liefert CampaignStorage.load_package sie im
+selben Prozess aus) und von einem Hintergrund-Thread dauerhaft gespeichert.
+
+- Pro Kampagne zählt nur das neueste Package (ältere, noch nicht geschriebene
+  Stände werden übersprungen)
+- Fehlgeschlagene Writes werden mit Backoff wiederholt, ohne andere
+  Kampagnen zu blockieren
+- Beim Beenden (Shutdown-Hook bzw. atexit) wird alles Ausstehende geschrieben
+"""
+
+import atexit
+import copy
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PackageWriteBehind:
+    """
+    Puffer + Writer-Thread für CampaignStorage.save_package().
+
+    Geschrieben wird über die Storage, die das Package übergeben hat (Backend,
+    fsync, history_limit des Aufrufers); ohne Angabe über die Default-Storage.
+    Der Thread startet beim ersten submit() und beendet sich nur über stop().
+    """
+
+    def __init__(self, storage=None, retry_delay: float = 0.5, max_retry_delay: float = 30.0):
+        """
+        Args:
+            storage: Default-CampaignStorage für submit() ohne storage
+            retry_delay: Erste Wartezeit nach einem fehlgeschlagenen Write
+            max_retry_delay: Obergrenze für das exponentielle Backoff
+        """
+        self.storage = storage
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        # campaign_id -> (Package, Storage); Einfügereihenfolge = Schreibreihenfolge
+        self._pending: Dict[str, Tuple[Dict[str, Any], Any]] = {}
+        self._failures: Dict[str, int] = {}
+        self._writing: Optional[str] = None
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {"submitted": 0, "written": 0, "superseded": 0, "errors": 0}
+
+    def submit(self, campaign_id: str, package: Dict[str, Any], storage=None) -> None:
+        """
+        Übernimmt ein Package zum Speichern (kehrt sofort zurück).
+
+        Args:
+            campaign_id: Campaign ID
+            package: Package Dict
+            storage: CampaignStorage, über die geschrieben wird (default: die des Writers)
+
+        Raises:
+            RuntimeError: Writer wurde bereits gestoppt
+            ValueError: Weder storage noch Default-Storage angegeben
+        """
+        storage = storage if storage is not None else self.storage
+        if storage is None:
+            raise ValueError("Package Writer ohne Storage")
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("Package Writer ist gestoppt")
+            if self._pending.pop(campaign_id, None) is not None:
+                self._stats["superseded"] += 1
+            self._pending[campaign_id] = (package, storage)
+            self._stats["submitted"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="package-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def pending(self, campaign_id: str, clone: bool = True) -> Optional[Dict[str, Any]]:
+        """Noch nicht geschriebenes Package einer Kampagne (als Kopie) oder None"""
+        with self._cond:
+            package, _ = self._pending.get(campaign_id, (None, None))
+        return copy.deepcopy(package) if clone and package is not None else package
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wartet bis alle bisher übergebenen Packages geschrieben sind.
+
+        Returns:
+            True wenn nichts mehr aussteht, False bei Timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending or self._writing is not None:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Schreibt Ausstehendes und beendet den Thread.
+
+        Returns:
+            True wenn alles geschrieben wurde
+        """
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        if not flushed:
+            logger.error(f"Package Writer gestoppt, {len(self._pending)} Package(s) nicht geschrieben: "
+                         f"{', '.join(self._pending)}")
+        return flushed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending) + (self._writing is not None)}
+
+    def _next(self) -> Optional[tuple]:
+        """Nächstes schreibbares Package (wartet), None beim Stoppen"""
+        with self._cond:
+            while not self._pending and not self._stopping:
+                self._cond.wait()
+            if self._stopping:
+                return None
+            campaign_id = next(iter(self._pending))
+            self._writing = campaign_id
+            return (campaign_id, *self._pending[campaign_id])
+
+    def _run(self) -> None:
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            campaign_id, package, storage = item
+            try:
+                storage.save_package(campaign_id, package)
+            except Exception as e:
+                with self._cond:
+                    failures = self._failures.get(campaign_id, 0) + 1
+                    self._failures[campaign_id] = failures
+                    self._stats["errors"] += 1
+                    # Hinten anstellen, damit andere Kampagnen weiterlaufen
+                    if self._is_pending(campaign_id, package):
+                        self._pending[campaign_id] = self._pending.pop(campaign_id)
+                    self._writing = None
+                    self._cond.notify_all()
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (failures - 1))
+                logger.warning(f"Package {campaign_id} nicht gespeichert (Versuch {failures}, "
+                               f"nächster in {delay:.1f}s): {e}")
+                with self._cond:
+                    if not self._stopping:
+                        self._cond.wait(delay)
+                continue
+
+            with self._cond:
+                # Nur entfernen, wenn zwischenzeitlich kein neueres Package kam
+                if self._is_pending(campaign_id, package):
+                    del self._pending[campaign_id]
+                self._failures.pop(campaign_id, None)
+                self._stats["written"] += 1
+                self._writing = None
+                self._cond.notify_all()
+
+    def _is_pending(self, campaign_id: str, package: Dict[str, Any]) -> bool:
+        """True wenn package noch der aktuelle (nicht ersetzte) Eintrag ist"""
+        entry = self._pending.get(campaign_id)
+        return entry is not None and entry[0] is package
+
+
+# Writer pro (Storage-Verzeichnis, Backend): ein Package im files-Backend ist
+# für eine SQLite-Storage desselben Verzeichnisses nicht sichtbar und umgekehrt
+_writers: Dict[Tuple[str, str], PackageWriteBehind] = {}
+_writers_lock = threading.Lock()
+
+
+def _key(storage_dir: str, backend: Optional[str]) -> Tuple[str, str]:
+    if backend is None:
+        from ..config import get_settings
+        backend = get_settings().package_backend
+    return str(Path(storage_dir).resolve()), backend
+
+
+def get_package_writer(storage_dir: str = "campaign_packages", backend: Optional[str] = None) -> PackageWriteBehind:
+    """
+    Gibt den prozessweiten Package Writer für ein Storage-Verzeichnis + Backend zurück.
+
+    Args:
+        storage_dir: Storage-Verzeichnis
+        backend: 'files' oder 'sqlite' (default: Setting package_backend)
+    """
+    key = _key(storage_dir, backend)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = PackageWriteBehind()
+            _writers[key] = writer
+            atexit.register(writer.stop)
+        return writer
+
+
+def pending_package(
+    storage_dir: str,
+    campaign_id: str,
+    clone: bool = True,
+    backend: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Noch nicht geschriebenes Package (ohne einen Writer anzulegen)"""
+    writer = _writers.get(_key(storage_dir, backend))
+    return writer.pending(campaign_id, clone) if writer is not None else None
+
+
+def stop_package_writers(timeout: Optional[float] = 30.0) -> bool:
+    """
+    Schreibt alle ausstehenden Packages und beendet die Writer (Shutdown).
+
+    Ein späteres get_package_writer() legt einen neuen Writer an.
+    """
+    with _writers_lock:
+        writers = dict(_writers)
+    # Erst schreiben, dann abmelden: bis dahin liefert load_package() sie weiter aus
+    flushed = all([writer.stop(timeout) for writer in writers.values()])
+    with _writers_lock:
+        for key, writer in writers.items():
+            if _writers.get(key) is writer:
+                del _writers[key]
+    return flushed
@@ -5,6 +5,7 @@ Dieses Interface ermöglicht es, verschiedene Transport-Methoden
 (WebRTC, Twilio, etc.) austauschbar zu nutzen.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 
@@ -40,6 +41,23 @@ class ConversationTransport(ABC):
         """
         pass
     
+    async def start_conversation_async(
+        self,
+        agent_id: str,
+        knowledge_base: str,
+        system_prompt: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Async Variante von start_conversation.
+        
+        Default: synchroner Start im Thread-Pool. Transports mit nativem
+        async Client überschreiben diese Methode.
+        """
+        return await asyncio.to_thread(
+            self.start_conversation, agent_id, knowledge_base, system_prompt, **kwargs
+        )
+    
     @abstractmethod
     def end_conversation(self, conversation_id: str) -> None:
         """
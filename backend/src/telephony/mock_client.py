@@ -5,6 +5,7 @@ Simuliert einen Call ohne tatsächliche Netzwerk-Verbindung.
 """
 
 import time
+import uuid
 from typing import Dict, Any, Optional
 
 from .base import ConversationTransport
@@ -41,7 +42,8 @@ class MockConversationClient(ConversationTransport):
         Returns:
             Dict mit mock conversation_id
         """
-        conversation_id = f"mock_conv_{int(time.time())}"
+        # Eindeutige ID auch bei parallelen Calls in derselben Sekunde
+        conversation_id = f"mock_conv_{int(time.time())}_{uuid.uuid4().hex[:8]}"
         
         self.conversations[conversation_id] = {
             "agent_id": agent_id,
@@ -6,6 +6,7 @@ Ideal für Tests und Agent-Entwicklung.
 """
 
 import signal
+import threading
 import time
 from typing import Dict, Any, Optional
 
@@ -129,7 +130,10 @@ class WebRTCConversation(ConversationTransport):
             print(f"\n\n⏹️  Beende Conversation...")
             conversation.end_session()
         
-        signal.signal(signal.SIGINT, cleanup)
+        # Signal Handler lassen sich nur im Main-Thread registrieren
+        # (Batch-Verarbeitung startet Calls aus Worker-Threads)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, cleanup)
         
         print(f"✅ Conversation gestartet!")
         print(f"   ID: {conversation_id}")
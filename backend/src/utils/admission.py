@@ -0,0 +1,213 @@
+"""Admission Control - begrenzt gleichzeitige teure Webhook-Requests
+
+Jeder Setup-/Protocol-Webhook startet eine LLM-Pipeline. Statt alle
+Requests gleichzeitig laufen (und gemeinsam langsam werden) zu lassen,
+laufen höchstens max_concurrent gleichzeitig; weitere warten in einer
+begrenzten Queue. Ist die Queue voll oder die Wartezeit überschritten,
+wird sofort mit 503 + Retry-After abgelehnt.
+
+Wartende Requests werden pro Client (Authorization Token) in eigenen
+Queues gehalten und reihum bedient - ein Client mit vielen Requests
+verdrängt die anderen nicht.
+"""
+
+import asyncio
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from ..config import get_settings
+
+# Annahme für die Retry-After Schätzung, solange keine Messwerte vorliegen
+_DEFAULT_SERVICE_SECONDS = 10.0
+
+
+class AdmissionRejected(Exception):
+    """Request wurde nicht angenommen (Queue voll oder Wartezeit überschritten)"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def client_key(authorization: Optional[str], fallback: str = "anonymous") -> str:
+    """Client-Schlüssel für Fair Queuing: Hash des Tokens (nie das Token selbst)"""
+    if not authorization:
+        return fallback
+    return hashlib.sha256(authorization.encode("utf-8")).hexdigest()[:12]
+
+
+class AdmissionController:
+    """
+    Begrenzte Work Queue mit Fair Queuing pro Client.
+
+    Muss innerhalb eines Event Loops genutzt werden (nicht thread-safe).
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 4,
+        max_queue: int = 32,
+        max_queue_per_client: int = 16,
+        max_wait_seconds: float = 30.0,
+        history_size: int = 500
+    ):
+        """
+        Args:
+            max_concurrent: Gleichzeitig laufende Requests
+            max_queue: Max. wartende Requests insgesamt
+            max_queue_per_client: Max. wartende Requests pro Client
+            max_wait_seconds: Max. Wartezeit in der Queue, danach 503
+            history_size: Anzahl gemerkter Wartezeiten für Perzentile
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_queue_per_client = max_queue_per_client
+        self.max_wait_seconds = max_wait_seconds
+
+        self._running = 0
+        self._queued = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waits: deque = deque(maxlen=history_size)
+        self._service_ewma: Optional[float] = None
+        self._counters = {"admitted": 0, "queued": 0, "rejected_full": 0, "timed_out": 0}
+
+    @asynccontextmanager
+    async def slot(self, client: str) -> AsyncIterator[float]:
+        """
+        Belegt einen Ausführungsplatz für die Dauer des Blocks.
+
+        Yields:
+            Wartezeit in Sekunden
+
+        Raises:
+            AdmissionRejected: Queue voll oder max_wait_seconds überschritten
+        """
+        waited = await self._acquire(client)
+        started = time.monotonic()
+        try:
+            yield waited
+        finally:
+            duration = time.monotonic() - started
+            self._service_ewma = duration if self._service_ewma is None else (
+                0.8 * self._service_ewma + 0.2 * duration
+            )
+            self._release()
+
+    def retry_after(self) -> int:
+        """Geschätzte Sekunden, bis ein neuer Request Platz hätte"""
+        service = self._service_ewma if self._service_ewma is not None else _DEFAULT_SERVICE_SECONDS
+        return max(1, math.ceil(service * (self._queued + 1) / max(1, self.max_concurrent)))
+
+    async def _acquire(self, client: str) -> float:
+        if self._running < self.max_concurrent and self._queued == 0:
+            self._running += 1
+            self._counters["admitted"] += 1
+            self._waits.append(0.0)
+            return 0.0
+
+        waiting = self._waiting.get(client)
+        if self._queued >= self.max_queue or (waiting and len(waiting) >= self.max_queue_per_client):
+            self._counters["rejected_full"] += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        if waiting is None:
+            waiting = self._waiting[client] = deque()
+        waiting.append(future)
+        self._queued += 1
+        self._counters["queued"] += 1
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait_seconds)
+        except asyncio.CancelledError:
+            # Client hat abgebrochen - ggf. bereits übergebenen Platz zurückgeben
+            if future.done():
+                self._release()
+            else:
+                self._remove(client, future)
+            raise
+
+        waited = time.monotonic() - started
+        if not future.done():
+            self._remove(client, future)
+            self._counters["timed_out"] += 1
+            raise AdmissionRejected("queue_timeout", self.retry_after())
+
+        self._counters["admitted"] += 1
+        self._waits.append(waited)
+        return waited
+
+    def _remove(self, client: str, future: asyncio.Future) -> None:
+        future.cancel()
+        waiting = self._waiting.get(client)
+        if waiting is not None and future in waiting:
+            waiting.remove(future)
+            self._queued -= 1
+            if not waiting:
+                del self._waiting[client]
+
+    def _release(self) -> None:
+        """Gibt einen Platz frei und vergibt ihn reihum an den nächsten Client"""
+        self._running -= 1
+        while self._running < self.max_concurrent and self._waiting:
+            client, waiting = next(iter(self._waiting.items()))
+            future = waiting.popleft()
+            self._queued -= 1
+            if waiting:
+                self._waiting.move_to_end(client)
+            else:
+                del self._waiting[client]
+            if future.done():
+                continue
+            self._running += 1
+            future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Gauges für /health: Queue-Tiefe, laufende Requests, Wartezeiten"""
+        waits = sorted(self._waits)
+
+        def pick(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 1)
+
+        return {
+            "running": self._running,
+            "queue_depth": self._queued,
+            "clients_waiting": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "wait_p50_ms": pick(0.50),
+            "wait_p95_ms": pick(0.95),
+            "wait_max_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+            "service_avg_seconds": round(self._service_ewma, 2) if self._service_ewma is not None else None,
+            "retry_after_seconds": self.retry_after(),
+            **self._counters
+        }
+
+
+# Singleton-Instanz
+_admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Gibt den prozessweiten Admission Controller zurück (konfiguriert über Settings)"""
+    global _admission_controller
+    with _admission_controller_lock:
+        if _admission_controller is None:
+            settings = get_settings()
+            _admission_controller = AdmissionController(
+                max_concurrent=settings.admission_max_concurrent,
+                max_queue=settings.admission_max_queue,
+                max_queue_per_client=settings.admission_max_queue_per_client,
+                max_wait_seconds=settings.admission_max_wait_seconds
+            )
+        return _admission_controller
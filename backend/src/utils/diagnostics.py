@@ -0,0 +1,190 @@
+"""Diagnostics - Strukturierte Diagnose-Events ohne Disk-I/O im Request-Pfad
+
+Events landen in einem In-Memory Ring Buffer (für /diagnostics) und werden
+über einen QueueHandler an einen QueueListener-Thread übergeben, der sie als
+JSON Lines in eine rotierende Datei schreibt. Serialisierung und Datei-I/O
+passieren ausschließlich im Listener-Thread.
+"""
+
+import json
+import logging
+import queue
+import random
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _RecordQueueHandler(QueueHandler):
+    """
+    QueueHandler ohne Formatierung im aufrufenden Thread.
+
+    Der Standard-QueueHandler formatiert den Record bereits vor dem Enqueue;
+    hier bleibt das Event-Dict unverändert und wird erst im Listener
+    serialisiert.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """Formatiert das Event-Dict eines Records als eine JSON-Zeile"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.msg, ensure_ascii=False, default=str)
+
+
+class Diagnostics:
+    """
+    Sammelt Diagnose-Events mit Sampling.
+
+    event() kostet nur ein Dict, ein deque.append und ein Queue-Put;
+    geschrieben wird im Hintergrund (start()/stop()).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        log_path: Optional[str] = None,
+        buffer_size: int = 1000,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3
+    ):
+        """
+        Args:
+            enabled: Events überhaupt erfassen
+            sample_rate: Anteil der erfassten Events (0.0 - 1.0)
+            log_path: JSONL-Datei (None/"" = nur Ring Buffer)
+            buffer_size: Anzahl Events im Ring Buffer
+            max_bytes: Rotationsgröße der Datei
+            backup_count: Anzahl rotierter Dateien
+        """
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.log_path = Path(log_path) if log_path else None
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handler = _RecordQueueHandler(self._queue)
+        self._listener: Optional[QueueListener] = None
+        self._recorded = 0
+        self._sampled_out = 0
+
+    @property
+    def running(self) -> bool:
+        """True solange der Listener-Thread schreibt"""
+        return self._listener is not None
+
+    def start(self) -> None:
+        """Startet den Listener-Thread (nur mit log_path)"""
+        if self._listener is not None or not self.enabled or self.log_path is None:
+            return
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            self.log_path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding='utf-8',
+            delay=True
+        )
+        file_handler.setFormatter(_JsonLineFormatter())
+        self._listener = QueueListener(self._queue, file_handler)
+        self._listener.start()
+        logger.info(f"Diagnostics aktiv: {self.log_path} (Sample Rate {self.sample_rate})")
+
+    def stop(self) -> None:
+        """Schreibt alle ausstehenden Events und beendet den Listener"""
+        if self._listener is None:
+            return
+        listener = self._listener
+        self._listener = None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    def event(
+        self,
+        location: str,
+        message: str,
+        data: Optional[Dict[str, Any]] = None,
+        force: bool = False
+    ) -> bool:
+        """
+        Erfasst ein Diagnose-Event.
+
+        Args:
+            location: Herkunft (z.B. "process_protocol_webhook")
+            message: Kurzbeschreibung
+            data: Zusätzliche Felder (wird nicht kopiert - nicht nachträglich ändern)
+            force: Sampling umgehen (z.B. für Fehler)
+
+        Returns:
+            True wenn das Event erfasst wurde
+        """
+        if not self.enabled:
+            return False
+        if not force and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self._sampled_out += 1
+            return False
+
+        record = {
+            'location': location,
+            'message': message,
+            'data': data or {},
+            'timestamp': int(time.time() * 1000)
+        }
+        self._buffer.append(record)
+        self._recorded += 1
+
+        if self._listener is not None:
+            self._handler.handle(logging.LogRecord(
+                __name__, logging.INFO, location, 0, record, None, None
+            ))
+        return True
+
+    def recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Gibt die letzten Events aus dem Ring Buffer zurück (neueste zuletzt)"""
+        events = list(self._buffer)
+        return events[-limit:] if limit > 0 else []
+
+    def stats(self) -> Dict[str, Any]:
+        """Zähler für /diagnostics"""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'recorded': self._recorded,
+            'sampled_out': self._sampled_out,
+            'buffered': len(self._buffer),
+            'writer_running': self.running
+        }
+
+
+# Singleton-Instanz
+_diagnostics: Optional[Diagnostics] = None
+
+
+def get_diagnostics() -> Diagnostics:
+    """
+    Gibt die prozessweite Diagnostics-Instanz zurück.
+    Konfiguration aus den Settings beim ersten Aufruf.
+    """
+    global _diagnostics
+    if _diagnostics is None:
+        settings = get_settings()
+        _diagnostics = Diagnostics(
+            enabled=settings.diagnostics_enabled,
+            sample_rate=settings.diagnostics_sample_rate,
+            log_path=settings.diagnostics_log_path,
+            buffer_size=settings.diagnostics_buffer_size
+        )
+    return _diagnostics
@@ -0,0 +1,123 @@
+"""JSON Codec - schnelle Serialisierung mit orjson, Fallback auf stdlib json
+
+Einheitliche Schnittstelle für HTTP-Responses, Package-Speicherung und
+Cache-Dateien. Ist orjson installiert, wird es genutzt (deutlich schneller
+bei großen Packages), sonst das stdlib json-Modul mit identischem Ergebnis
+beim Dekodieren.
+
+Auf der Platte wird standardmäßig kompakt geschrieben; eingerückt nur auf
+Wunsch (pretty=True), z.B. für Debug-Exports.
+"""
+
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # optionale Abhängigkeit
+    orjson = None
+
+# Dekodierfehler beider Backends (orjson.JSONDecodeError erbt von json.JSONDecodeError)
+JSONDecodeError = json.JSONDecodeError
+
+
+def backend() -> str:
+    """Name des aktiven Backends ('orjson' oder 'json')"""
+    return "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    """Fallback für Typen, die keines der Backends direkt kennt"""
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialisiert nach UTF-8 JSON (ohne ASCII-Escaping).
+
+    Args:
+        obj: Zu serialisierender Wert
+        pretty: Mit 2 Leerzeichen einrücken
+        sort_keys: Schlüssel sortieren
+
+    Returns:
+        JSON als Bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except TypeError:
+            # z.B. Integer > 64 Bit - stdlib kann alles, was json kann
+            pass
+    text = json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if pretty else None,
+        separators=None if pretty else (",", ":"),
+        sort_keys=sort_keys,
+        default=_default
+    )
+    return text.encode("utf-8")
+
+
+def dumps_str(obj: Any, pretty: bool = False, sort_keys: bool = False) -> str:
+    """Wie dumps(), liefert aber str (z.B. für SQLite TEXT-Spalten)"""
+    return dumps(obj, pretty=pretty, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """
+    Dekodiert JSON aus Bytes oder str.
+
+    Raises:
+        JSONDecodeError: Bei ungültigem JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def dump_file(path: Union[str, Path], obj: Any, pretty: bool = False, atomic: bool = True) -> Path:
+    """
+    Schreibt JSON in eine Datei.
+
+    Args:
+        path: Zieldatei
+        obj: Zu serialisierender Wert
+        pretty: Eingerückt schreiben (nur für Debug/Menschen)
+        atomic: Erst in .tmp schreiben und dann ersetzen (keine halben Dateien)
+
+    Returns:
+        Pfad der Datei
+    """
+    path = Path(path)
+    data = dumps(obj, pretty=pretty)
+    if not atomic:
+        path.write_bytes(data)
+        return path
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Lädt JSON aus einer Datei (kompakt oder eingerückt)"""
+    return loads(Path(path).read_bytes())
+
@@ -0,0 +1,240 @@
+"""Inkrementeller JSON-Parser für Top-Level-Objekte
+
+Parst ein JSON-Objekt, das in Teilstücken eintrifft (HTTP-Stream, LLM-Stream),
+und liefert fertige Werte, sobald sie vollständig sind - ohne den gesamten
+Text vorher puffern zu müssen:
+
+- ("item", key, value):  ein Element eines Top-Level-Arrays ist fertig
+- ("value", key, value): ein Top-Level-Wert ist fertig (Arrays als Liste)
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+Event = Tuple[str, str, Any]
+
+_WHITESPACE = " \t\r\n"
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURAL = re.compile(r'["{}\[\]]')
+_LITERAL_END = re.compile(r'[,\]}\s]')
+
+# Ab dieser Menge verarbeiteter Zeichen wird der Puffer gekürzt
+_COMPACT_THRESHOLD = 64 * 1024
+
+
+class IncrementalJSONParser:
+    """
+    Zustandsbehafteter Parser für ein einzelnes JSON-Objekt.
+
+    Jeder Wert wird genau einmal gescannt (Position und Verschachtelungstiefe
+    bleiben zwischen feed()-Aufrufen erhalten) und erst dekodiert, wenn er
+    vollständig im Puffer liegt.
+    """
+
+    def __init__(self, skip_prefix: bool = False):
+        """
+        Args:
+            skip_prefix: Text vor der ersten '{' ignorieren
+                         (z.B. Markdown-Fences in LLM-Antworten)
+        """
+        self.skip_prefix = skip_prefix
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: Optional[str] = None
+        self._items: List[Any] = []
+        # Scan-Zustand des aktuellen Werts: [start, index, depth, in_string, escape]
+        self._scan: Optional[List[Any]] = None
+
+    @property
+    def finished(self) -> bool:
+        """True sobald die schließende '}' des Objekts gelesen wurde"""
+        return self._state == "end"
+
+    def feed(self, text: str) -> List[Event]:
+        """
+        Fügt ein Teilstück hinzu und gibt alle neu fertigen Events zurück.
+
+        Raises:
+            ValueError: Bei syntaktisch ungültigem JSON
+        """
+        self._buf += text
+        events: List[Event] = []
+
+        while True:
+            if self._scan is None:
+                self._skip_whitespace()
+            if self._pos >= len(self._buf):
+                break
+
+            char = self._buf[self._pos]
+            state = self._state
+
+            if state == "start":
+                if char == "{":
+                    self._pos += 1
+                    self._state = "key"
+                elif self.skip_prefix:
+                    next_brace = self._buf.find("{", self._pos)
+                    self._pos = len(self._buf) if next_brace == -1 else next_brace
+                else:
+                    raise ValueError(f"JSON-Objekt erwartet, gefunden: {char!r}")
+
+            elif state == "key":
+                if char == "}":
+                    self._pos += 1
+                    self._state = "end"
+                elif char == ",":
+                    self._pos += 1
+                elif char == '"':
+                    key = self._read_value()
+                    if key is _INCOMPLETE:
+                        break
+                    self._key = key
+                    self._state = "colon"
+                else:
+                    raise ValueError(f"Key erwartet, gefunden: {char!r}")
+
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"':' erwartet, gefunden: {char!r}")
+                self._pos += 1
+                self._state = "value"
+
+            elif state == "value":
+                if char == "[" and self._scan is None:
+                    self._pos += 1
+                    self._items = []
+                    self._state = "array"
+                    continue
+                value = self._read_value()
+                if value is _INCOMPLETE:
+                    break
+                events.append(("value", self._key, value))
+                self._state = "key"
+
+            elif state == "array":
+                if char == "]" and self._scan is None:
+                    self._pos += 1
+                    events.append(("value", self._key, self._items))
+                    self._items = []
+                    self._state = "key"
+                elif char == "," and self._scan is None:
+                    self._pos += 1
+                else:
+                    item = self._read_value()
+                    if item is _INCOMPLETE:
+                        break
+                    self._items.append(item)
+                    events.append(("item", self._key, item))
+
+            else:  # end - nur noch Whitespace (oder Suffix) erlaubt
+                if not self.skip_prefix:
+                    raise ValueError(f"Unerwartete Daten nach Objektende: {char!r}")
+                self._pos = len(self._buf)
+
+        self._compact()
+        return events
+
+    def close(self) -> None:
+        """
+        Prüft, dass das Objekt vollständig war.
+
+        Raises:
+            ValueError: Wenn der Stream mitten im Objekt endete
+        """
+        if self._state != "end":
+            raise ValueError("Unvollständiges JSON: Stream endete vor Objektende")
+
+    def _skip_whitespace(self) -> None:
+        buf = self._buf
+        pos = self._pos
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        self._pos = pos
+
+    def _read_value(self) -> Any:
+        """Scannt ab self._pos bis zum Ende des Werts; dekodiert wenn vollständig"""
+        if self._scan is None:
+            self._scan = [self._pos, self._pos, 0, False, False]
+
+        end = self._scan_to_end()
+        if end is None:
+            return _INCOMPLETE
+
+        start = self._scan[0]
+        self._scan = None
+        try:
+            value, _ = self._decoder.raw_decode(self._buf[start:end])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ungültiger JSON-Wert: {e.msg}") from e
+        self._pos = end
+        return value
+
+    def _scan_to_end(self) -> Optional[int]:
+        """Liefert den Index hinter dem aktuellen Wert oder None (mehr Daten nötig)"""
+        start, index, depth, in_string, escape = self._scan
+        buf = self._buf
+
+        if buf[start] not in '{["':
+            # Zahl oder Literal: endet am nächsten Trenner
+            match = _LITERAL_END.search(buf, index)
+            if match is None:
+                self._scan[1] = len(buf)
+                return None
+            return match.start()
+
+        while True:
+            if escape:
+                if index >= len(buf):
+                    break
+                index += 1
+                escape = False
+                continue
+
+            pattern = _STRING_SPECIAL if in_string else _STRUCTURAL
+            match = pattern.search(buf, index)
+            if match is None:
+                index = len(buf)
+                break
+
+            char = match.group()
+            index = match.end()
+            if in_string:
+                if char == "\\":
+                    escape = True
+                else:
+                    in_string = False
+                    if depth == 0:
+                        return index
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return index
+
+        self._scan[1:] = [index, depth, in_string, escape]
+        return None
+
+    def _compact(self) -> None:
+        """Verwirft bereits verarbeiteten Text, damit der Puffer klein bleibt"""
+        cut = self._scan[0] if self._scan is not None else self._pos
+        if cut < _COMPACT_THRESHOLD:
+            return
+        self._buf = self._buf[cut:]
+        self._pos -= cut
+        if self._scan is not None:
+            self._scan[0] -= cut
+            self._scan[1] -= cut
+
+
+class _Incomplete:
+    """Marker: Wert ist noch nicht vollständig im Puffer"""
+
+
+_INCOMPLETE = _Incomplete()
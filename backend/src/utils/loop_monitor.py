@@ -0,0 +1,158 @@
+"""Event Loop Lag Monitor - erkennt blockierende Aufrufe im Event Loop
+
+Ein Heartbeat-Task misst, wie verspätet asyncio.sleep() zurückkehrt
+(= Loop Lag). Ein Watchdog-Thread prüft parallel, ob der Heartbeat
+ausbleibt, und hält dann den Stack des Loop-Threads fest - so ist im Log
+sichtbar, welcher Aufruf den Loop blockiert.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Misst den Lag des laufenden Event Loops und meldet Blockaden.
+
+    start() muss im Event Loop aufgerufen werden (z.B. im Startup-Hook).
+    """
+
+    def __init__(
+        self,
+        interval_seconds: float = 0.1,
+        threshold_seconds: float = 0.25,
+        on_stall: Optional[Callable[[Dict[str, Any]], None]] = None,
+        history_size: int = 600
+    ):
+        """
+        Args:
+            interval_seconds: Heartbeat-Intervall
+            threshold_seconds: Ab diesem Lag gilt der Loop als blockiert
+            on_stall: Callback pro erkannter Blockade (z.B. Diagnostics)
+            history_size: Anzahl gemerkter Lag-Messungen für Perzentile
+        """
+        self.interval_seconds = interval_seconds
+        self.threshold_seconds = threshold_seconds
+        self.on_stall = on_stall
+
+        self._lags: deque = deque(maxlen=history_size)
+        self._max_lag = 0.0
+        self._stalls = 0
+        self._last_stall: Optional[Dict[str, Any]] = None
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._pending_stack: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Startet Heartbeat-Task und Watchdog-Thread im laufenden Loop"""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        """Beendet Heartbeat und Watchdog"""
+        self._stop_event.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _heartbeat(self) -> None:
+        """Misst die Verspätung jedes Sleeps"""
+        while True:
+            expected = time.monotonic() + self.interval_seconds
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            self._record(lag)
+
+    def _record(self, lag: float) -> None:
+        self._lags.append(lag)
+        if lag > self._max_lag:
+            self._max_lag = lag
+        if lag < self.threshold_seconds:
+            return
+
+        with self._lock:
+            stack = self._pending_stack
+            self._pending_stack = None
+        stall = {
+            "lag_ms": round(lag * 1000, 1),
+            "detected_at": time.time(),
+            "stack": stack or []
+        }
+        self._stalls += 1
+        self._last_stall = stall
+        where = stack[-1].strip().splitlines()[0] if stack else "unbekannt"
+        logger.warning(f"Event Loop blockiert für {lag * 1000:.0f}ms ({where})")
+        if self.on_stall is not None:
+            try:
+                self.on_stall(stall)
+            except Exception as e:
+                logger.debug(f"on_stall Callback fehlgeschlagen: {e}")
+
+    def _watch(self) -> None:
+        """Watchdog: Stack des Loop-Threads festhalten, solange er blockiert"""
+        poll = max(self.interval_seconds / 2, 0.01)
+        captured_for = None
+        while not self._stop_event.wait(poll):
+            beat = self._last_beat
+            overdue = time.monotonic() - beat - self.interval_seconds
+            if overdue < self.threshold_seconds or captured_for == beat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame, limit=8)
+            with self._lock:
+                self._pending_stack = stack
+            captured_for = beat
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /health"""
+        lags = sorted(self._lags)
+
+        def pick(p: float) -> float:
+            if not lags:
+                return 0.0
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))] * 1000, 1)
+
+        return {
+            "running": self.running,
+            "lag_p50_ms": pick(0.50),
+            "lag_p99_ms": pick(0.99),
+            "lag_max_ms": round(self._max_lag * 1000, 1),
+            "stalls": self._stalls,
+            "threshold_ms": round(self.threshold_seconds * 1000, 1),
+            "last_stall": self._last_stall
+        }
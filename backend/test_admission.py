@@ -0,0 +1,106 @@
+"""Test Admission Control - begrenzte Queue, Fair Queuing pro Client, 503 + Retry-After (ohne API)"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils import admission
+from src.utils.admission import AdmissionController, AdmissionRejected, client_key
+
+
+def test_fair_queuing_between_clients():
+    controller = AdmissionController(max_concurrent=1, max_queue=10, max_wait_seconds=5)
+    order = []
+
+    async def request(client, name, gate=None):
+        async with controller.slot(client):
+            order.append(name)
+            if gate is not None:
+                await gate.wait()
+            await asyncio.sleep(0)
+
+    async def run():
+        gate = asyncio.Event()
+        first = asyncio.create_task(request("A", "a0", gate))
+        await asyncio.sleep(0)
+        # Client A schickt einen Burst, B und C je einen Request
+        tasks = [asyncio.create_task(request("A", f"a{i}")) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(request("B", "b1")), asyncio.create_task(request("C", "c1"))]
+        await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 5 and controller.stats()["clients_waiting"] == 3
+        gate.set()
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+    assert order == ["a0", "a1", "b1", "c1", "a2", "a3"]
+    stats = controller.stats()
+    assert stats["running"] == 0 and stats["queue_depth"] == 0 and stats["admitted"] == 6
+
+
+def test_reject_when_full_and_on_timeout():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, max_queue_per_client=1,
+                                     max_wait_seconds=0.05)
+
+    async def hold(client, seconds):
+        async with controller.slot(client):
+            await asyncio.sleep(seconds)
+
+    async def rejected(client):
+        try:
+            await hold(client, 0)
+        except AdmissionRejected as e:
+            return e.reason
+
+    async def run():
+        busy = asyncio.create_task(hold("A", 0.3))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(rejected("B"))]
+        await asyncio.sleep(0)
+        reasons = [await rejected("B")]                         # Limit pro Client
+        waiters.append(asyncio.create_task(rejected("C")))
+        await asyncio.sleep(0)
+        reasons.append(await rejected("D"))                     # Queue voll
+        reasons += await asyncio.gather(*waiters)              # max_wait_seconds überschritten
+
+        # Abgebrochener Request verlässt die Queue
+        cancelled = asyncio.create_task(hold("E", 0))
+        await asyncio.sleep(0)
+        assert controller.stats()["queue_depth"] == 1
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert controller.stats()["queue_depth"] == 0
+        await busy
+        return reasons
+
+    assert asyncio.run(run()) == ["queue_full", "queue_full", "queue_timeout", "queue_timeout"]
+    stats = controller.stats()
+    assert stats["rejected_full"] == 2 and stats["timed_out"] == 2
+    assert stats["queue_depth"] == 0 and stats["running"] == 0
+    assert stats["retry_after_seconds"] >= 1
+
+
+def test_api_returns_503_with_retry_after(monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+
+    monkeypatch.setattr(api_server, "verify_webhook_auth", lambda authorization=None: True)
+    monkeypatch.setattr(admission, "_admission_controller",
+                        AdmissionController(max_concurrent=0, max_queue=0))
+
+    response = TestClient(api_server.app).post(
+        "/webhook/process-protocol",
+        json={"id": 1, "name": "Pflege", "pages": []},
+        headers={"Authorization": "Bearer token"}
+    )
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["reason"] == "queue_full"
+    assert client_key("Bearer token") != client_key("Bearer other") and "token" not in client_key("Bearer token")
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,206 @@
+"""Test: APIDataSource offline (Fake-Session statt echter API)"""
+
+import json
+import sys
+from pathlib import Path
+
+import requests
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.data_sources.api_loader import APIDataSource
+
+
+API_PAYLOAD = {
+    "applicants": [
+        {"first_name": "Anna", "last_name": "Berg", "telephone": "+491111", "campaign_id": 60},
+        {"first_name": "Test", "last_name": "User", "telephone": "+490000", "campaign_id": 60},
+        {"first_name": "Max", "last_name": "Mustermann", "telephone": "+492222", "campaign_id": 61},
+        {"first_name": "anna", "last_name": "Zweite", "telephone": "+493333", "campaign_id": 61},
+    ],
+    "campaigns": [
+        {"id": 60, "company_id": 7, "name": "Pflege", "transcript": {"id": 1, "name": "Pflege", "pages": []}},
+        {"id": 61, "company_id": 8, "name": "MFA", "transcript": {"id": 2, "name": "MFA", "pages": []}},
+    ],
+    "companies": [
+        {"id": 7, "name": "Klinikum Nord", "onboarding": {"pages": []}},
+        {"id": 8, "name": "Praxis Süd", "onboarding": {"pages": []}},
+    ],
+}
+
+
+class _FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None, chunk_size=37):
+        self._body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.chunk_size = chunk_size
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=None):
+        # Kleine Chunks: Umlaute werden mitten im UTF-8-Zeichen getrennt
+        for i in range(0, len(self._body), self.chunk_size):
+            yield self._body[i:i + self.chunk_size]
+
+    def close(self):
+        pass
+
+
+class _FakeSession:
+    def __init__(self, payload, etag='"v1"'):
+        self.payload = payload
+        self.etag = etag
+        self.headers = {}
+        self.calls = 0
+        self.request_headers = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        self.request_headers.append(dict(headers or {}))
+        if headers and headers.get("If-None-Match") == self.etag:
+            return _FakeResponse({}, status_code=304)
+        return _FakeResponse(self.payload, headers={"ETag": self.etag})
+
+
+def _make_source(**kwargs):
+    source = APIDataSource(api_url="https://api.example.test/v1", **kwargs)
+    source.session = _FakeSession(API_PAYLOAD)
+    return source
+
+
+def test_indexed_applicant_lookup():
+    """Lookups über Telefon, vollen Namen und Vornamen"""
+    source = _make_source()
+
+    assert source._find_applicant_by_id("+492222")["first_name"] == "Max"
+    assert source._find_applicant_by_id("MAX MUSTERMANN")["telephone"] == "+492222"
+    # Vorname "anna" kommt doppelt vor - erster Listeneintrag gewinnt
+    assert source._find_applicant_by_id("Anna")["last_name"] == "Berg"
+    # Test-Bewerber sind herausgefiltert
+    try:
+        source._find_applicant_by_id("+490000")
+        assert False, "Test-Bewerber sollte nicht gefunden werden"
+    except ValueError:
+        pass
+
+    assert source.session.calls == 1
+    print("   ✅ Applicant-Lookups korrekt, API nur einmal geladen")
+
+
+def test_indexed_campaign_and_company_lookup():
+    """Campaign → Company Auflösung über Indizes"""
+    source = _make_source()
+
+    company = source.get_company_profile("61")
+    assert company["name"] == "Praxis Süd"
+    assert source.get_conversation_protocol("60")["name"] == "Pflege"
+
+    try:
+        source._find_campaign_by_id(999)
+        assert False, "Unbekannte Campaign sollte ValueError werfen"
+    except ValueError as e:
+        assert "Verfügbare Campaigns: 2" in str(e)
+
+
+def test_iter_pending_applicants_streams_and_caches():
+    """Iterator liefert gefilterte Bewerber und befüllt den Cache"""
+    source = _make_source()
+
+    names = [a["first_name"] for a in source.iter_pending_applicants()]
+    assert names == ["Anna", "Max", "anna"]
+    assert source.get_company_profile("60")["name"] == "Klinikum Nord"
+    # Zweiter Durchlauf kommt aus dem Cache
+    assert len(list(source.iter_pending_applicants())) == 3
+    assert source.session.calls == 1
+
+
+def test_ttl_refresh_uses_conditional_request():
+    """Nach Ablauf der TTL: If-None-Match, 304 behält den Cache"""
+    source = _make_source(cache_ttl_seconds=0)
+
+    assert len(source.list_pending_applicants()) == 3
+    # Abgelaufen: sofort aus dem Cache, Refresh läuft im Hintergrund
+    assert len(source.list_pending_applicants()) == 3
+    source._download.wait()
+    assert source.session.calls == 2
+    assert source.session.request_headers[1].get("If-None-Match") == '"v1"'
+    assert source._find_applicant_by_id("+491111")["last_name"] == "Berg"
+
+
+class _FailingSession(_FakeSession):
+    def get(self, url, headers=None, **kwargs):
+        self.calls += 1
+        raise requests.exceptions.ConnectionError("Server nicht erreichbar")
+
+
+def test_failed_refresh_backs_off_and_serves_stale_data():
+    """Fehlgeschlagener Refresh: gecachte Daten sofort, kein erneuter Download bis zum Backoff-Ende"""
+    source = _make_source(cache_ttl_seconds=0, refresh_retry_seconds=60)
+    assert len(source.list_pending_applicants()) == 3
+
+    source.session = _FailingSession(API_PAYLOAD)
+    for _ in range(5):
+        assert source._find_applicant_by_id("+491111")["last_name"] == "Berg"
+        if source._download is not None:
+            source._download.wait()
+    assert source.session.calls == 1
+
+    # Ohne Cache: Fehler wird bis zum Backoff-Ende direkt gemeldet
+    fresh = _make_source(refresh_retry_seconds=60)
+    fresh.session = _FailingSession(API_PAYLOAD)
+    for _ in range(3):
+        try:
+            fresh.list_pending_applicants()
+            assert False, "Download-Fehler erwartet"
+        except Exception as e:
+            assert "Server nicht erreichbar" in str(e)
+    assert fresh.session.calls == 1
+
+
+class _TruncatedResponse(_FakeResponse):
+    def iter_content(self, chunk_size=None):
+        yield self._body[:len(self._body) // 2]
+
+
+def test_failed_refresh_mid_stream_keeps_old_validators():
+    """Abgebrochener Refresh: neuer ETag darf nicht übernommen werden (sonst 304 auf Dauer)"""
+    source = _make_source(cache_ttl_seconds=0, refresh_retry_seconds=0)
+    assert len(source.list_pending_applicants()) == 3
+
+    updated = {**API_PAYLOAD, "applicants": API_PAYLOAD["applicants"][:1]}
+    session = _FakeSession(updated, etag='"v2"')
+    session.get = lambda url, headers=None, **kwargs: (
+        session.request_headers.append(dict(headers or {})) or _TruncatedResponse(updated, headers={"ETag": '"v2"'})
+    )
+    source.session = session
+    source.list_pending_applicants()
+    source._download.wait()
+    assert source._download.error is not None and source._etag == '"v1"'
+
+    # Nächster Refresh fragt mit dem alten ETag und bekommt die neuen Daten
+    source.session = _FakeSession(updated, etag='"v2"')
+    source.list_pending_applicants()
+    source._download.wait()
+    assert source.session.request_headers[0].get("If-None-Match") == '"v1"'
+    assert len(source.list_pending_applicants()) == 1 and source._etag == '"v2"'
+
+
+def test_paging_stops_when_server_ignores_page_params():
+    """Server liefert für jede Seite dasselbe: Abbruch statt Endlosschleife"""
+    source = _make_source(page_size=2)
+
+    names = [a["first_name"] for a in source.iter_pending_applicants()]
+    assert names == ["Anna", "Max", "anna"]
+    assert source.session.calls == 2
+
+
+if __name__ == "__main__":
+    test_indexed_applicant_lookup()
+    test_indexed_campaign_and_company_lookup()
+    test_iter_pending_applicants_streams_and_caches()
+    test_ttl_refresh_uses_conditional_request()
+    test_failed_refresh_backs_off_and_serves_stale_data()
+    test_paging_stops_when_server_ignores_page_params()
+    print("\n✅ Alle APIDataSource Tests bestanden")
@@ -0,0 +1,201 @@
+"""Test Async CallOrchestrator - parallele Datenabfragen, async Transport, Sync-Wrapper (ohne API)"""
+
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.config import get_settings
+from src.data_sources.base import DataSource
+from src.orchestrator.call_orchestrator import CallOrchestrator
+from src.orchestrator.question_cache import CampaignQuestionCache
+from src.storage.call_store import CallResultStore
+from src.telephony.mock_client import MockConversationClient
+
+LOAD_DELAY = 0.1
+
+
+class SlowDataSource(DataSource):
+    """Jede Abfrage blockiert LOAD_DELAY Sekunden (wie ein HTTP Request)"""
+
+    def __init__(self):
+        self.threads = set()
+
+    def _wait(self):
+        self.threads.add(threading.get_ident())
+        time.sleep(LOAD_DELAY)
+
+    def get_applicant_profile(self, applicant_id):
+        self._wait()
+        return {"first_name": "Max", "last_name": "Muster", "telephone": applicant_id}
+
+    def get_applicant_address(self, applicant_id):
+        self._wait()
+        return {"street": "Hauptstraße", "house_number": "1", "postal_code": "10115", "city": "Berlin"}
+
+    def get_company_profile(self, company_id):
+        self._wait()
+        return {"name": "Klinik Nord", "size": "300", "benefits": "Jobrad"}
+
+    def get_conversation_protocol(self, campaign_id):
+        self._wait()
+        return {"id": 1, "name": "Pflege", "pages": []}
+
+
+class AsyncTransport(MockConversationClient):
+    """Transport mit nativem async Start (zählt, welcher Pfad genutzt wurde)"""
+
+    def __init__(self):
+        super().__init__()
+        self.async_starts = 0
+        self.closed = 0
+
+    async def start_conversation_async(self, agent_id, knowledge_base, system_prompt=None, **kwargs):
+        self.async_starts += 1
+        number = self.async_starts
+        await asyncio.sleep(0)
+        return {"conversation_id": f"async_{number}", "status": "started"}
+
+    async def aclose(self):
+        self.closed += 1
+
+
+def _orchestrator(tmp_path, transport):
+    prompts = tmp_path / "prompts"
+    prompts.mkdir(exist_ok=True)
+    (prompts / "Masterprompt.md").write_text("Master Prompt", encoding="utf-8")
+    questions = tmp_path / "questions.json"
+    questions.write_text(json.dumps({"questions": [
+        {"id": "q1", "question": "Examen vorhanden?", "category": "standardqualifikationen", "type": "boolean"}
+    ]}), encoding="utf-8")
+
+    settings = get_settings().model_copy(update={
+        "prompts_dir": str(prompts),
+        "questions_json_path": str(questions),
+        "generate_questions": False,
+        "kb_payload_max_chars": 0
+    })
+    store = CallResultStore(str(tmp_path / "calls.sqlite3"))
+    orchestrator = CallOrchestrator(
+        data_source=SlowDataSource(),
+        conversation_client=transport,
+        settings=settings,
+        question_cache=CampaignQuestionCache(storage=None),
+        call_store=store
+    )
+    return orchestrator, store
+
+
+def test_data_loads_overlap(tmp_path):
+    orchestrator, store = _orchestrator(tmp_path, AsyncTransport())
+
+    started = time.perf_counter()
+    result = asyncio.run(orchestrator.start_call_async("+4915100000001", "7"))
+    elapsed = time.perf_counter() - started
+
+    assert result["conversation_id"] == "async_1"
+    # Vier Abfragen à LOAD_DELAY parallel statt nacheinander
+    assert elapsed < 3 * LOAD_DELAY
+    assert len(orchestrator.data_source.threads) > 1
+    store.flush()
+    assert store.get_call("async_1")["campaign_id"] == "7"
+    store.close()
+
+
+def test_concurrent_calls_share_one_loop(tmp_path):
+    transport = AsyncTransport()
+    orchestrator, store = _orchestrator(tmp_path, transport)
+
+    async def run():
+        return await asyncio.gather(*(
+            orchestrator.start_call_async(f"+49151000000{i:02d}", "7") for i in range(8)
+        ))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+
+    assert len({r["conversation_id"] for r in results}) == 8
+    assert transport.async_starts == 8
+    assert elapsed < 8 * LOAD_DELAY
+    store.close()
+
+
+def test_sync_wrapper_and_thread_fallback(tmp_path):
+    # Sync-Wrapper mit async Transport: Client wird pro Loop geschlossen
+    transport = AsyncTransport()
+    orchestrator, store = _orchestrator(tmp_path, transport)
+    result = orchestrator.start_call("+4915100000001", "7", phase=3)
+    assert result["phase"] == 3 and transport.closed == 1
+    store.close()
+
+    # Transport ohne eigene async Methode: Default aus ConversationTransport (Thread-Pool)
+    orchestrator, store = _orchestrator(tmp_path, MockConversationClient())
+    result = orchestrator.start_call("+4915100000002", "7")
+    assert result["conversation_id"].startswith("mock_conv_")
+    store.close()
+
+
+def test_sync_transport_runs_on_main_thread_from_cli(tmp_path):
+    class ThreadRecordingTransport(MockConversationClient):
+        def __init__(self):
+            super().__init__()
+            self.threads = []
+
+        def start_conversation(self, *args, **kwargs):
+            self.threads.append(threading.current_thread())
+            return super().start_conversation(*args, **kwargs)
+
+    # CLI (Main-Thread): direkt, damit Signal Handler registriert werden können
+    transport = ThreadRecordingTransport()
+    orchestrator, store = _orchestrator(tmp_path, transport)
+    orchestrator.start_call("+4915100000001", "7", phase=1)
+    assert transport.threads == [threading.main_thread()]
+
+    # Worker-Thread bzw. laufender Loop: weiterhin im Thread-Pool
+    worker = threading.Thread(target=orchestrator.start_call, args=("+4915100000002", "7", 1))
+    worker.start()
+    worker.join()
+    asyncio.run(orchestrator.start_call_async("+4915100000003", "7", phase=1))
+    assert transport.threads[1] is not worker and transport.threads[2] is not threading.main_thread()
+    store.close()
+
+
+def test_payload_section_ids_resolve_via_lookup_api(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import api_server
+    from src.aggregator import kb_store
+
+    class PayloadRecordingTransport(MockConversationClient):
+        def start_conversation(self, agent_id, knowledge_base, system_prompt=None, **kwargs):
+            self.payload = knowledge_base
+            return super().start_conversation(agent_id, knowledge_base, system_prompt, **kwargs)
+
+    kb_dir = str(tmp_path / "kb_stores")
+    monkeypatch.setattr(kb_store, "_kb_registry", kb_store.KnowledgeStoreRegistry(storage_dir=kb_dir))
+    transport = PayloadRecordingTransport()
+    orchestrator, store = _orchestrator(tmp_path, transport)
+    orchestrator.settings = orchestrator.settings.model_copy(update={"kb_payload_max_chars": 1})
+    orchestrator.start_call("+4915100000001", "7")
+    store.close()
+
+    section_ids = re.findall(r"- \[(phase_[23]:\d+)\]", transport.payload)
+    assert section_ids
+
+    # api_server ist ein anderer Prozess: eigene (leere) Registry, gleiches Verzeichnis
+    monkeypatch.setattr(kb_store, "_kb_registry", kb_store.KnowledgeStoreRegistry(storage_dir=kb_dir))
+    monkeypatch.setattr(get_settings(), "webhook_secret", "")
+    client = TestClient(api_server.app)
+    for section_id in section_ids:
+        response = client.get(f"/campaigns/7/kb/sections/{section_id}")
+        assert response.status_code == 200 and response.json()["id"] == section_id
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,119 @@
+"""Test Batch Runner - Parallele Calls mit Limits und Checkpoint (ohne API)"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent
+sys.path.insert(0, str(backend_path))
+
+from src.orchestrator.batch_runner import BatchCallRunner, percentile
+
+
+def _make_applicants(count: int, campaigns: int):
+    return [
+        {
+            "first_name": f"Bewerber{i}",
+            "last_name": "Muster",
+            "telephone": f"+4917600{i:04d}",
+            "campaign_id": 100 + (i % campaigns)
+        }
+        for i in range(count)
+    ]
+
+
+class _FakeOrchestrator:
+    """Zählt gleichzeitige Calls global und pro Kampagne"""
+
+    def __init__(self, delay: float = 0.02, fail_phone: str = None):
+        self.delay = delay
+        self.fail_phone = fail_phone
+        self.lock = threading.Lock()
+        self.active = 0
+        self.active_per_campaign = {}
+        self.max_active = 0
+        self.max_active_per_campaign = 0
+        self.calls = []
+
+    def start_call(self, applicant_id: str, campaign_id: str):
+        with self.lock:
+            self.active += 1
+            self.active_per_campaign[campaign_id] = self.active_per_campaign.get(campaign_id, 0) + 1
+            self.max_active = max(self.max_active, self.active)
+            self.max_active_per_campaign = max(
+                self.max_active_per_campaign, self.active_per_campaign[campaign_id]
+            )
+            self.calls.append(applicant_id)
+        try:
+            time.sleep(self.delay)
+            if applicant_id == self.fail_phone:
+                raise RuntimeError("Leitung besetzt")
+            return {"conversation_id": f"conv_{applicant_id}", "status": "started"}
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.active_per_campaign[campaign_id] -= 1
+
+
+def test_concurrency_limits():
+    """Globales und Kampagnen-Limit werden eingehalten"""
+    print("\n🧪 TEST: Concurrency-Limits")
+
+    fake = _FakeOrchestrator()
+    runner = BatchCallRunner(fake.start_call, max_workers=6, max_per_campaign=2)
+    summary = runner.run(_make_applicants(30, campaigns=2))
+
+    assert summary["successful"] == 30
+    assert fake.max_active <= 4  # 2 Kampagnen × 2 pro Kampagne
+    assert fake.max_active_per_campaign <= 2
+    assert fake.max_active > 1, "Calls sollten parallel laufen"
+    print(f"   ✅ max global: {fake.max_active}, max pro Kampagne: {fake.max_active_per_campaign}")
+
+
+def test_checkpoint_resume(tmp_path):
+    """Erfolgreiche Bewerber werden beim zweiten Lauf übersprungen"""
+    print("\n🧪 TEST: Checkpoint / Resume")
+
+    checkpoint = tmp_path / "checkpoint.json"
+    applicants = _make_applicants(10, campaigns=3)
+    failing_phone = applicants[3]["telephone"]
+
+    first = BatchCallRunner(
+        _FakeOrchestrator(fail_phone=failing_phone).start_call,
+        max_workers=4,
+        checkpoint_path=checkpoint
+    ).run(applicants)
+    assert first["successful"] == 9
+    assert first["failed"] == 1
+    assert first["errors"][0]["phone"] == failing_phone
+
+    second_fake = _FakeOrchestrator()
+    second = BatchCallRunner(
+        second_fake.start_call,
+        max_workers=4,
+        checkpoint_path=checkpoint
+    ).run(applicants)
+    assert second["skipped"] == 9
+    assert second_fake.calls == [failing_phone]
+    print("   ✅ Nur fehlgeschlagener Bewerber wurde wiederholt")
+
+
+def test_percentile():
+    """Nearest-Rank Perzentile"""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 90) == 90.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_concurrency_limits()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_checkpoint_resume(Path(tmp))
+    test_percentile()
+    print("\n✅ Alle Batch-Runner Tests bestanden")
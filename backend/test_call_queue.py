@@ -0,0 +1,205 @@
+"""Test Call Queue - Priorität, Anrufzeiten, Quoten, Retries und Leases (ohne API)"""
+
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.orchestrator.call_queue import (
+    CallingWindows, CallQueue, CallQueueWorker, PRIORITY_RETRY
+)
+
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+def _ts(*args):
+    return datetime(*args, tzinfo=BERLIN).timestamp()
+
+
+def test_calling_windows():
+    windows = CallingWindows("Mo-Fr 09:00-19:00; Sa 10:00-14:00")
+    assert windows.is_open(_ts(2025, 6, 2, 9, 0))          # Montag
+    assert not windows.is_open(_ts(2025, 6, 2, 19, 0))
+    assert not windows.is_open(_ts(2025, 6, 8, 12, 0))     # Sonntag
+    # Freitag Abend -> Samstag 10:00
+    assert windows.next_open(_ts(2025, 6, 6, 20, 0)) == _ts(2025, 6, 7, 10, 0)
+    # Samstag Nachmittag -> Montag 09:00
+    assert windows.next_open(_ts(2025, 6, 7, 15, 0)) == _ts(2025, 6, 9, 9, 0)
+    assert CallingWindows("").is_open(_ts(2025, 6, 8, 3, 0))
+
+
+def test_priority_window_and_quotas(tmp_path):
+    queue = CallQueue(
+        str(tmp_path / "queue.sqlite3"),
+        windows=CallingWindows("Mon-Fri 09:00-19:00"),
+        max_in_flight=3,
+        max_in_flight_per_campaign=2
+    )
+    now = _ts(2025, 6, 2, 10, 0)
+    queue.enqueue("retry_1", "A", priority=PRIORITY_RETRY, now=now)
+    for i in range(3):
+        queue.enqueue(f"fresh_a{i}", "A", now=now + i)
+    queue.enqueue("fresh_b0", "B", now=now + 5)
+    assert not queue.enqueue("fresh_a0", "A", now=now)      # idempotent
+
+    assert queue.claim("w1", 10, now=_ts(2025, 6, 2, 20, 0)) == []   # außerhalb der Anrufzeit
+
+    claimed = queue.claim("w1", 10, now=now + 10)
+    # Frische zuerst, max. 2 pro Kampagne, max. 3 gesamt
+    assert [j["applicant_id"] for j in claimed] == ["fresh_a0", "fresh_a1", "fresh_b0"]
+    assert queue.claim("w2", 10, now=now + 11) == []
+
+    assert queue.complete(claimed[0]["job_id"], "w1", {"conversation_id": "c1"})
+    assert [j["applicant_id"] for j in queue.claim("w2", 10, now=now + 12)] == ["fresh_a2"]
+
+
+def test_rate_limit_per_minute(tmp_path):
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), max_in_flight=100, max_in_flight_per_campaign=100,
+                      max_per_minute=4)
+    for i in range(10):
+        queue.enqueue(f"a{i}", "A", now=1000.0)
+    assert len(queue.claim("w", 10, now=1000.0)) == 4
+    assert queue.claim("w", 10, now=1030.0) == []
+    assert len(queue.claim("w", 10, now=1061.0)) == 4
+
+
+def test_retry_delay_and_not_reached(tmp_path):
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), retry_delays=[60, 600], max_attempts=3)
+    queue.enqueue("a", "A", now=1000.0)
+
+    job = queue.claim("w", now=1000.0)[0]
+    assert queue.fail(job["job_id"], "w", "timeout", now=1001.0) == "pending"
+    assert queue.claim("w", now=1030.0) == []                     # Verzögerung 60s
+    job = queue.claim("w", now=1062.0)[0]
+    assert job["attempts"] == 2
+
+    queue.complete(job["job_id"], "w")
+    assert queue.mark_not_reached(job["job_id"], now=1100.0) == "pending"
+    assert queue.get(job["job_id"])["priority"] == PRIORITY_RETRY
+    assert queue.claim("w", now=1600.0) == []                     # Verzögerung 600s
+    job = queue.claim("w", now=1701.0)[0]
+    assert queue.fail(job["job_id"], "w", "down", now=1702.0) == "failed"
+
+
+def test_not_reached_stops_after_max_attempts(tmp_path):
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), retry_delays=[0], max_attempts=2)
+    dialed = []
+
+    def start_call(applicant_id, campaign_id):
+        dialed.append(applicant_id)
+        return {"conversation_id": "conv", "status": "no_answer"}
+
+    queue.enqueue("a", "A")
+    summary = CallQueueWorker(queue, start_call, max_workers=1, poll_interval=0.01).run()
+    assert dialed == ["a", "a"]
+    assert summary["not_reached"] == 2 and summary["failed"] == 1
+    assert queue.get("a:A")["status"] == "failed"
+
+    # Erneutes Einreihen aus der 'not_reached' Liste setzt die Versuche nicht zurück
+    assert not queue.enqueue("a", "A", requeue=True)
+    assert queue.enqueue("a", "A", requeue=True, reset_attempts=True)
+    assert queue.get("a:A")["attempts"] == 0
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=30)
+    queue.enqueue("a", "A", now=1000.0)
+    job = queue.claim("crashed", now=1000.0)[0]
+
+    assert queue.claim("w2", now=1010.0) == []
+    assert queue.heartbeat(job["job_id"], "crashed", now=1020.0)
+    assert queue.claim("w2", now=1045.0) == []                    # Lease verlängert bis 1050
+    taken = queue.claim("w2", now=1051.0)
+    assert [j["job_id"] for j in taken] == [job["job_id"]]
+    # Alter Worker kann nicht mehr abschließen
+    assert not queue.complete(job["job_id"], "crashed")
+    assert queue.complete(job["job_id"], "w2")
+
+
+def test_expired_lease_respects_max_attempts(tmp_path):
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=30, max_attempts=2)
+    queue.enqueue("a", "A", now=1000.0)
+
+    assert queue.claim("crashed_1", now=1000.0)[0]["attempts"] == 1
+    assert queue.claim("crashed_2", now=1031.0)[0]["attempts"] == 2
+    # Zweite Lease läuft ab: kein dritter Anruf
+    assert queue.claim("w3", now=1062.0) == []
+    job = queue.get("a:A")
+    assert job["status"] == "failed" and job["last_error"] == "lease_expired"
+
+
+def test_cli_limits_apply_to_queue(tmp_path, monkeypatch):
+    """--workers/--per-campaign begrenzen auch den Queue-Pfad"""
+    import process_all_applicants
+
+    queue = CallQueue(str(tmp_path / "queue.sqlite3"), retry_delays=[0], max_in_flight=8, max_in_flight_per_campaign=8)
+    monkeypatch.setattr(process_all_applicants, "get_call_queue", lambda: queue)
+    lock = threading.Lock()
+    in_flight, peak = [], {}
+
+    def start_call(applicant_id, campaign_id):
+        with lock:
+            in_flight.append(campaign_id)
+            peak[campaign_id] = max(peak.get(campaign_id, 0), in_flight.count(campaign_id))
+            peak["total"] = max(peak.get("total", 0), len(in_flight))
+        time.sleep(0.05)
+        with lock:
+            in_flight.remove(campaign_id)
+        return {"conversation_id": applicant_id, "status": "done"}
+
+    applicants = [
+        {"telephone": f"+49{i}", "campaign_id": campaign, "id": i}
+        for i, campaign in enumerate(["A"] * 4 + ["B"] * 4)
+    ]
+    settings = SimpleNamespace(
+        api_status="new", call_queue_path=str(queue.path), call_queue_windows="", call_queue_timezone="Europe/Berlin"
+    )
+    summary = process_all_applicants._process_via_queue(
+        SimpleNamespace(start_call=start_call), applicants, settings, max_workers=3, max_per_campaign=1
+    )
+
+    assert summary["successful"] == 8
+    assert peak["A"] == 1 and peak["B"] == 1
+    assert peak["total"] <= 2
+
+
+def test_workers_never_double_dial(tmp_path):
+    path = str(tmp_path / "queue.sqlite3")
+    setup = CallQueue(path, max_in_flight=6, max_in_flight_per_campaign=6)
+    for i in range(60):
+        setup.enqueue(f"+49{i}", f"c{i % 3}")
+
+    dialed = []
+    lock = threading.Lock()
+
+    def start_call(applicant_id, campaign_id):
+        with lock:
+            dialed.append(applicant_id)
+        return {"conversation_id": f"conv_{applicant_id}"}
+
+    # Jeder Worker mit eigener Queue-Instanz (wie getrennte Prozesse)
+    workers = [
+        CallQueueWorker(CallQueue(path, max_in_flight=6, max_in_flight_per_campaign=6), start_call,
+                        worker_id=f"w{n}", max_workers=3, poll_interval=0.01)
+        for n in range(3)
+    ]
+    summaries = []
+    threads = [threading.Thread(target=lambda w=w: summaries.append(w.run())) for w in workers]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(dialed) == sorted(f"+49{i}" for i in range(60))
+    assert sum(s["successful"] for s in summaries) == 60
+    assert setup.stats()["jobs"] == {"done": 60}
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,98 @@
+"""Test Call Result Store - KB-Deduplizierung, Group Commit und Abfragen (ohne API)"""
+
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.call_store import CallResultStore, kb_hash
+
+
+def test_kb_stored_once_per_campaign(tmp_path):
+    store = CallResultStore(str(tmp_path / "calls.sqlite3"))
+    kb = "PHASE 1 ... PHASE 4 " * 500
+
+    for i in range(50):
+        store.record(f"conv_{i}", applicant_id=str(i % 10), campaign_id="42", knowledge_base=kb)
+    store.flush()
+
+    conn = sqlite3.connect(tmp_path / "calls.sqlite3")
+    assert conn.execute("SELECT COUNT(*) FROM knowledge_bases").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0] == 50
+
+    stats = store.stats()
+    assert stats["records"] == 50
+    assert stats["kb_deduplicated"] == 49
+    assert stats["commits"] < 50          # Group Commit
+    assert store.get_knowledge_base(kb_hash(kb)) == kb
+    store.close()
+    print(f"   ✅ {stats}")
+
+
+def test_concurrent_writers_and_queries(tmp_path):
+    store = CallResultStore(str(tmp_path / "calls.sqlite3"), batch_size=16)
+
+    def worker(n):
+        for i in range(25):
+            store.record(f"w{n}_{i}", applicant_id=f"a{n}", campaign_id=f"c{n % 2}",
+                         knowledge_base=f"KB Kampagne {n % 2}", metadata={"worker": n})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    store.attach_transcript("w1_3", "Agent: Hallo ...")
+    store.flush()
+
+    assert len(store.list_calls(campaign_id="c0", limit=1000)) == 50
+    by_applicant = store.list_calls(applicant_id="a3")
+    assert len(by_applicant) == 25 and by_applicant[0]["metadata"] == {"worker": 3}
+    assert [c["created_at"] for c in by_applicant] == sorted((c["created_at"] for c in by_applicant), reverse=True)
+
+    call = store.get_call("w1_3")
+    assert call["has_transcript"] and call["transcript"].startswith("Agent")
+
+    future = datetime.now(timezone.utc) + timedelta(minutes=1)
+    assert store.list_calls(since=future) == []
+    assert len(store.list_calls(until=future, limit=1000)) == 100
+    assert store.stats()["errors"] == 0
+    store.close()
+
+
+def test_failing_record_does_not_drop_batch(tmp_path):
+    store = CallResultStore(str(tmp_path / "calls.sqlite3"), flush_interval=0.5)
+    conn = sqlite3.connect(tmp_path / "calls.sqlite3")
+    conn.execute(
+        "CREATE TRIGGER reject_bad BEFORE INSERT ON calls WHEN NEW.conversation_id = 'bad' "
+        "BEGIN SELECT RAISE(ABORT, 'abgelehnt'); END"
+    )
+    conn.commit()
+
+    for conversation_id in ("ok_1", "bad", "ok_2"):
+        store.record(conversation_id, applicant_id="1", campaign_id="42", knowledge_base="KB")
+    store.flush()
+
+    assert store.get_call("ok_1") and store.get_call("ok_2") and store.get_call("bad") is None
+    stats = store.stats()
+    assert stats["records"] == 2 and stats["failed_records"] == 1 and stats["errors"] == 1
+    store.close()
+
+
+def test_close_flushes_pending(tmp_path):
+    path = tmp_path / "calls.sqlite3"
+    store = CallResultStore(str(path), flush_interval=1.0)
+    store.record("last", applicant_id="1", knowledge_base="kb")
+    store.close()
+
+    reopened = CallResultStore(str(path))
+    assert reopened.get_call("last")["applicant_id"] == "1"
+    reopened.close()
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
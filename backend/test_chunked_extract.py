@@ -0,0 +1,191 @@
+"""Test Chunked Extract - seitenweise parallele Extraktion großer Protokolle (ohne API)"""
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import llm_adapter, provider_health
+from src.questions.pipeline import extract_multistage
+from src.questions.pipeline.extract_multistage import chunk_protocol, derive_site_fields, merge_chunk_results
+from src.questions.provider_health import ProviderHealth
+from src.questions.structured_output import StructuredOutputError
+
+
+def _protocol(page_count=6, prompts_per_page=5):
+    return {
+        "id": 42,
+        "name": "Pflegefachkraft (m/w/d)",
+        "pages": [
+            {
+                "id": page,
+                "name": f"Seite {page}",
+                "prompts": [
+                    {"id": page * 100 + n, "question": f"Kriterium {page}.{n} " + "x" * 80, "position": n}
+                    for n in range(prompts_per_page)
+                ]
+            }
+            for page in range(1, page_count + 1)
+        ]
+    }
+
+
+def test_chunk_protocol_groups_pages_within_budget():
+    protocol = _protocol()
+    assert chunk_protocol(protocol, 0) == [protocol]
+    assert chunk_protocol(protocol, 100000) == [protocol]
+
+    page_tokens = len(json.dumps(protocol["pages"][0], ensure_ascii=False)) // 4
+    chunks = chunk_protocol(protocol, page_tokens * 2 + 50)
+    assert [[p["id"] for p in c["pages"]] for c in chunks] == [[1, 2], [3, 4], [5, 6]]
+    assert all(c["name"] == protocol["name"] and c["id"] == 42 for c in chunks)
+
+    # Zu große Einzelseite → eigener Chunk
+    assert len(chunk_protocol(protocol, 10)) == 6
+
+
+def test_merge_chunk_results_is_deterministic():
+    merged = merge_chunk_results([
+        {"gehalt": None, "benefits": ["Jobrad", "Kita-Zuschuss"], "protocol_questions": [{"text": "A"}]},
+        {"gehalt": {"min": 3500}, "benefits": ["jobrad ", "Weiterbildung"], "protocol_questions": [{"text": "a"}]},
+        {"gehalt": {"min": 9999}, "department_contacts": {"Pflege": "Frau X"}},
+        {"department_contacts": {"Pflege": "Herr Y", "IT": "Herr Z"}}
+    ])
+    assert merged["gehalt"] == {"min": 3500}
+    assert merged["benefits"] == ["Jobrad", "Kita-Zuschuss", "Weiterbildung"]
+    assert len(merged["protocol_questions"]) == 2   # Dedupe macht merge_protocol_questions
+    assert merged["department_contacts"] == {"Pflege": "Frau X", "IT": "Herr Z"}
+
+
+def test_merge_chunk_results_merges_dicts_per_key():
+    merged = merge_chunk_results([
+        {"gehalt": {"min": 3200}, "arbeitszeit": {"modell": "Vollzeit"}},
+        {"gehalt": {"min": 4000, "max": 4200}, "arbeitszeit": {"stunden": 38.5, "schichten": {"nacht": True}}},
+        {"arbeitszeit": {"schichten": {"wochenende": False}}}
+    ])
+    assert merged["gehalt"] == {"min": 3200, "max": 4200}
+    assert merged["arbeitszeit"] == {
+        "modell": "Vollzeit", "stunden": 38.5, "schichten": {"nacht": True, "wochenende": False}
+    }
+
+
+def test_site_fields_derived_after_merge():
+    chunk_question = {"category": "standort", "page_id": 1, "prompt_id": 7, "is_required": True}
+    merged = merge_chunk_results([
+        {"sites": [{"label": "Nord"}], "site_count": 1, "region_context": "Hamburg",
+         "protocol_questions": [{**chunk_question, "text": "Wir sind in Hamburg, genauer in Nord. Passt das für Sie?",
+                                 "type": "boolean"}]},
+        {"sites": [{"label": "Süd"}], "site_count": 1,
+         "protocol_questions": [{**chunk_question, "page_id": 3, "text": "Wir sind in Süd. Passt das für Sie?",
+                                 "type": "boolean"}, {"text": "Führerschein?", "category": "info"}]}
+    ])
+    derived = derive_site_fields(merged)
+
+    assert derived["site_count"] == 2
+    site_questions = [pq for pq in derived["protocol_questions"] if pq.get("category") == "standort"]
+    assert len(site_questions) == 1
+    assert site_questions[0]["type"] == "choice"
+    assert site_questions[0]["options"] == ["Nord", "Süd"]
+    assert site_questions[0]["text"] == "Wir haben 2 Standorte in Hamburg. Haben Sie eine Präferenz?"
+    assert (site_questions[0]["page_id"], site_questions[0]["prompt_id"]) == (1, 7)
+    assert [pq["text"] for pq in derived["protocol_questions"]][0] == "Führerschein?"
+
+
+def test_large_protocol_runs_chunks_concurrently(monkeypatch):
+    settings = extract_multistage.get_settings()
+    protocol = _protocol()
+    page_tokens = len(json.dumps(protocol["pages"][0], ensure_ascii=False)) // 4
+    monkeypatch.setattr(settings, "extract_chunk_token_budget", page_tokens * 2 + 50)
+
+    calls = []
+
+    async def fake_structured(messages, schema, stage, **kwargs):
+        chunk = json.loads(messages[1]["content"])["protocol"]
+        page_ids = [p["id"] for p in chunk["pages"]]
+        calls.append((stage, page_ids))
+        await asyncio.sleep(0.2 if page_ids[0] == 5 else 0.05)  # letzter Chunk am langsamsten
+        first = page_ids[0]
+        if stage == "extract_qualifications":
+            return {"must_have": [f"Examen {first}", "Deutsch B2"],
+                    "protocol_questions": [{"text": f"Frage {first}", "page_id": first}]}
+        if stage == "extract_rahmen":
+            return {"gehalt": {"min": 3000 + first} if first > 1 else None, "benefits": [f"Benefit {first}"],
+                    "arbeitszeit": None, "protocol_questions": [{"text": "Schicht?", "page_id": first}]}
+        return {"sites": [{"label": f"Standort {first}"}], "all_departments": ["Pflege"],
+                "priorities": [], "roles": [], "protocol_questions": []}
+
+    monkeypatch.setattr(extract_multistage, "call_llm_structured", fake_structured)
+
+    started = time.perf_counter()
+    result = asyncio.run(extract_multistage.extract_multi_stage(protocol))
+    elapsed = time.perf_counter() - started
+
+    assert len(calls) == 9
+    assert elapsed < 0.4, f"Chunks nicht parallel: {elapsed:.2f}s"
+    assert result.must_have == ["Examen 1", "Deutsch B2", "Examen 3", "Examen 5"]
+    assert result.constraints.gehalt == {"min": 3003}
+    assert [site.label for site in result.sites] == ["Standort 1", "Standort 3", "Standort 5"]
+    assert [pq.text for pq in result.protocol_questions] == ["Frage 1", "Frage 3", "Frage 5", "Schicht?"]
+    print(f"   ✅ 3 Chunks × 3 Extractors in {elapsed:.2f}s")
+
+
+def test_failed_extractor_fails_extract(monkeypatch):
+    """Ein Extractor ohne gültige Antwort bricht den Build ab statt leere Daten zu liefern"""
+    settings = extract_multistage.get_settings()
+    protocol = _protocol()
+    page_tokens = len(json.dumps(protocol["pages"][0], ensure_ascii=False)) // 4
+
+    async def fake_structured(messages, schema, stage, **kwargs):
+        chunk = json.loads(messages[1]["content"])["protocol"]
+        if stage == "extract_rahmen" and chunk["pages"][0]["id"] == 3:
+            raise StructuredOutputError("extract_rahmen: Antwort blieb ungültig")
+        return {"must_have": [], "sites": [], "protocol_questions": []}
+
+    monkeypatch.setattr(extract_multistage, "call_llm_structured", fake_structured)
+
+    for budget, pages in ((page_tokens * 2 + 50, protocol["pages"]), (0, protocol["pages"][2:3])):
+        monkeypatch.setattr(settings, "extract_chunk_token_budget", budget)
+        try:
+            asyncio.run(extract_multistage.extract_multi_stage({**protocol, "pages": pages}))
+            assert False, "StructuredOutputError erwartet"
+        except StructuredOutputError as e:
+            assert "ungültig" in str(e)
+
+
+def test_global_llm_limit(monkeypatch):
+    """Nie mehr als llm_max_concurrent_calls gleichzeitig beim Provider"""
+    settings = llm_adapter.get_settings()
+    monkeypatch.setattr(settings, "llm_max_concurrent_calls", 2)
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "use_claude_first", True)
+    monkeypatch.setattr(provider_health, "_provider_health", ProviderHealth())
+
+    in_flight = []
+    peak = []
+
+    async def slow_claude(*args, **kwargs):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.pop()
+        return {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 1}}
+
+    monkeypatch.setattr(llm_adapter, "_call_claude", slow_claude)
+
+    async def run():
+        return await asyncio.gather(*(
+            llm_adapter.call_llm_async([{"role": "user", "content": "x"}], force_provider="claude")
+            for _ in range(6)
+        ))
+
+    results = asyncio.run(run())
+    assert len(results) == 6
+    assert max(peak) == 2
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,117 @@
+"""Test Classification Cache - nur neue Items gehen ans LLM (ohne API)"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import classification_cache
+from src.questions.classification_cache import ClassificationCache
+from src.questions.pipeline import classify
+
+
+def _protocol(questions):
+    return {
+        "name": "Pflegefachkraft",
+        "pages": [{
+            "id": 1,
+            "name": "Der Bewerber erfüllt folgende Kriterien:",
+            "prompts": [{"id": i, "question": q, "position": i} for i, q in enumerate(questions, 1)]
+        }]
+    }
+
+
+def _fake_llm(calls):
+    """Klassifiziert alles mit 'zwingend' als Gate, Rest als Information"""
+    async def fake_structured(messages, schema, stage, temperature=None, **kwargs):
+        lines = [l for l in messages[1]["content"].splitlines() if l[:1].isdigit()]
+        calls.append(lines)
+        return {"classified_items": {
+            f"item_{n}": {
+                "intent": "GATE_QUESTION" if "zwingend" in line else "INFORMATION",
+                "confidence": "high"
+            }
+            for n, line in enumerate(lines, 1)
+        }}
+    return fake_structured
+
+
+def test_second_run_only_classifies_new_items(monkeypatch, tmp_path):
+    cache_path = tmp_path / "classification_cache.json"
+    monkeypatch.setattr(classification_cache, "_classification_cache", ClassificationCache(str(cache_path)))
+    calls = []
+    monkeypatch.setattr(classify, "call_llm_structured", _fake_llm(calls))
+
+    first = asyncio.run(classify.classify_protocol_items(_protocol([
+        "zwingend: Deutschkenntnisse B2",
+        "Einwilligung Datenschutz",
+        "zwingend: Deutschkenntnisse B2"   # Duplikat im selben Protokoll
+    ])))
+    assert len(calls[0]) == 2
+    assert len(first["gate_items"]) == 2
+
+    # Anderes Protokoll mit denselben Template-Items (andere Schreibweise) + einem neuen
+    second = asyncio.run(classify.classify_protocol_items(_protocol([
+        "Zwingend:  Deutschkenntnisse  B2",
+        "Führerschein Klasse B",
+        "einwilligung datenschutz"
+    ])))
+    assert len(calls) == 2 and len(calls[1]) == 1
+    assert "Führerschein" in calls[1][0]
+    assert [i["text"] for i in second["gate_items"]] == ["Zwingend:  Deutschkenntnisse  B2"]
+    assert [i["text"] for i in second["information_items"]] == ["Führerschein Klasse B", "einwilligung datenschutz"]
+
+    # Komplett bekanntes Protokoll: kein LLM-Call
+    asyncio.run(classify.classify_protocol_items(_protocol(["einwilligung datenschutz"])))
+    assert len(calls) == 2
+
+    # Persistenz: neuer Prozess liest die Datei
+    stored = json.loads(cache_path.read_text(encoding="utf-8"))
+    assert len(stored["entries"]) == 3
+    print(f"   ✅ Cache-Stats: {classification_cache._classification_cache.stats()}")
+
+
+def test_llm_failure_keeps_cache_hits(monkeypatch, tmp_path):
+    monkeypatch.setattr(classification_cache, "_classification_cache", ClassificationCache(str(tmp_path / "c.json")))
+    monkeypatch.setattr(classify, "call_llm_structured", _fake_llm([]))
+    asyncio.run(classify.classify_protocol_items(_protocol(["zwingend: Examen"])))
+
+    async def broken(*args, **kwargs):
+        raise classify.StructuredOutputError("kein gültiges JSON")
+
+    monkeypatch.setattr(classify, "call_llm_structured", broken)
+    result = asyncio.run(classify.classify_protocol_items(_protocol(["zwingend: Examen", "Neues Kriterium"])))
+    assert [i["text"] for i in result["gate_items"]] == ["zwingend: Examen"]
+    assert sum(len(items) for items in result.values()) == 1     # neues Item bleibt unklassifiziert
+
+
+def test_prompt_change_invalidates(tmp_path):
+    path = str(tmp_path / "cache.json")
+    item = {"page_name": "Kriterien", "text": "zwingend: Examen"}
+
+    cache = ClassificationCache(path)
+    cache.put("v1", item, {"intent": "gate_question", "original_text": "x"})
+    cache.save()
+
+    reloaded = ClassificationCache(path)
+    assert reloaded.get("v1", item) == {"intent": "GATE_QUESTION"}
+    assert reloaded.get("v2", item) is None
+    assert reloaded.stats()["entries"] == 0
+
+
+def test_lru_eviction():
+    cache = ClassificationCache(max_entries=2)
+    a, b, c = ({"page_name": "p", "text": t} for t in "abc")
+    cache.put("v", a, {"intent": "INFORMATION"})
+    cache.put("v", b, {"intent": "INFORMATION"})
+    assert cache.get("v", a)
+    cache.put("v", c, {"intent": "INFORMATION"})
+    assert cache.get("v", b) is None
+    assert cache.get("v", a) and cache.get("v", c)
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
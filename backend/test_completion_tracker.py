@@ -0,0 +1,144 @@
+"""Test Completion Tracker - Webhook, gebündeltes Polling mit Backoff, Timeouts (ohne API)"""
+
+import asyncio
+import hashlib
+import hmac
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.elevenlabs.completion_tracker import (
+    CompletionTracker, format_transcript, verify_webhook_signature
+)
+
+
+class FakeSource:
+    """Conversations werden nach n Status-Abfragen 'done'"""
+
+    def __init__(self, polls_until_done):
+        self.polls_until_done = polls_until_done
+        self.polls = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.transcripts = 0
+
+    async def status(self, conversation_id):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.005)
+        self.in_flight -= 1
+        self.polls[conversation_id] = self.polls.get(conversation_id, 0) + 1
+        done = self.polls[conversation_id] >= self.polls_until_done.get(conversation_id, 10**6)
+        return {"status": "done" if done else "processing"}
+
+    async def transcript(self, conversation_id):
+        self.transcripts += 1
+        return f"agent: Hallo {conversation_id}"
+
+
+def _tracker(source, **kwargs):
+    options = dict(batch_size=5, min_interval=0.01, max_interval=0.05, timeout=5.0)
+    options.update(kwargs)
+    return CompletionTracker(source.status, source.transcript, **options)
+
+
+def test_polling_completes_many_conversations_in_batches():
+    async def run():
+        source = FakeSource({f"c{i}": 1 + i % 3 for i in range(30)})
+        tracker = _tracker(source)
+        completed = []
+        tracker.add_callback(lambda result: completed.append(result["conversation_id"]))
+        tracker.start()
+
+        futures = [tracker.track(f"c{i}") for i in range(30)]
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=5)
+        await tracker.stop()
+        return source, tracker, results, completed
+
+    source, tracker, results, completed = asyncio.run(run())
+    assert all(r["status"] == "done" and r["source"] == "poll" for r in results)
+    assert results[7]["transcript"] == "agent: Hallo c7"
+    assert sorted(completed) == sorted(f"c{i}" for i in range(30))
+    assert 1 < source.max_in_flight <= 5
+    assert tracker.stats()["completed_poll"] == 30 and tracker.stats()["pending"] == 0
+
+
+def test_backoff_grows_interval():
+    async def run():
+        source = FakeSource({"slow": 6})
+        tracker = _tracker(source, min_interval=0.01, max_interval=0.04, backoff=2.0)
+        tracker.start()
+        started = time.monotonic()
+        await asyncio.wait_for(tracker.track("slow"), timeout=5)
+        elapsed = time.monotonic() - started
+        await tracker.stop()
+        return elapsed
+
+    # Intervalle 0.01, 0.02, 0.04, 0.04, 0.04, 0.04 statt 6 x 0.01
+    assert asyncio.run(run()) >= 0.15
+
+
+def test_webhook_completes_without_polling():
+    async def run():
+        source = FakeSource({})
+        tracker = _tracker(source, min_interval=10.0)
+        tracker.start()
+        future = tracker.track("conv_1")
+        await tracker.notify("conv_1", {
+            "status": "done",
+            "transcript": [{"role": "agent", "message": "Hallo"}, {"role": "user", "message": "Ja"}]
+        })
+        result = await asyncio.wait_for(future, timeout=1)
+
+        # Unbekannte Conversation: Callbacks laufen trotzdem
+        seen = []
+        tracker.add_callback(lambda r: seen.append(r["conversation_id"]))
+        await tracker.notify("untracked", {"status": "done"})
+        await tracker.stop()
+        return source, result, seen
+
+    source, result, seen = asyncio.run(run())
+    assert result["source"] == "webhook"
+    assert result["transcript"] == "agent: Hallo\nuser: Ja"
+    assert source.polls == {}
+    assert seen == ["untracked"] and source.transcripts == 1
+
+
+def test_timeout_and_failing_status():
+    async def run():
+        async def broken(conversation_id):
+            raise ConnectionError("down")
+
+        tracker = CompletionTracker(broken, min_interval=0.01, max_interval=0.02, timeout=0.1)
+        tracker.start()
+        try:
+            await asyncio.wait_for(tracker.track("lost"), timeout=2)
+        except TimeoutError as e:
+            error = e
+        stats = tracker.stats()
+        await tracker.stop()
+        return error, stats
+
+    error, stats = asyncio.run(run())
+    assert "lost" in str(error)
+    assert stats["timeouts"] == 1 and stats["polls"] >= 2
+
+
+def test_signature_and_transcript_format():
+    secret, body = "whsec", b'{"data": {"conversation_id": "c1"}}'
+    timestamp = str(int(time.time()))
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+
+    assert verify_webhook_signature(body, f"t={timestamp},v0={digest}", secret)
+    assert not verify_webhook_signature(body + b" ", f"t={timestamp},v0={digest}", secret)
+    assert not verify_webhook_signature(body, f"t=100,v0={digest}", secret)
+    assert not verify_webhook_signature(body, None, secret)
+    assert format_transcript(None) is None
+    assert format_transcript("fertig") == "fertig"
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,94 @@
+"""Test Diagnostics - Ring Buffer, Sampling und Hintergrund-Writer (ohne API)"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils import diagnostics as diagnostics_module
+from src.utils.diagnostics import Diagnostics
+
+
+def test_ring_buffer_keeps_latest_events():
+    """Ring Buffer ist begrenzt, ohne log_path wird nichts geschrieben"""
+    diagnostics = Diagnostics(buffer_size=3)
+    for i in range(5):
+        diagnostics.event("test", f"event {i}", {"i": i})
+
+    events = diagnostics.recent()
+    assert [e["data"]["i"] for e in events] == [2, 3, 4]
+    assert diagnostics.recent(1)[0]["message"] == "event 4"
+    assert diagnostics.stats()["recorded"] == 5
+    assert not diagnostics.running
+    print("   ✅ Ring Buffer hält die letzten 3 Events")
+
+
+def test_sampling_and_force():
+    """sample_rate=0 verwirft alles außer force-Events, disabled erfasst nichts"""
+    diagnostics = Diagnostics(sample_rate=0.0)
+    assert not diagnostics.event("test", "verworfen")
+    assert diagnostics.event("test", "Fehler", force=True)
+    assert diagnostics.stats()["sampled_out"] == 1
+    assert len(diagnostics.recent()) == 1
+
+    disabled = Diagnostics(enabled=False)
+    assert not disabled.event("test", "aus", force=True)
+    assert disabled.recent() == []
+
+
+def test_listener_writes_json_lines(tmp_path):
+    """Writer-Thread schreibt JSONL, stop() leert die Queue"""
+    log_path = tmp_path / "logs" / "diagnostics.jsonl"
+    diagnostics = Diagnostics(log_path=str(log_path))
+    diagnostics.start()
+    assert diagnostics.running
+
+    for i in range(50):
+        diagnostics.event("webhook", "Umlaut-Test äöü", {"i": i})
+    diagnostics.stop()
+
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 50
+    first = json.loads(lines[0])
+    assert first["location"] == "webhook"
+    assert first["message"] == "Umlaut-Test äöü"
+    assert json.loads(lines[-1])["data"]["i"] == 49
+
+    # Nach stop() nur noch Ring Buffer
+    diagnostics.event("webhook", "nach stop")
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 50
+    print("   ✅ 50 Events als JSON Lines geschrieben")
+
+
+def test_structure_v2_reports_via_diagnostics():
+    """build_questions_v2 schreibt keine Debug-Datei, sondern Diagnose-Events"""
+    from src.questions.pipeline.structure_v2 import build_questions_v2
+    from src.questions.types import ExtractResult
+
+    previous = diagnostics_module._diagnostics
+    diagnostics_module._diagnostics = Diagnostics()
+    try:
+        extract_result = ExtractResult(
+            must_have=["Examen"], sites=[], priorities=[], all_departments=[], protocol_questions=[]
+        )
+        questions = build_questions_v2(extract_result)
+        events = diagnostics_module._diagnostics.recent()
+    finally:
+        diagnostics_module._diagnostics = previous
+
+    assert [e["message"] for e in events] == ["V2 Entry", "After GENERATE", "V2 Exit"]
+    assert all(e["location"] == "build_questions_v2" for e in events)
+    assert events[-1]["data"]["final_count"] == len(questions)
+    print("   ✅ Structure V2 meldet Entry/Generate/Exit als Events")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_ring_buffer_keeps_latest_events()
+    test_sampling_and_force()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_listener_writes_json_lines(Path(tmp))
+    test_structure_v2_reports_via_diagnostics()
+    print("\n✅ Alle Diagnostics Tests bestanden")
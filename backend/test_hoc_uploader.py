@@ -0,0 +1,110 @@
+"""Test: Async HOC Uploader (Retry, gzip, Outbox) mit httpx MockTransport"""
+
+import asyncio
+import gzip
+import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+
+from src.storage.hoc_uploader import HOCUploader
+
+
+PACKAGE = {"campaign_id": "258", "company_name": "Klinikum Nord", "questions": {"questions": []}}
+
+
+def _make_uploader(tmp_path, responses):
+    """Uploader, dessen Transport die Status-Codes aus `responses` nacheinander liefert"""
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        status = responses.pop(0) if responses else 200
+        if status == "timeout":
+            raise httpx.ReadTimeout("timeout", request=request)
+        if status == 200:
+            return httpx.Response(200, json={"download_url": "https://hoc.example/p/258"})
+        if status in (201, 204):
+            return httpx.Response(status, text="Created" if status == 201 else "")
+        return httpx.Response(status, text="error")
+
+    uploader = HOCUploader(
+        hoc_api_url="https://hoc.example/api/v1",
+        hoc_api_key="secret",
+        outbox_dir=str(tmp_path / "outbox"),
+        max_attempts=3,
+        backoff_base=0.001,
+        transport=httpx.MockTransport(handler)
+    )
+    return uploader, received
+
+
+def test_retry_then_success(tmp_path):
+    """503 und Timeout werden wiederholt, Body ist gzip-komprimiert"""
+    async def run():
+        uploader, received = _make_uploader(tmp_path, [503, "timeout", 200])
+        url = await uploader.upload(PACKAGE)
+        await uploader.aclose()
+        return url, received
+
+    url, received = asyncio.run(run())
+    assert url == "https://hoc.example/p/258"
+    assert len(received) == 3
+    assert received[-1].headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(received[-1].content)) == PACKAGE
+
+
+def test_failed_upload_goes_to_outbox_and_is_flushed(tmp_path):
+    """Nach allen Fehlversuchen: Outbox statt Fehler, später nachgeholt"""
+    async def run():
+        uploader, received = _make_uploader(tmp_path, [500, 500, 500])
+        url = await uploader.upload_or_enqueue(PACKAGE)
+        queued = len(uploader.outbox)
+        uploaded = await uploader.flush_outbox()
+        await uploader.aclose()
+        return url, queued, uploaded, len(uploader.outbox), received
+
+    url, queued, uploaded, remaining, received = asyncio.run(run())
+    assert url is None
+    assert queued == 1
+    assert uploaded == 1
+    assert remaining == 0
+    assert len(received) == 4
+
+
+def test_client_error_is_not_retried(tmp_path):
+    async def run():
+        uploader, received = _make_uploader(tmp_path, [400])
+        try:
+            await uploader.upload(PACKAGE)
+            assert False, "400 sollte IOError werfen"
+        except IOError:
+            pass
+        await uploader.aclose()
+        return received
+
+    assert len(asyncio.run(run())) == 1
+
+
+def test_non_json_success_falls_back_to_endpoint(tmp_path):
+    async def run():
+        uploader, received = _make_uploader(tmp_path, [201, 204])
+        urls = [await uploader.upload(PACKAGE), await uploader.upload(PACKAGE)]
+        await uploader.aclose()
+        return urls, received
+
+    urls, received = asyncio.run(run())
+    assert urls == ["https://hoc.example/api/v1/campaigns/258/package"] * 2
+    assert len(received) == 2
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (test_retry_then_success, test_failed_upload_goes_to_outbox_and_is_flushed,
+                 test_client_error_is_not_retried, test_non_json_success_falls_back_to_endpoint):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("✅ Alle HOC Uploader Tests bestanden")
@@ -0,0 +1,154 @@
+"""Test Job Leases - genau ein Build über mehrere Worker, Übernahme nach Absturz (ohne API)"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.job_leases import ACQUIRED, DONE, RUNNING, JobLeaseStore, LeaseLost, LeaseTimeout
+
+
+def test_acquire_expiry_and_fingerprint(tmp_path):
+    store = JobLeaseStore(str(tmp_path / "leases.sqlite3"), lease_seconds=30)
+
+    assert store.acquire("build:1", "w1", "v1", now=1000.0) == ACQUIRED
+    assert store.acquire("build:1", "w2", "v1", now=1010.0) == RUNNING
+    assert store.heartbeat("build:1", "w1", now=1020.0)
+    assert store.acquire("build:1", "w2", "v1", now=1045.0) == RUNNING     # verlängert bis 1050
+
+    # w1 abgestürzt: Lease läuft ab, w2 übernimmt; w1 kann nicht mehr abschließen
+    assert store.acquire("build:1", "w2", "v1", now=1051.0) == ACQUIRED
+    assert not store.complete("build:1", "w1", {"ok": 1})
+    assert store.complete("build:1", "w2", {"ok": 2})
+    assert store.get("build:1")["result"] == {"ok": 2}
+    assert store.get("build:1")["attempts"] == 2
+
+    assert store.acquire("build:1", "w3", "v1") == DONE
+    assert store.acquire("build:1", "w3", "v2") == ACQUIRED                # neuer Inhalt
+    assert store.release("build:1", "w3", "boom")
+    assert store.acquire("build:1", "w4", "v2") == ACQUIRED                # nach Fehler erneut
+    assert store.stats(now=0)["jobs"] == {"running": 1}
+
+
+def test_exactly_one_build_across_workers(tmp_path):
+    path = str(tmp_path / "leases.sqlite3")
+    builds = []
+    results = []
+    lock = threading.Lock()
+
+    async def build():
+        with lock:
+            builds.append(threading.get_ident())
+        await asyncio.sleep(0.2)
+        return {"package": "p1"}
+
+    def worker(force):
+        # Eigene Store-Instanz und eigener Loop pro Thread (wie getrennte Prozesse)
+        store = JobLeaseStore(path, lease_seconds=5)
+        result = asyncio.run(store.run_once("campaign_setup:7", build, fingerprint="f", force=force,
+                                            poll_interval=0.02))
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=worker, args=(n % 2 == 0,)) for n in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Auch force-Anfragen, die auf den laufenden Build gewartet haben, bauen nicht erneut
+    assert len(builds) == 1
+    assert sorted(ran for _, ran in results) == [False] * 5 + [True]
+    assert all(result == {"package": "p1"} for result, _ in results)
+
+
+def test_crashed_worker_is_reclaimed(tmp_path):
+    store = JobLeaseStore(str(tmp_path / "leases.sqlite3"), lease_seconds=0.3)
+    store.acquire("campaign_setup:9", "crashed", "f")
+
+    async def build():
+        return "rebuilt"
+
+    result, ran = asyncio.run(store.run_once("campaign_setup:9", build, fingerprint="f", poll_interval=0.05))
+    assert (result, ran) == ("rebuilt", True)
+
+    # Job-Fehler gibt die Lease frei, Wartezeit auf fremden Worker ist begrenzt
+    async def failing():
+        raise ValueError("kaputt")
+
+    try:
+        asyncio.run(store.run_once("campaign_setup:10", failing))
+        assert False
+    except ValueError:
+        pass
+    assert store.get("campaign_setup:10")["status"] == "failed"
+
+    store.acquire("campaign_setup:11", "other", "f")
+    try:
+        asyncio.run(store.run_once("campaign_setup:11", build, fingerprint="f",
+                                   wait_timeout=0.1, poll_interval=0.02))
+        assert False
+    except LeaseTimeout:
+        pass
+
+
+def test_leader_lease(tmp_path):
+    store = JobLeaseStore(str(tmp_path / "leases.sqlite3"), lease_seconds=30)
+    assert store.hold("hoc_outbox", "a", now=1000.0)
+    assert not store.hold("hoc_outbox", "b", now=1010.0)
+    assert store.hold("hoc_outbox", "a", now=1020.0)                        # verlängert
+    assert not store.hold("hoc_outbox", "b", now=1045.0)
+    assert store.hold("hoc_outbox", "b", now=1051.0)                        # a ausgefallen
+    assert not store.hold("hoc_outbox", "a", now=1052.0)
+
+
+def test_done_without_stored_result_is_rebuilt(tmp_path):
+    store = JobLeaseStore(str(tmp_path / "leases.sqlite3"), lease_seconds=30)
+    stored = set()
+
+    # Worker hat den Lease abgeschlossen, ist vor dem (Write-Behind) Speichern abgestürzt
+    assert store.acquire("build:1", "crashed", "v1", now=1000.0) == ACQUIRED
+    assert store.complete("build:1", "crashed", {"hash": "abc"}, now=1001.0)
+
+    async def build():
+        stored.add("abc")
+        return {"hash": "abc"}
+
+    result, ran = asyncio.run(store.run_once(
+        "build:1", build, fingerprint="v1", wait_timeout=1, poll_interval=0.01,
+        verify_done=lambda result: result["hash"] in stored
+    ))
+    assert ran and stored == {"abc"}
+
+    # Jetzt gespeichert: wird übernommen statt neu gebaut
+    result, ran = asyncio.run(store.run_once(
+        "build:1", build, fingerprint="v1", verify_done=lambda result: result["hash"] in stored
+    ))
+    assert not ran and result == {"hash": "abc"}
+
+
+def test_job_is_cancelled_when_lease_is_lost(tmp_path):
+    store = JobLeaseStore(str(tmp_path / "leases.sqlite3"), lease_seconds=0.15)
+    saved = []
+
+    async def slow_build():
+        # Anderer Worker übernimmt die Lease, während dieser Build läuft
+        store.acquire("build:2", "other", "v1", force=True, now=9e9)
+        await asyncio.sleep(1)
+        saved.append("package")
+        return {"ok": True}
+
+    try:
+        asyncio.run(store.run_once("build:2", slow_build, owner="w1", fingerprint="v1"))
+        assert False, "LeaseLost erwartet"
+    except LeaseLost:
+        pass
+    assert saved == []
+    assert store.get("build:2")["owner"] == "other"
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,84 @@
+"""Test JSON Codec - orjson/stdlib identisch, kompakt auf der Platte, schnelle Responses (ohne API)"""
+
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.campaign_storage import CampaignStorage
+from src.utils import json_codec
+from benchmark_json import run_benchmark, synthetic_package
+
+
+class _Meta(BaseModel):
+    version: int
+
+
+SAMPLE = {
+    "name": "Pflegefachkraft – Süd",
+    "created": datetime(2025, 6, 2, 10, 0, tzinfo=timezone.utc),
+    "meta": _Meta(version=2),
+    "tags": {"nacht"},
+    "counts": {1: "eins"},
+    "nested": [{"a": None, "b": 1.5, "c": True}]
+}
+EXPECTED = {
+    "name": "Pflegefachkraft – Süd",
+    "created": "2025-06-02T10:00:00+00:00",
+    "meta": {"version": 2},
+    "tags": ["nacht"],
+    "counts": {"1": "eins"},
+    "nested": [{"a": None, "b": 1.5, "c": True}]
+}
+
+
+def test_backends_produce_same_data(monkeypatch):
+    fast = json_codec.dumps(SAMPLE)
+    assert json_codec.loads(fast) == EXPECTED
+    assert "Süd".encode("utf-8") in fast and b"\n" not in fast     # kompakt, ohne ASCII-Escaping
+
+    monkeypatch.setattr(json_codec, "orjson", None)
+    assert json_codec.backend() == "json"
+    slow = json_codec.dumps(SAMPLE)
+    assert json_codec.loads(slow) == EXPECTED
+    assert json_codec.loads(json_codec.dumps(SAMPLE, pretty=True)) == EXPECTED
+    assert json_codec.dumps({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+    try:
+        json_codec.loads(b"{kaputt")
+        assert False
+    except json_codec.JSONDecodeError:
+        pass
+
+
+def test_storage_roundtrip_and_legacy_files(tmp_path):
+    package = synthetic_package(10)
+    storage = CampaignStorage(str(tmp_path / "packages"))
+    storage.save_package("7", package)
+    assert storage.load_package("7") == package
+
+    # Alte, eingerückte Packages bleiben lesbar
+    (tmp_path / "packages" / "8.json").write_text(json.dumps(package, indent=2), encoding="utf-8")
+    assert storage.load_package("8") == package
+
+
+def test_fast_responses_and_benchmark():
+    from fastapi.testclient import TestClient
+    import api_server
+
+    response = TestClient(api_server.app).get("/")
+    assert response.status_code == 200 and response.json()["status"] == "online"
+    assert response.headers["content-type"] == "application/json"
+
+    results = run_benchmark({"klein": 5}, repeat=2)
+    assert results[0]["bytes_compact"] < results[0]["bytes_legacy"]
+    assert results[0]["encode_codec_ms"] > 0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,78 @@
+"""Test: Inkrementeller JSON-Parser (beliebige Chunk-Grenzen)"""
+
+import json
+import random
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.json_stream import IncrementalJSONParser
+
+
+DOCUMENT = {
+    "applicants": [
+        {"first_name": "Jörg \"JJ\"", "tags": ["a]", "{b"], "n": i} for i in range(50)
+    ],
+    "count": 50,
+    "ratio": -1.5e3,
+    "active": True,
+    "note": None,
+    "meta": {"nested": [1, 2, {"x": "}"}]}
+}
+
+
+def _parse_in_chunks(text: str, seed: int):
+    rng = random.Random(seed)
+    parser = IncrementalJSONParser()
+    events = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 40)
+        events += parser.feed(text[position:position + size])
+        position += size
+    parser.close()
+    return events
+
+
+def test_random_chunk_boundaries():
+    """Ergebnis ist unabhängig von den Chunk-Grenzen"""
+    text = json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+
+    for seed in range(25):
+        events = _parse_in_chunks(text, seed)
+        values = {key: value for kind, key, value in events if kind == "value"}
+        items = [value for kind, key, value in events if kind == "item" and key == "applicants"]
+        assert values == DOCUMENT
+        assert items == DOCUMENT["applicants"]
+
+
+def test_items_arrive_before_array_ends():
+    """Array-Elemente werden geliefert, bevor das Array geschlossen ist"""
+    parser = IncrementalJSONParser()
+    events = parser.feed('{"applicants": [{"id": 1}, {"id": 2}, {"id"')
+    assert [value for _, _, value in events] == [{"id": 1}, {"id": 2}]
+
+
+def test_incomplete_stream_raises():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": [1, 2')
+    try:
+        parser.close()
+        assert False, "Unvollständiges JSON sollte ValueError werfen"
+    except ValueError:
+        pass
+
+
+def test_skip_prefix_for_markdown_fences():
+    parser = IncrementalJSONParser(skip_prefix=True)
+    events = parser.feed('```json\n{"must_have": ["B2"]}\n```')
+    parser.close()
+    assert events[-1] == ("value", "must_have", ["B2"])
+
+
+if __name__ == "__main__":
+    test_random_chunk_boundaries()
+    test_items_arrive_before_array_ends()
+    test_incomplete_stream_raises()
+    test_skip_prefix_for_markdown_fences()
+    print("✅ Alle JSON-Stream Tests bestanden")
@@ -0,0 +1,125 @@
+"""Test Knowledge Store - Abschnitte, BM25-Lookup und Phase-Payload mit Budget (ohne API)"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.aggregator.kb_store import (
+    KnowledgeStore, KnowledgeStoreRegistry, knowledge_base_sections, split_phase_sections
+)
+from src.aggregator.knowledge_base_builder import KnowledgeBaseBuilder
+
+
+def _phase_texts(tmp_path):
+    builder = KnowledgeBaseBuilder(prompts_dir=tmp_path)
+    questions_json = {"questions": [
+        {"id": "q1", "question": "Haben Sie eine abgeschlossene Ausbildung als Pflegefachkraft?",
+         "category": "standardqualifikationen", "required": True, "type": "boolean"},
+        {"id": "q2", "question": "Sind Sie bereit, im Nachtdienst und Schichtdienst zu arbeiten?",
+         "category": "rahmenbedingungen", "type": "boolean"},
+        {"id": "q3", "question": "Welcher Standort passt Ihnen: Kita Nord oder Kita Süd?",
+         "category": "standort", "type": "choice"},
+    ]}
+    phase_2 = builder.build_phase_2({
+        "companyname": "Pflegeheim Sonnenhof", "companysize": 120,
+        "campaignlocation_label": "Berlin", "companypitch": "Jobrad, Kita-Zuschuss, 30 Tage Urlaub",
+        "companypriorities": "Nachtdienst", "campaignrole_title": "Pflegefachkraft"
+    })
+    return {"phase_2": phase_2, "phase_3": builder.build_phase_3(questions_json)}
+
+
+def test_sections_follow_banners(tmp_path):
+    texts = _phase_texts(tmp_path)
+    titles = [s["title"] for s in split_phase_sections("phase_3", texts["phase_3"])]
+    assert titles[:2] == ["PHASE 3: FRAGENKATALOG", "FRAGEN FÜR DIESE PHASE"]
+    assert "RAHMENBEDINGUNGEN" in titles and "STANDORTE" in titles
+    # Kein Text geht verloren
+    joined = "".join(s["text"] for s in split_phase_sections("phase_3", texts["phase_3"]))
+    assert "Nachtdienst" in joined and "Kita Süd" in joined
+
+
+def test_bm25_finds_relevant_section(tmp_path):
+    store = KnowledgeStore.from_phase_texts(_phase_texts(tmp_path))
+
+    hits = store.search("Nachtdienst Schicht", k=2, phase="phase_3")
+    assert hits[0]["title"] == "RAHMENBEDINGUNGEN"
+    assert hits[0]["score"] > 0
+
+    assert store.search("Standort Kita")[0]["title"] == "STANDORTE"
+    assert store.search("xyz unbekannt") == []
+    assert all(s["chars"] == len(s["text"]) for s in store.sections())
+
+
+def test_phase_payload_respects_budget(tmp_path):
+    texts = _phase_texts(tmp_path)
+    store = KnowledgeStore.from_phase_texts(texts)
+    sections = store.sections("phase_3")
+
+    full = store.phase_payload("phase_3")
+    assert "WEITERE ABSCHNITTE" not in full
+    assert len(full) >= sum(s["chars"] for s in sections)
+
+    budget = sections[0]["chars"] + sections[1]["chars"]
+    small = store.phase_payload("phase_3", budget)
+    assert len(small) < len(full)
+    assert small.startswith(sections[0]["text"])
+    # Ausgelassene Abschnitte sind per ID abrufbar
+    for section in sections[2:]:
+        assert f"[{section['id']}]" in small
+        assert store.section(section["id"])["text"] == section["text"]
+
+
+def test_registry_rebuilds_only_on_change(tmp_path):
+    texts = _phase_texts(tmp_path)
+    builds = []
+
+    def build(sources):
+        builds.append(1)
+        return KnowledgeStore.from_phase_texts(sources)
+
+    registry = KnowledgeStoreRegistry()
+    first = registry.get_or_build("42", texts, build)
+    assert registry.get_or_build("42", dict(texts), build) is first
+    changed = {**texts, "phase_2": texts["phase_2"] + "\nNEU"}
+    assert registry.get_or_build("42", changed, build) is not first
+    assert len(builds) == 2
+
+
+def test_registry_persists_phase_stores(tmp_path):
+    texts = _phase_texts(tmp_path)
+    writer = KnowledgeStoreRegistry(storage_dir=str(tmp_path / "kb"))
+    written = writer.get_or_build("42", texts, KnowledgeStore.from_phase_texts, persist=True)
+
+    reader = KnowledgeStoreRegistry(storage_dir=str(tmp_path / "kb"))
+    loaded = reader.get("42")
+    assert [s["id"] for s in loaded.sections()] == [s["id"] for s in written.sections()]
+    assert reader.get("42") is loaded and reader.get("43") is None
+
+    # Neuer Inhalt aus dem Call-Prozess wird beim nächsten Lookup übernommen
+    changed = {**texts, "phase_2": texts["phase_2"] + "\nNEU: Dienstwagen"}
+    KnowledgeStoreRegistry(storage_dir=str(tmp_path / "kb")).get_or_build(
+        "42", changed, KnowledgeStore.from_phase_texts, persist=True
+    )
+    assert reader.get("42").search("Dienstwagen")
+
+
+def test_store_from_package():
+    kb = {
+        "company_benefits": ["Jobrad", "Betriebliche Altersvorsorge"],
+        "salary_info": {"min": 3500, "max": 4200, "tarif": None},
+        "general_info": [],
+    }
+    assert [s["title"] for s in knowledge_base_sections(kb)] == ["COMPANY BENEFITS", "SALARY INFO"]
+
+    store = KnowledgeStore.from_package({
+        "knowledge_base": kb,
+        "questions": {"questions": [{"question": "Führerschein Klasse B?", "category": "zusaetzliche_informationen"}]}
+    })
+    assert store.search("Altersvorsorge")[0]["id"] == "knowledge_base:1"
+    assert store.search("Führerschein")[0]["phase"] == "questions"
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
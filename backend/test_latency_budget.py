@@ -0,0 +1,98 @@
+"""Test Latency Budget - adaptive Timeouts pro Stage und Stage Trace (ohne API)"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import llm_adapter, latency_budget, provider_health
+from src.questions.latency_budget import LatencyBudgets, collect_stage_trace
+from src.questions.provider_health import ProviderHealth
+
+
+def test_budget_from_percentile_with_floor_and_ceiling():
+    budgets = LatencyBudgets(percentile=90, headroom=2.0, floor_seconds=5, ceiling_seconds=60,
+                             default_seconds=120, min_samples=10)
+
+    assert budgets.timeout_for("classify", "claude", "m") == (120, "default")
+
+    for seconds in range(1, 11):  # 1..10s
+        budgets.record("classify", "claude", "m", float(seconds))
+    assert budgets.timeout_for("classify", "claude", "m") == (18.0, "observed")  # p90=9s × 2
+
+    for _ in range(10):
+        budgets.record("fast", "claude", "m", 0.5)
+    assert budgets.timeout_for("fast", "claude", "m")[0] == 5      # Floor
+
+    for _ in range(10):
+        budgets.record("slow", "claude", "m", 100.0)
+    assert budgets.timeout_for("slow", "claude", "m")[0] == 60     # Ceiling
+
+    # Schlüssel sind getrennt nach Provider/Model
+    assert budgets.timeout_for("classify", "openai", "m")[1] == "default"
+    print("   ✅ Perzentil, Floor und Ceiling korrekt")
+
+
+def test_timeouts_push_budget_up():
+    """Zensierte Timeout-Messwerte lassen das Budget bei Verlangsamung wachsen"""
+    budgets = LatencyBudgets(percentile=50, headroom=1.5, floor_seconds=1, ceiling_seconds=100,
+                             min_samples=4, window_size=8)
+    for _ in range(8):
+        budgets.record("extract", "claude", "m", 4.0)
+    first, _ = budgets.timeout_for("extract", "claude", "m")
+    assert first == 6.0
+
+    budget = first
+    for _ in range(16):
+        budgets.record("extract", "claude", "m", budget)   # Timeout beim aktuellen Budget
+        budget, _ = budgets.timeout_for("extract", "claude", "m")
+    assert budget > first * 2
+
+
+def test_call_uses_stage_budget_and_records_trace(monkeypatch):
+    """Hängender Claude-Call wird nach dem Stage-Budget abgebrochen, Fallback startet früh"""
+    budgets = LatencyBudgets(percentile=95, headroom=1.0, floor_seconds=0.05, ceiling_seconds=10,
+                             default_seconds=10, min_samples=3)
+    for _ in range(3):
+        budgets.record("classify", "claude", "claude-test", 0.1)
+    monkeypatch.setattr(latency_budget, "_latency_budgets", budgets)
+    monkeypatch.setattr(provider_health, "_provider_health", ProviderHealth())
+
+    settings = llm_adapter.get_settings()
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "anthropic_model", "claude-test")
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "openai_model", "gpt-test")
+    monkeypatch.setattr(settings, "use_claude_first", True)
+
+    async def hanging_claude(*args, **kwargs):
+        await asyncio.sleep(5)
+
+    async def quick_openai(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 1}}
+
+    monkeypatch.setattr(llm_adapter, "_call_claude", hanging_claude)
+    monkeypatch.setattr(llm_adapter, "_call_openai", quick_openai)
+
+    async def run():
+        with collect_stage_trace() as trace:
+            result = await llm_adapter.call_llm_async([{"role": "user", "content": "x"}], stage="classify")
+        return result, trace
+
+    result, trace = asyncio.run(run())
+
+    assert result["_provider"] == "openai"
+    assert result["_duration"] < 1.0
+    assert [(t["provider"], t["outcome"], t["budget_source"]) for t in trace] == [
+        ("claude", "timeout", "observed"),
+        ("openai", "ok", "default"),
+    ]
+    assert trace[0]["timeout_seconds"] == 0.1
+    assert "classify/openai/gpt-test" in budgets.snapshot()
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,208 @@
+"""Test LLM Streaming - inkrementelle JSON-Abschnitte aus Provider-Streams (ohne API)"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import llm_adapter, provider_health, structured_output
+from src.questions.pipeline import generate_unified
+from src.questions.provider_health import ProviderHealth
+from src.utils.json_stream import IncrementalJSONParser
+
+PAYLOAD = {
+    "sites": [{"label": "Kita Nord"}, {"label": "Kita Süd"}],
+    "all_departments": ["Pflege", "Verwaltung"],
+    "roles": []
+}
+TEXT = json.dumps(PAYLOAD, ensure_ascii=False)
+CHUNKS = [TEXT[i:i + 9] for i in range(0, len(TEXT), 9)]
+
+
+class _Stream:
+    """Async-Iterator über vorbereitete Events, protokolliert den Fortschritt"""
+
+    def __init__(self, events, progress):
+        self._events = events
+        self._progress = progress
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for index, event in enumerate(self._events):
+            self._progress.append(index)
+            await asyncio.sleep(0)
+            yield event
+
+
+def _claude_events():
+    events = [SimpleNamespace(type="message_start", message=SimpleNamespace(usage=SimpleNamespace(input_tokens=20)))]
+    events += [
+        SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="input_json_delta", partial_json=chunk))
+        for chunk in CHUNKS
+    ]
+    events.append(SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=30)))
+    return events
+
+
+def _use_fake_claude(monkeypatch, events, progress, fail_after=None):
+    class _FakeMessages:
+        async def create(self, stream=False, **kwargs):
+            assert stream, "Streaming-Modus erwartet"
+            selected = events if fail_after is None else events[:fail_after]
+            stream_obj = _Stream(selected, progress)
+            if fail_after is None:
+                return stream_obj
+
+            class _Failing(_Stream):
+                async def _gen(inner):
+                    async for event in _Stream._gen(inner):
+                        yield event
+                    raise ConnectionError("Stream abgerissen")
+
+            return _Failing(selected, progress)
+
+    class _FakeAnthropic:
+        def __init__(self, api_key):
+            self.messages = _FakeMessages()
+
+    monkeypatch.setattr(llm_adapter, "AsyncAnthropic", _FakeAnthropic)
+    monkeypatch.setattr(provider_health, "_provider_health", ProviderHealth())
+    settings = llm_adapter.get_settings()
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "use_claude_first", True)
+
+
+def test_claude_stream_emits_sections_early(monkeypatch):
+    """Abschnitte kommen während des Streams an, nicht erst am Ende"""
+    progress = []
+    seen = []
+    _use_fake_claude(monkeypatch, _claude_events(), progress)
+
+    def on_event(event):
+        seen.append((event, len(progress)))
+
+    result = asyncio.run(llm_adapter.call_llm_async(
+        [{"role": "user", "content": "x"}],
+        json_schema={"name": "extract_info", "schema": {"type": "object"}},
+        on_event=on_event
+    ))
+
+    kinds = [(kind, key) for (kind, key, _), _ in seen]
+    assert kinds[:3] == [("item", "sites"), ("item", "sites"), ("value", "sites")]
+    assert ("value", "roles") in kinds
+    # Erstes Site-Element deutlich vor dem letzten Chunk
+    assert seen[0][1] < len(CHUNKS) // 2
+    assert json.loads(result["choices"][0]["message"]["content"]) == PAYLOAD
+    assert result["usage"]["total_tokens"] == 50
+    assert result["_first_result_seconds"] is not None
+    assert llm_adapter.get_streaming_stats()["streams"] >= 1
+    print(f"   ✅ Erstes Ergebnis nach Chunk {seen[0][1]} von {len(CHUNKS)}")
+
+
+def test_no_fallback_after_partial_stream(monkeypatch):
+    """Nach ausgelieferten Abschnitten kein stiller Fallback auf OpenAI"""
+    progress = []
+    seen = []
+    _use_fake_claude(monkeypatch, _claude_events(), progress, fail_after=len(CHUNKS) // 2)
+
+    async def must_not_run(*args, **kwargs):
+        raise AssertionError("OpenAI-Fallback darf nicht laufen")
+
+    monkeypatch.setattr(llm_adapter, "_call_openai", must_not_run)
+
+    try:
+        asyncio.run(llm_adapter.call_llm_async(
+            [{"role": "user", "content": "x"}],
+            json_schema={"name": "extract_info", "schema": {"type": "object"}},
+            on_event=seen.append
+        ))
+        assert False, "Exception erwartet"
+    except Exception as e:
+        assert "Stream abgebrochen" in str(e)
+    assert seen
+
+
+def test_openai_stream_collects_content_and_usage():
+    """OpenAI-Chunks werden zusammengesetzt, Usage aus dem letzten Chunk"""
+    progress = []
+    chunks = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=c))], usage=None)
+        for c in CHUNKS
+    ]
+    chunks.append(SimpleNamespace(
+        choices=[],
+        usage=SimpleNamespace(total_tokens=42, prompt_tokens=30, completion_tokens=12)
+    ))
+
+    class _Completions:
+        async def create(self, **kwargs):
+            assert kwargs["stream"] and kwargs["stream_options"] == {"include_usage": True}
+            return _Stream(chunks, progress)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=_Completions()))
+    seen = []
+    collector = llm_adapter._StreamCollector(seen.append, started=0.0)
+
+    result = asyncio.run(llm_adapter._stream_openai(client, {"model": "gpt-4o"}, collector))
+
+    assert json.loads(result["choices"][0]["message"]["content"]) == PAYLOAD
+    assert result["usage"] == {"total_tokens": 42, "input_tokens": 30, "output_tokens": 12}
+    assert [e[1] for e in seen if e[0] == "value"] == ["sites", "all_departments", "roles"]
+
+
+def test_collector_tolerates_non_object_output():
+    """Nicht-Objekt-Antworten schalten nur die Events ab, der Text bleibt erhalten"""
+    seen = []
+    collector = llm_adapter._StreamCollector(seen.append, started=0.0)
+    collector.feed("```json\n")
+    collector.feed('{"a": [1, 2]}\n```')
+    assert [e[0] for e in seen] == ["item", "item", "value"]
+
+    collector = llm_adapter._StreamCollector(seen.append, started=0.0)
+    collector.feed("Leider kein JSON")
+    assert collector.text == "Leider kein JSON"
+
+
+def test_generate_consumes_only_validated_attempt(monkeypatch):
+    """Reparaturversuch streamt erneut - nur Fragen des gültigen Versuchs werden übernommen"""
+    monkeypatch.setattr(generate_unified.get_settings(), "llm_streaming_enabled", True)
+    stale = {"id": "alt", "type": "boolean", "required": True, "priority": 1}  # ohne "question"
+    fresh = [
+        {"id": "examen", "question": "Haben Sie ein Examen?", "type": "boolean", "required": True, "priority": 1},
+        {"id": "fuehrerschein", "question": "Führerschein?", "type": "boolean", "required": False, "priority": 2,
+         "group": "Unbekannt"}
+    ]
+    replies = [{"questions": [stale]}, {"questions": fresh, "info_pool": {}}]
+    attempts = []
+
+    async def fake_call_llm_async(messages, on_event=None, **kwargs):
+        text = json.dumps(replies[len(attempts)], ensure_ascii=False)
+        attempts.append(on_event)
+        parser = IncrementalJSONParser()
+        for event in parser.feed(text):
+            on_event(event)
+        return {"choices": [{"message": {"content": text, "role": "assistant"}}], "usage": {"total_tokens": 10}}
+
+    monkeypatch.setattr(structured_output, "call_llm_async", fake_call_llm_async)
+    protocol = {"pages": [{"name": "Bewerber erfüllt folgende Kriterien", "prompts": []}]}
+
+    result = asyncio.run(generate_unified.generate_from_kriterien(protocol))
+    streamed = dict(result["_streamed"])
+
+    assert len(attempts) == 2
+    assert len(streamed) == 2   # Frage aus Versuch 0 verworfen
+    questions, _ = generate_unified.merge_results(result, {}, {})
+    assert [q.id for q in questions] == ["examen", "fuehrerschein"]
+    assert all(any(q is s for s in streamed.values()) for q in questions)
+    assert questions[1].group.value == "Qualifikation"
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,97 @@
+"""Test Stand-in Server und Load Driver - Latenzen, Fehler-/429-Injektion, Ende-zu-Ende Lauf (ohne API)"""
+
+import random
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.loadtest.standin_server import (
+    EndpointProfile, LatencyModel, StandinConfig, StandinServer, parse_profile
+)
+from src.loadtest.load_driver import format_report, run_load_test
+
+
+def test_latency_models():
+    rng = random.Random(7)
+    assert LatencyModel.parse("fixed:0.05").sample(rng) == 0.05
+    assert all(0.1 <= LatencyModel.parse("uniform:0.1,0.2").sample(rng) <= 0.2 for _ in range(100))
+
+    samples = sorted(LatencyModel.parse("lognormal:0.1,0.8").sample(rng) for _ in range(2000))
+    assert 0.08 < samples[1000] < 0.12            # Median
+    assert samples[1979] > 3 * samples[1000]      # langer Tail (p99)
+
+    profile = parse_profile("latency=normal:0.2,0.01;errors=0.1;error_status=503;rate=5")
+    assert (profile.error_rate, profile.error_status, profile.rate_limit_per_second) == (0.1, 503, 5.0)
+    for bad in ("gamma:1,2", "uniform:0.1"):
+        try:
+            LatencyModel.parse(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+
+def test_rate_limit_and_error_injection():
+    config = StandinConfig(
+        profiles={
+            "status": EndpointProfile(rate_limit_per_second=3),
+            "start": EndpointProfile(error_rate=1.0, error_status=503),
+        },
+        seed=1
+    )
+    with StandinServer(config) as server:
+        with httpx.Client(base_url=server.base_url) as client:
+            codes = [client.get("/v1/convai/conversations/x").status_code for _ in range(6)]
+            limited = client.get("/v1/convai/conversations/x")
+            assert client.post("/v1/conversational-ai/conversations", json={}).status_code == 503
+            stats = client.get("/_standin/stats").json()
+
+    assert codes[:3] == [404, 404, 404] and 429 in codes[3:]
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+    assert stats["requests"]["start"] == {"503": 1}
+
+
+def test_end_to_end_load_run(tmp_path):
+    config = StandinConfig(
+        profiles={"start": EndpointProfile(latency=LatencyModel("uniform", 0.005, 0.02))},
+        call_duration=LatencyModel("fixed", 0.05),
+        applicants=12,
+        campaigns=2,
+        seed=3
+    )
+    with StandinServer(config) as server:
+        report = run_load_test(
+            server.base_url,
+            work_dir=str(tmp_path / "work"),
+            concurrency=4,
+            poll_interval=0.02
+        )
+        stats = server.stats()
+
+    assert report["calls"]["successful"] == 12 and report["calls"]["failed"] == 0
+    assert report["calls"]["throughput_per_minute"] > 0
+    assert report["completion"]["completed"] == 12 and report["completion"]["with_transcript"] == 12
+    assert report["uploads"]["uploaded"] == 2
+    assert stats["requests"]["start"] == {"200": 12} and stats["uploads"] == 2
+    assert "12/12 erfolgreich" in format_report(report)
+    assert (tmp_path / "work" / "prompts" / "Masterprompt.md").exists()     # Stub statt Settings-Default
+
+
+def test_throughput_counts_only_successful_calls(tmp_path):
+    config = StandinConfig(
+        profiles={"start": EndpointProfile(latency=LatencyModel("fixed", 0.005), error_rate=1.0, error_status=400)},
+        applicants=4,
+        campaigns=1,
+        seed=1
+    )
+    with StandinServer(config) as server:
+        report = run_load_test(server.base_url, work_dir=str(tmp_path), concurrency=2, upload_packages=False)
+
+    assert report["calls"]["failed"] == 4 and report["calls"]["throughput_per_minute"] == 0.0
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
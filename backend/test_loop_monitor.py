@@ -0,0 +1,113 @@
+"""Test Loop Lag Monitor und nicht-blockierender OpenAI-Pfad (ohne API)"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.utils.loop_monitor import LoopLagMonitor
+from src.questions import openai_adapter
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+def test_detects_blocking_call_with_stack():
+    """Ein time.sleep im Loop wird als Stall mit Stack gemeldet"""
+    stalls = []
+
+    async def scenario():
+        monitor = LoopLagMonitor(
+            interval_seconds=0.02, threshold_seconds=0.1, on_stall=stalls.append
+        )
+        monitor.start()
+        await asyncio.sleep(0.1)
+        _blocking_call()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["stalls"] == 1
+    assert stats["lag_max_ms"] >= 200
+    assert not stats["running"]
+    assert any("_blocking_call" in frame for frame in stalls[0]["stack"])
+    print(f"   ✅ Stall erkannt: {stalls[0]['lag_ms']}ms in _blocking_call")
+
+
+def test_no_stall_for_async_work():
+    """Echte async-Wartezeiten erzeugen keinen Stall"""
+    async def scenario():
+        monitor = LoopLagMonitor(interval_seconds=0.02, threshold_seconds=0.1)
+        monitor.start()
+        await asyncio.gather(*(asyncio.sleep(0.2) for _ in range(20)))
+        await monitor.stop()
+        return monitor.stats()
+
+    assert asyncio.run(scenario())["stalls"] == 0
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def create(self, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+
+        class _Response:
+            def model_dump(self):
+                return {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 1}}
+
+        return _Response()
+
+
+def test_call_openai_async_runs_concurrently(monkeypatch):
+    """call_openai_async blockiert den Loop nicht - Calls laufen parallel"""
+    completions = _FakeCompletions()
+
+    class _FakeClient:
+        chat = type("Chat", (), {"completions": completions})()
+
+    settings = openai_adapter.get_settings()
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(openai_adapter, "_get_async_client", lambda: _FakeClient())
+
+    async def scenario():
+        return await asyncio.gather(*(
+            openai_adapter.call_openai_async(
+                "gpt-4o", 0.0, [{"role": "user", "content": "hi"}], {"type": "json_object"}
+            )
+            for _ in range(5)
+        ))
+
+    results = asyncio.run(scenario())
+    assert len(results) == 5
+    assert completions.max_active == 5
+
+
+def test_async_client_pooled_per_loop(monkeypatch):
+    """Ein Client pro Event Loop, wiederverwendet innerhalb des Loops"""
+    settings = openai_adapter.get_settings()
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+
+    async def two_clients():
+        return openai_adapter._get_async_client(), openai_adapter._get_async_client()
+
+    first_a, first_b = asyncio.run(two_clients())
+    second_a, _ = asyncio.run(two_clients())
+    assert first_a is first_b
+    assert second_a is not first_a
+
+
+if __name__ == "__main__":
+    test_detects_blocking_call_with_stack()
+    test_no_stall_for_async_work()
+    print("\n✅ Alle Loop Monitor Tests bestanden")
@@ -0,0 +1,102 @@
+"""Test Package Store - komprimierte Blobs, Deduplizierung, Historie/Rollback (ohne API)"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage import package_store
+from src.storage.campaign_storage import CampaignStorage
+
+
+def _package(campaign_id, questions, created_at="2025-06-02T10:00:00Z"):
+    return {
+        "campaign_id": campaign_id,
+        "company_name": "Klinikum Süd",
+        "campaign_name": "Pflegefachkraft",
+        "created_at": created_at,
+        "questions": {"questions": [{"id": f"q{i}", "question": "Examen vorhanden? " * 20} for i in range(questions)]},
+        "kb_templates": {"phase_2": "Unternehmensvorstellung " * 50},
+        "knowledge_base": {"benefits": ["Jobrad", "30 Tage Urlaub"] * 30}
+    }
+
+
+def _blobs(storage):
+    return sorted(p.name for p in (storage.storage_dir / "blobs").glob("*/*"))
+
+
+def test_dedupe_and_transparent_load(tmp_path):
+    storage = CampaignStorage(str(tmp_path))
+    storage.save_package("1", _package("1", 10))
+    blob = next((tmp_path / "blobs").glob("*/*"))
+    mtime = blob.stat().st_mtime_ns
+
+    # Unveränderter Rebuild (nur created_at neu): kein neuer Blob, keine neue Version
+    storage.save_package("1", _package("1", 10, created_at="2025-06-03T08:00:00Z"))
+    assert len(_blobs(storage)) == 1 and blob.stat().st_mtime_ns == mtime
+    assert len(storage.package_history("1")) == 1
+    assert storage.load_package("1") == _package("1", 10)
+
+    # Gleicher Inhalt in anderer Kampagne wird einmal gespeichert
+    twin = dict(_package("1", 10), created_at="2025-06-04T00:00:00Z")
+    storage.save_package("2", twin)
+    assert len(_blobs(storage)) == 1
+    assert storage.load_package("2")["created_at"] == "2025-06-04T00:00:00Z"
+
+    # Komprimiert auf der Platte
+    assert blob.read_bytes()[:2] == b"\x1f\x8b" or blob.read_bytes()[:4] == b"\x28\xb5\x2f\xfd"
+    assert not (tmp_path / "1.json").exists()
+
+
+def test_history_rollback_and_info(tmp_path):
+    storage = CampaignStorage(str(tmp_path), history_limit=3)
+    first = storage.backend.put("5", _package("5", 5))
+    storage.save_package("5", _package("5", 8))
+
+    info = storage.get_package_info("5")
+    assert info["question_count"] == 8 and info["template_sizes"] == {"phase_2": len("Unternehmensvorstellung " * 50)}
+    assert info["storage"]["ratio"] > 2 and info["storage"]["stored_bytes"] < info["storage"]["raw_bytes"]
+    assert info["storage"]["versions"] == 2
+
+    entry = storage.rollback_package("5")
+    assert entry["hash"] == first["hash"] and entry["rollback"]
+    assert len(storage.load_package("5")["questions"]["questions"]) == 5
+    assert len(storage.load_package("5", version=storage.package_history("5")[1]["hash"][:10])
+               ["questions"]["questions"]) == 8
+
+    for n in range(3):
+        storage.save_package("5", _package("5", 20 + n))
+    assert len(storage.package_history("5")) == 3                   # history_limit
+
+    # Nicht mehr referenzierte Blobs werden aufgeräumt (Zeitpuffer 0 für den Test)
+    assert len(_blobs(storage)) == 5
+    assert storage.collect_garbage(min_age_seconds=0) == 2
+    assert storage.load_package("5")["questions"]["questions"][-1]["id"] == "q21"
+
+
+def test_legacy_files_and_listing(tmp_path, monkeypatch):
+    legacy = _package("9", 3)
+    (tmp_path / "9.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+    storage = CampaignStorage(str(tmp_path))
+    monkeypatch.setattr(package_store, "zstandard", None)
+    storage.save_package("10", _package("10", 4))
+
+    assert storage.list_packages() == ["10", "9"]
+    listed = {c["campaign_id"]: c for c in storage.list_campaigns()}
+    assert listed["9"]["question_count"] == 3 and listed["10"]["question_count"] == 4
+    assert storage.get_package_info("9")["storage"]["format"] == "legacy_json"
+    assert storage.get_package_info("10")["storage"]["codec"] == "gzip"
+    assert gzip.decompress(Path(storage.get_package_info("10")["storage"]["path"]).read_bytes())
+
+    # Neues Speichern löst die Legacy-Datei ab
+    storage.save_package("9", legacy)
+    assert not (tmp_path / "9.json").exists() and storage.load_package("9") == legacy
+    assert storage.delete_package("9") and not storage.package_exists("9")
+    assert storage.list_packages() == ["10"]
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
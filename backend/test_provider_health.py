@@ -0,0 +1,152 @@
+"""Test Provider Health - Circuit Breaker und Latenz-Routing (ohne API)"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import anthropic
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import llm_adapter, provider_health
+from src.questions.provider_health import CircuitBreaker, ProviderHealth, CLOSED, OPEN, HALF_OPEN
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_recovers_via_probe():
+    """closed → open nach Fehlern → half_open nach Cooldown → closed nach Probe"""
+    clock = _Clock()
+    breaker = CircuitBreaker("claude", consecutive_failures=3, cooldown_seconds=30, clock=clock)
+
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    clock.now += 31
+    assert breaker.allow_request()          # Probe
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()      # nur eine Probe gleichzeitig
+
+    breaker.record_success(2.0)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["times_opened"] == 1
+    print("   ✅ Zustandsübergänge korrekt")
+
+
+def test_failed_probe_reopens():
+    clock = _Clock()
+    breaker = CircuitBreaker("openai", consecutive_failures=2, cooldown_seconds=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now += 11
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["retry_in_seconds"] == 10.0
+
+
+def test_error_rate_threshold():
+    """Fehlerquote im Fenster öffnet auch ohne Fehler in Folge"""
+    breaker = CircuitBreaker("claude", error_rate_threshold=0.5, min_calls=6, consecutive_failures=99)
+    for ok in [True, False, True, False, True]:
+        breaker.record_success(1.0) if ok else breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+
+def test_route_skips_open_and_demotes_slow_primary():
+    clock = _Clock()
+    health = ProviderHealth(latency_route_factor=2.0, reprobe_seconds=60, clock=clock, consecutive_failures=1)
+
+    health.breaker("claude").record_success(12.0)
+    health.breaker("openai").record_success(3.0)
+    assert health.route(["claude", "openai"]) == ["openai", "claude"]
+
+    # Nach reprobe_seconds darf der langsame Primary wieder vorne messen
+    clock.now += 61
+    assert health.route(["claude", "openai"]) == ["claude", "openai"]
+    assert health.route(["claude", "openai"]) == ["openai", "claude"]
+
+    health.breaker("openai").record_failure()
+    assert health.route(["claude", "openai"]) == ["claude"]
+
+
+def test_outage_costs_one_failure_not_one_per_call(monkeypatch):
+    """Nach Öffnen des Breakers geht kein Call mehr an den ausgefallenen Provider"""
+    monkeypatch.setattr(provider_health, "_provider_health", ProviderHealth(consecutive_failures=1))
+    settings = llm_adapter.get_settings()
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "use_claude_first", True)
+
+    claude_calls = []
+
+    async def failing_claude(*args, **kwargs):
+        claude_calls.append(1)
+        raise ConnectionError("529 overloaded")
+
+    async def working_openai(*args, **kwargs):
+        return {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 1}}
+
+    monkeypatch.setattr(llm_adapter, "_call_claude", failing_claude)
+    monkeypatch.setattr(llm_adapter, "_call_openai", working_openai)
+
+    async def run_calls():
+        return [
+            await llm_adapter.call_llm_async([{"role": "user", "content": "x"}])
+            for _ in range(5)
+        ]
+
+    results = asyncio.run(run_calls())
+    assert all(r["_provider"] == "openai" for r in results)
+    assert len(claude_calls) == 1
+    snapshot = provider_health.get_provider_health().snapshot()
+    assert snapshot["claude"]["state"] == OPEN
+    assert snapshot["openai"]["state"] == CLOSED
+
+
+def test_client_errors_do_not_open_breaker(monkeypatch):
+    """400er liegen am Request - nur 5xx/429 und Transportfehler zählen"""
+    monkeypatch.setattr(provider_health, "_provider_health", ProviderHealth(consecutive_failures=1))
+    settings = llm_adapter.get_settings()
+    monkeypatch.setattr(settings, "anthropic_api_key", "sk-ant-test")
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "use_claude_first", True)
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    errors = [
+        anthropic.BadRequestError("prompt is too long", response=httpx.Response(400, request=request), body=None),
+        anthropic.RateLimitError("rate limited", response=httpx.Response(429, request=request), body=None)
+    ]
+
+    async def failing_claude(*args, **kwargs):
+        raise errors.pop(0)
+
+    async def working_openai(*args, **kwargs):
+        return {"choices": [{"message": {"content": "{}"}}], "usage": {"total_tokens": 1}}
+
+    monkeypatch.setattr(llm_adapter, "_call_claude", failing_claude)
+    monkeypatch.setattr(llm_adapter, "_call_openai", working_openai)
+
+    async def call():
+        return await llm_adapter.call_llm_async([{"role": "user", "content": "x"}])
+
+    assert asyncio.run(call())["_provider"] == "openai"
+    assert provider_health.get_provider_health().snapshot()["claude"]["state"] == CLOSED
+    asyncio.run(call())
+    assert provider_health.get_provider_health().snapshot()["claude"]["state"] == OPEN
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,182 @@
+"""Test Campaign Question Cache - Fragenkatalog pro Kampagne ohne Node-Prozess (ohne API)"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.orchestrator.question_cache import CampaignQuestionCache, protocol_fingerprint
+from src.storage.campaign_storage import CampaignStorage
+
+
+class _Question:
+    def __init__(self, qid, text):
+        self._data = {"id": qid, "question": text, "conversation_flow": {"intern": True}}
+
+    def model_dump(self):
+        return dict(self._data)
+
+
+def _fake_builder(builds):
+    lock = threading.Lock()
+
+    async def build(protocol, context):
+        with lock:
+            builds.append(protocol["name"])
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(questions=[_Question(f"q_{protocol['name']}", "Haben Sie ein Examen?")])
+
+    return build
+
+
+def test_concurrent_calls_share_one_build():
+    builds = []
+    cache = CampaignQuestionCache(builder=_fake_builder(builds))
+    protocol = {"name": "A", "pages": []}
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: cache.get("100", protocol), range(8)))
+
+    assert builds == ["A"]
+    assert all(r == {"questions": [{"id": "q_A", "question": "Haben Sie ein Examen?"}]} for r in results)
+    assert cache.stats()["hits"] >= 1
+
+    # Andere Kampagne → eigener Katalog, geändertes Protokoll → Neuaufbau
+    assert cache.get("200", {"name": "B", "pages": []})["questions"][0]["id"] == "q_B"
+    cache.get("100", {"name": "A2", "pages": []})
+    assert builds == ["A", "B", "A2"]
+    print(f"   ✅ Stats: {cache.stats()}")
+
+
+def test_stored_package_wins_and_no_build_without_flag(tmp_path):
+    builds = []
+    storage = CampaignStorage(storage_dir=str(tmp_path))
+    storage.save_package("300", {
+        "campaign_id": "300",
+        "questions": {"questions": [{"id": "stored", "question": "Aus dem Package"}]}
+    })
+    cache = CampaignQuestionCache(storage=storage, builder=_fake_builder(builds))
+
+    assert cache.get("300", {"name": "X"}, build=False)["questions"][0]["id"] == "stored"
+    assert cache.get("301", {"name": "Y"}, build=False) is None
+    assert builds == []
+    assert cache.stats()["package_loads"] == 1
+
+
+def test_package_from_other_protocol_is_rebuilt(tmp_path):
+    builds = []
+    storage = CampaignStorage(storage_dir=str(tmp_path))
+    storage.save_package("310", {
+        "campaign_id": "310",
+        "protocol_hash": protocol_fingerprint({"name": "alt"}),
+        "questions": {"questions": [{"id": "stored", "question": "Aus dem Package"}]}
+    })
+    cache = CampaignQuestionCache(storage=storage, builder=_fake_builder(builds))
+
+    assert cache.get("310", {"name": "alt"})["questions"][0]["id"] == "stored"
+    assert cache.get("310", {"name": "neu"})["questions"][0]["id"] == "q_neu"
+    assert cache.get("310", {"name": "neu2"}, build=False) is None
+    assert builds == ["neu"]
+    assert cache.stats()["stale_packages"] == 2
+
+
+def test_webhook_package_matches_api_protocol(tmp_path, monkeypatch):
+    from api_server import ConversationProtocol
+    from src.campaign import package_builder
+
+    api_protocol = {
+        "id": 7, "name": "Pflegefachkraft", "created_on": "2025-05-01T08:00:00Z", "updated_on": "2025-06-01T09:30:00Z",
+        "pages": [{
+            "id": 1, "name": "Kriterien", "position": 1, "is_template": False, "created_on": "2025-05-01T08:00:00Z",
+            "prompts": [{
+                "id": 11, "question": "zwingend: Examen", "position": 1, "checked": True,
+                "information": "", "answer": None, "updated_on": "2025-06-01T09:30:00Z"
+            }]
+        }]
+    }
+    webhook_protocol = ConversationProtocol(**api_protocol).model_dump()
+
+    builds = []
+    monkeypatch.setattr(package_builder, "build_question_catalog", _fake_builder(builds))
+    package = asyncio.run(package_builder.CampaignPackageBuilder().build_package_from_data(
+        campaign_id="320", company_data={"name": "Klinikum Ost"}, protocol_data=webhook_protocol
+    ))
+    storage = CampaignStorage(storage_dir=str(tmp_path))
+    storage.save_package("320", package)
+
+    # Call-Pfad mit dem API-Protokoll (zusätzliche Felder) nutzt das Package
+    cache = CampaignQuestionCache(storage=storage, builder=_fake_builder(builds))
+    assert asyncio.run(cache.get_async("320", api_protocol, build=False)) == package["questions"]
+    assert builds == ["Pflegefachkraft"] and cache.stats()["stale_packages"] == 0
+
+    # Geänderte Frage → Neuaufbau
+    api_protocol["pages"][0]["prompts"][0]["question"] = "zwingend: Examen + B2"
+    assert cache.get("320", api_protocol, build=False) is None
+
+
+def test_async_access_inside_event_loop():
+    builds = []
+    cache = CampaignQuestionCache(builder=_fake_builder(builds))
+
+    async def run():
+        protocol = {"name": "C"}
+        return await asyncio.gather(*(cache.get_async("400", protocol) for _ in range(5)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    assert builds == ["C"]
+    assert len({id(r) for r in results}) == 1
+    assert time.perf_counter() - started < 1.0
+
+
+def test_async_waiters_share_build_across_loops_and_survive_cancel():
+    builds = []
+    cache = CampaignQuestionCache(builder=_fake_builder(builds))
+    protocol = {"name": "D"}
+
+    async def run():
+        owner = asyncio.ensure_future(cache.get_async("500", protocol))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(cache.get_async("500", protocol))
+        cancelled = asyncio.ensure_future(cache.get_async("500", protocol))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await asyncio.gather(owner, waiter)
+
+    # Zweiter Loop im Worker-Thread wartet auf denselben Build
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        other = pool.submit(lambda: asyncio.run(cache.get_async("500", protocol)))
+        owner_result, waiter_result = asyncio.run(run())
+        assert other.result(timeout=5) == owner_result == waiter_result
+    assert builds == ["D"]
+
+
+def test_failed_build_reaches_waiters_and_is_retried():
+    attempts = []
+
+    async def failing(protocol, context):
+        attempts.append(1)
+        await asyncio.sleep(0.05)
+        if len(attempts) == 1:
+            raise RuntimeError("LLM nicht erreichbar")
+        return SimpleNamespace(questions=[_Question("q_ok", "Examen?")])
+
+    cache = CampaignQuestionCache(builder=failing)
+
+    async def run():
+        return await asyncio.gather(*(cache.get_async("600", {"name": "E"}) for _ in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results) and len(attempts) == 1
+    assert cache.get("600", {"name": "E"})["questions"][0]["id"] == "q_ok"
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
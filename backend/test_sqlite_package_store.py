@@ -0,0 +1,111 @@
+"""Test SQLite Package Backend - Projektionen, Index-Listen, Historie, Migration (ohne API)"""
+
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage import sqlite_package_store
+from src.storage.campaign_storage import CampaignStorage
+from migrate_packages import migrate_packages
+
+
+def _package(campaign_id, questions, company="Klinikum Ost", created_at="2025-06-02T10:00:00Z"):
+    return {
+        "campaign_id": campaign_id,
+        "company_name": company,
+        "campaign_name": "Pflegefachkraft",
+        "created_at": created_at,
+        "questions": {"questions": [{"id": f"q{i}", "question": "Examen vorhanden? " * 20} for i in range(questions)]},
+        "kb_templates": {"phase_2": "Unternehmensvorstellung " * 50},
+        "knowledge_base": {"benefits": ["Jobrad", "30 Tage Urlaub"] * 30}
+    }
+
+
+def test_roundtrip_projections_and_listing(tmp_path, monkeypatch):
+    storage = CampaignStorage(str(tmp_path), fsync=False, backend="sqlite")
+    storage.save_package("1", _package("1", 10))
+    storage.save_package("2", _package("2", 3, company="Reha Zentrum"))
+    storage.save_package("1", _package("1", 10, created_at="2025-06-03T08:00:00Z"))   # unverändert
+
+    assert storage.load_package("1") == _package("1", 10)
+    assert len(storage.package_history("1")) == 1
+
+    # Projektion dekomprimiert nur den angefragten Abschnitt
+    decoded = []
+    original = sqlite_package_store.decompress
+    monkeypatch.setattr(sqlite_package_store, "decompress", lambda data: decoded.append(1) or original(data))
+    assert len(storage.load_questions("1")["questions"]) == 10
+    assert storage.load_sections("1", "knowledge_base", "created_at", "fehlt") == {
+        "knowledge_base": _package("1", 1)["knowledge_base"],
+        "created_at": "2025-06-02T10:00:00Z"
+    }
+    assert len(decoded) == 2
+
+    listed = storage.list_campaigns(company_name="Reha Zentrum")
+    assert [c["campaign_id"] for c in listed] == ["2"] and listed[0]["question_count"] == 3
+    info = storage.get_package_info("1")
+    assert info["storage"]["format"] == "sqlite" and info["storage"]["ratio"] > 2
+    assert Path(info["storage"]["path"]).name == "packages.sqlite3"
+
+    conn = sqlite3.connect(tmp_path / "packages.sqlite3")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(str(row) for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM campaigns WHERE company_name = ?", ("Reha Zentrum",)
+    ))
+    assert "idx_campaigns_company" in plan
+
+
+def test_history_rollback_gc_and_concurrency(tmp_path):
+    storage = CampaignStorage(str(tmp_path), history_limit=3, fsync=False, backend="sqlite")
+    first = storage.backend.put("5", _package("5", 5))
+    storage.save_package("5", _package("5", 8))
+
+    entry = storage.rollback_package("5")
+    assert entry["hash"] == first["hash"] and entry["rollback"]
+    assert len(storage.load_package("5")["questions"]["questions"]) == 5
+    assert len(storage.load_package("5", version=storage.package_history("5")[1]["hash"][:10])
+               ["questions"]["questions"]) == 8
+
+    threads = [
+        threading.Thread(target=storage.save_package, args=("5", _package("5", 20 + n)))
+        for n in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(storage.package_history("5")) == 3                   # history_limit
+    assert storage.collect_garbage(min_age_seconds=0) == 5
+    assert storage.load_package("5")["questions"] == storage.load_questions("5")
+
+    assert storage.delete_package("5") and not storage.package_exists("5")
+    assert storage.collect_garbage(min_age_seconds=0) == 3
+
+
+def test_migration_from_json_and_blob_files(tmp_path):
+    legacy = _package("9", 3)
+    (tmp_path / "9.json").write_text(json.dumps(legacy, indent=2), encoding="utf-8")
+    files = CampaignStorage(str(tmp_path), fsync=False, backend="files")
+    files.save_package("10", _package("10", 4))
+    files.save_package("10", _package("10", 6))
+
+    stats = migrate_packages(str(tmp_path), remove_legacy=True)
+    assert stats["migrated"] == 2 and stats["versions"] == 3 and not stats["failed"]
+    assert not (tmp_path / "9.json").exists()
+
+    storage = CampaignStorage(str(tmp_path), fsync=False, backend="sqlite")
+    assert storage.load_package("9") == legacy
+    assert storage.load_package("10") == _package("10", 6)
+    assert [v["question_count"] for v in storage.package_history("10")] == [4, 6]
+
+    # Zweiter Lauf ändert nichts
+    assert migrate_packages(str(tmp_path))["unchanged"] == 1
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,131 @@
+"""Test Structured Output - Schema-Validierung, Repair-Loop, Tool-Use (ohne API)"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.questions import llm_adapter, structured_output
+from src.questions.schemas import QUALIFICATIONS_SCHEMA
+from src.questions.structured_output import (
+    StructuredOutputError,
+    call_llm_structured,
+    get_structured_output_stats,
+    reset_structured_output_stats,
+)
+
+VALID = {
+    "preferred": ["Pflegefachkraft"],
+    "alternatives": [],
+    "must_have": ["Deutsch B2"],
+    "optional": [],
+    "protocol_questions": []
+}
+
+
+def _fake_llm(replies, calls):
+    async def fake_call_llm_async(messages, **kwargs):
+        calls.append({"messages": messages, **kwargs})
+        return {
+            "choices": [{"message": {"content": replies[len(calls) - 1], "role": "assistant"}}],
+            "usage": {"total_tokens": 100}
+        }
+    return fake_call_llm_async
+
+
+MESSAGES = [{"role": "system", "content": "sys"}, {"role": "user", "content": "protokoll"}]
+
+
+def test_repair_after_invalid_payload(monkeypatch):
+    """Ungültige Antwort wird mit Fehlermeldung zur Korrektur zurückgeschickt"""
+    reset_structured_output_stats()
+    calls = []
+    invalid = json.dumps({**VALID, "must_have": "Deutsch B2"})
+    monkeypatch.setattr(structured_output, "call_llm_async", _fake_llm([invalid, json.dumps(VALID)], calls))
+
+    data = asyncio.run(call_llm_structured(MESSAGES, QUALIFICATIONS_SCHEMA, "extract_qualifications", max_repairs=1))
+
+    assert data == VALID
+    assert calls[0]["json_schema"]["name"] == "extract_qualifications"
+    repair_messages = calls[1]["messages"]
+    assert repair_messages[2] == {"role": "assistant", "content": invalid}
+    assert "must_have" in repair_messages[3]["content"]
+
+    stats = get_structured_output_stats()["extract_qualifications"]
+    assert stats == {"calls": 2, "parse_failures": 1, "repaired": 1, "failed": 0, "wasted_tokens": 100}
+    print("   ✅ Reparatur erfolgreich, Metriken gezählt")
+
+
+def test_bounded_retries_raise(monkeypatch):
+    """Nach max_repairs wird StructuredOutputError geworfen statt leerer Daten"""
+    reset_structured_output_stats()
+    calls = []
+    monkeypatch.setattr(structured_output, "call_llm_async", _fake_llm(["kein json", "{\"preferred\": ["], calls))
+
+    try:
+        asyncio.run(call_llm_structured(MESSAGES, QUALIFICATIONS_SCHEMA, "extract_qualifications", max_repairs=1))
+        assert False, "StructuredOutputError erwartet"
+    except StructuredOutputError as e:
+        assert "Kein gültiges JSON" in str(e)
+
+    assert len(calls) == 2
+    assert get_structured_output_stats()["extract_qualifications"]["failed"] == 1
+
+
+def test_events_tagged_with_attempt(monkeypatch):
+    """on_event erhält die Versuchsnummer, Reparaturversuche sind unterscheidbar"""
+    reset_structured_output_stats()
+    calls = []
+    fake = _fake_llm(["{\"preferred\": 1}", json.dumps(VALID)], calls)
+
+    async def streaming_fake(messages, on_event=None, **kwargs):
+        on_event(("value", "preferred", len(calls)))
+        return await fake(messages, **kwargs)
+
+    monkeypatch.setattr(structured_output, "call_llm_async", streaming_fake)
+    seen = []
+    data = asyncio.run(call_llm_structured(
+        MESSAGES, QUALIFICATIONS_SCHEMA, "extract_qualifications", max_repairs=1,
+        on_event=lambda attempt, event: seen.append((attempt, event))
+    ))
+
+    assert data == VALID
+    assert seen == [(0, ("value", "preferred", 0)), (1, ("value", "preferred", 1))]
+
+
+def test_claude_uses_forced_tool(monkeypatch):
+    """Mit json_schema erzwingt der Claude-Call ein Tool und liefert dessen Input"""
+    captured = {}
+
+    class _FakeMessages:
+        async def create(self, **kwargs):
+            captured.update(kwargs)
+            return SimpleNamespace(
+                content=[SimpleNamespace(type="tool_use", input=VALID)],
+                usage=SimpleNamespace(input_tokens=10, output_tokens=5)
+            )
+
+    class _FakeAnthropic:
+        def __init__(self, api_key):
+            self.messages = _FakeMessages()
+
+    monkeypatch.setattr(llm_adapter, "AsyncAnthropic", _FakeAnthropic)
+    settings = SimpleNamespace(anthropic_api_key="sk-test", anthropic_model="claude-test")
+
+    result = asyncio.run(llm_adapter._call_claude(
+        MESSAGES, 0.7, settings, {"name": "extract_qualifications", "schema": QUALIFICATIONS_SCHEMA}
+    ))
+
+    assert captured["tool_choice"] == {"type": "tool", "name": "extract_qualifications"}
+    assert captured["tools"][0]["input_schema"] is QUALIFICATIONS_SCHEMA
+    assert "NUR mit validem JSON" not in captured["system"]
+    assert json.loads(result["choices"][0]["message"]["content"]) == VALID
+    assert result["usage"]["total_tokens"] == 15
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,111 @@
+"""Test Package Writes - atomar, Sperre pro Kampagne, Write-Behind mit Retry (ohne API)"""
+
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage import package_store
+from src.storage.campaign_storage import CampaignStorage
+from src.storage.write_behind import PackageWriteBehind, get_package_writer, stop_package_writers
+
+
+def _package(campaign_id, questions):
+    return {
+        "campaign_id": campaign_id,
+        "company_name": "Klinikum Nord",
+        "created_at": f"2025-06-02T10:00:{questions:02d}Z",
+        "questions": {"questions": [{"id": f"q{i}"} for i in range(questions)]}
+    }
+
+
+def test_atomic_write_leaves_no_partial_files(tmp_path, monkeypatch):
+    target = tmp_path / "refs" / "1.json"
+    package_store.atomic_write(target, b"alt", fsync=True)
+
+    def broken_replace(src, dst):
+        raise OSError("Platte voll")
+
+    monkeypatch.setattr(package_store.os, "replace", broken_replace)
+    try:
+        package_store.atomic_write(target, b"neu", fsync=True)
+        assert False
+    except OSError:
+        pass
+    assert target.read_bytes() == b"alt"
+    assert [p.name for p in target.parent.iterdir()] == ["1.json"]
+
+
+def test_concurrent_saves_keep_every_version(tmp_path):
+    storage = CampaignStorage(str(tmp_path), fsync=False)
+    threads = [
+        threading.Thread(target=storage.save_package, args=("3", _package("3", n)))
+        for n in range(1, 9)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Ohne Sperre überschreiben sich parallele Pointer-Updates gegenseitig
+    history = storage.package_history("3")
+    assert len(history) == 8
+    assert sorted(entry["question_count"] for entry in history) == list(range(1, 9))
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_write_behind_read_your_writes_and_flush(tmp_path):
+    storage = CampaignStorage(str(tmp_path), fsync=False)
+    try:
+        storage.enqueue_package("4", _package("4", 2))
+        storage.enqueue_package("4", _package("4", 5))
+
+        # Sofort lesbar, auch über eine neue Instanz im selben Prozess
+        assert CampaignStorage(str(tmp_path), fsync=False).package_exists("4")
+        assert len(storage.load_package("4")["questions"]["questions"]) == 5
+
+        writer = get_package_writer(str(tmp_path))
+        assert writer.flush(timeout=10)
+        assert storage.backend.current("4")["question_count"] == 5
+        assert writer.stats()["pending"] == 0
+    finally:
+        assert stop_package_writers(timeout=10)
+    assert storage.load_package("4") == _package("4", 5)
+
+
+def test_write_behind_uses_callers_backend(tmp_path):
+    storage = CampaignStorage(str(tmp_path), fsync=False, backend="sqlite")
+    files = CampaignStorage(str(tmp_path), fsync=False, backend="files")
+    try:
+        storage.enqueue_package("42", _package("42", 3))
+        assert storage.package_exists("42") and not files.package_exists("42")
+        assert get_package_writer(str(tmp_path), "sqlite").flush(timeout=10)
+    finally:
+        assert stop_package_writers(timeout=10)
+    assert storage.backend.current("42")["question_count"] == 3
+    assert not list((tmp_path / "refs").glob("*.json"))
+
+
+def test_failed_writes_are_retried(tmp_path):
+    calls = []
+
+    class FlakyStorage:
+        def save_package(self, campaign_id, package):
+            calls.append(campaign_id)
+            if calls.count("a") < 3 and campaign_id == "a":
+                raise IOError("Platte nicht erreichbar")
+
+    writer = PackageWriteBehind(FlakyStorage(), retry_delay=0.01)
+    with writer._cond:                                   # beide liegen an, bevor der Thread startet
+        writer.submit("a", {"n": 1})
+        writer.submit("b", {"n": 2})
+    assert writer.stop(timeout=10)
+    assert calls.count("a") == 3 and "b" in calls
+    assert calls.index("b") < 2                          # "b" wartet nicht auf "a"
+    assert writer.stats()["errors"] == 2 and writer.stats()["written"] == 2
+
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
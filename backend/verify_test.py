@@ -1,12 +1,15 @@
-import json
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.storage.campaign_storage import CampaignStorage
 
 print("="*70)
 print("🧪 TEST-ERGEBNIS: Automatische Fragen wurden entfernt")
 print("="*70)
 
 # Campaign 258
-with open('campaign_packages/258.json', encoding='utf-8') as f:
-    c258 = json.load(f)
+c258 = CampaignStorage().load_package('258')
 
 print("\n📦 Campaign 258 (Wege Klinik):")
 print(f"   Fragen: {len(c258['questions']['questions'])}")
@@ -14,8 +17,7 @@ for q in c258['questions']['questions']:
     print(f"   ✓ {q['id']}")
 
 # Campaign 93
-with open('campaign_packages/93.json', encoding='utf-8') as f:
-    c93 = json.load(f)
+c93 = CampaignStorage().load_package('93')
 
 print("\n📦 Campaign 93 (Evangelische Krankenhausgemeinschaft):")
 print(f"   Fragen: {len(c93['questions']['questions'])}")